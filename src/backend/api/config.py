@@ -19,6 +19,15 @@ class Settings:
     # Durées de vie des tokens
     access_ttl_minutes: int = int(os.getenv("ACCESS_TTL_MINUTES", "60"))
     refresh_ttl_days: int = int(os.getenv("REFRESH_TTL_DAYS", "7"))
+    # Access tokens déjà vérifiés gardés en mémoire (0 = désactivé)
+    jwt_cache_size: int = int(os.getenv("JWT_CACHE_SIZE", "4096"))
+    # Durée (s) pendant laquelle un utilisateur existant n'est pas revérifié
+    # en base par les routes protégées (0 = désactivé)
+    user_cache_ttl_seconds: float = float(os.getenv("USER_CACHE_TTL_SECONDS", "30"))
+    # Hachage bcrypt : nb de processus (0 = nb de cœurs) et appels admis en
+    # cours + en attente (0 = 2 x processus) avant rejet en 503
+    password_hash_workers: int = int(os.getenv("PASSWORD_HASH_WORKERS", "0"))
+    password_hash_max_pending: int = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "0"))
 
     # CORS (frontend local par défaut)
     cors_allow_origins: list[str] = field(
@@ -32,11 +41,58 @@ class Settings:
         ]
     )
 
+    # Recherche de recettes : correspondance terme <-> ingrédient
+    # ("ilike" ou "trigram", voir RecipeDAO.find_recipes_by_ingredients)
+    recipe_search_match: str = os.getenv("RECIPE_SEARCH_MATCH", "ilike")
+    # Moteur de recherche en base : "sql" (requêtes), "index" (index inversé
+    # en mémoire) ou "matrix" (matrice d'incidence NumPy), chargés au démarrage
+    recipe_search_engine: str = os.getenv("RECIPE_SEARCH_ENGINE", "sql")
+    # Moteur "index" : rechargement complet périodique (secondes, 0 = jamais),
+    # pour voir les écritures des autres workers
+    recipe_index_refresh_seconds: float = float(
+        os.getenv("RECIPE_INDEX_REFRESH_SECONDS", "300")
+    )
+    # Cache des résultats de recherche (durée de vie en secondes, 0 = désactivé)
+    recipe_search_cache_ttl_seconds: float = float(
+        os.getenv("RECIPE_SEARCH_CACHE_TTL_SECONDS", "60")
+    )
+    recipe_search_cache_size: int = int(os.getenv("RECIPE_SEARCH_CACHE_SIZE", "1024"))
+    # Latence : attente maximale de l'API, comptée depuis le début de la
+    # recherche (secondes, 0 = sans limite ; la requête DB n'est pas bornée) et
+    # appel API lancé en parallèle de la base ("hedge")
+    recipe_search_api_wait_seconds: float = float(
+        os.getenv("RECIPE_SEARCH_API_WAIT_SECONDS", "0")
+    )
+    recipe_search_hedge: bool = os.getenv("RECIPE_SEARCH_HEDGE", "false").lower() in (
+        "1",
+        "true",
+        "yes",
+    )
+    # Persistance des recettes externes par une file de fond (écritures
+    # groupées, la réponse attend l'id local) : taille de la file
+    # (0 = persistance dans la requête) et taille des lots
+    recipe_import_queue_size: int = int(os.getenv("RECIPE_IMPORT_QUEUE_SIZE", "256"))
+    recipe_import_batch_size: int = int(os.getenv("RECIPE_IMPORT_BATCH_SIZE", "20"))
+
     # =========================
     # Services externes
     # =========================
     # Clé Spoonacular (optionnelle) – utilisée pour compléter les recettes via API.
     api_key_spoonacular: str | None = os.getenv("API_KEY_SPOONACULAR") or None
+    # Cache disque (SQLite) des réponses Spoonacular ("" = désactivé)
+    spoonacular_cache_path: str = os.getenv(
+        "SPOONACULAR_CACHE_PATH", ".cache/spoonacular.sqlite3"
+    )
+    spoonacular_cache_max_mb: int = int(os.getenv("SPOONACULAR_CACHE_MAX_MB", "50"))
+    # Limiteur local : budget journalier (points), débit, état persistant
+    spoonacular_daily_quota: float = float(os.getenv("SPOONACULAR_DAILY_QUOTA", "150"))
+    spoonacular_rate_per_second: float = float(
+        os.getenv("SPOONACULAR_RATE_PER_SECOND", "1")
+    )
+    spoonacular_burst: int = int(os.getenv("SPOONACULAR_BURST", "2"))
+    spoonacular_quota_path: str = os.getenv(
+        "SPOONACULAR_QUOTA_PATH", ".cache/spoonacular_quota.sqlite3"
+    )
 
 
 settings = Settings()
@@ -7,24 +7,48 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 
 from api.config import settings
+from clients.spoonacular_client import (
+    SpoonacularRateLimiter,
+    SpoonacularResponseCache,
+    shared_rate_limiter,
+    shared_response_cache,
+)
 from dao.ingredient_dao import IngredientDAO
 from dao.recipe_dao import RecipeDAO
 from services.find_recipe import FindRecipe, IngredientSearchQuery
-from services.find_recipe_api import ApiFindRecipe
+from services.find_recipe_api import ApiFindRecipe, shared_recipe_importer
+from services.find_recipe_db import DbFindRecipe
 from services.find_recipe_factory import FindRecipeFactory
+from services.find_recipe_index import shared_index_finder
+from services.recipe_scoring import shared_recipe_scorer
+from services.recipe_search_cache import SearchResultCache, shared_search_cache
 from services.stock_service import StockService
+from services.user_cache import UserExistenceCache, shared_user_cache
 from services.user_service import UserNotFoundError, UserService
 from utils.jwt_utils import (
     JWTExpiredError,
     JWTInvalidTokenError,
     JWTIssuerError,
+    VerifiedTokenCache,
     decode_jwt,
 )
+from utils.write_behind import WriteBehindQueue
 
 
 # Schéma "Authorization: Bearer <token>"
 bearer = HTTPBearer(auto_error=False)
 
+# Access tokens déjà vérifiés : un client renvoie le même token à chaque requête
+_verified_tokens: VerifiedTokenCache | None = (
+    VerifiedTokenCache(max_entries=settings.jwt_cache_size)
+    if settings.jwt_cache_size > 0
+    else None
+)
+
+# En-tête portant le curseur de la page suivante (pagination keyset).
+# Le corps des listes reste un simple tableau JSON.
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
 
 @dataclass(frozen=True, slots=True)
 class CurrentUser:
@@ -83,6 +107,7 @@ def get_current_user(
             token,
             secret=settings.jwt_secret,
             issuer=settings.jwt_issuer,
+            cache=_verified_tokens,
         )
     except (JWTExpiredError, JWTInvalidTokenError, JWTIssuerError) as exc:
         raise HTTPException(
@@ -119,7 +144,17 @@ def get_current_user_checked_exists(
     Variante plus stricte :
     - JWT valide
     - ET utilisateur toujours présent en BDD
+
+    Les utilisateurs trouvés sont mémorisés quelques secondes (voir
+    `USER_CACHE_TTL_SECONDS`) ; `UserService` invalide l'entrée à la
+    suppression ou à la modification d'un compte.
     """
+    cache = _user_cache()
+    generation = None
+    if cache is not None:
+        if cache.contains(cu.user_id):
+            return cu
+        generation = cache.generation()
 
     try:
         user_service.get_user(cu.user_id)
@@ -129,6 +164,9 @@ def get_current_user_checked_exists(
             detail=str(exc),
         ) from exc
 
+    if cache is not None:
+        # Ignoré si le compte a été modifié ou supprimé pendant la lecture
+        cache.put(cu.user_id, generation=generation)
     return cu
 
 
@@ -157,6 +195,7 @@ def get_current_user_optional(
             token,
             secret=settings.jwt_secret,
             issuer=settings.jwt_issuer,
+            cache=_verified_tokens,
         )
     except (JWTExpiredError, JWTInvalidTokenError, JWTIssuerError) as exc:
         raise HTTPException(
@@ -190,28 +229,52 @@ def get_current_user_optional(
 # ---------------------------------------------------------------------
 
 
-class _DbFindRecipe(FindRecipe):
-    """Implémentation DB de FindRecipe basée sur RecipeDAO."""
+def _running_under_pytest() -> bool:
+    # PYTEST_CURRENT_TEST est automatiquement défini pendant l'exécution des tests
+    return bool(os.getenv("PYTEST_CURRENT_TEST"))
 
-    def __init__(self, dao: RecipeDAO):
-        self._dao = dao
 
-    def get_by_id(self, recipe_id: int):
-        return self._dao.get_recipe_by_id(int(recipe_id), with_relations=True)
+def _user_cache() -> UserExistenceCache | None:
+    # Désactivé en tests : la base est réinitialisée entre les tests
+    if _running_under_pytest() or settings.user_cache_ttl_seconds <= 0:
+        return None
+    return shared_user_cache(ttl_seconds=settings.user_cache_ttl_seconds)
 
-    def search_by_ingredients(self, query: IngredientSearchQuery):
-        return self._dao.find_recipes_by_ingredients(
-            query.ingredients,
-            limit=query.limit,
-            max_missing=query.max_missing,
-            strict_only=query.strict_only,
-            dish_type=query.dish_type,
-        )
 
+def _search_cache() -> SearchResultCache | None:
+    if settings.recipe_search_cache_ttl_seconds <= 0:
+        return None
+    return shared_search_cache(
+        ttl_seconds=settings.recipe_search_cache_ttl_seconds,
+        max_entries=settings.recipe_search_cache_size,
+    )
 
-def _running_under_pytest() -> bool:
-    # PYTEST_CURRENT_TEST est automatiquement défini pendant l'exécution des tests
-    return bool(os.getenv("PYTEST_CURRENT_TEST"))
+
+def _spoonacular_cache() -> SpoonacularResponseCache | None:
+    if not settings.spoonacular_cache_path:
+        return None
+    return shared_response_cache(
+        settings.spoonacular_cache_path,
+        max_bytes=settings.spoonacular_cache_max_mb * 1024 * 1024,
+    )
+
+
+def _spoonacular_limiter() -> SpoonacularRateLimiter:
+    return shared_rate_limiter(
+        settings.spoonacular_quota_path or None,
+        daily_budget=settings.spoonacular_daily_quota,
+        rate_per_second=settings.spoonacular_rate_per_second,
+        burst=settings.spoonacular_burst,
+    )
+
+
+def _recipe_importer() -> WriteBehindQueue | None:
+    if settings.recipe_import_queue_size <= 0:
+        return None
+    return shared_recipe_importer(
+        max_size=settings.recipe_import_queue_size,
+        batch_size=settings.recipe_import_batch_size,
+    )
 
 
 def get_recipe_finder() -> FindRecipe:
@@ -221,23 +284,48 @@ def get_recipe_finder() -> FindRecipe:
     - Sous pytest : DB only (pour ne jamais consommer le quota)
     """
     recipe_dao = RecipeDAO()
-    db_finder: FindRecipe = _DbFindRecipe(recipe_dao)
+    db_finder: FindRecipe
+    if settings.recipe_search_engine == "index":
+        db_finder = shared_index_finder(
+            refresh_seconds=settings.recipe_index_refresh_seconds
+        )
+    else:
+        # Moteurs "sql" et "matrix" : même finder, classement NumPy en option
+        scorer = None
+        if settings.recipe_search_engine == "matrix":
+            scorer = shared_recipe_scorer()
+        db_finder = DbFindRecipe(
+            recipe_dao, match=settings.recipe_search_match, scorer=scorer
+        )
 
     # ✅ Pendant les tests: on coupe l’API externe quoi qu’il arrive
     # (pour ne jamais consommer les 50 requêtes/jour)
     if _running_under_pytest() and not os.getenv("FORCE_SPOONACULAR_IN_TESTS"):
+        # (sans cache non plus : la base est réinitialisée entre les tests)
         api_finder: FindRecipe = _NoApiFindRecipe()
         return FindRecipeFactory(db=db_finder, api=api_finder)
 
     # Hors tests: comportement normal
+    limiter: SpoonacularRateLimiter | None = None
     if not settings.api_key_spoonacular:
         api_finder = _NoApiFindRecipe()
     else:
+        limiter = _spoonacular_limiter()
         ingredient_dao = IngredientDAO()
         api_finder = ApiFindRecipe(
             api_key=settings.api_key_spoonacular,
             dao=recipe_dao,
             ingredient_dao=ingredient_dao,
+            cache=_spoonacular_cache(),
+            limiter=limiter,
+            importer=_recipe_importer(),
         )
 
-    return FindRecipeFactory(db=db_finder, api=api_finder)
+    return FindRecipeFactory(
+        db=db_finder,
+        api=api_finder,
+        cache=_search_cache(),
+        api_quota=limiter,
+        hedge=settings.recipe_search_hedge,
+        api_wait_seconds=settings.recipe_search_api_wait_seconds or None,
+    )
@@ -1,20 +1,35 @@
 from __future__ import annotations
 
+from contextlib import asynccontextmanager
+from dataclasses import asdict
 from datetime import datetime
 import logging
 from pathlib import Path
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse
-import httpx
+from fastapi.responses import HTMLResponse, JSONResponse
 
 from api.config import settings
+from api.deps import NEXT_CURSOR_HEADER
 from api.routers.auth import router as auth_router
 from api.routers.ingredients import router as ingredients_router
 from api.routers.recipes import router as recipes_router
 from api.routers.stocks import router as stocks_router
 from api.routers.users import router as users_router
+from clients.spoonacular_client import (
+    SpoonacularError,
+    close_default_client,
+    default_client,
+)
+from dao.async_dao import shutdown_executor
+from dao.db_connection import DBConnection, connection_scope
+from exceptions import PasswordHashingBusyError
+from services.find_recipe_api import close_recipe_importer
+from services.find_recipe_factory import shutdown_api_executor
+from services.find_recipe_index import shared_index_finder
+from services.recipe_scoring import shared_recipe_scorer
+from utils.password_pool import shared_password_pool, shutdown_password_pool
 
 
 logging.basicConfig(
@@ -24,7 +39,31 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-app = FastAPI(title=settings.app_name)
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    # Chargement du moteur de recherche en mémoire avant la première requête
+    if settings.recipe_search_engine == "index":
+        shared_index_finder(refresh_seconds=settings.recipe_index_refresh_seconds)
+    elif settings.recipe_search_engine == "matrix":
+        shared_recipe_scorer()
+    # Dimensionnement du pool de hachage (processus lancés au premier appel)
+    shared_password_pool(
+        max_workers=settings.password_hash_workers or None,
+        max_pending=settings.password_hash_max_pending or None,
+    )
+    yield
+    # Libère les threads de l'executor BDD utilisé par les routes async
+    shutdown_executor()
+    # Attend les appels API en cours, puis ferme les connexions keep-alive
+    shutdown_api_executor()
+    # Termine l'import des recettes externes encore en file
+    close_recipe_importer()
+    close_default_client()
+    # Arrête les processus de hachage des mots de passe
+    shutdown_password_pool()
+
+
+app = FastAPI(title=settings.app_name, lifespan=lifespan)
 
 logger.info("App starting: app_name=%s", settings.app_name)
 logger.info("Spoonacular key loaded: %s", bool(settings.api_key_spoonacular))
@@ -36,8 +75,25 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
+
+@app.middleware("http")
+async def db_connection_per_request(request: Request, call_next):
+    """Une connexion du pool par requête, rendue dès la réponse construite."""
+    with connection_scope():
+        return await call_next(request)
+
+
+@app.exception_handler(PasswordHashingBusyError)
+async def password_hashing_busy(_request: Request, exc: PasswordHashingBusyError):
+    """Pool bcrypt saturé : rejet immédiat, le client peut réessayer."""
+    return JSONResponse(
+        status_code=503, content={"detail": str(exc)}, headers={"Retry-After": "1"}
+    )
+
+
 # Routers par domaine
 app.include_router(auth_router)
 app.include_router(users_router)
@@ -88,6 +144,22 @@ def health():
     return {"status": "ok"}
 
 
+@app.get("/health/db", tags=["Système"])
+def health_db():
+    """Vérifie la base (SELECT 1) et expose les statistiques du pool."""
+    try:
+        with DBConnection().connection.cursor() as cur:
+            cur.execute("SELECT 1")
+    except Exception as e:
+        logger.exception("Database health check failed")
+        raise HTTPException(
+            status_code=503,
+            detail=f"Database unreachable: {e}",
+        ) from e
+
+    return {"status": "ok", "pool": asdict(DBConnection().stats())}
+
+
 @app.get("/health/spoonacular", tags=["Système"])
 def health_spoonacular():
     """
@@ -100,7 +172,6 @@ def health_spoonacular():
             status_code=500, detail="Spoonacular API key not configured"
         )
 
-    url = "https://api.spoonacular.com/recipes/complexSearch"
     params = {
         "apiKey": settings.api_key_spoonacular,
         "number": 1,  # on demande 1 résultat
@@ -108,14 +179,13 @@ def health_spoonacular():
     }
 
     try:
-        with httpx.Client(timeout=10.0) as client:
-            resp = client.get(url, params=params)
+        resp = default_client().get("recipes/complexSearch", params, timeout=10.0)
         logger.info("Spoonacular test call done: status=%s", resp.status_code)
         return {
             "spoonacular_reachable": True,
             "status_code": resp.status_code,
         }
-    except Exception as e:
+    except SpoonacularError as e:
         logger.exception("Spoonacular test call failed")
         raise HTTPException(
             status_code=502,
@@ -17,6 +17,7 @@ from api.schemas.auth import (
 from exceptions import (
     InvalidPasswordError,
     InvalidRefreshTokenError,
+    PasswordHashingBusyError,
     UserAlreadyExistsError,
     UserEmailAlreadyExistsError,
     UserNotFoundError,
@@ -92,6 +93,17 @@ def _map_service_errors(exc: Exception) -> HTTPException:
             detail="Problème dans le refresh",
         )
 
+    # ----------------------------
+    # SATURATION (hachage bcrypt)
+    # ----------------------------
+
+    if isinstance(exc, PasswordHashingBusyError):
+        return HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(exc),
+            headers={"Retry-After": "1"},
+        )
+
     # ----------------------------
     # Cas non géré
     # ----------------------------
@@ -136,6 +148,7 @@ def _auth_service() -> AuthService:
         409: {"description": "L'identifiant (email ou pseudo) existe déjà."},
         422: {"description": "Format de données incorrects"},
         500: {"description": "Erreur interne du serveur."},
+        503: {"description": "Service d'authentification saturé."},
     },
 )
 def register(
@@ -198,6 +211,7 @@ def register(
         401: {"description": "Le mot de passe est incorrect."},
         422: {"description": "Format de données incorrects"},
         500: {"description": "Erreur interne du serveur."},
+        503: {"description": "Service d'authentification saturé."},
     },
 )
 def login(req: LoginRequest, request: Request) -> TokenPairResponse:
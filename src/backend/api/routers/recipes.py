@@ -2,11 +2,18 @@ from __future__ import annotations
 
 import re
 
-from fastapi import APIRouter, Depends, HTTPException, status
-
-from api.deps import CurrentUser, get_current_user_checked_exists, get_recipe_finder
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+
+from api.deps import (
+    NEXT_CURSOR_HEADER,
+    CurrentUser,
+    get_current_user_checked_exists,
+    get_recipe_finder,
+)
 from api.schemas.recipes import RecipeOut, RecipeSearchIn, RecipeUpdateIn
 from business_objects.recipe import Recipe
+from dao.async_dao import AsyncRecipeDAO
+from dao.pagination import InvalidCursorError
 from services.find_recipe import FindRecipe, IngredientSearchQuery
 
 
@@ -114,9 +121,11 @@ def search_recipes(
 
 
 @router.get("", response_model=list[RecipeOut])
-def list_recipes(
+async def list_recipes(
+    response: Response,
     limit: int = 50,
     offset: int = 0,
+    cursor: str | None = None,
     name: str | None = None,
     include_relations: bool = False,
     #_cu: CurrentUser = Depends(get_current_user_checked_exists),  # noqa: B008
@@ -124,26 +133,43 @@ def list_recipes(
     """Liste toutes les recettes (BDD).
 
     - name : filtre sur le champ recipe.name (ILIKE)
-    - include_relations : si True, recharge ingrédients + tags
+    - include_relations : si True, charge ingrédients + tags (en lot)
+    - cursor : pagination par curseur ; le curseur de la page suivante est
+      renvoyé dans l'en-tête X-Next-Cursor (absent sur la dernière page).
+      `offset` reste accepté pour compatibilité (pages profondes coûteuses).
     """
     from dao.recipe_dao import RecipeDAO
 
-    dao = RecipeDAO()
-    recipes = dao.list_recipes(name_ilike=name, limit=limit, offset=offset)
+    dao = AsyncRecipeDAO(RecipeDAO())
 
-    if include_relations:
-        full = []
-        for r in recipes:
-            rr = dao.get_recipe_by_id(int(r.recipe_id), with_relations=True)
-            if rr is not None:
-                full.append(rr)
-        recipes = full
+    if offset and cursor is None:
+        recipes = await dao.list_recipes(
+            name_ilike=name,
+            limit=limit,
+            offset=offset,
+            with_relations=include_relations,
+        )
+    else:
+        try:
+            page = await dao.list_recipes_page(
+                name_ilike=name,
+                limit=limit,
+                after=cursor,
+                with_relations=include_relations,
+            )
+        except InvalidCursorError as exc:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)
+            ) from exc
+        if page.next_cursor:
+            response.headers[NEXT_CURSOR_HEADER] = page.next_cursor
+        recipes = page.items
 
     return [_bo_to_out(r) for r in recipes]
 
 
 @router.patch("/{recipe_id}", response_model=RecipeOut)
-def update_recipe(
+async def update_recipe(
     recipe_id: int,
     payload: RecipeUpdateIn,
     cu: CurrentUser = Depends(get_current_user_checked_exists),  # noqa: B008
@@ -158,8 +184,8 @@ def update_recipe(
 
     from dao.recipe_dao import RecipeDAO
 
-    dao = RecipeDAO()
-    updated = dao.update_recipe(
+    dao = AsyncRecipeDAO(RecipeDAO())
+    updated = await dao.update_recipe(
         int(recipe_id),
         name=payload.name,
         description=payload.description,
@@ -1,8 +1,9 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 
 from api.deps import (
+    NEXT_CURSOR_HEADER,
     CurrentUser,
     get_current_user_checked_exists,
     get_stock_service,
@@ -10,14 +11,20 @@ from api.deps import (
 from api.schemas.ingredients import IngredientOwnedOut
 from api.schemas.stocks import (
     ConsumeIn,
+    CookRecipeIn,
     StockCreateIn,
+    StockItemBulkIn,
     StockItemCreateIn,
     StockItemOut,
     StockOut,
     StockUpdateIn,
 )
+from dao.async_dao import AsyncStockDAO
+from dao.pagination import InvalidCursorError
 from services.stock_service import (
     ForbiddenError,
+    InsufficientStockError,
+    NewLot,
     NotFoundError,
     StockService,
     ValidationError,
@@ -34,6 +41,21 @@ def _map_service_errors(exc: Exception) -> HTTPException:
         return HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(exc))
     if isinstance(exc, NotFoundError):
         return HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(exc))
+    if isinstance(exc, InsufficientStockError):
+        return HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail={
+                "message": str(exc),
+                "shortages": [
+                    {
+                        "ingredient_id": s.ingredient_id,
+                        "required": s.required,
+                        "available": s.available,
+                    }
+                    for s in exc.shortages
+                ],
+            },
+        )
     return HTTPException(
         status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(exc)
     )
@@ -53,16 +75,19 @@ def create_stock(
 
 
 @router.get("", response_model=list[StockOut])
-def list_my_stocks(
+async def list_my_stocks(
+    response: Response,
     user_id: int | None = None,
     limit: int = 200,
     offset: int = 0,
+    cursor: str | None = None,
     name: str | None = None,
     cu: CurrentUser = Depends(get_current_user_checked_exists),  # noqa: B008
 ):
     """
     - Sans user_id : retourne les stocks de l'utilisateur connecté (comme avant)
     - Avec user_id : admin uniquement (si user_id != cu.user_id)
+    - cursor : pagination par curseur (page suivante dans l'en-tête X-Next-Cursor)
     """
     from dao.stock_dao import StockDAO
 
@@ -75,13 +100,31 @@ def list_my_stocks(
             detail="Accès réservé aux administrateurs.",
         )
 
-    dao = StockDAO()
-    stocks = dao.list_user_stocks(
-        user_id=target_user_id,
-        name_ilike=name,
-        limit=limit,
-        offset=offset,
-    )
+    dao = AsyncStockDAO(StockDAO())
+
+    if offset and cursor is None:
+        stocks = await dao.list_user_stocks(
+            user_id=target_user_id,
+            name_ilike=name,
+            limit=limit,
+            offset=offset,
+        )
+    else:
+        try:
+            page = await dao.list_user_stocks_page(
+                user_id=target_user_id,
+                name_ilike=name,
+                limit=limit,
+                after=cursor,
+            )
+        except InvalidCursorError as exc:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)
+            ) from exc
+        if page.next_cursor:
+            response.headers[NEXT_CURSOR_HEADER] = page.next_cursor
+        stocks = page.items
+
     return [StockOut(stock_id=s.id_stock, name=s.nom) for s in stocks]
 
 
@@ -144,6 +187,49 @@ def add_lot(
         raise _map_service_errors(exc) from exc
 
 
+@router.post("/{stock_id}/lots/bulk", response_model=dict)
+def add_lots_bulk(
+    stock_id: int,
+    payload: StockItemBulkIn,
+    cu: CurrentUser = Depends(get_current_user_checked_exists),  # noqa: B008
+    service: StockService = Depends(get_stock_service),  # noqa: B008
+):
+    """
+    Ajoute plusieurs lots en une fois (ex: ticket de caisse).
+    Les lots invalides sont listés dans `errors` (position dans `items`),
+    les autres sont créés.
+    """
+    try:
+        res = service.add_lots_bulk(
+            user_id=cu.user_id,
+            stock_id=stock_id,
+            lots=[
+                NewLot(
+                    ingredient_id=item.ingredient_id,
+                    quantity=item.quantity,
+                    expiration_date=item.expiration_date,
+                )
+                for item in payload.items
+            ],
+        )
+        return {
+            "created": [
+                {"index": index, "stock_item_id": lot_id}
+                for index, lot_id in sorted(res.created.items())
+            ],
+            "errors": [
+                {
+                    "index": e.index,
+                    "ingredient_id": e.ingredient_id,
+                    "detail": e.message,
+                }
+                for e in res.errors
+            ],
+        }
+    except Exception as exc:  # noqa: BLE001
+        raise _map_service_errors(exc) from exc
+
+
 @router.delete("/lots/{stock_item_id}", response_model=dict)
 def delete_lot(
     stock_item_id: int,
@@ -201,6 +287,39 @@ def consume_fefo_all_stocks(
         raise _map_service_errors(exc) from exc
 
 
+@router.post("/cook", response_model=dict)
+def cook_recipe(
+    payload: CookRecipeIn,
+    cu: CurrentUser = Depends(get_current_user_checked_exists),  # noqa: B008
+    service: StockService = Depends(get_stock_service),  # noqa: B008
+):
+    """
+    Consomme tous les ingrédients d'une recette (FEFO, tous les stocks de
+    l'utilisateur) en une seule transaction.
+    - 409 : stock insuffisant, rien n'est consommé (détail des manques)
+    """
+    try:
+        res = service.cook_recipe(
+            user_id=cu.user_id,
+            recipe_id=payload.recipe_id,
+            portions=payload.portions,
+        )
+        return {
+            "recipe_id": res.recipe_id,
+            "portions": res.portions,
+            "ingredients": [
+                {
+                    "ingredient_id": i.ingredient_id,
+                    "consumed_quantity": i.consumed_quantity,
+                    "by_stock": i.by_stock,
+                }
+                for i in res.ingredients
+            ],
+        }
+    except Exception as exc:  # noqa: BLE001
+        raise _map_service_errors(exc) from exc
+
+
 @router.delete("/{stock_id}", response_model=dict)
 def delete_stock(
     stock_id: int,
@@ -228,9 +347,11 @@ def empty_stock(
 
 
 @router.get("/all", response_model=list[StockOut])
-def list_all_stocks(
+async def list_all_stocks(
+    response: Response,
     limit: int = 50,
     offset: int = 0,
+    cursor: str | None = None,
     name: str | None = None,
     cu: CurrentUser = Depends(get_current_user_checked_exists),  # noqa: B008
 ):
@@ -244,12 +365,28 @@ def list_all_stocks(
 
     from dao.stock_dao import StockDAO
 
-    dao = StockDAO()
-    stocks = dao.list_stocks(
-        name_ilike=name,
-        limit=limit,
-        offset=offset,
-    )
+    dao = AsyncStockDAO(StockDAO())
+
+    if offset and cursor is None:
+        stocks = await dao.list_stocks(
+            name_ilike=name,
+            limit=limit,
+            offset=offset,
+        )
+    else:
+        try:
+            page = await dao.list_stocks_page(
+                name_ilike=name,
+                limit=limit,
+                after=cursor,
+            )
+        except InvalidCursorError as exc:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)
+            ) from exc
+        if page.next_cursor:
+            response.headers[NEXT_CURSOR_HEADER] = page.next_cursor
+        stocks = page.items
 
     return [
         StockOut(
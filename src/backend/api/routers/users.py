@@ -1,9 +1,9 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 
 from api.config import settings
-from api.deps import CurrentUser, get_current_user_checked_exists
+from api.deps import NEXT_CURSOR_HEADER, CurrentUser, get_current_user_checked_exists
 from api.schemas.users import (
     AdminUpdateUserRequest,
     AdminUpdateUserResponse,
@@ -12,6 +12,7 @@ from api.schemas.users import (
     UpdateMeRequest,
     UserPublic,
 )
+from dao.pagination import InvalidCursorError
 from services.auth_service import AuthService
 from services.user_service import (
     InvalidCredentialsError,
@@ -115,11 +116,29 @@ def logout(
     description="Renvoie la liste complète des utilisateurs enregistrés",
     dependencies=[Depends(get_current_user_checked_exists)],
 )
-def get_all_users() -> list[UserPublic]:
+def get_all_users(
+    response: Response,
+    limit: int | None = None,
+    cursor: str | None = None,
+) -> list[UserPublic]:
+    """Sans `limit` ni `cursor` : tous les utilisateurs (comportement historique).
+
+    Sinon pagination par curseur : le curseur de la page suivante est renvoyé
+    dans l'en-tête X-Next-Cursor (absent sur la dernière page).
+    """
     user_service = UserService()
-    users = (
-        user_service.get_all_users()
-    )  # Vous devrez créer cette méthode dans UserService
+    if limit is None and cursor is None:
+        users = user_service.get_all_users()
+    else:
+        try:
+            page = user_service.get_users_page(limit=limit or 50, after=cursor)
+        except InvalidCursorError as exc:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)
+            ) from exc
+        if page.next_cursor:
+            response.headers[NEXT_CURSOR_HEADER] = page.next_cursor
+        users = page.items
 
     return [
         UserPublic(
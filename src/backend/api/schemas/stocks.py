@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from datetime import date
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class StockCreateIn(BaseModel):
@@ -20,6 +20,10 @@ class StockItemCreateIn(BaseModel):
     expiration_date: date | None = None
 
 
+class StockItemBulkIn(BaseModel):
+    items: list[StockItemCreateIn] = Field(min_length=1, max_length=1000)
+
+
 class StockItemOut(BaseModel):
     stock_item_id: int
     stock_id: int
@@ -33,5 +37,10 @@ class ConsumeIn(BaseModel):
     quantity: float
 
 
+class CookRecipeIn(BaseModel):
+    recipe_id: int
+    portions: int | None = None
+
+
 class StockUpdateIn(BaseModel):
     name: str
@@ -1,16 +1,79 @@
 from collections import defaultdict
+from collections.abc import Iterable, Iterator
 from datetime import date
+import heapq
+from itertools import count
 
 from business_objects.stock_item import StockItem
 
 
+class FefoLots:
+    """Lots d'un ingrédient ordonnés FEFO (tas binaire).
+
+    Le prochain lot à périmer est toujours en tête (`self[0]`, O(1)).
+    Ajout et retrait de la tête en O(log n). À date égale, l'ordre d'ajout
+    est conservé.
+    """
+
+    def __init__(self) -> None:
+        # Entrées (date de péremption, n° d'ajout, lot) : le n° d'ajout
+        # départage les dates égales, les lots ne sont jamais comparés
+        self._heap: list[tuple[date, int, StockItem]] = []
+        self._seq = count()
+
+    def push(self, item: StockItem) -> None:
+        """Ajoute un lot (O(log n))."""
+        heapq.heappush(self._heap, (item.expiry_date, next(self._seq), item))
+
+    def extend_sorted(self, items: Iterable[StockItem]) -> None:
+        """Ajoute des lots déjà triés FEFO (ex: lignes du DAO) en O(n).
+
+        Une liste triée est déjà un tas : sur une file vide, les lots sont
+        simplement ajoutés à la suite. Si l'ordre n'est pas respecté (ou si
+        la file contient déjà des lots), le tas est reconstruit.
+        """
+        ordered = not self._heap
+        for item in items:
+            entry = (item.expiry_date, next(self._seq), item)
+            if ordered and self._heap and entry < self._heap[-1]:
+                ordered = False
+            self._heap.append(entry)
+        if not ordered:
+            heapq.heapify(self._heap)
+
+    def peek(self) -> StockItem:
+        """Prochain lot à périmer (O(1))."""
+        return self._heap[0][2]
+
+    def pop(self) -> StockItem:
+        """Retire et retourne le prochain lot à périmer (O(log n))."""
+        return heapq.heappop(self._heap)[2]
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def __iter__(self) -> Iterator[StockItem]:
+        """Parcourt les lots dans l'ordre FEFO (O(n log n))."""
+        return (entry[2] for entry in sorted(self._heap))
+
+    def __getitem__(self, index: int) -> StockItem:
+        """Lot à la position `index` dans l'ordre FEFO (O(1) pour la tête)."""
+        if index == 0 and self._heap:
+            return self.peek()
+        return list(self)[index]
+
+    def __repr__(self) -> str:
+        return f"FefoLots({list(self)!r})"
+
+
 class Stock:
     """Gestionnaire de l'inventaire des ingrédients (Entrepôt).
 
     Attributs:
         id_stock (int): Identifiant unique du stock (ex: Stock Central, Stock Cuisine).
         nom (str): Nom du stock.
-        items_by_ingredient (dict[int, list[StockItem]]): Dictionnaire indexé par id_ingredient.
+        items_by_ingredient (dict[int, FefoLots]): Lots indexés par id_ingredient,
+            ordonnés FEFO.
     """
 
     def __init__(self, id_stock: int, nom: str):
@@ -18,7 +81,7 @@ class Stock:
         self.id_stock = id_stock
         self.nom = nom
         # On indexe par id_ingredient pour plus de cohérence avec la BDD
-        self.items_by_ingredient = defaultdict(list)
+        self.items_by_ingredient: defaultdict[int, FefoLots] = defaultdict(FefoLots)
 
     # -------------------------------------------------
     # Méthodes de gestion du stock
@@ -27,18 +90,25 @@ class Stock:
     def add_item(
         self, id_ingredient: int, id_lot: int, quantity: float, expiry_date: date
     ):
-        """Crée et ajoute un StockItem au stock, puis trie par date de péremption (FEFO)."""
+        """Crée et ajoute un StockItem au stock, rangé par date de péremption (FEFO)."""
 
         # On délègue la validation au constructeur de StockItem
         new_item = StockItem(id_ingredient, id_lot, quantity, expiry_date)
 
-        self.items_by_ingredient[id_ingredient].append(new_item)
-        # Tri automatique pour que le prochain lot à périmer soit toujours à l'index 0
-        self.items_by_ingredient[id_ingredient].sort(key=lambda x: x.expiry_date)
+        # Le prochain lot à périmer reste toujours à l'index 0
+        self.items_by_ingredient[id_ingredient].push(new_item)
 
-        print(
-            f"Ajout au stock '{self.nom}': {quantity} de l'ingrédient {id_ingredient}."
-        )
+    def add_items_sorted(self, items: Iterable[StockItem]) -> None:
+        """Ajoute des lots déjà triés FEFO (chargement depuis la base).
+
+        Évite de repositionner chaque lot : construction en O(n).
+        """
+        by_ingredient: defaultdict[int, list[StockItem]] = defaultdict(list)
+        for item in items:
+            by_ingredient[item.id_ingredient].append(item)
+
+        for id_ingredient, lots in by_ingredient.items():
+            self.items_by_ingredient[id_ingredient].extend_sorted(lots)
 
     def get_total_quantity(self, id_ingredient: int) -> float:
         """Calcule la quantité totale disponible pour un ingrédient (tous lots confondus)."""
@@ -64,14 +134,14 @@ class Stock:
 
         # Logique de consommation FEFO
         while quantity_to_consume > 0 and items:
-            current_item = items[0]
+            current_item = items.peek()
 
             if current_item.quantity > quantity_to_consume:
                 current_item.quantity -= quantity_to_consume
                 quantity_to_consume = 0
             else:
                 quantity_to_consume -= current_item.quantity
-                items.pop(0)  # Le lot est vide, on le retire du stock
+                items.pop()  # Le lot est vide, on le retire du stock
 
     def __repr__(self) -> str:
         return f"Stock(id={self.id_stock}, nom='{self.nom}', nb_ingredients={len(self.items_by_ingredient)})"
@@ -1,15 +1,27 @@
 from __future__ import annotations
 
-from collections.abc import Sequence
+from collections.abc import Callable, Mapping, Sequence
 from dataclasses import dataclass
+import hashlib
+import json
+from pathlib import Path
 import re
+import sqlite3
+import threading
+import time
 from typing import Any
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
+from urllib3.util.retry import Retry
 
 
 SPOONACULAR_BASE_URL = "https://api.spoonacular.com"
 
+# Statuts "serveur" rejoués par le client (jamais 402/429 : ce sont des quotas)
+RETRY_STATUSES = (500, 502, 503, 504)
+
 
 # ============================================================
 # Exceptions
@@ -24,6 +36,10 @@ class SpoonacularAuthError(SpoonacularError):
     """Clé API absente/invalide ou non autorisée."""
 
 
+class SpoonacularConnectionError(SpoonacularError):
+    """Connexion impossible : la requête n'a jamais atteint Spoonacular."""
+
+
 class SpoonacularRateLimitError(SpoonacularError):
     """Quota/rate limit dépassé."""
 
@@ -106,6 +122,645 @@ def _raise_for_spoonacular_error(resp: requests.Response) -> None:
     raise SpoonacularError(f"Spoonacular error ({resp.status_code}): {msg}")
 
 
+def _http_get(
+    session: requests.Session | None,
+    url: str,
+    params: dict[str, Any],
+    timeout: float | tuple[float, float],
+) -> requests.Response:
+    """GET via `session` (ou la session du client partagé), erreurs réseau
+    converties en `SpoonacularError`.
+
+    `SpoonacularConnectionError` seulement si la connexion n'a pas pu être
+    établie (requête jamais envoyée) ; après l'envoi (timeout de lecture,
+    connexion coupée), Spoonacular a pu traiter et facturer l'appel.
+    """
+    sess = session or default_client().session
+    try:
+        return sess.get(url, params=params, timeout=timeout)
+    except requests.ConnectTimeout as e:
+        raise SpoonacularConnectionError(
+            f"Timeout de connexion à Spoonacular: {e}"
+        ) from e
+    except requests.Timeout as e:
+        raise SpoonacularError(f"Timeout en appelant Spoonacular: {e}") from e
+    except requests.ConnectionError as e:
+        if _never_sent(e):
+            raise SpoonacularConnectionError(
+                f"Connexion impossible à Spoonacular: {e}"
+            ) from e
+        raise SpoonacularError(f"Erreur réseau en appelant Spoonacular: {e}") from e
+    except requests.RequestException as e:
+        raise SpoonacularError(f"Erreur réseau en appelant Spoonacular: {e}") from e
+
+
+def _never_sent(exc: requests.ConnectionError) -> bool:
+    """Vrai si l'erreur vient de l'ouverture de la connexion (DNS, refus...)."""
+    reason = exc.args[0] if exc.args else None
+    # urllib3 : MaxRetryError(reason=NewConnectionError) après les rejeux
+    reason = getattr(reason, "reason", reason)
+    return isinstance(reason, NewConnectionError)
+
+
+# ============================================================
+# Client HTTP (connexions persistantes)
+# ============================================================
+
+
+class SpoonacularClient:
+    """Client HTTP Spoonacular longue durée, partageable entre threads.
+
+    - un pool de connexions keep-alive (un seul `HTTPAdapter`) : la poignée de
+      main TCP + TLS n'est payée qu'à la première requête de chaque connexion
+    - une `requests.Session` par thread, toutes montées sur cet adapter (une
+      session n'est pas garantie thread-safe, le pool urllib3 l'est)
+    - rejeu des GET sur erreur réseau et statuts 5xx, avec backoff exponentiel
+    - timeout (connexion, lecture) par défaut
+    """
+
+    def __init__(
+        self,
+        *,
+        base_url: str = SPOONACULAR_BASE_URL,
+        pool_maxsize: int = 10,
+        retries: int = 2,
+        backoff_factor: float = 0.5,
+        timeout: float | tuple[float, float] = (5.0, 30.0),
+    ) -> None:
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        retry = Retry(
+            total=retries,
+            connect=retries,
+            read=retries,
+            status=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=frozenset({"GET"}),
+            # Le dernier 5xx est rendu tel quel (-> _raise_for_spoonacular_error)
+            raise_on_status=False,
+        )
+        self._adapter = HTTPAdapter(
+            pool_connections=1, pool_maxsize=pool_maxsize, max_retries=retry
+        )
+        self._local = threading.local()
+
+    @property
+    def session(self) -> requests.Session:
+        """Session du thread courant (créée au premier accès)."""
+        sess = getattr(self._local, "session", None)
+        if sess is None:
+            sess = requests.Session()
+            sess.mount("https://", self._adapter)
+            sess.mount("http://", self._adapter)
+            self._local.session = sess
+        return sess
+
+    def get(
+        self,
+        path: str,
+        params: dict[str, Any],
+        *,
+        timeout: float | tuple[float, float] | None = None,
+    ) -> requests.Response:
+        """GET `path` (relatif à `base_url`) ; la réponse n'est pas vérifiée."""
+        url = f"{self.base_url}/{path.lstrip('/')}"
+        return _http_get(self.session, url, params, timeout or self.timeout)
+
+    def close(self) -> None:
+        """Ferme les connexions du pool."""
+        self._adapter.close()
+
+
+_default_client: SpoonacularClient | None = None
+_default_client_lock = threading.Lock()
+
+
+def default_client() -> SpoonacularClient:
+    """Client partagé par le processus (utilisé quand aucune session n'est
+    fournie aux fonctions de ce module)."""
+    global _default_client
+    if _default_client is None:
+        with _default_client_lock:
+            if _default_client is None:
+                _default_client = SpoonacularClient()
+    return _default_client
+
+
+def close_default_client() -> None:
+    global _default_client
+    with _default_client_lock:
+        if _default_client is not None:
+            _default_client.close()
+            _default_client = None
+
+
+# ============================================================
+# Cache disque des réponses (quota)
+# ============================================================
+
+# Durées de vie par endpoint (secondes). Une recherche peut évoluer avec le
+# catalogue Spoonacular ; le détail d'une recette (ids fixes) beaucoup moins.
+DEFAULT_CACHE_TTLS: dict[str, float] = {
+    "recipes/complexSearch": 24 * 3600,
+    "recipes/findByIngredients": 24 * 3600,
+    "recipes/informationBulk": 7 * 24 * 3600,
+}
+
+
+class SpoonacularResponseCache:
+    """Cache persistant (SQLite) des réponses JSON Spoonacular.
+
+    - clé : empreinte SHA-256 de l'endpoint et des paramètres normalisés
+      (triés, `apiKey` exclu) : même requête = même clé, quelle que soit la clé
+      API ou l'ordre des paramètres
+    - durée de vie par endpoint (`ttls`, endpoints absents = non cachés)
+    - taille bornée (`max_bytes`) : éviction des entrées les moins récemment
+      lues au-delà
+
+    Une lecture n'écrit pas dans SQLite : la date d'accès est notée en
+    mémoire puis écrite par lots (au prochain `put`, ou tous les
+    `TOUCH_BATCH_SIZE` accès).
+    """
+
+    # Nombre d'accès notés en mémoire avant écriture groupée
+    TOUCH_BATCH_SIZE = 64
+
+    def __init__(
+        self,
+        path: str | Path,
+        *,
+        ttls: Mapping[str, float] | None = None,
+        max_bytes: int = 50 * 1024 * 1024,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.path = Path(path)
+        self._ttls = dict(DEFAULT_CACHE_TTLS if ttls is None else ttls)
+        self._max_bytes = int(max_bytes)
+        self._clock = clock
+        self._lock = threading.Lock()
+        # clé -> date du dernier accès pas encore écrite en base
+        self._touched: dict[str, float] = {}
+
+        if str(path) != ":memory:":
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS response (
+                    key         TEXT PRIMARY KEY,
+                    endpoint    TEXT NOT NULL,
+                    body        TEXT NOT NULL,
+                    size        INTEGER NOT NULL,
+                    expires_at  REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )
+                """
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS response_last_access "
+                "ON response (last_access)"
+            )
+
+    @staticmethod
+    def cache_key(endpoint: str, params: Mapping[str, Any]) -> str:
+        normalized = sorted(
+            (str(k), str(v)) for k, v in params.items() if k != "apiKey"
+        )
+        raw = json.dumps([endpoint.strip("/"), normalized], separators=(",", ":"))
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def ttl(self, endpoint: str) -> float:
+        return float(self._ttls.get(endpoint.strip("/"), 0))
+
+    def get(self, endpoint: str, params: Mapping[str, Any]) -> Any | None:
+        """Réponse JSON décodée, ou None (absente / expirée / non cachable)."""
+        if self.ttl(endpoint) <= 0:
+            return None
+
+        key = self.cache_key(endpoint, params)
+        now = self._clock()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body, expires_at FROM response WHERE key = ?", (key,)
+            ).fetchone()
+            # Entrée expirée : purgée au prochain `put` (pas d'écriture ici)
+            if row is None or row[1] <= now:
+                return None
+            self._touched[key] = now
+            if len(self._touched) >= self.TOUCH_BATCH_SIZE:
+                with self._conn:
+                    self._flush_touches()
+        return json.loads(row[0])
+
+    def _flush_touches(self) -> None:
+        """Écrit les dates d'accès notées en mémoire (appelé sous verrou)."""
+        if not self._touched:
+            return
+        touched, self._touched = self._touched, {}
+        self._conn.executemany(
+            "UPDATE response SET last_access = MAX(last_access, ?) WHERE key = ?",
+            [(at, key) for key, at in touched.items()],
+        )
+
+    def put(self, endpoint: str, params: Mapping[str, Any], payload: Any) -> None:
+        ttl = self.ttl(endpoint)
+        if ttl <= 0:
+            return
+
+        body = json.dumps(payload, separators=(",", ":"))
+        size = len(body.encode("utf-8"))
+        if size > self._max_bytes:
+            return
+
+        now = self._clock()
+        with self._lock, self._conn:
+            # Ordre LRU à jour avant une éventuelle éviction
+            self._flush_touches()
+            self._conn.execute(
+                """
+                INSERT OR REPLACE INTO response
+                    (key, endpoint, body, size, expires_at, last_access)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    self.cache_key(endpoint, params),
+                    endpoint.strip("/"),
+                    body,
+                    size,
+                    now + ttl,
+                    now,
+                ),
+            )
+            self._evict(now)
+
+    def _evict(self, now: float) -> None:
+        """Purge les entrées expirées puis, au-delà de `max_bytes`, les moins
+        récemment lues (appelé sous verrou, dans la transaction)."""
+        self._conn.execute("DELETE FROM response WHERE expires_at <= ?", (now,))
+        total = self.total_bytes(locked=True)
+        if total <= self._max_bytes:
+            return
+
+        excess = total - self._max_bytes
+        freed = 0
+        victims: list[str] = []
+        for key, size in self._conn.execute(
+            "SELECT key, size FROM response ORDER BY last_access ASC"
+        ):
+            victims.append(key)
+            freed += size
+            if freed >= excess:
+                break
+        self._conn.executemany(
+            "DELETE FROM response WHERE key = ?", [(k,) for k in victims]
+        )
+
+    def total_bytes(self, *, locked: bool = False) -> int:
+        def _sum() -> int:
+            row = self._conn.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM response"
+            ).fetchone()
+            return int(row[0])
+
+        if locked:
+            return _sum()
+        with self._lock:
+            return _sum()
+
+    def clear(self) -> None:
+        with self._lock, self._conn:
+            self._touched.clear()
+            self._conn.execute("DELETE FROM response")
+
+    def close(self) -> None:
+        with self._lock:
+            with self._conn:
+                self._flush_touches()
+            self._conn.close()
+
+
+_shared_caches: dict[str, SpoonacularResponseCache] = {}
+_shared_caches_lock = threading.Lock()
+
+
+def shared_response_cache(
+    path: str | Path, *, max_bytes: int = 50 * 1024 * 1024
+) -> SpoonacularResponseCache:
+    """Cache partagé par le processus pour le fichier `path` (la taille n'est
+    prise en compte qu'à l'ouverture)."""
+    key = str(path)
+    with _shared_caches_lock:
+        cache = _shared_caches.get(key)
+        if cache is None:
+            cache = SpoonacularResponseCache(path, max_bytes=max_bytes)
+            _shared_caches[key] = cache
+        return cache
+
+
+# ============================================================
+# Limitation de débit / quota journalier
+# ============================================================
+
+
+def estimate_cost(endpoint: str, params: Mapping[str, Any]) -> float:
+    """Coût estimé d'une requête en points de quota Spoonacular.
+
+    Barème de la documentation : 1 point par appel, plus 0.01 par résultat
+    pour les recherches et 0.5 par recette supplémentaire pour
+    informationBulk.
+    """
+    endpoint = endpoint.strip("/")
+    if endpoint == "recipes/informationBulk":
+        n_ids = len([i for i in str(params.get("ids", "")).split(",") if i])
+        return 1.0 + 0.5 * max(0, n_ids - 1)
+    if endpoint in ("recipes/complexSearch", "recipes/findByIngredients"):
+        return 1.0 + 0.01 * int(params.get("number", 0) or 0)
+    return 1.0
+
+
+def estimate_search_cost(n: int) -> float:
+    """Coût estimé de `fetch_detailed_recipes_by_ingredients` pour `n`
+    recettes (recherche + informationBulk)."""
+    n = max(1, int(n))
+    return (1.0 + 0.01 * n) + (1.0 + 0.5 * (n - 1))
+
+
+class SpoonacularRateLimiter:
+    """Limiteur local devant l'API : seau à jetons + budget journalier.
+
+    - seau à jetons : au plus `rate_per_second` requêtes par seconde en
+      régime établi, `burst` d'affilée ; `acquire` attend au plus `max_wait`
+      secondes un jeton
+    - budget journalier (points, jour UTC comme Spoonacular) persisté en
+      SQLite (`state_path`, None = en mémoire) : il survit aux redémarrages
+      et est recalé sur l'en-tête `X-API-Quota-Used` des réponses
+    - `would_exceed` est une vérification locale immédiate (sans verrou
+      réseau ni appel amont)
+    """
+
+    def __init__(
+        self,
+        *,
+        daily_budget: float = 150.0,
+        rate_per_second: float = 1.0,
+        burst: int = 2,
+        max_wait: float = 2.0,
+        state_path: str | Path | None = None,
+        clock: Callable[[], float] = time.monotonic,
+        wall_clock: Callable[[], float] = time.time,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        if rate_per_second <= 0:
+            raise ValueError("rate_per_second must be > 0")
+        if burst < 1:
+            raise ValueError("burst must be >= 1")
+
+        self.daily_budget = float(daily_budget)
+        self._rate = float(rate_per_second)
+        self._burst = float(burst)
+        self._max_wait = float(max_wait)
+        self._clock = clock
+        self._wall_clock = wall_clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+
+        self._tokens = self._burst
+        self._refilled_at = clock()
+
+        if state_path is not None and str(state_path) != ":memory:":
+            Path(state_path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(
+            ":memory:" if state_path is None else str(state_path),
+            check_same_thread=False,
+        )
+        with self._lock, self._conn:
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS quota_usage (
+                    day  TEXT PRIMARY KEY,
+                    used REAL NOT NULL
+                )
+                """
+            )
+        self._day, self._used = self._load_today()
+
+    # ------------------------------------------------------------------
+    # Budget journalier
+    # ------------------------------------------------------------------
+
+    def _today(self) -> str:
+        return time.strftime("%Y-%m-%d", time.gmtime(self._wall_clock()))
+
+    def _load_today(self) -> tuple[str, float]:
+        day = self._today()
+        row = self._conn.execute(
+            "SELECT used FROM quota_usage WHERE day = ?", (day,)
+        ).fetchone()
+        return day, float(row[0]) if row else 0.0
+
+    def _roll_day(self) -> None:
+        """Change de jour si besoin (appelé sous verrou)."""
+        if self._today() != self._day:
+            self._day, self._used = self._load_today()
+
+    def _save(self) -> None:
+        with self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO quota_usage (day, used) VALUES (?, ?)",
+                (self._day, self._used),
+            )
+            self._conn.execute("DELETE FROM quota_usage WHERE day < ?", (self._day,))
+
+    def remaining(self) -> float:
+        with self._lock:
+            self._roll_day()
+            return max(0.0, self.daily_budget - self._used)
+
+    def would_exceed(self, cost: float = 1.0) -> bool:
+        """Vrai si dépenser `cost` points dépasserait le budget du jour."""
+        with self._lock:
+            self._roll_day()
+            return self._used + cost > self.daily_budget
+
+    def mark_exhausted(self) -> None:
+        """L'API a signalé le quota épuisé (402) : budget du jour consommé."""
+        with self._lock:
+            self._roll_day()
+            self._used = max(self._used, self.daily_budget)
+            self._save()
+
+    def release(self, cost: float) -> None:
+        """Rend les points réservés par `acquire` pour une requête jamais
+        envoyée (`SpoonacularConnectionError`)."""
+        with self._lock:
+            self._roll_day()
+            self._used = max(0.0, self._used - cost)
+            self._save()
+
+    def observe(self, resp: requests.Response) -> None:
+        """Recale la consommation sur les en-têtes de quota de la réponse
+        (`X-API-Quota-Left` <= 0 : budget du jour consommé)."""
+        headers = resp.headers or {}
+        left = _header_float(headers, "X-API-Quota-Left")
+        if left is not None and left <= 0:
+            self.mark_exhausted()
+            return
+
+        used = _header_float(headers, "X-API-Quota-Used")
+        if used is None:
+            return
+        with self._lock:
+            self._roll_day()
+            self._used = used
+            self._save()
+
+    # ------------------------------------------------------------------
+    # Seau à jetons
+    # ------------------------------------------------------------------
+
+    def _refill(self) -> None:
+        now = self._clock()
+        elapsed = max(0.0, now - self._refilled_at)
+        self._tokens = min(self._burst, self._tokens + elapsed * self._rate)
+        self._refilled_at = now
+
+    def acquire(self, cost: float = 1.0) -> None:
+        """Réserve une requête de `cost` points.
+
+        Lève `SpoonacularRateLimitError` sans appeler l'API si le budget du
+        jour est insuffisant, ou si aucun jeton n'est disponible dans
+        `max_wait` secondes.
+        """
+        with self._lock:
+            self._roll_day()
+            if self._used + cost > self.daily_budget:
+                raise SpoonacularRateLimitError(
+                    "Spoonacular daily budget exhausted (local limiter): "
+                    f"{self._used:.2f}/{self.daily_budget:.2f} points used"
+                )
+
+            self._refill()
+            wait = max(0.0, (1.0 - self._tokens) / self._rate)
+            if wait > self._max_wait:
+                raise SpoonacularRateLimitError(
+                    f"Spoonacular rate limit (local limiter): retry in {wait:.2f}s"
+                )
+            # Le jeton (et le budget) sont réservés tout de suite : les
+            # appelants concurrents attendent chacun leur tour.
+            self._tokens -= 1.0
+            self._used += cost
+            self._save()
+
+        if wait > 0:
+            self._sleep(wait)
+
+    def throttle(self, retry_after: float | None = None) -> None:
+        """L'API a limité le débit (429) : vide le seau à jetons pour
+        `retry_after` secondes (une période de jeton par défaut). Le budget
+        du jour n'est pas touché."""
+        with self._lock:
+            self._refill()
+            if retry_after is None or retry_after <= 0:
+                self._tokens = min(self._tokens, 0.0)
+            else:
+                # Un jeton disponible exactement après `retry_after` secondes
+                self._tokens = min(self._tokens, 1.0 - retry_after * self._rate)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def _header_float(headers: Any, name: str) -> float | None:
+    """Valeur numérique d'un en-tête de réponse (None si absent/invalide)."""
+    value = headers.get(name)
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+_shared_limiters: dict[str, SpoonacularRateLimiter] = {}
+_shared_limiters_lock = threading.Lock()
+
+
+def shared_rate_limiter(
+    state_path: str | Path | None,
+    *,
+    daily_budget: float = 150.0,
+    rate_per_second: float = 1.0,
+    burst: int = 2,
+) -> SpoonacularRateLimiter:
+    """Limiteur partagé par le processus pour `state_path` (paramètres pris
+    en compte à la création)."""
+    key = str(state_path)
+    with _shared_limiters_lock:
+        limiter = _shared_limiters.get(key)
+        if limiter is None:
+            limiter = SpoonacularRateLimiter(
+                daily_budget=daily_budget,
+                rate_per_second=rate_per_second,
+                burst=burst,
+                state_path=state_path,
+            )
+            _shared_limiters[key] = limiter
+        return limiter
+
+
+def _get_json(
+    session: requests.Session | None,
+    endpoint: str,
+    params: dict[str, Any],
+    timeout: float | tuple[float, float],
+    cache: SpoonacularResponseCache | None,
+    limiter: SpoonacularRateLimiter | None = None,
+) -> Any:
+    """GET `endpoint` et décode la réponse JSON, en passant par `cache`.
+
+    Seules les réponses 2xx sont mises en cache (les erreurs, dont les
+    dépassements de quota, sont toujours levées). Les réponses servies par le
+    cache ne consomment rien auprès de `limiter`.
+    """
+    if cache is not None:
+        cached = cache.get(endpoint, params)
+        if cached is not None:
+            return cached
+
+    cost = estimate_cost(endpoint, params)
+    if limiter is not None:
+        limiter.acquire(cost)
+
+    try:
+        resp = _http_get(session, f"{SPOONACULAR_BASE_URL}/{endpoint}", params, timeout)
+    except SpoonacularConnectionError:
+        # Requête jamais envoyée : rien n'a été décompté chez Spoonacular. Un
+        # timeout de lecture garde sa réservation (l'appel a pu être facturé)
+        if limiter is not None:
+            limiter.release(cost)
+        raise
+
+    if limiter is not None:
+        if resp.status_code == 402:
+            limiter.mark_exhausted()
+        elif resp.status_code == 429:
+            # Limitation de débit (par seconde / concurrence), pas de quota :
+            # seul cet appel échoue, les suivants attendent `Retry-After`
+            limiter.throttle(_header_float(resp.headers or {}, "Retry-After"))
+            limiter.observe(resp)
+        else:
+            limiter.observe(resp)
+    _raise_for_spoonacular_error(resp)
+    data = resp.json()
+
+    if cache is not None:
+        cache.put(endpoint, params, data)
+    return data
+
+
 # ============================================================
 # Résultats de recherche (complexSearch)
 # ============================================================
@@ -154,6 +809,8 @@ def search_recipes_by_ingredients(
     offset: int = 0,
     timeout: float = 30.0,
     session: requests.Session | None = None,
+    cache: SpoonacularResponseCache | None = None,
+    limiter: SpoonacularRateLimiter | None = None,
 ) -> RecipeSearchResponse:
     """
     Cherche des recettes Spoonacular à partir d'une liste d'ingrédients, via:
@@ -249,19 +906,7 @@ def search_recipes_by_ingredients(
             raise ValueError("sort_direction doit être 'asc' ou 'desc'.")
         params["sortDirection"] = sort_direction
 
-    url = f"{SPOONACULAR_BASE_URL}/recipes/complexSearch"
-
-    sess = session or requests.Session()
-    try:
-        resp = sess.get(url, params=params, timeout=timeout)
-    except requests.Timeout as e:
-        raise SpoonacularError(f"Timeout en appelant Spoonacular: {e}") from e
-    except requests.RequestException as e:
-        raise SpoonacularError(f"Erreur réseau en appelant Spoonacular: {e}") from e
-
-    _raise_for_spoonacular_error(resp)
-
-    data = resp.json()
+    data = _get_json(session, "recipes/complexSearch", params, timeout, cache, limiter)
 
     # Parsing robuste
     offset_val = int(data.get("offset", 0))
@@ -343,6 +988,8 @@ def fetch_detailed_recipes_by_ingredients(
     instructions_required: bool = True,
     timeout: float = 30.0,
     session: requests.Session | None = None,
+    cache: SpoonacularResponseCache | None = None,
+    limiter: SpoonacularRateLimiter | None = None,
 ) -> list[DetailedRecipe]:
     """
     - Mode normal (strict_only=False): complexSearch (filtre dish_type possible)
@@ -364,6 +1011,8 @@ def fetch_detailed_recipes_by_ingredients(
             ranking=2,
             timeout=timeout,
             session=session,
+            cache=cache,
+            limiter=limiter,
         )
     else:
         search = search_recipes_by_ingredients(
@@ -380,6 +1029,8 @@ def fetch_detailed_recipes_by_ingredients(
             add_recipe_nutrition=False,
             timeout=timeout,
             session=session,
+            cache=cache,
+            limiter=limiter,
         )
         ids = [r.id for r in search.results]
 
@@ -387,7 +1038,6 @@ def fetch_detailed_recipes_by_ingredients(
         return []
 
     # 2) Bulk info (ingrédients + étapes)
-    url = f"{SPOONACULAR_BASE_URL}/recipes/informationBulk"
     params: dict[str, Any] = {
         "apiKey": api_key,
         "ids": ",".join(map(str, ids)),
@@ -395,17 +1045,9 @@ def fetch_detailed_recipes_by_ingredients(
         "addRecipeInstructions": "true",
     }
 
-    sess = session or requests.Session()
-    try:
-        resp = sess.get(url, params=params, timeout=timeout)
-    except requests.Timeout as e:
-        raise SpoonacularError(f"Timeout en appelant Spoonacular: {e}") from e
-    except requests.RequestException as e:
-        raise SpoonacularError(f"Erreur réseau en appelant Spoonacular: {e}") from e
-
-    _raise_for_spoonacular_error(resp)
-
-    recipes_info = resp.json()
+    recipes_info = _get_json(
+        session, "recipes/informationBulk", params, timeout, cache, limiter
+    )
     if not isinstance(recipes_info, list):
         raise SpoonacularError(
             "Réponse inattendue de informationBulk (liste attendue)."
@@ -477,6 +1119,8 @@ def find_recipe_ids_by_ingredients(
     ranking: int = 2,
     timeout: float = 30.0,
     session: requests.Session | None = None,
+    cache: SpoonacularResponseCache | None = None,
+    limiter: SpoonacularRateLimiter | None = None,
 ) -> list[int]:
     """
     Appelle /recipes/findByIngredients et renvoie une liste d'IDs.
@@ -494,7 +1138,6 @@ def find_recipe_ids_by_ingredients(
 
     ing_csv = _build_include_ingredients(ingredients)
 
-    url = f"{SPOONACULAR_BASE_URL}/recipes/findByIngredients"
     params: dict[str, Any] = {
         "apiKey": api_key,
         "ingredients": ing_csv,
@@ -507,16 +1150,9 @@ def find_recipe_ids_by_ingredients(
             raise ValueError("max_missing_ingredients doit être >= 0.")
         params["maxMissingIngredients"] = max_missing_ingredients
 
-    sess = session or requests.Session()
-    try:
-        resp = sess.get(url, params=params, timeout=timeout)
-    except requests.Timeout as e:
-        raise SpoonacularError(f"Timeout en appelant Spoonacular: {e}") from e
-    except requests.RequestException as e:
-        raise SpoonacularError(f"Erreur réseau en appelant Spoonacular: {e}") from e
-
-    _raise_for_spoonacular_error(resp)
-    data = resp.json()
+    data = _get_json(
+        session, "recipes/findByIngredients", params, timeout, cache, limiter
+    )
 
     if not isinstance(data, list):
         raise SpoonacularError(
@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+import contextvars
+import functools
+import os
+import threading
+from typing import Any
+
+from dao.recipe_dao import RecipeDAO
+from dao.session_dao import SessionDAO
+from dao.stock_dao import StockDAO
+from dao.stock_item_dao import StockItemDAO
+from dao.user_dao import UserDAO
+
+
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+def _db_executor() -> ThreadPoolExecutor:
+    """Executor dédié aux appels BDD, dimensionné sur la taille max du pool.
+
+    Un appel BDD ne peut pas aller plus vite que le nombre de connexions
+    disponibles : inutile d'occuper plus de threads que POSTGRES_POOL_MAX_SIZE.
+    Les requêtes en attente (ex: fallback Spoonacular) ne bloquent ainsi
+    aucun thread du threadpool FastAPI.
+    """
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=int(os.getenv("POSTGRES_POOL_MAX_SIZE", "10")),
+                    thread_name_prefix="db",
+                )
+    return _executor
+
+
+def shutdown_executor() -> None:
+    """Arrête l'executor BDD (à appeler à l'arrêt de l'application)."""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True)
+            _executor = None
+
+
+async def run_in_db_executor(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """Exécute un appel DAO synchrone dans l'executor BDD.
+
+    Le contexte courant (contextvars) est propagé : l'appel utilise donc la
+    connexion empruntée par la requête HTTP (`connection_scope`).
+    """
+    ctx = contextvars.copy_context()
+    call = functools.partial(ctx.run, func, *args, **kwargs)
+    return await asyncio.get_running_loop().run_in_executor(_db_executor(), call)
+
+
+class AsyncDAO:
+    """Variante asynchrone d'un DAO synchrone.
+
+    Expose les mêmes noms de méthodes que le DAO enveloppé, sous forme de
+    coroutines : `await AsyncRecipeDAO().list_recipes(limit=10)`.
+    Les attributs privés (`_...`) et non appelables sont renvoyés tels quels.
+    """
+
+    def __init__(self, dao: Any) -> None:
+        self._dao = dao
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._dao, name)
+        if name.startswith("_") or not callable(attr):
+            return attr
+
+        @functools.wraps(attr)
+        async def _async_call(*args, **kwargs):
+            return await run_in_db_executor(attr, *args, **kwargs)
+
+        # Cache : les appels suivants ne repassent plus par __getattr__
+        setattr(self, name, _async_call)
+        return _async_call
+
+    @property
+    def sync(self) -> Any:
+        """DAO synchrone sous-jacent."""
+        return self._dao
+
+
+class AsyncRecipeDAO(AsyncDAO):
+    def __init__(self, dao: RecipeDAO | None = None) -> None:
+        super().__init__(dao or RecipeDAO())
+
+
+class AsyncStockDAO(AsyncDAO):
+    def __init__(self, dao: StockDAO | None = None) -> None:
+        super().__init__(dao or StockDAO())
+
+
+class AsyncStockItemDAO(AsyncDAO):
+    def __init__(self, dao: StockItemDAO | None = None) -> None:
+        super().__init__(dao or StockItemDAO())
+
+
+class AsyncUserDAO(AsyncDAO):
+    def __init__(self, dao: UserDAO | None = None) -> None:
+        super().__init__(dao or UserDAO())
+
+
+class AsyncSessionDAO(AsyncDAO):
+    def __init__(self, dao: SessionDAO | None = None) -> None:
+        super().__init__(dao or SessionDAO())
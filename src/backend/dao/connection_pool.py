@@ -0,0 +1,287 @@
+from __future__ import annotations
+
+from collections import deque
+from collections.abc import Callable
+import contextlib
+from dataclasses import dataclass
+import logging
+import threading
+import time
+from typing import Any
+
+import psycopg2
+from psycopg2 import extensions
+
+
+logger = logging.getLogger(__name__)
+
+
+class PoolError(RuntimeError):
+    """Erreur générique du pool de connexions."""
+
+
+class PoolTimeoutError(PoolError):
+    """Aucune connexion disponible avant l'expiration du délai d'attente."""
+
+
+class PoolClosedError(PoolError):
+    """Le pool a été fermé : plus aucune connexion ne peut être empruntée."""
+
+
+@dataclass(frozen=True, slots=True)
+class PoolStats:
+    """Photographie des compteurs du pool.
+
+    Attributes:
+        min_size: Nombre minimal de connexions maintenues ouvertes.
+        max_size: Nombre maximal de connexions simultanées.
+        size: Nombre de connexions actuellement ouvertes.
+        idle: Connexions disponibles dans le pool.
+        in_use: Connexions empruntées.
+        waiting: Threads en attente d'une connexion.
+        checkouts: Nombre total d'emprunts réussis.
+        timeouts: Nombre d'emprunts abandonnés (délai dépassé).
+        reconnects: Connexions remplacées après un échec de health check.
+        discarded: Connexions fermées au retour (cassées ou en erreur).
+    """
+
+    min_size: int
+    max_size: int
+    size: int
+    idle: int
+    in_use: int
+    waiting: int
+    checkouts: int
+    timeouts: int
+    reconnects: int
+    discarded: int
+
+
+class _PooledConnection:
+    """Connexion psycopg2 + métadonnées de suivi (dernière utilisation)."""
+
+    __slots__ = ("raw", "last_used")
+
+    def __init__(self, raw: Any) -> None:
+        self.raw = raw
+        self.last_used = time.monotonic()
+
+
+class ConnectionPool:
+    """Pool de connexions PostgreSQL thread-safe.
+
+    - emprunt/retour explicites (`getconn` / `putconn`)
+    - taille min/max configurable, attente bornée quand le pool est plein
+    - health check (`SELECT 1`) des connexions restées inactives trop longtemps
+    - reconnexion automatique des connexions fermées ou cassées
+    - statistiques (`stats()`)
+
+    Args:
+        connect: Fabrique de connexions (ex: `lambda: psycopg2.connect(...)`).
+        min_size: Connexions ouvertes dès la création du pool.
+        max_size: Connexions simultanées maximum.
+        timeout: Attente max (secondes) d'une connexion libre.
+        health_check_interval: Au-delà de cette inactivité (secondes), la
+            connexion est testée avant d'être rendue à l'appelant.
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], Any],
+        *,
+        min_size: int = 1,
+        max_size: int = 10,
+        timeout: float = 30.0,
+        health_check_interval: float = 30.0,
+    ) -> None:
+        if min_size < 0:
+            raise ValueError("min_size doit être >= 0.")
+        if max_size < 1 or max_size < min_size:
+            raise ValueError("max_size doit être >= 1 et >= min_size.")
+
+        self._connect = connect
+        self._min_size = int(min_size)
+        self._max_size = int(max_size)
+        self._timeout = float(timeout)
+        self._health_check_interval = float(health_check_interval)
+
+        self._cond = threading.Condition(threading.Lock())
+        self._idle: deque[_PooledConnection] = deque()
+        self._in_use: dict[int, _PooledConnection] = {}
+        self._size = 0
+        self._waiting = 0
+        self._closed = False
+
+        self._checkouts = 0
+        self._timeouts = 0
+        self._reconnects = 0
+        self._discarded = 0
+
+        for _ in range(self._min_size):
+            self._idle.append(_PooledConnection(self._connect()))
+            self._size += 1
+
+    # ------------------------------------------------------------------
+    # Emprunt / retour
+    # ------------------------------------------------------------------
+
+    def getconn(self, timeout: float | None = None) -> Any:
+        """Emprunte une connexion saine.
+
+        Raises:
+            PoolTimeoutError: Si aucune connexion n'est libérée à temps.
+            PoolClosedError: Si le pool est fermé.
+        """
+        wait = self._timeout if timeout is None else float(timeout)
+        deadline = time.monotonic() + wait
+
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise PoolClosedError("Le pool de connexions est fermé.")
+
+                if self._idle:
+                    pooled = self._idle.pop()
+                    break
+
+                if self._size < self._max_size:
+                    # On réserve la place avant de se connecter hors verrou
+                    self._size += 1
+                    pooled = None
+                    break
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._timeouts += 1
+                    raise PoolTimeoutError(
+                        f"Aucune connexion disponible après {wait:.1f}s "
+                        f"(max_size={self._max_size})."
+                    )
+                self._waiting += 1
+                try:
+                    self._cond.wait(remaining)
+                finally:
+                    self._waiting -= 1
+
+        try:
+            if pooled is None:
+                pooled = _PooledConnection(self._connect())
+            else:
+                pooled = self._ensure_healthy(pooled)
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+
+        with self._cond:
+            self._in_use[id(pooled.raw)] = pooled
+            self._checkouts += 1
+        return pooled.raw
+
+    def putconn(self, conn: Any, *, close: bool = False) -> None:
+        """Rend une connexion au pool.
+
+        Une transaction laissée ouverte est annulée (rollback) ; une connexion
+        fermée, cassée ou explicitement marquée `close=True` est détruite.
+        """
+        with self._cond:
+            pooled = self._in_use.pop(id(conn), None)
+        if pooled is None:
+            raise PoolError("Connexion inconnue du pool.")
+
+        keep = not close and not self._closed and self._reset(conn)
+
+        with self._cond:
+            if keep and len(self._idle) < self._max_size:
+                pooled.last_used = time.monotonic()
+                self._idle.append(pooled)
+            else:
+                self._size -= 1
+                if not self._closed:
+                    self._discarded += 1
+                self._close_quietly(conn)
+            self._cond.notify()
+
+    def close(self) -> None:
+        """Ferme toutes les connexions inactives ; refuse les emprunts suivants."""
+        with self._cond:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._size -= len(idle)
+            self._cond.notify_all()
+        for pooled in idle:
+            self._close_quietly(pooled.raw)
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def stats(self) -> PoolStats:
+        """Retourne un instantané des compteurs du pool."""
+        with self._cond:
+            return PoolStats(
+                min_size=self._min_size,
+                max_size=self._max_size,
+                size=self._size,
+                idle=len(self._idle),
+                in_use=len(self._in_use),
+                waiting=self._waiting,
+                checkouts=self._checkouts,
+                timeouts=self._timeouts,
+                reconnects=self._reconnects,
+                discarded=self._discarded,
+            )
+
+    # ------------------------------------------------------------------
+    # Santé des connexions
+    # ------------------------------------------------------------------
+
+    def _ensure_healthy(self, pooled: _PooledConnection) -> _PooledConnection:
+        """Vérifie une connexion inactive et la remplace si elle est morte."""
+        conn = pooled.raw
+        idle_for = time.monotonic() - pooled.last_used
+
+        if not conn.closed and idle_for < self._health_check_interval:
+            return pooled
+
+        if not conn.closed and self._ping(conn):
+            return pooled
+
+        logger.warning("Connexion PostgreSQL perdue : reconnexion.")
+        self._close_quietly(conn)
+        fresh = _PooledConnection(self._connect())
+        with self._cond:
+            self._reconnects += 1
+        return fresh
+
+    @staticmethod
+    def _ping(conn: Any) -> bool:
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    @staticmethod
+    def _reset(conn: Any) -> bool:
+        """Remet la connexion dans un état propre. Retourne False si inutilisable."""
+        if conn.closed:
+            return False
+        try:
+            status = conn.get_transaction_status()
+            if status == extensions.TRANSACTION_STATUS_UNKNOWN:
+                return False
+            if status != extensions.TRANSACTION_STATUS_IDLE:
+                conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    @staticmethod
+    def _close_quietly(conn: Any) -> None:
+        with contextlib.suppress(Exception):
+            conn.close()
@@ -1,41 +1,147 @@
+from __future__ import annotations
+
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
 import os
+import threading
 
 import dotenv
 import psycopg2
 from psycopg2.extras import RealDictCursor
 
+from dao.connection_pool import ConnectionPool, PoolStats
 from utils.singleton import Singleton
 
 
+class _Lease:
+    """Connexion empruntée au pool à la première utilisation, rendue à la fin du scope."""
+
+    __slots__ = ("_conn", "_pool")
+
+    def __init__(self) -> None:
+        self._conn = None
+        self._pool: ConnectionPool | None = None
+
+    def get(self, pool: ConnectionPool):
+        if self._conn is None:
+            self._conn = pool.getconn()
+            self._pool = pool
+        return self._conn
+
+    def release(self) -> None:
+        if self._conn is not None and self._pool is not None:
+            conn, self._conn = self._conn, None
+            self._pool.putconn(conn)
+
+
+# Lease de la requête HTTP en cours (posé par `connection_scope`)
+_request_lease: ContextVar[_Lease | None] = ContextVar("db_request_lease", default=None)
+
+
+@contextmanager
+def connection_scope() -> Iterator[None]:
+    """Délimite la durée d'emprunt d'une connexion (typiquement : une requête HTTP).
+
+    Tous les appels à `DBConnection().connection` faits dans ce scope (y compris
+    depuis les threads du threadpool FastAPI, qui héritent du contexte) partagent
+    la même connexion, rendue au pool à la sortie du bloc. Aucune connexion n'est
+    empruntée si le scope ne touche pas la base.
+
+    À utiliser aussi dans les threads de fond (import, chargement des index) :
+    hors scope, un thread garde sa connexion jusqu'à `DBConnection().release()`.
+    Un scope imbriqué réutilise la connexion du scope englobant.
+    """
+    if _request_lease.get() is not None:
+        yield
+        return
+
+    lease = _Lease()
+    token = _request_lease.set(lease)
+    try:
+        yield
+    finally:
+        _request_lease.reset(token)
+        lease.release()
+
+
 class DBConnection(metaclass=Singleton):
     """
-    Classe gérant une unique connexion à la base PostgreSQL.
-    Utilise le patron Singleton pour éviter plusieurs connexions simultanées.
+    Point d'accès unique au pool de connexions PostgreSQL.
+
+    Le Singleton ne porte plus une connexion unique mais un `ConnectionPool`
+    thread-safe : chaque requête HTTP (voir `connection_scope`) emprunte sa
+    propre connexion, ce qui permet aux endpoints de s'exécuter en parallèle.
+    Les threads de fond (import, chargement des index) passent aussi par
+    `connection_scope`. Hors scope (scripts, reset de la base), chaque thread
+    garde sa connexion jusqu'à l'appel de `release()`.
+
+    Variables d'environnement (optionnelles) :
+        - POSTGRES_POOL_MIN_SIZE (défaut 1)
+        - POSTGRES_POOL_MAX_SIZE (défaut 10)
+        - POSTGRES_POOL_TIMEOUT (secondes, défaut 30)
+        - POSTGRES_POOL_HEALTH_CHECK_INTERVAL (secondes, défaut 30)
     """
 
     def __init__(self):
-        """Initialise la connexion à la base de données."""
+        """Initialise le pool de connexions à la base de données."""
         dotenv.load_dotenv()  # charge le fichier .env
+        connect_kwargs = {
+            "host": os.getenv("POSTGRES_HOST", "db"),
+            "port": os.getenv("POSTGRES_PORT"),
+            "database": os.getenv("POSTGRES_DATABASE"),
+            "user": os.getenv("POSTGRES_USER"),
+            "password": os.getenv("POSTGRES_PASSWORD"),
+            "options": f"-c search_path={os.getenv('POSTGRES_SCHEMA')}",
+            "cursor_factory": RealDictCursor,
+        }
         try:
-            self.__connection = psycopg2.connect(
-                host=os.getenv("POSTGRES_HOST", "db"),
-                port=os.getenv("POSTGRES_PORT"),
-                database=os.getenv("POSTGRES_DATABASE"),
-                user=os.getenv("POSTGRES_USER"),
-                password=os.getenv("POSTGRES_PASSWORD"),
-                options=f"-c search_path={os.getenv('POSTGRES_SCHEMA')}",
-                cursor_factory=RealDictCursor,
+            self.__pool = ConnectionPool(
+                lambda: psycopg2.connect(**connect_kwargs),
+                min_size=int(os.getenv("POSTGRES_POOL_MIN_SIZE", "1")),
+                max_size=int(os.getenv("POSTGRES_POOL_MAX_SIZE", "10")),
+                timeout=float(os.getenv("POSTGRES_POOL_TIMEOUT", "30")),
+                health_check_interval=float(
+                    os.getenv("POSTGRES_POOL_HEALTH_CHECK_INTERVAL", "30")
+                ),
             )
             print(f"Connexion réussie au schéma : {os.getenv('POSTGRES_SCHEMA')}")
         except Exception as e:
             print("Erreur de connexion à la base de données :", e)
             raise
+        self.__local = threading.local()
+
+    def _current_lease(self) -> _Lease:
+        lease = _request_lease.get()
+        if lease is not None:
+            return lease
+
+        lease = getattr(self.__local, "lease", None)
+        if lease is None:
+            lease = _Lease()
+            self.__local.lease = lease
+        return lease
 
     @property
     def connection(self):
-        """Retourne la connexion PostgreSQL active."""
-        return self.__connection
+        """Retourne la connexion PostgreSQL empruntée pour le scope courant."""
+        return self._current_lease().get(self.__pool)
 
     def get_connexion(self):
         """Alias pour compatibilité."""
-        return self.__connection
+        return self.connection
+
+    @property
+    def pool(self) -> ConnectionPool:
+        """Pool sous-jacent."""
+        return self.__pool
+
+    def stats(self) -> PoolStats:
+        """Statistiques du pool (taille, connexions utilisées, reconnexions…)."""
+        return self.__pool.stats()
+
+    def release(self) -> None:
+        """Rend au pool la connexion du thread courant (usage hors requête HTTP)."""
+        lease = getattr(self.__local, "lease", None)
+        if lease is not None:
+            lease.release()
@@ -160,6 +160,84 @@ class IngredientDAO:
             conn.rollback()
             raise
 
+    @log
+    def get_or_create_ingredient_ids(
+        self, items: Iterable[tuple[str, Unit | str | None]]
+    ) -> dict[str, int]:
+        """Résout (ou crée) un lot d'ingrédients en une seule requête.
+
+        Les noms sont comparés en minuscules (index unique sur LOWER(name)) ;
+        pour un nom présent plusieurs fois, la première unité est retenue.
+        Les ingrédients existants ne sont pas modifiés.
+
+        Args:
+            items: Couples (nom, unité).
+
+        Returns:
+            dict[str, int]: {nom en minuscules: ingredient_id}.
+        """
+        wanted: dict[str, tuple[str, str | None]] = {}
+        for name, unit in items:
+            clean_name = (name or "").strip()
+            if not clean_name or clean_name.lower() in wanted:
+                continue
+            parsed_unit = Unit.from_any(unit) if unit else None
+            wanted[clean_name.lower()] = (
+                clean_name,
+                parsed_unit.value if parsed_unit else None,
+            )
+        if not wanted:
+            return {}
+
+        values_sql = ",".join(["(%s, %s::unit_type)"] * len(wanted))
+        params = [v for pair in wanted.values() for v in pair]
+        lowered = list(wanted)
+
+        conn = DBConnection().connection
+        try:
+            with conn.cursor() as cur:
+                cur.execute(
+                    f"""
+                    WITH input (name, unit) AS (VALUES {values_sql}),
+                    ins AS (
+                        INSERT INTO ingredient (name, unit)
+                        SELECT name, unit FROM input
+                        ON CONFLICT ((LOWER(name))) DO NOTHING
+                        RETURNING ingredient_id, name
+                    )
+                    SELECT LOWER(name) AS key, ingredient_id FROM ins
+                    UNION ALL
+                    SELECT LOWER(name) AS key, ingredient_id
+                    FROM ingredient
+                    WHERE LOWER(name) = ANY(%s)
+                    """,
+                    (*params, lowered),
+                )
+                ids = {str(r["key"]): int(r["ingredient_id"]) for r in cur.fetchall()}
+
+                missing = [k for k in lowered if k not in ids]
+                if missing:
+                    # Créés par une transaction concurrente validée pendant
+                    # la requête : visibles seulement maintenant
+                    cur.execute(
+                        """
+                        SELECT LOWER(name) AS key, ingredient_id
+                        FROM ingredient
+                        WHERE LOWER(name) = ANY(%s)
+                        """,
+                        (missing,),
+                    )
+                    ids.update(
+                        {str(r["key"]): int(r["ingredient_id"]) for r in cur.fetchall()}
+                    )
+
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+        return ids
+
     @log
     def get_ingredient_by_id(
         self,
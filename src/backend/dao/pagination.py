@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import base64
+import binascii
+from dataclasses import dataclass, field
+from datetime import datetime
+import json
+from typing import Any, Generic, TypeVar
+
+
+T = TypeVar("T")
+
+
+class InvalidCursorError(ValueError):
+    """Curseur de pagination illisible ou d'un format inattendu."""
+
+
+@dataclass(frozen=True, slots=True)
+class Page(Generic[T]):
+    """Page de résultats en pagination par curseur (keyset).
+
+    Attributes:
+        items: Éléments de la page.
+        next_cursor: Curseur opaque de la page suivante (None si dernière page).
+    """
+
+    items: list[T] = field(default_factory=list)
+    next_cursor: str | None = None
+
+
+def encode_cursor(*key: Any) -> str:
+    """Encode la clé de tri du dernier élément d'une page en curseur opaque.
+
+    Les datetime sont sérialisés en ISO 8601 ; le résultat est du base64
+    « URL-safe » sans padding, utilisable tel quel en query string.
+    """
+    values = [v.isoformat() if isinstance(v, datetime) else v for v in key]
+    raw = json.dumps(values, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def decode_cursor(cursor: str, *, size: int) -> list[Any]:
+    """Décode un curseur produit par `encode_cursor`.
+
+    Args:
+        cursor: Curseur reçu du client.
+        size: Nombre de composantes attendues dans la clé.
+
+    Raises:
+        InvalidCursorError: Si le curseur est corrompu ou n'a pas la bonne forme.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, UnicodeError, binascii.Error) as exc:
+        raise InvalidCursorError("Curseur de pagination invalide.") from exc
+
+    if not isinstance(values, list) or len(values) != size:
+        raise InvalidCursorError("Curseur de pagination invalide.")
+    return values
@@ -1,15 +1,28 @@
 from __future__ import annotations
 
-from collections.abc import Iterable
+from collections.abc import Callable, Iterable, Iterator
 from dataclasses import dataclass
-from typing import Any
+from datetime import datetime
+import logging
+from typing import Any, ClassVar
 
 from business_objects.recipe import Recipe
 from business_objects.user import GenericUser
 from dao.db_connection import DBConnection
+from dao.pagination import InvalidCursorError, Page, decode_cursor, encode_cursor
 from utils.log_decorator import log
 
 
+logger = logging.getLogger(__name__)
+
+# Observateur d'écriture : (recipe_id, deleted)
+RecipeWriteListener = Callable[[int, bool], None]
+
+# Clé de tri des listings : created_at DESC place les NULL en tête ; la clé
+# keyset doit faire de même (une comparaison de tuple avec NULL est fausse)
+_CREATED_AT_KEY = "COALESCE(created_at, 'infinity'::timestamp)"
+
+
 @dataclass(frozen=True, slots=True)
 class RecipeRow:
     """Représentation typée d'une ligne de la table `recipe`."""
@@ -24,6 +37,16 @@ class RecipeRow:
     created_at: Any
 
 
+@dataclass(frozen=True, slots=True)
+class RecipeIndexRow:
+    """Données minimales d'une recette pour l'index de recherche en mémoire."""
+
+    recipe_id: int
+    created_at: Any
+    ingredient_ids: list[int]
+    tag_names: list[str]
+
+
 class RecipeDAO:
     """DAO pour `recipe` + tables de liaison associées.
 
@@ -33,6 +56,49 @@ class RecipeDAO:
     - recipe_tag
     """
 
+    # Observateurs notifiés après chaque écriture validée (index de recherche,
+    # caches...). Partagés par toutes les instances de la DAO.
+    _write_listeners: ClassVar[list[RecipeWriteListener]] = []
+    # ... dont ceux qui ignorent les imports de recettes externes
+    _skip_imports: ClassVar[list[RecipeWriteListener]] = []
+
+    # ---------------------------------------------------------------------
+    # Observateurs d'écriture
+    # ---------------------------------------------------------------------
+
+    @classmethod
+    def add_write_listener(
+        cls, listener: RecipeWriteListener, *, imports: bool = True
+    ) -> None:
+        """Abonne `listener(recipe_id, deleted)` aux écritures de recettes
+        (`imports=False` : sauf les imports de recettes externes)."""
+        if listener not in cls._write_listeners:
+            cls._write_listeners.append(listener)
+        if not imports and listener not in cls._skip_imports:
+            cls._skip_imports.append(listener)
+
+    @classmethod
+    def remove_write_listener(cls, listener: RecipeWriteListener) -> None:
+        if listener in cls._write_listeners:
+            cls._write_listeners.remove(listener)
+        if listener in cls._skip_imports:
+            cls._skip_imports.remove(listener)
+
+    def _notify_write(
+        self, recipe_id: int, *, deleted: bool = False, imported: bool = False
+    ) -> None:
+        """Prévient les observateurs (après commit). Leurs erreurs sont journalisées
+        sans remettre en cause l'écriture, déjà validée."""
+        for listener in list(self._write_listeners):
+            if imported and listener in self._skip_imports:
+                continue
+            try:
+                listener(int(recipe_id), deleted)
+            except Exception:
+                logger.exception(
+                    "Observateur d'écriture en échec (recipe_id=%s)", recipe_id
+                )
+
     # ---------------------------------------------------------------------
     # Helpers
     # ---------------------------------------------------------------------
@@ -81,6 +147,31 @@ class RecipeDAO:
 
         return recipe
 
+    def _rows_to_bos(
+        self, cur, rows: list[RecipeRow], *, with_relations: bool
+    ) -> list[Recipe]:
+        """Construit les `Recipe` d'un lot de lignes.
+
+        Avec `with_relations=True`, ingrédients et tags de tout le lot sont
+        chargés en 2 requêtes (quel que soit le nombre de lignes), puis
+        réassemblés en mémoire.
+        """
+        if not with_relations or not rows:
+            return [self._row_to_bo(r) for r in rows]
+
+        recipe_ids = [r.recipe_id for r in rows]
+        ingredients_by_recipe = self.get_ingredients_for_recipes(recipe_ids, cursor=cur)
+        tags_by_recipe = self.get_tags_for_recipes(recipe_ids, cursor=cur)
+
+        return [
+            self._row_to_bo(
+                r,
+                ingredients=ingredients_by_recipe.get(r.recipe_id),
+                tags=tags_by_recipe.get(r.recipe_id),
+            )
+            for r in rows
+        ]
+
     @staticmethod
     def _fetch_one_recipe(cur, recipe_id: int) -> RecipeRow | None:
         cur.execute(
@@ -149,11 +240,140 @@ class RecipeDAO:
                 tags = self.get_recipe_tags(recipe_id, cursor=cur)
 
             conn.commit()
-            return self._row_to_bo(row, ingredients=ingredients, tags=tags)
         except Exception:
             conn.rollback()
             raise
 
+        self._notify_write(recipe_id)
+        return self._row_to_bo(row, ingredients=ingredients, tags=tags)
+
+    # ---------------------------------------------------------------------
+    # Recettes importées (source externe)
+    # ---------------------------------------------------------------------
+
+    @log
+    def get_recipe_ids_by_external_ids(
+        self, source: str, external_ids: Iterable[str]
+    ) -> dict[str, int]:
+        """Retourne {external_id: recipe_id} des recettes déjà importées.
+
+        Une seule requête (index unique `(external_source, external_id)`).
+        """
+        ids = list(dict.fromkeys(str(i) for i in external_ids))
+        if not ids:
+            return {}
+
+        conn = DBConnection().connection
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                SELECT external_id, recipe_id
+                FROM recipe
+                WHERE external_source = %s
+                  AND external_id = ANY(%s)
+                """,
+                (source, ids),
+            )
+            return {str(r["external_id"]): int(r["recipe_id"]) for r in cur.fetchall()}
+
+    @log
+    def upsert_external_recipe(
+        self,
+        *,
+        source: str,
+        external_id: str,
+        name: str,
+        status: str | None = "public",
+        prep_time: int | None = 0,
+        portion: int | None = 1,
+        description: str | None = None,
+        ingredient_items: Iterable[tuple[int, float]] | None = None,
+        tag_ids: Iterable[int] | None = None,
+    ) -> Recipe:
+        """Importe une recette externe si elle est inconnue, sinon renvoie l'existante.
+
+        L'insertion est protégée par l'index unique `(external_source,
+        external_id)` (`ON CONFLICT DO NOTHING`) : deux imports concurrents de
+        la même recette n'en créent qu'une. Les ingrédients/tags ne sont écrits
+        que pour une recette nouvellement créée.
+        """
+
+        conn = DBConnection().connection
+        try:
+            with conn.cursor() as cur:
+                cur.execute(
+                    """
+                    WITH ins AS (
+                        INSERT INTO recipe (
+                            fk_user_id, name, status, prep_time, portion,
+                            description, external_source, external_id
+                        )
+                        VALUES (NULL, %s, %s, %s, %s, %s, %s, %s)
+                        ON CONFLICT (external_source, external_id) DO NOTHING
+                        RETURNING recipe_id
+                    )
+                    SELECT recipe_id, TRUE AS inserted FROM ins
+                    UNION ALL
+                    SELECT recipe_id, FALSE AS inserted
+                    FROM recipe
+                    WHERE external_source = %s
+                      AND external_id = %s
+                    """,
+                    (
+                        name,
+                        status,
+                        prep_time,
+                        portion,
+                        description,
+                        source,
+                        external_id,
+                        source,
+                        external_id,
+                    ),
+                )
+                found = cur.fetchone()
+                if found is None:
+                    # Conflit avec un import concurrent validé après le début
+                    # de la requête : la ligne n'est visible qu'à présent
+                    cur.execute(
+                        """
+                        SELECT recipe_id, FALSE AS inserted
+                        FROM recipe
+                        WHERE external_source = %s
+                          AND external_id = %s
+                        """,
+                        (source, external_id),
+                    )
+                    found = cur.fetchone()
+                if found is None:
+                    raise RuntimeError("Import recette échoué (ligne introuvable).")
+
+                recipe_id = int(found["recipe_id"])
+                inserted = bool(found["inserted"])
+
+                if inserted and ingredient_items:
+                    self._bulk_upsert_recipe_ingredients(
+                        cur, recipe_id, ingredient_items
+                    )
+                if inserted and tag_ids:
+                    self._bulk_upsert_recipe_tags(cur, recipe_id, tag_ids)
+
+                row = self._fetch_one_recipe(cur, recipe_id)
+                if row is None:
+                    raise RuntimeError("Import recette échoué (ligne introuvable).")
+
+                ingredients = self.get_recipe_ingredients(recipe_id, cursor=cur)
+                tags = self.get_recipe_tags(recipe_id, cursor=cur)
+
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+        if inserted:
+            self._notify_write(recipe_id, imported=True)
+        return self._row_to_bo(row, ingredients=ingredients, tags=tags)
+
     @log
     def get_recipe_by_id(
         self, recipe_id: int, *, with_relations: bool = True
@@ -174,19 +394,45 @@ class RecipeDAO:
             return self._row_to_bo(row, ingredients=ingredients, tags=tags)
 
     @log
-    def list_recipes(
-        self,
-        *,
-        fk_user_id: int | None = None,
-        name_ilike: str | None = None,
-        limit: int = 50,
-        offset: int = 0,
+    def get_recipes_by_ids(
+        self, recipe_ids: Iterable[int], *, with_relations: bool = True
     ) -> list[Recipe]:
-        """Liste des recettes (filtrables, sans charger les relations)."""
+        """Retourne les recettes demandées, dans l'ordre des ids fournis.
 
-        limit = max(1, min(int(limit), 500))
-        offset = max(0, int(offset))
+        Nombre de requêtes constant (1, ou 3 avec les relations) ; les ids
+        inexistants sont ignorés.
+        """
+        ids = list(dict.fromkeys(int(i) for i in recipe_ids))
+        if not ids:
+            return []
+
+        conn = DBConnection().connection
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                SELECT
+                    recipe_id,
+                    fk_user_id,
+                    name,
+                    status,
+                    prep_time,
+                    portion,
+                    description,
+                    created_at
+                FROM recipe
+                WHERE recipe_id = ANY(%s)
+                """,
+                (ids,),
+            )
+            by_id = {int(r["recipe_id"]): RecipeRow(**r) for r in cur.fetchall()}
+            rows = [by_id[i] for i in ids if i in by_id]
 
+            return self._rows_to_bos(cur, rows, with_relations=with_relations)
+
+    @staticmethod
+    def _list_filters(
+        fk_user_id: int | None, name_ilike: str | None
+    ) -> tuple[list[str], list[Any]]:
         where_clauses: list[str] = []
         params: list[Any] = []
 
@@ -197,6 +443,30 @@ class RecipeDAO:
             where_clauses.append("name ILIKE %s")
             params.append(f"%{name_ilike}%")
 
+        return where_clauses, params
+
+    @log
+    def list_recipes(
+        self,
+        *,
+        fk_user_id: int | None = None,
+        name_ilike: str | None = None,
+        limit: int = 50,
+        offset: int = 0,
+        with_relations: bool = False,
+    ) -> list[Recipe]:
+        """Liste des recettes (filtrables).
+
+        Avec `with_relations=True`, ingrédients et tags de toute la page sont
+        chargés en lot : 3 requêtes au total, quelle que soit la taille de page.
+        Pour parcourir des pages profondes, préférer `list_recipes_page`.
+        """
+
+        limit = max(1, min(int(limit), 500))
+        offset = max(0, int(offset))
+
+        where_clauses, params = self._list_filters(fk_user_id, name_ilike)
+
         where_sql = ""
         if where_clauses:
             where_sql = "WHERE " + " AND ".join(where_clauses)
@@ -223,7 +493,90 @@ class RecipeDAO:
             )
             rows = [RecipeRow(**r) for r in cur.fetchall()]
 
-        return [self._row_to_bo(r) for r in rows]
+            return self._rows_to_bos(cur, rows, with_relations=with_relations)
+
+    @log
+    def list_recipes_page(
+        self,
+        *,
+        fk_user_id: int | None = None,
+        name_ilike: str | None = None,
+        limit: int = 50,
+        after: str | None = None,
+        with_relations: bool = False,
+    ) -> Page[Recipe]:
+        """Page de recettes en pagination par curseur (keyset).
+
+        Même tri que `list_recipes` (created_at DESC, recipe_id DESC), mais la
+        page suivante démarre après la clé du dernier élément au lieu de
+        sauter `offset` lignes : une page profonde coûte autant que la
+        première, et les insertions concurrentes ne décalent pas les pages.
+        Les recettes sans `created_at` (NULL, en tête) sont triées comme
+        'infinity' ; leur curseur porte `null`.
+
+        Args:
+            after: Curseur `next_cursor` de la page précédente (None = début).
+
+        Raises:
+            InvalidCursorError: Si `after` est illisible.
+        """
+
+        limit = max(1, min(int(limit), 500))
+
+        where_clauses, params = self._list_filters(fk_user_id, name_ilike)
+
+        if after is not None:
+            created_at, recipe_id = decode_cursor(after, size=2)
+            try:
+                key = (
+                    "infinity"
+                    if created_at is None
+                    else datetime.fromisoformat(created_at),
+                    int(recipe_id),
+                )
+            except (TypeError, ValueError) as exc:
+                raise InvalidCursorError("Curseur de pagination invalide.") from exc
+            where_clauses.append(
+                f"({_CREATED_AT_KEY}, recipe_id) < (%s::timestamp, %s)"
+            )
+            params.extend(key)
+
+        where_sql = ""
+        if where_clauses:
+            where_sql = "WHERE " + " AND ".join(where_clauses)
+
+        conn = DBConnection().connection
+        with conn.cursor() as cur:
+            cur.execute(
+                f"""
+                SELECT
+                    recipe_id,
+                    fk_user_id,
+                    name,
+                    status,
+                    prep_time,
+                    portion,
+                    description,
+                    created_at
+                FROM recipe
+                {where_sql}
+                ORDER BY {_CREATED_AT_KEY} DESC, recipe_id DESC
+                LIMIT %s
+                """,
+                (*params, limit + 1),
+            )
+            rows = [RecipeRow(**r) for r in cur.fetchall()]
+
+            # Une ligne de plus que demandé => il existe une page suivante
+            next_cursor = None
+            if len(rows) > limit:
+                rows = rows[:limit]
+                last = rows[-1]
+                next_cursor = encode_cursor(last.created_at, last.recipe_id)
+
+            items = self._rows_to_bos(cur, rows, with_relations=with_relations)
+
+        return Page(items=items, next_cursor=next_cursor)
 
     @log
     def update_recipe(
@@ -284,11 +637,13 @@ class RecipeDAO:
                 tags = self.get_recipe_tags(recipe_id, cursor=cur)
 
             conn.commit()
-            return self._row_to_bo(row, ingredients=ingredients, tags=tags)
         except Exception:
             conn.rollback()
             raise
 
+        self._notify_write(recipe_id)
+        return self._row_to_bo(row, ingredients=ingredients, tags=tags)
+
     @log
     def delete_recipe(self, recipe_id: int) -> bool:
         """Supprime une recette (cascade sur les tables de liaison)."""
@@ -299,11 +654,14 @@ class RecipeDAO:
                 cur.execute("DELETE FROM recipe WHERE recipe_id = %s", (recipe_id,))
                 deleted = cur.rowcount > 0
             conn.commit()
-            return deleted
         except Exception:
             conn.rollback()
             raise
 
+        if deleted:
+            self._notify_write(recipe_id, deleted=True)
+        return deleted
+
     # ---------------------------------------------------------------------
     # Relations : ingrédients
     # ---------------------------------------------------------------------
@@ -359,6 +717,8 @@ class RecipeDAO:
             conn.rollback()
             raise
 
+        self._notify_write(recipe_id)
+
     @log
     def remove_ingredient(self, recipe_id: int, ingredient_id: int) -> bool:
         """Supprime un ingrédient d'une recette."""
@@ -375,11 +735,14 @@ class RecipeDAO:
                 )
                 removed = cur.rowcount > 0
             conn.commit()
-            return removed
         except Exception:
             conn.rollback()
             raise
 
+        if removed:
+            self._notify_write(recipe_id)
+        return removed
+
     @log
     def replace_ingredients(
         self, recipe_id: int, ingredient_items: Iterable[tuple[int, float]]
@@ -399,6 +762,8 @@ class RecipeDAO:
             conn.rollback()
             raise
 
+        self._notify_write(recipe_id)
+
     def get_recipe_ingredients(
         self, recipe_id: int, *, cursor=None
     ) -> list[tuple[int, float]]:
@@ -425,6 +790,43 @@ class RecipeDAO:
             if should_close:
                 cur.close()
 
+    def get_ingredients_for_recipes(
+        self, recipe_ids: Iterable[int], *, cursor=None
+    ) -> dict[int, list[tuple[int, float]]]:
+        """Retourne {recipe_id: [(ingredient_id, quantity), ...]} en une requête.
+
+        Variante ensembliste de `get_recipe_ingredients` : évite le N+1 quand
+        on hydrate plusieurs recettes. Chaque id demandé est présent dans le
+        résultat (liste vide si la recette n'a pas d'ingrédient).
+        """
+
+        ids = list(dict.fromkeys(int(i) for i in recipe_ids))
+        result: dict[int, list[tuple[int, float]]] = {i: [] for i in ids}
+        if not ids:
+            return result
+
+        conn = DBConnection().connection
+        should_close = cursor is None
+        cur = cursor or conn.cursor()
+        try:
+            cur.execute(
+                """
+                SELECT fk_recipe_id, fk_ingredient_id, quantity
+                FROM recipe_ingredient
+                WHERE fk_recipe_id = ANY(%s)
+                ORDER BY fk_recipe_id, fk_ingredient_id
+                """,
+                (ids,),
+            )
+            for r in cur.fetchall():
+                result.setdefault(int(r["fk_recipe_id"]), []).append(
+                    (int(r["fk_ingredient_id"]), float(r["quantity"]))
+                )
+            return result
+        finally:
+            if should_close:
+                cur.close()
+
     # ---------------------------------------------------------------------
     # Relations : tags
     # ---------------------------------------------------------------------
@@ -467,6 +869,8 @@ class RecipeDAO:
             conn.rollback()
             raise
 
+        self._notify_write(recipe_id)
+
     @log
     def remove_tag(self, recipe_id: int, tag_id: int) -> bool:
         conn = DBConnection().connection
@@ -481,11 +885,14 @@ class RecipeDAO:
                 )
                 removed = cur.rowcount > 0
             conn.commit()
-            return removed
         except Exception:
             conn.rollback()
             raise
 
+        if removed:
+            self._notify_write(recipe_id)
+        return removed
+
     @log
     def replace_tags(self, recipe_id: int, tag_ids: Iterable[int]) -> None:
         conn = DBConnection().connection
@@ -500,6 +907,8 @@ class RecipeDAO:
             conn.rollback()
             raise
 
+        self._notify_write(recipe_id)
+
     def get_recipe_tags(self, recipe_id: int, *, cursor=None) -> list[tuple[int, str]]:
         """Retourne la liste des tags (tag_id, name) d'une recette."""
 
@@ -522,10 +931,180 @@ class RecipeDAO:
             if should_close:
                 cur.close()
 
+    def get_tags_for_recipes(
+        self, recipe_ids: Iterable[int], *, cursor=None
+    ) -> dict[int, list[tuple[int, str]]]:
+        """Retourne {recipe_id: [(tag_id, name), ...]} en une requête.
+
+        Variante ensembliste de `get_recipe_tags` (même tri par nom de tag).
+        """
+
+        ids = list(dict.fromkeys(int(i) for i in recipe_ids))
+        result: dict[int, list[tuple[int, str]]] = {i: [] for i in ids}
+        if not ids:
+            return result
+
+        conn = DBConnection().connection
+        should_close = cursor is None
+        cur = cursor or conn.cursor()
+        try:
+            cur.execute(
+                """
+                SELECT rt.fk_recipe_id, t.tag_id, t.name
+                FROM recipe_tag rt
+                JOIN tag t ON t.tag_id = rt.fk_tag_id
+                WHERE rt.fk_recipe_id = ANY(%s)
+                ORDER BY rt.fk_recipe_id, t.name
+                """,
+                (ids,),
+            )
+            for r in cur.fetchall():
+                result.setdefault(int(r["fk_recipe_id"]), []).append(
+                    (int(r["tag_id"]), str(r["name"]))
+                )
+            return result
+        finally:
+            if should_close:
+                cur.close()
+
     # ---------------------------------------------------------------------
     # Recherche : Pour le service
     # ---------------------------------------------------------------------
 
+    def iter_search_index_rows(
+        self, recipe_ids: Iterable[int] | None = None, *, batch_size: int = 5000
+    ) -> Iterator[RecipeIndexRow]:
+        """Parcourt (recette, ids d'ingrédients, noms de tags) pour l'index mémoire.
+
+        Sans `recipe_ids`, tout le catalogue est lu via un curseur serveur
+        (par lots de `batch_size`) : la mémoire côté Python reste bornée même
+        pour des centaines de milliers de recettes.
+        """
+        where_sql = ""
+        params: tuple[Any, ...] = ()
+        if recipe_ids is not None:
+            ids = [int(i) for i in recipe_ids]
+            if not ids:
+                return
+            where_sql = "WHERE r.recipe_id = ANY(%s)"
+            params = (ids,)
+
+        conn = DBConnection().connection
+        with conn.cursor(name="recipe_search_index") as cur:
+            cur.itersize = max(1, int(batch_size))
+            cur.execute(
+                f"""
+                SELECT
+                    r.recipe_id,
+                    r.created_at,
+                    COALESCE(
+                        (SELECT ARRAY_AGG(ri.fk_ingredient_id)
+                         FROM recipe_ingredient ri
+                         WHERE ri.fk_recipe_id = r.recipe_id),
+                        '{{}}'
+                    ) AS ingredient_ids,
+                    COALESCE(
+                        (SELECT ARRAY_AGG(LOWER(t.name))
+                         FROM recipe_tag rt
+                         JOIN tag t ON t.tag_id = rt.fk_tag_id
+                         WHERE rt.fk_recipe_id = r.recipe_id),
+                        '{{}}'
+                    ) AS tag_names
+                FROM recipe r
+                {where_sql}
+                """,
+                params,
+            )
+            for r in cur:
+                yield RecipeIndexRow(
+                    recipe_id=int(r["recipe_id"]),
+                    created_at=r["created_at"],
+                    ingredient_ids=[int(i) for i in r["ingredient_ids"]],
+                    tag_names=[str(t) for t in r["tag_names"]],
+                )
+
+    # Disponibilité de pg_trgm (détectée une fois par processus)
+    _trigram_available: bool | None = None
+
+    @classmethod
+    def _has_trigram(cls, cur) -> bool:
+        if cls._trigram_available is None:
+            cur.execute(
+                "SELECT to_regprocedure('public.similarity(text,text)') IS NOT NULL"
+                " AS available"
+            )
+            row = cur.fetchone()
+            cls._trigram_available = bool(row and row["available"])
+        return cls._trigram_available
+
+    def resolve_ingredient_terms(
+        self, terms: list[str], *, per_term: int = 5, cursor=None
+    ) -> dict[str, list[tuple[int, float]]]:
+        """Résout chaque terme en ingredient_id classés par similarité.
+
+        Une seule requête pour tous les termes. Avec pg_trgm, un ingrédient est
+        candidat s'il contient le terme (ILIKE) ou s'il lui est similaire
+        (opérateur `%`, seuil `pg_trgm.similarity_threshold`) ; les deux
+        prédicats utilisent l'index GIN `idx_ingredient_name_trgm`. Sans
+        pg_trgm, seul ILIKE est utilisé et les noms les plus courts (les plus
+        proches du terme) passent en premier.
+
+        Returns:
+            {terme: [(ingredient_id, score), ...]} (au plus `per_term` par terme,
+            meilleur score en premier ; liste vide si aucun ingrédient).
+        """
+
+        clean_terms = list(dict.fromkeys(t.strip() for t in terms if t and t.strip()))
+        result: dict[str, list[tuple[int, float]]] = {t: [] for t in clean_terms}
+        if not clean_terms:
+            return result
+
+        per_term = max(1, min(int(per_term), 50))
+
+        conn = DBConnection().connection
+        should_close = cursor is None
+        cur = cursor or conn.cursor()
+        try:
+            if self._has_trigram(cur):
+                candidates_sql = """
+                    SELECT
+                        i.ingredient_id,
+                        public.similarity(i.name, q.term)::float AS score
+                    FROM ingredient i
+                    WHERE i.name ILIKE '%%' || q.term || '%%'
+                       OR i.name OPERATOR(public.%%) q.term
+                    ORDER BY score DESC, i.ingredient_id
+                    LIMIT %s
+                """
+            else:
+                candidates_sql = """
+                    SELECT
+                        i.ingredient_id,
+                        1.0::float / GREATEST(LENGTH(i.name), 1) AS score
+                    FROM ingredient i
+                    WHERE i.name ILIKE '%%' || q.term || '%%'
+                    ORDER BY score DESC, i.ingredient_id
+                    LIMIT %s
+                """
+
+            cur.execute(
+                f"""
+                SELECT q.term, m.ingredient_id, m.score
+                FROM UNNEST(%s::text[]) WITH ORDINALITY AS q(term, pos)
+                CROSS JOIN LATERAL ({candidates_sql}) m
+                ORDER BY q.pos, m.score DESC, m.ingredient_id
+                """,
+                (clean_terms, per_term),
+            )
+            for r in cur.fetchall():
+                result.setdefault(str(r["term"]), []).append(
+                    (int(r["ingredient_id"]), float(r["score"]))
+                )
+            return result
+        finally:
+            if should_close:
+                cur.close()
+
     @log
     def find_recipes_by_ingredients(
         self,
@@ -535,6 +1114,7 @@ class RecipeDAO:
         max_missing: int = 0,
         strict_only: bool = False,
         dish_type: str | None = None,
+        match: str = "ilike",
         # ignore_pantry: bool = True,  # gardé pour compat, non utilisé sans table pantry
     ) -> list[Recipe]:
         """
@@ -552,8 +1132,16 @@ class RecipeDAO:
 
         - ingredients: liste de chaînes (noms d'ingrédients)
         - dish_type: si fourni, filtre par tag (ex: "dessert")
+        - match: correspondance terme <-> ingredient.name
+            - "ilike" (défaut) : ILIKE '%terme%' évalué dans la requête ;
+            - "trigram" : chaque terme est d'abord résolu en quelques
+              ingredient_id classés par similarité (`resolve_ingredient_terms`,
+              index pg_trgm), puis la recherche ne compare plus que des ids.
         """
 
+        if match not in ("ilike", "trigram"):
+            raise ValueError(f"Mode de correspondance inconnu : {match!r}")
+
         ings = [s.strip() for s in ingredients if s and s.strip()]
         if not ings:
             return []
@@ -565,6 +1153,70 @@ class RecipeDAO:
         like_terms = [f"%{s}%" for s in ings]
         n_terms = len(like_terms)
 
+        conn = DBConnection().connection
+        with conn.cursor() as cur:
+            if match == "trigram":
+                resolved = self.resolve_ingredient_terms(ings, cursor=cur)
+                term_positions: list[int] = []
+                ingredient_ids: list[int] = []
+                for pos, term in enumerate(ings):
+                    for ingredient_id, _score in resolved.get(term, []):
+                        term_positions.append(pos)
+                        ingredient_ids.append(ingredient_id)
+
+                # Mode strict : un terme = une position, reliée à ses ids résolus
+                match_join = """
+                        JOIN UNNEST(%s::int[], %s::int[]) AS q(term, ingredient_id)
+                            ON q.ingredient_id = ri.fk_ingredient_id
+                """
+                match_params: list[Any] = [term_positions, ingredient_ids]
+                # Mode inclusif : l'ingrédient fait-il partie des ids résolus ?
+                in_query_filter = "i.ingredient_id = ANY(%s::int[])"
+                in_query_params: list[Any] = [ingredient_ids]
+            else:
+                match_join = """
+                        JOIN ingredient i ON i.ingredient_id = ri.fk_ingredient_id
+                        JOIN (
+                            SELECT UNNEST(%s::text[]) AS term
+                        ) q ON i.name ILIKE q.term
+                """
+                match_params = [like_terms]
+                in_query_filter = "i.name ILIKE ANY(%s::text[])"
+                in_query_params = [like_terms]
+
+            return self._find_recipes_matching(
+                cur,
+                match_join=match_join,
+                match_params=match_params,
+                in_query_filter=in_query_filter,
+                in_query_params=in_query_params,
+                n_terms=n_terms,
+                limit=limit,
+                max_missing=max_missing,
+                strict_only=strict_only,
+                dish_type=dish_type,
+            )
+
+    def _find_recipes_matching(
+        self,
+        cur,
+        *,
+        match_join: str,
+        match_params: list[Any],
+        in_query_filter: str,
+        in_query_params: list[Any],
+        n_terms: int,
+        limit: int,
+        max_missing: int,
+        strict_only: bool,
+        dish_type: str | None,
+    ) -> list[Recipe]:
+        """Requête principale de `find_recipes_by_ingredients`.
+
+        `match_join` (mode strict) et `in_query_filter` (mode inclusif) portent
+        la correspondance terme <-> ingrédient propre au mode `match`.
+        """
+
         tag_join = ""
         tag_where = ""
         params: list[Any] = []
@@ -578,120 +1230,110 @@ class RecipeDAO:
             tag_where = "AND t_filter.name ILIKE %s"
             params.append(f"%{dish_type}%")
 
-        conn = DBConnection().connection
-        with conn.cursor() as cur:
-            if strict_only:
-                # Mode strict (historique) : la recette doit matcher (presque) tous les termes.
-                cur.execute(
-                    f"""
-                    WITH matched AS (
-                        SELECT
-                            r.recipe_id,
-                            COUNT(DISTINCT q.term) AS matched_count
-                        FROM recipe r
-                        {tag_join}
-                        JOIN recipe_ingredient ri ON ri.fk_recipe_id = r.recipe_id
-                        JOIN ingredient i ON i.ingredient_id = ri.fk_ingredient_id
-                        JOIN (
-                            SELECT UNNEST(%s::text[]) AS term
-                        ) q ON i.name ILIKE q.term
-                        WHERE 1=1
-                        {tag_where}
-                        GROUP BY r.recipe_id
-                    )
+        if strict_only:
+            # Mode strict (historique) : la recette doit matcher (presque) tous les termes.
+            cur.execute(
+                f"""
+                WITH matched AS (
                     SELECT
                         r.recipe_id,
-                        r.fk_user_id,
-                        r.name,
-                        r.status,
-                        r.prep_time,
-                        r.portion,
-                        r.description,
-                        r.created_at,
-                        m.matched_count
-                    FROM matched m
-                    JOIN recipe r ON r.recipe_id = m.recipe_id
-                    WHERE (%s - m.matched_count) <= %s
-                    ORDER BY m.matched_count DESC, r.created_at DESC, r.recipe_id DESC
-                    LIMIT %s
-                    """,
-                    (
-                        like_terms,  # %s::text[]
-                        *params,  # éventuellement dish_type
-                        n_terms,  # %s (nb termes)
-                        max_missing,  # %s (tolérance = ingrédients manquants)
-                        limit,  # %s (limit)
-                    ),
+                        COUNT(DISTINCT q.term) AS matched_count
+                    FROM recipe r
+                    {tag_join}
+                    JOIN recipe_ingredient ri ON ri.fk_recipe_id = r.recipe_id
+                    {match_join}
+                    WHERE 1=1
+                    {tag_where}
+                    GROUP BY r.recipe_id
                 )
-            else:
-                # Mode inclusif : on renvoie les recettes dont les ingrédients sont inclus
-                # dans la liste fournie (sous-ensemble). `max_missing` = tolérance sur
-                # les ingrédients "en trop" (non présents dans la liste fournie).
-                #
-                # total_count     = nombre d'ingrédients distincts de la recette
-                # in_query_count  = nombre d'ingrédients distincts de la recette qui matchent la requête
-                # On garde si (total_count - in_query_count) <= max_missing
-                cur.execute(
-                    f"""
-                    WITH recipe_counts AS (
-                        SELECT
-                            r.recipe_id,
-                            COUNT(DISTINCT i.ingredient_id) AS total_count,
-                            COUNT(DISTINCT i.ingredient_id) FILTER (
-                                WHERE i.name ILIKE ANY(%s::text[])
-                            ) AS in_query_count
-                        FROM recipe r
-                        {tag_join}
-                        JOIN recipe_ingredient ri ON ri.fk_recipe_id = r.recipe_id
-                        JOIN ingredient i ON i.ingredient_id = ri.fk_ingredient_id
-                        WHERE 1=1
-                        {tag_where}
-                        GROUP BY r.recipe_id
-                    )
+                SELECT
+                    r.recipe_id,
+                    r.fk_user_id,
+                    r.name,
+                    r.status,
+                    r.prep_time,
+                    r.portion,
+                    r.description,
+                    r.created_at,
+                    m.matched_count
+                FROM matched m
+                JOIN recipe r ON r.recipe_id = m.recipe_id
+                WHERE (%s - m.matched_count) <= %s
+                ORDER BY m.matched_count DESC, r.created_at DESC, r.recipe_id DESC
+                LIMIT %s
+                """,
+                (
+                    *match_params,  # termes (text[]) ou (positions, ids) résolus
+                    *params,  # éventuellement dish_type
+                    n_terms,  # %s (nb termes)
+                    max_missing,  # %s (tolérance = ingrédients manquants)
+                    limit,  # %s (limit)
+                ),
+            )
+        else:
+            # Mode inclusif : on renvoie les recettes dont les ingrédients sont inclus
+            # dans la liste fournie (sous-ensemble). `max_missing` = tolérance sur
+            # les ingrédients "en trop" (non présents dans la liste fournie).
+            #
+            # total_count     = nombre d'ingrédients distincts de la recette
+            # in_query_count  = nombre d'ingrédients distincts de la recette qui matchent la requête
+            # On garde si (total_count - in_query_count) <= max_missing
+            cur.execute(
+                f"""
+                WITH recipe_counts AS (
                     SELECT
                         r.recipe_id,
-                        r.fk_user_id,
-                        r.name,
-                        r.status,
-                        r.prep_time,
-                        r.portion,
-                        r.description,
-                        r.created_at,
-                        rc.in_query_count AS matched_count
-                    FROM recipe_counts rc
-                    JOIN recipe r ON r.recipe_id = rc.recipe_id
-                    WHERE (rc.total_count - rc.in_query_count) <= %s
-                    AND rc.total_count > 0
-                    ORDER BY rc.in_query_count DESC, r.created_at DESC, r.recipe_id DESC
-                    LIMIT %s
-                    """,
-                    (
-                        like_terms,  # %s::text[] pour ILIKE ANY(...)
-                        *params,  # éventuellement dish_type
-                        max_missing,  # %s (tolérance = ingrédients "en trop")
-                        limit,  # %s (limit)
-                    ),
+                        COUNT(DISTINCT i.ingredient_id) AS total_count,
+                        COUNT(DISTINCT i.ingredient_id) FILTER (
+                            WHERE {in_query_filter}
+                        ) AS in_query_count
+                    FROM recipe r
+                    {tag_join}
+                    JOIN recipe_ingredient ri ON ri.fk_recipe_id = r.recipe_id
+                    JOIN ingredient i ON i.ingredient_id = ri.fk_ingredient_id
+                    WHERE 1=1
+                    {tag_where}
+                    GROUP BY r.recipe_id
                 )
+                SELECT
+                    r.recipe_id,
+                    r.fk_user_id,
+                    r.name,
+                    r.status,
+                    r.prep_time,
+                    r.portion,
+                    r.description,
+                    r.created_at,
+                    rc.in_query_count AS matched_count
+                FROM recipe_counts rc
+                JOIN recipe r ON r.recipe_id = rc.recipe_id
+                WHERE (rc.total_count - rc.in_query_count) <= %s
+                AND rc.total_count > 0
+                ORDER BY rc.in_query_count DESC, r.created_at DESC, r.recipe_id DESC
+                LIMIT %s
+                """,
+                (
+                    *in_query_params,  # termes (ILIKE ANY) ou ids résolus (= ANY)
+                    *params,  # éventuellement dish_type
+                    max_missing,  # %s (tolérance = ingrédients "en trop")
+                    limit,  # %s (limit)
+                ),
+            )
 
-            rows = cur.fetchall()
-
-            # 2) Construire les Recipe (avec relations)
-            recipes: list[Recipe] = []
-            for r in rows:
-                row = RecipeRow(
-                    recipe_id=int(r["recipe_id"]),
-                    fk_user_id=r["fk_user_id"],
-                    name=str(r["name"]),
-                    status=r["status"],
-                    prep_time=r["prep_time"],
-                    portion=r["portion"],
-                    description=r["description"],
-                    created_at=r["created_at"],
-                )
-                ingredients_rel = self.get_recipe_ingredients(row.recipe_id, cursor=cur)
-                tags_rel = self.get_recipe_tags(row.recipe_id, cursor=cur)
-                recipes.append(
-                    self._row_to_bo(row, ingredients=ingredients_rel, tags=tags_rel)
-                )
+        rows = [
+            RecipeRow(
+                recipe_id=int(r["recipe_id"]),
+                fk_user_id=r["fk_user_id"],
+                name=str(r["name"]),
+                status=r["status"],
+                prep_time=r["prep_time"],
+                portion=r["portion"],
+                description=r["description"],
+                created_at=r["created_at"],
+            )
+            for r in cur.fetchall()
+        ]
 
-            return recipes
+        # 2) Relations chargées en lot (2 requêtes, quel que soit le nombre
+        #    de recettes), puis assemblage en mémoire.
+        return self._rows_to_bos(cur, rows, with_relations=True)
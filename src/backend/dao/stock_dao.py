@@ -5,7 +5,9 @@ from datetime import date
 from typing import Any
 
 from business_objects.stock import Stock
+from business_objects.stock_item import StockItem
 from dao.db_connection import DBConnection
+from dao.pagination import InvalidCursorError, Page, decode_cursor, encode_cursor
 from utils.log_decorator import log
 
 
@@ -98,15 +100,17 @@ class StockDAO:
         stock = Stock(id_stock=int(row.stock_id), nom=str(row.name))
 
         if item_rows:
-            for r in item_rows:
-                qty = 0.0 if r.quantity is None else float(r.quantity)
-                exp = r.expiration_date or date.max  # BO exige une date
-                stock.add_item(
+            # Lignes déjà triées FEFO (voir _fetch_stock_items) : chargement
+            # en bloc, sans repositionner chaque lot
+            stock.add_items_sorted(
+                StockItem(
                     id_ingredient=int(r.fk_ingredient_id),
                     id_lot=int(r.stock_item_id),
-                    quantity=qty,
-                    expiry_date=exp,
+                    quantity=0.0 if r.quantity is None else float(r.quantity),
+                    expiry_date=r.expiration_date or date.max,  # BO exige une date
                 )
+                for r in item_rows
+            )
         return stock
 
     # ------------------------------------------------------------------
@@ -207,6 +211,75 @@ class StockDAO:
             rows = [StockRow(**r) for r in cur.fetchall()]
         return [self._row_to_bo(r) for r in rows]
 
+    @staticmethod
+    def _decode_name_cursor(after: str) -> tuple[str, int]:
+        name, stock_id = decode_cursor(after, size=2)
+        try:
+            return str(name), int(stock_id)
+        except (TypeError, ValueError) as exc:
+            raise InvalidCursorError("Curseur de pagination invalide.") from exc
+
+    def _to_page(self, rows: list[StockRow], limit: int) -> Page[Stock]:
+        """Coupe la ligne sentinelle (limit + 1) et calcule le curseur suivant."""
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1].name, rows[-1].stock_id)
+        return Page(items=[self._row_to_bo(r) for r in rows], next_cursor=next_cursor)
+
+    @log
+    def list_stocks_page(
+        self,
+        *,
+        name_ilike: str | None = None,
+        limit: int = 50,
+        after: str | None = None,
+    ) -> Page[Stock]:
+        """Page de stocks en pagination par curseur (keyset).
+
+        Même tri que `list_stocks` (name, stock_id) ; la page suivante démarre
+        après la clé du dernier élément, donc son coût ne dépend pas de la
+        profondeur et les insertions concurrentes ne décalent pas les pages.
+
+        Args:
+            name_ilike: Filtre optionnel sur le nom.
+            limit: Taille max.
+            after: Curseur `next_cursor` de la page précédente (None = début).
+
+        Returns:
+            Page[Stock]: Stocks de la page + curseur suivant.
+
+        Raises:
+            InvalidCursorError: Si `after` est illisible.
+        """
+        limit = max(1, min(int(limit), 500))
+
+        where: list[str] = []
+        params: list[Any] = []
+        if name_ilike:
+            where.append("name ILIKE %s")
+            params.append(f"%{name_ilike}%")
+        if after is not None:
+            where.append("(name, stock_id) > (%s, %s)")
+            params.extend(self._decode_name_cursor(after))
+
+        where_sql = f"WHERE {' AND '.join(where)}" if where else ""
+
+        conn = DBConnection().connection
+        with conn.cursor() as cur:
+            cur.execute(
+                f"""
+                SELECT stock_id, name
+                FROM stock
+                {where_sql}
+                ORDER BY name ASC, stock_id ASC
+                LIMIT %s
+                """,
+                (*params, limit + 1),
+            )
+            rows = [StockRow(**r) for r in cur.fetchall()]
+        return self._to_page(rows, limit)
+
     @log
     def update_stock(self, stock_id: int, *, name: str | None = None) -> Stock | None:
         """Met à jour un stock.
@@ -343,6 +416,57 @@ class StockDAO:
             rows = [StockRow(**r) for r in cur.fetchall()]
         return [self._row_to_bo(r) for r in rows]
 
+    @log
+    def list_user_stocks_page(
+        self,
+        user_id: int,
+        *,
+        name_ilike: str | None = None,
+        limit: int = 50,
+        after: str | None = None,
+    ) -> Page[Stock]:
+        """Page des stocks d'un utilisateur en pagination par curseur (keyset).
+
+        Args:
+            user_id: Identifiant utilisateur.
+            name_ilike: Filtre optionnel sur le nom du stock (ILIKE).
+            limit: Taille max (clampée).
+            after: Curseur `next_cursor` de la page précédente (None = début).
+
+        Returns:
+            Page[Stock]: Stocks de la page + curseur suivant.
+
+        Raises:
+            InvalidCursorError: Si `after` est illisible.
+        """
+        limit = max(1, min(int(limit), 500))
+
+        where = ["us.fk_user_id = %s"]
+        params: list[Any] = [user_id]
+
+        if name_ilike:
+            where.append("s.name ILIKE %s")
+            params.append(f"%{name_ilike}%")
+        if after is not None:
+            where.append("(s.name, s.stock_id) > (%s, %s)")
+            params.extend(self._decode_name_cursor(after))
+
+        conn = DBConnection().connection
+        with conn.cursor() as cur:
+            cur.execute(
+                f"""
+                SELECT s.stock_id, s.name
+                FROM stock s
+                JOIN user_stock us ON us.fk_stock_id = s.stock_id
+                WHERE {" AND ".join(where)}
+                ORDER BY s.name ASC, s.stock_id ASC
+                LIMIT %s
+                """,
+                (*params, limit + 1),
+            )
+            rows = [StockRow(**r) for r in cur.fetchall()]
+        return self._to_page(rows, limit)
+
     @log
     def get_user_stock_by_name(
         self,
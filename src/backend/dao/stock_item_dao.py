@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from collections.abc import Sequence
 from dataclasses import dataclass
 from datetime import date
 from typing import Any
@@ -10,6 +11,141 @@ from utils.log_decorator import log
 
 _UNSET = object()
 
+# Consommation FEFO en une seule requête :
+#   - `locked`  : lots concernés, verrouillés (FOR UPDATE) dans un ordre fixe
+#                 pour éviter les interblocages entre consommateurs
+#   - `lots`    : quantité cumulée des lots qui précèdent (ordre FEFO)
+#   - `plan`    : part prélevée sur chaque lot entamé, vide si le stock est
+#                 insuffisant (rien n'est alors modifié)
+#   - `deleted` / `updated` : lots vidés supprimés, dernier lot décrémenté
+# Le résultat donne la quantité disponible et le détail par stock.
+_CONSUME_FEFO_SQL = """
+WITH locked AS (
+    SELECT si.stock_item_id, si.fk_stock_id, si.quantity,
+           si.expiration_date, si.created_at
+    FROM stock_item si
+    {join}
+    WHERE {where}
+    ORDER BY si.stock_item_id
+    FOR UPDATE OF si
+),
+lots AS (
+    SELECT stock_item_id, fk_stock_id, quantity,
+           SUM(quantity) OVER (
+               ORDER BY expiration_date ASC NULLS LAST,
+                        created_at ASC,
+                        stock_item_id ASC
+           ) - quantity AS consumed_before
+    FROM locked
+),
+demand AS (
+    SELECT %s::numeric AS requested,
+           (SELECT COALESCE(SUM(quantity), 0) FROM locked) AS available
+),
+plan AS (
+    SELECT l.stock_item_id, l.fk_stock_id, l.quantity,
+           LEAST(l.quantity, d.requested - l.consumed_before) AS taken
+    FROM lots l
+    CROSS JOIN demand d
+    WHERE d.available >= d.requested
+      AND l.consumed_before < d.requested
+),
+deleted AS (
+    DELETE FROM stock_item si
+    USING plan p
+    WHERE si.stock_item_id = p.stock_item_id
+      AND p.taken >= p.quantity
+),
+updated AS (
+    UPDATE stock_item si
+    SET quantity = p.quantity - p.taken
+    FROM plan p
+    WHERE si.stock_item_id = p.stock_item_id
+      AND p.taken < p.quantity
+)
+SELECT d.available, p.fk_stock_id, SUM(p.taken) AS taken
+FROM demand d
+LEFT JOIN plan p ON TRUE
+GROUP BY d.available, p.fk_stock_id
+"""
+
+# Consommation d'une recette (tous ses ingrédients) en une seule requête,
+# même principe que `_CONSUME_FEFO_SQL` avec un cumul FEFO par ingrédient.
+# Les quantités sont mises à l'échelle des portions demandées (comme
+# `Recipe.scale_portions`). Si un ingrédient manque, aucun lot n'est modifié.
+# Aucune ligne : recette introuvable.
+_CONSUME_RECIPE_FEFO_SQL = """
+WITH recipe_row AS (
+    SELECT recipe_id, portion
+    FROM recipe
+    WHERE recipe_id = %s
+),
+needs AS (
+    SELECT ri.fk_ingredient_id AS ingredient_id,
+           ROUND(
+               ri.quantity * COALESCE(%s::numeric / NULLIF(r.portion, 0), 1), 2
+           ) AS required
+    FROM recipe_row r
+    JOIN recipe_ingredient ri ON ri.fk_recipe_id = r.recipe_id
+    WHERE ri.quantity > 0
+),
+locked AS (
+    SELECT si.stock_item_id, si.fk_stock_id, si.fk_ingredient_id, si.quantity,
+           si.expiration_date, si.created_at
+    FROM stock_item si
+    JOIN user_stock us ON us.fk_stock_id = si.fk_stock_id
+    WHERE us.fk_user_id = %s
+      AND si.fk_ingredient_id IN (SELECT ingredient_id FROM needs)
+    ORDER BY si.stock_item_id
+    FOR UPDATE OF si
+),
+lots AS (
+    SELECT stock_item_id, fk_stock_id, fk_ingredient_id, quantity,
+           SUM(quantity) OVER (
+               PARTITION BY fk_ingredient_id
+               ORDER BY expiration_date ASC NULLS LAST,
+                        created_at ASC,
+                        stock_item_id ASC
+           ) - quantity AS consumed_before
+    FROM locked
+),
+availability AS (
+    SELECT n.ingredient_id, n.required,
+           COALESCE(SUM(l.quantity), 0) AS available
+    FROM needs n
+    LEFT JOIN locked l ON l.fk_ingredient_id = n.ingredient_id
+    GROUP BY n.ingredient_id, n.required
+),
+plan AS (
+    SELECT l.stock_item_id, l.fk_stock_id, l.fk_ingredient_id, l.quantity,
+           LEAST(l.quantity, a.required - l.consumed_before) AS taken
+    FROM lots l
+    JOIN availability a ON a.ingredient_id = l.fk_ingredient_id
+    WHERE l.consumed_before < a.required
+      AND NOT EXISTS (SELECT 1 FROM availability WHERE available < required)
+),
+deleted AS (
+    DELETE FROM stock_item si
+    USING plan p
+    WHERE si.stock_item_id = p.stock_item_id
+      AND p.taken >= p.quantity
+),
+updated AS (
+    UPDATE stock_item si
+    SET quantity = p.quantity - p.taken
+    FROM plan p
+    WHERE si.stock_item_id = p.stock_item_id
+      AND p.taken < p.quantity
+)
+SELECT r.portion, a.ingredient_id, a.required, a.available,
+       p.fk_stock_id, SUM(p.taken) AS taken
+FROM recipe_row r
+LEFT JOIN availability a ON TRUE
+LEFT JOIN plan p ON p.fk_ingredient_id = a.ingredient_id
+GROUP BY r.portion, a.ingredient_id, a.required, a.available, p.fk_stock_id
+ORDER BY a.ingredient_id
+"""
+
 
 @dataclass(frozen=True, slots=True)
 class StockItemRow:
@@ -32,6 +168,49 @@ class StockItemRow:
     created_at: Any
 
 
+@dataclass(frozen=True, slots=True)
+class IngredientConsumption:
+    """Consommation d'un ingrédient d'une recette.
+
+    Attributes:
+        ingredient_id: Identifiant de l'ingrédient.
+        required: Quantité demandée (mise à l'échelle des portions).
+        available: Quantité disponible dans les stocks de l'utilisateur.
+        by_stock: Quantité prélevée par stock_id (vide si rien n'a été
+            consommé).
+    """
+
+    ingredient_id: int
+    required: float
+    available: float
+    by_stock: dict[int, float]
+
+    @property
+    def missing(self) -> float:
+        """Quantité manquante (0 si le stock suffit)."""
+        return max(0.0, self.required - self.available)
+
+
+@dataclass(frozen=True, slots=True)
+class RecipeConsumption:
+    """Résultat de la consommation d'une recette.
+
+    Attributes:
+        recipe_id: Identifiant de la recette.
+        portions: Portions consommées (None si la recette n'en précise pas).
+        ingredients: Détail par ingrédient.
+    """
+
+    recipe_id: int
+    portions: int | None
+    ingredients: list[IngredientConsumption]
+
+    @property
+    def shortages(self) -> list[IngredientConsumption]:
+        """Ingrédients en quantité insuffisante (rien n'a alors été consommé)."""
+        return [i for i in self.ingredients if i.missing > 0]
+
+
 class StockItemDAO:
     """DAO responsable de la table `stock_item` (gestion des lots)."""
 
@@ -152,6 +331,76 @@ class StockItemDAO:
             conn.rollback()
             raise
 
+    @log
+    def create_stock_items(
+        self,
+        *,
+        stock_id: int,
+        items: Sequence[tuple[int, float, date | None]],
+    ) -> dict[int, int]:
+        """Crée un lot de lots (import de ticket de caisse) en une requête.
+
+        Les identifiants sont tirés de la séquence avant l'insertion, ce qui
+        permet de relier chaque lot créé à sa position dans `items`. Les
+        éléments dont l'ingrédient n'existe pas sont ignorés.
+
+        Args:
+            stock_id: Identifiant du stock.
+            items: Triplets (ingredient_id, quantité, date de péremption).
+
+        Returns:
+            dict[int, int]: {position dans items: stock_item_id créé}.
+        """
+        if not items:
+            return {}
+
+        positions = list(range(len(items)))
+        ingredient_ids = [int(i[0]) for i in items]
+        quantities = [float(i[1]) for i in items]
+        expirations = [i[2] for i in items]
+
+        conn = DBConnection().connection
+        try:
+            with conn.cursor() as cur:
+                cur.execute(
+                    """
+                    WITH input AS (
+                        SELECT t.item_index, t.ingredient_id, t.quantity,
+                               t.expiration_date
+                        FROM unnest(%s::int[], %s::int[], %s::numeric[], %s::date[])
+                            AS t(item_index, ingredient_id, quantity, expiration_date)
+                        JOIN ingredient g ON g.ingredient_id = t.ingredient_id
+                    ),
+                    numbered AS (
+                        SELECT nextval(
+                                   pg_get_serial_sequence('stock_item', 'stock_item_id')
+                               ) AS stock_item_id,
+                               input.*
+                        FROM input
+                    ),
+                    ins AS (
+                        INSERT INTO stock_item (
+                            stock_item_id, fk_stock_id, fk_ingredient_id,
+                            quantity, expiration_date
+                        )
+                        SELECT stock_item_id, %s, ingredient_id,
+                               quantity, expiration_date
+                        FROM numbered
+                    )
+                    SELECT item_index, stock_item_id FROM numbered
+                    """,
+                    (positions, ingredient_ids, quantities, expirations, stock_id),
+                )
+                created = {
+                    int(r["item_index"]): int(r["stock_item_id"])
+                    for r in cur.fetchall()
+                }
+            conn.commit()
+            return created
+        except Exception:
+            conn.rollback()
+            raise
+
     @log
     def update_stock_item(
         self,
@@ -235,25 +484,19 @@ class StockItemDAO:
     # Consommation FEFO (transactionnelle)
     # ------------------------------------------------------------------
 
-    @log
-    def consume_quantity_fefo(
-        self,
+    @staticmethod
+    def _consume_fefo(
         *,
-        stock_id: int,
+        join_sql: str,
+        where_sql: str,
+        params: tuple[Any, ...],
         ingredient_id: int,
         quantity_to_consume: float,
-    ) -> None:
-        """Consomme une quantité en base en respectant FEFO.
-
-        Algorithme :
-            - Sélectionne les lots du (stock, ingredient) triés FEFO
-            - Décrémente lot par lot
-            - Supprime les lots vidés
+    ) -> dict[int, float]:
+        """Exécute `_CONSUME_FEFO_SQL` et valide la transaction.
 
-        Args:
-            stock_id: Identifiant du stock.
-            ingredient_id: Identifiant de l'ingrédient.
-            quantity_to_consume: Quantité à consommer (> 0).
+        Returns:
+            dict[int, float]: Quantité prélevée par stock_id.
 
         Raises:
             ValueError: Si quantity_to_consume <= 0 ou stock insuffisant.
@@ -265,55 +508,60 @@ class StockItemDAO:
         try:
             with conn.cursor() as cur:
                 cur.execute(
-                    """
-                    SELECT stock_item_id, quantity
-                    FROM stock_item
-                    WHERE fk_stock_id = %s AND fk_ingredient_id = %s
-                    ORDER BY expiration_date ASC NULLS LAST, created_at ASC, stock_item_id ASC
-                    FOR UPDATE
-                    """,
-                    (stock_id, ingredient_id),
+                    _CONSUME_FEFO_SQL.format(join=join_sql, where=where_sql),
+                    (*params, quantity_to_consume),
                 )
                 rows = cur.fetchall()
 
-                total_available = sum(float(r["quantity"]) for r in rows)
-                if quantity_to_consume > total_available:
+                by_stock = {
+                    int(r["fk_stock_id"]): float(r["taken"])
+                    for r in rows
+                    if r["fk_stock_id"] is not None
+                }
+                if not by_stock:
+                    total_available = float(rows[0]["available"]) if rows else 0.0
                     raise ValueError(
                         f"Stock insuffisant (ingredient_id={ingredient_id}): "
                         f"demande={quantity_to_consume}, disponible={total_available}."
                     )
 
-                remaining = float(quantity_to_consume)
-
-                for r in rows:
-                    lot_id = int(r["stock_item_id"])
-                    lot_qty = float(r["quantity"])
-
-                    if remaining <= 0:
-                        break
-
-                    if lot_qty > remaining:
-                        cur.execute(
-                            """
-                            UPDATE stock_item
-                            SET quantity = %s
-                            WHERE stock_item_id = %s
-                            """,
-                            (lot_qty - remaining, lot_id),
-                        )
-                        remaining = 0.0
-                    else:
-                        cur.execute(
-                            "DELETE FROM stock_item WHERE stock_item_id = %s",
-                            (lot_id,),
-                        )
-                        remaining -= lot_qty
-
             conn.commit()
+            return by_stock
         except Exception:
             conn.rollback()
             raise
 
+    @log
+    def consume_quantity_fefo(
+        self,
+        *,
+        stock_id: int,
+        ingredient_id: int,
+        quantity_to_consume: float,
+    ) -> None:
+        """Consomme une quantité en base en respectant FEFO.
+
+        Algorithme (une seule requête, voir `_CONSUME_FEFO_SQL`) :
+            - Verrouille les lots du (stock, ingredient) triés FEFO
+            - Calcule la part prélevée sur chaque lot (somme cumulée)
+            - Supprime les lots vidés, décrémente le dernier lot entamé
+
+        Args:
+            stock_id: Identifiant du stock.
+            ingredient_id: Identifiant de l'ingrédient.
+            quantity_to_consume: Quantité à consommer (> 0).
+
+        Raises:
+            ValueError: Si quantity_to_consume <= 0 ou stock insuffisant.
+        """
+        self._consume_fefo(
+            join_sql="",
+            where_sql="si.fk_stock_id = %s AND si.fk_ingredient_id = %s",
+            params=(stock_id, ingredient_id),
+            ingredient_id=ingredient_id,
+            quantity_to_consume=quantity_to_consume,
+        )
+
     @log
     def delete_stock_items_by_stock(self, *, stock_id: int) -> int:
         """Supprime tous les lots d'un stock.
@@ -346,69 +594,117 @@ class StockItemDAO:
         ingredient_id: int,
         quantity_to_consume: float,
     ) -> dict[int, float]:
-        if quantity_to_consume <= 0:
-            raise ValueError("La quantité à consommer doit être strictement positive.")
+        """Consomme une quantité en FEFO sur tous les stocks d'un utilisateur.
 
-        conn = DBConnection().connection
-        try:
-            with conn.cursor() as cur:
-                cur.execute(
-                    """
-                    SELECT si.stock_item_id, si.fk_stock_id, si.quantity
-                    FROM stock_item si
-                    JOIN user_stock us ON us.fk_stock_id = si.fk_stock_id
-                    WHERE us.fk_user_id = %s
-                    AND si.fk_ingredient_id = %s
-                    ORDER BY
-                        si.expiration_date ASC NULLS LAST,
-                        si.created_at ASC,
-                        si.stock_item_id ASC
-                    FOR UPDATE
-                    """,
-                    (user_id, ingredient_id),
-                )
-                rows = cur.fetchall()
+        Même requête unique que `consume_quantity_fefo`, les lots étant pris
+        dans l'ensemble des stocks de l'utilisateur.
 
-                total_available = sum(float(r["quantity"]) for r in rows)
-                if quantity_to_consume > total_available:
-                    raise ValueError(
-                        f"Stock insuffisant (ingredient_id={ingredient_id}): "
-                        f"demande={quantity_to_consume}, disponible={total_available}."
-                    )
+        Args:
+            user_id: Identifiant de l'utilisateur.
+            ingredient_id: Identifiant de l'ingrédient.
+            quantity_to_consume: Quantité à consommer (> 0).
 
-                remaining = float(quantity_to_consume)
-                by_stock: dict[int, float] = {}
+        Returns:
+            dict[int, float]: Quantité prélevée par stock_id.
 
-                for r in rows:
-                    if remaining <= 0:
-                        break
+        Raises:
+            ValueError: Si quantity_to_consume <= 0 ou stock insuffisant.
+        """
+        return self._consume_fefo(
+            join_sql="JOIN user_stock us ON us.fk_stock_id = si.fk_stock_id",
+            where_sql="us.fk_user_id = %s AND si.fk_ingredient_id = %s",
+            params=(user_id, ingredient_id),
+            ingredient_id=ingredient_id,
+            quantity_to_consume=quantity_to_consume,
+        )
 
-                    lot_id = int(r["stock_item_id"])
-                    stock_id = int(r["fk_stock_id"])
-                    lot_qty = float(r["quantity"])
+    @log
+    def consume_recipe_fefo_for_user(
+        self,
+        *,
+        user_id: int,
+        recipe_id: int,
+        portions: int | None = None,
+    ) -> RecipeConsumption | None:
+        """Consomme tous les ingrédients d'une recette (FEFO, tous stocks).
 
-                    take = min(lot_qty, remaining)
-                    by_stock[stock_id] = by_stock.get(stock_id, 0.0) + take
+        Une seule requête (voir `_CONSUME_RECIPE_FEFO_SQL`) : si un
+        ingrédient manque, rien n'est consommé et le résultat liste les
+        manques (`RecipeConsumption.shortages`).
 
-                    if lot_qty > remaining:
-                        cur.execute(
-                            """
-                            UPDATE stock_item
-                            SET quantity = %s
-                            WHERE stock_item_id = %s
-                            """,
-                            (lot_qty - remaining, lot_id),
-                        )
-                        remaining = 0.0
-                    else:
-                        cur.execute(
-                            "DELETE FROM stock_item WHERE stock_item_id = %s",
-                            (lot_id,),
-                        )
-                        remaining -= lot_qty
+        Avec `portions`, les quantités sont mises à l'échelle comme
+        `Recipe.scale_portions` (quantité x portions / portions de la
+        recette), puis arrondies au centième (`ROUND(..., 2)`).
 
-            conn.commit()
-            return by_stock
+        Args:
+            user_id: Identifiant de l'utilisateur.
+            recipe_id: Identifiant de la recette.
+            portions: Portions à cuisiner (None = portions de la recette).
+
+        Returns:
+            RecipeConsumption | None: Détail par ingrédient, None si la
+            recette n'existe pas.
+
+        Raises:
+            ValueError: Si portions <= 0, ou si `portions` est donné alors
+                que la recette n'a pas de nombre de portions (rien n'est
+                consommé).
+        """
+        if portions is not None and portions <= 0:
+            raise ValueError("Le nombre de portions doit être strictement positif.")
+
+        conn = DBConnection().connection
+        try:
+            with conn.cursor() as cur:
+                cur.execute(_CONSUME_RECIPE_FEFO_SQL, (recipe_id, portions, user_id))
+                rows = cur.fetchall()
+
+            if portions is not None and rows and not rows[0]["portion"]:
+                # Mise à l'échelle impossible : la requête a consommé les
+                # quantités de base, annulées par le rollback
+                raise ValueError(
+                    "La recette n'a pas de nombre de portions : "
+                    "impossible de l'adapter."
+                )
+            result = self._rows_to_recipe_consumption(recipe_id, portions, rows)
+            # Recette introuvable ou ingrédient manquant : rien n'a été
+            # modifié, on libère simplement les verrous
+            if result is None or result.shortages:
+                conn.rollback()
+            else:
+                conn.commit()
+            return result
         except Exception:
             conn.rollback()
             raise
+
+    @staticmethod
+    def _rows_to_recipe_consumption(
+        recipe_id: int, portions: int | None, rows: list[dict[str, Any]]
+    ) -> RecipeConsumption | None:
+        """Regroupe les lignes (ingrédient, stock) de `_CONSUME_RECIPE_FEFO_SQL`."""
+        if not rows:
+            return None
+
+        ingredients: dict[int, IngredientConsumption] = {}
+        for r in rows:
+            if r["ingredient_id"] is None:
+                continue
+            ingredient_id = int(r["ingredient_id"])
+            item = ingredients.setdefault(
+                ingredient_id,
+                IngredientConsumption(
+                    ingredient_id=ingredient_id,
+                    required=float(r["required"]),
+                    available=float(r["available"]),
+                    by_stock={},
+                ),
+            )
+            if r["fk_stock_id"] is not None:
+                item.by_stock[int(r["fk_stock_id"])] = float(r["taken"])
+
+        return RecipeConsumption(
+            recipe_id=recipe_id,
+            portions=portions or rows[0]["portion"],
+            ingredients=list(ingredients.values()),
+        )
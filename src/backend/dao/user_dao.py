@@ -5,6 +5,7 @@ from typing import Any
 
 from business_objects.user import Admin, GenericUser, User
 from dao.db_connection import DBConnection
+from dao.pagination import InvalidCursorError, Page, decode_cursor, encode_cursor
 from utils.log_decorator import log
 
 
@@ -227,3 +228,56 @@ class UserDAO:
     def get_all_users(self, limit: int | None = None) -> list[User]:
         user_rows = self.get_all_user_rows(limit=limit)
         return [self._row_to_bo(row) for row in user_rows]
+
+    def get_user_rows_page(
+        self, *, limit: int = 50, after: str | None = None
+    ) -> Page[UserRow]:
+        """Page d'utilisateurs (ORDER BY user_id) en pagination par curseur.
+
+        La page suivante démarre après le dernier user_id lu (index de la clé
+        primaire) : coût constant quelle que soit la profondeur.
+
+        Raises:
+            InvalidCursorError: Si `after` est illisible.
+        """
+        limit = max(1, min(int(limit), 500))
+
+        where_sql = ""
+        params: list[Any] = []
+        if after is not None:
+            (last_id,) = decode_cursor(after, size=1)
+            try:
+                params.append(int(last_id))
+            except (TypeError, ValueError) as exc:
+                raise InvalidCursorError("Curseur de pagination invalide.") from exc
+            where_sql = "WHERE user_id > %s"
+
+        conn = DBConnection().connection
+        with conn.cursor() as cur:
+            cur.execute(
+                f"""
+                SELECT user_id, username, email, password_hash, status, created_at
+                FROM users
+                {where_sql}
+                ORDER BY user_id
+                LIMIT %s
+                """,
+                (*params, limit + 1),
+            )
+            rows = [UserRow(**row) for row in cur.fetchall()]
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1].user_id)
+        return Page(items=rows, next_cursor=next_cursor)
+
+    @log
+    def get_users_page(
+        self, *, limit: int = 50, after: str | None = None
+    ) -> Page[User]:
+        page = self.get_user_rows_page(limit=limit, after=after)
+        return Page(
+            items=[self._row_to_bo(row) for row in page.items],
+            next_cursor=page.next_cursor,
+        )
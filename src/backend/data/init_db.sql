@@ -101,7 +101,10 @@ CREATE TABLE recipe (
     prep_time INT CHECK (prep_time >= 0),          -- temps de préparation en minutes
     portion INT CHECK (portion > 0),               -- nombre de portions
     description TEXT,
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    external_source VARCHAR(30),                   -- ex: 'spoonacular' (NULL = recette locale)
+    external_id VARCHAR(64),                       -- identifiant chez la source externe
+    CHECK ((external_source IS NULL) = (external_id IS NULL))
 );
 
 -----------------------------------------------------
@@ -210,3 +213,34 @@ CREATE TABLE ingredient_substitution (
 CREATE INDEX idx_recipe_name ON recipe(name);
 CREATE INDEX idx_ingredient_name ON ingredient(name);
 CREATE INDEX idx_tag_name ON tag(name);
+
+-- Pagination keyset (ordre des listings ; created_at NULL trié en tête)
+CREATE INDEX idx_recipe_created_at_id
+    ON recipe((COALESCE(created_at, 'infinity'::timestamp)) DESC, recipe_id DESC);
+CREATE INDEX idx_stock_name_id ON stock(name, stock_id);
+
+-- Déduplication des recettes importées (les recettes locales, à NULL, ne
+-- sont pas concernées)
+CREATE UNIQUE INDEX uq_recipe_external ON recipe(external_source, external_id);
+
+-- Recherche par ingrédients : résolution terme -> ingredient_id
+CREATE INDEX idx_recipe_ingredient_ingredient ON recipe_ingredient(fk_ingredient_id);
+
+-- Index trigrammes (pg_trgm) sur ingredient.name : accélèrent ILIKE '%terme%'
+-- et la recherche par similarité. L'extension est installée dans `public`
+-- (partagée par les schémas) ; si elle n'est pas disponible sur le serveur,
+-- on continue sans (la DAO retombe alors sur ILIKE).
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm') THEN
+        CREATE EXTENSION IF NOT EXISTS pg_trgm WITH SCHEMA public;
+        CREATE INDEX idx_ingredient_name_trgm
+            ON ingredient USING gin (name public.gin_trgm_ops);
+    ELSE
+        RAISE NOTICE 'pg_trgm indisponible : index trigrammes non créés.';
+    END IF;
+EXCEPTION
+    WHEN insufficient_privilege THEN
+        RAISE NOTICE 'Droits insuffisants pour pg_trgm : index trigrammes non créés.';
+END
+$$;
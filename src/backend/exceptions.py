@@ -43,3 +43,9 @@ class InvalidCredentialsError(BaseAppError):
     """Levée quand les identifiants (login/mot de passe) sont invalides."""
 
     pass
+
+
+class PasswordHashingBusyError(BaseAppError):
+    """Levée quand le pool de hachage des mots de passe est saturé (503)."""
+
+    pass
@@ -19,7 +19,7 @@ from exceptions import (
 )
 from utils.jwt_utils import encode_jwt
 from utils.log_decorator import log
-from utils.securite import check_password
+from utils.password_pool import check_password
 
 
 # class AuthServiceError(Exception):
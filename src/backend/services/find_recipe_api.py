@@ -1,38 +1,80 @@
 from __future__ import annotations
 
-import inspect
+from collections.abc import Iterable
+from concurrent.futures import wait as wait_futures
 import logging
+import threading
 from typing import Protocol
 
 from business_objects.recipe import Recipe
 from business_objects.unit import Unit
 from business_objects.user import GenericUser
 from clients.spoonacular_client import (
+    SpoonacularClient,
+    SpoonacularRateLimiter,
     SpoonacularRateLimitError,
+    SpoonacularResponseCache,
+    default_client,
     fetch_detailed_recipes_by_ingredients,
 )
+from dao.db_connection import connection_scope
 from dao.ingredient_dao import IngredientDAO
+from dao.recipe_dao import RecipeDAO
 from services.find_recipe import FindRecipe, IngredientSearchQuery
+from services.recipe_search_cache import canonical_query_key
+from utils.single_flight import SingleFlight
+from utils.write_behind import WriteBehindQueue
+
+
+logger = logging.getLogger(__name__)
+
+# Partagés par toutes les instances (une instance est créée par requête HTTP) :
+# - une recherche identique en cours est rejointe au lieu d'être relancée
+# - une même recette externe n'est persistée que par un thread à la fois
+_search_flights: SingleFlight[list[Recipe]] = SingleFlight()
+_persist_flights: SingleFlight[Recipe] = SingleFlight()
+
+
+# Source des recettes importées (colonne `recipe.external_source`)
+EXTERNAL_SOURCE = "spoonacular"
+
+# Attente maximale de la file d'import avant de persister soi-même
+IMPORT_WAIT_SECONDS = 5.0
+
+
+def _external_key(r) -> str:
+    """Clé de déduplication d'une recette externe (id chez la source)."""
+    return str(r.id)
+
+
+def _parse_unit(unit_raw: str | None) -> Unit | None:
+    """Unité reconnue, ou None (les unités Spoonacular sont libres)."""
+    if not unit_raw:
+        return None
+    try:
+        return Unit.from_any(unit_raw)
+    except Exception:
+        return None
 
 
 class RecipeWriteDao(Protocol):
     """Sous-ensemble du DAO nécessaire pour 'cacher' les recettes externes en BDD."""
 
-    def list_recipes(
-        self,
-        *,
-        fk_user_id: int | None = None,
-        name_ilike: str | None = None,
-        limit: int = 50,
-        offset: int = 0,
+    def get_recipe_ids_by_external_ids(
+        self, source: str, external_ids: Iterable[str]
+    ) -> dict[str, int]: ...
+
+    def get_recipes_by_ids(
+        self, recipe_ids: Iterable[int], *, with_relations: bool = True
     ) -> list[Recipe]: ...
 
-    def create_recipe(
+    def upsert_external_recipe(
         self,
         *,
-        fk_user_id: int | None,
+        source: str,
+        external_id: str,
         name: str,
-        status: str | None = "draft",
+        status: str | None = "public",
         prep_time: int | None = 0,
         portion: int | None = 1,
         description: str | None = None,
@@ -41,6 +83,151 @@ class RecipeWriteDao(Protocol):
     ) -> Recipe: ...
 
 
+class ExternalRecipeStore:
+    """Persistance locale des recettes externes, dédupliquées par id externe."""
+
+    def __init__(
+        self, dao: RecipeWriteDao, ingredient_dao: IngredientDAO | None = None
+    ):
+        self._dao = dao
+        self._ingredient_dao = ingredient_dao
+
+    def persist(self, detailed: list) -> list[Recipe]:
+        """Persiste un lot de recettes détaillées ; renvoie les recettes locales.
+
+        Les recettes déjà importées sont retrouvées en une requête pour tout le
+        lot ; les ingrédients des nouvelles sont résolus (ou créés) en une
+        requête, puis seules les nouvelles recettes sont écrites (une même
+        recette n'est persistée que par un thread à la fois).
+        """
+        existing = self.load_imported(detailed)
+
+        new = [r for r in detailed if _external_key(r) not in existing]
+        ingredient_ids = self.resolve_ingredients(new)
+
+        saved: list[Recipe] = []
+        for r in detailed:
+            key = _external_key(r)
+            if key in existing:
+                saved.append(existing[key])
+                continue
+            saved.append(
+                _persist_flights.do(
+                    key,
+                    lambda r=r: self.get_or_create_local_recipe(r, ingredient_ids),
+                )
+            )
+        return saved
+
+    def load_imported(self, detailed: list) -> dict[str, Recipe]:
+        """{id externe: recette locale} des recettes du lot déjà importées
+        (deux requêtes pour tout le lot)."""
+        known = self._dao.get_recipe_ids_by_external_ids(
+            EXTERNAL_SOURCE, [_external_key(r) for r in detailed]
+        )
+        by_id = {
+            int(rec.recipe_id): rec
+            for rec in self._dao.get_recipes_by_ids(known.values(), with_relations=True)
+        }
+        return {
+            key: by_id[recipe_id]
+            for key, recipe_id in known.items()
+            if recipe_id in by_id
+        }
+
+    def resolve_ingredients(self, detailed: list) -> dict[str, int]:
+        """{nom en minuscules: ingredient_id} des ingrédients d'un lot de
+        recettes, créés au besoin (une seule requête pour tout le lot)."""
+        if self._ingredient_dao is None:
+            return {}
+
+        items: list[tuple[str, Unit | None]] = []
+        for r in detailed:
+            for ing in getattr(r, "ingredients", None) or []:
+                ing_name = (getattr(ing, "name", None) or "").strip()
+                if ing_name:
+                    items.append((ing_name, _parse_unit(getattr(ing, "unit", None))))
+        if not items:
+            return {}
+        return self._ingredient_dao.get_or_create_ingredient_ids(items)
+
+    def get_or_create_local_recipe(
+        self, r, ingredient_ids: dict[str, int] | None = None
+    ) -> Recipe:
+        """Importe `r` (upsert indexé sur son id externe).
+
+        `ingredient_ids` : ingrédients déjà résolus pour le lot (sinon résolus
+        pour cette seule recette).
+        """
+        if ingredient_ids is None:
+            ingredient_ids = self.resolve_ingredients([r])
+
+        title = (r.title or "").strip()
+
+        description_parts: list[str] = []
+        if getattr(r, "source_url", None):
+            description_parts.append(f"Source: {r.source_url}")
+        if getattr(r, "summary", None):
+            description_parts.append(str(r.summary))
+        if getattr(r, "steps", None):
+            steps_txt = "\n".join(
+                f"{st.number}. {st.step}"
+                for st in sorted(r.steps, key=lambda s: s.number)
+            )
+            if steps_txt.strip():
+                description_parts.append("\nPréparation:\n" + steps_txt)
+
+        description = (
+            "\n\n".join(p for p in description_parts if p and str(p).strip()) or None
+        )
+
+        # Un ingrédient peut apparaître plusieurs fois dans une recette
+        # externe : quantités cumulées si l'unité est la même, sinon la
+        # première ligne est gardée (pas de conversion entre unités)
+        quantities: dict[int, tuple[Unit | str, float]] = {}
+        for ing in getattr(r, "ingredients", None) or []:
+            ing_name = (getattr(ing, "name", None) or "").strip().lower()
+            ing_id = ingredient_ids.get(ing_name)
+            if ing_id is None:
+                continue
+            unit_raw = getattr(ing, "unit", None)
+            unit = _parse_unit(unit_raw) or (unit_raw or "").strip().lower()
+            ing_amount = float(getattr(ing, "amount", 0.0) or 0.0)
+            if ing_id not in quantities:
+                quantities[ing_id] = (unit, ing_amount)
+                continue
+            first_unit, total = quantities[ing_id]
+            if unit == first_unit:
+                quantities[ing_id] = (unit, total + ing_amount)
+            else:
+                logger.info(
+                    "Recipe %s: '%s' line in another unit ignored (%s %s)",
+                    _external_key(r),
+                    ing_name,
+                    ing_amount,
+                    unit_raw,
+                )
+        ingredient_items = [(i, amount) for i, (_u, amount) in quantities.items()]
+
+        created = self._dao.upsert_external_recipe(
+            source=EXTERNAL_SOURCE,
+            external_id=_external_key(r),
+            name=title or "(Sans titre)",
+            status="public",
+            prep_time=int(getattr(r, "ready_in_minutes", 0) or 0),
+            portion=int(getattr(r, "servings", 1) or 1),
+            description=description,
+            ingredient_items=ingredient_items or None,
+        )
+
+        created.steps = [
+            st.step
+            for st in sorted((getattr(r, "steps", None) or []), key=lambda s: s.number)
+        ]
+        created.add_translation("en", title, description or "")
+        return created
+
+
 class ApiFindRecipe(FindRecipe):
     def __init__(
         self,
@@ -48,20 +235,53 @@ class ApiFindRecipe(FindRecipe):
         *,
         dao: RecipeWriteDao | None = None,
         ingredient_dao: IngredientDAO | None = None,
+        client: SpoonacularClient | None = None,
+        cache: SpoonacularResponseCache | None = None,
+        limiter: SpoonacularRateLimiter | None = None,
+        importer: WriteBehindQueue | None = None,
     ):
         self._api_key = api_key
-        self._dao = dao
-        self._ingredient_dao = ingredient_dao
+        self._store = (
+            ExternalRecipeStore(dao, ingredient_dao) if dao is not None else None
+        )
+        # Persistance par la file de fond (écritures groupées sur une connexion
+        # dédiée) ; la réponse attend tout de même l'id local des recettes
+        self._importer = importer if dao is not None else None
+        # Client HTTP partagé (connexions keep-alive) par défaut
+        self._client = client or default_client()
+        # Cache disque des réponses (économise le quota journalier)
+        self._cache = cache
+        # Débit / budget journalier vérifiés localement avant chaque appel
+        self._limiter = limiter
 
     def get_by_id(self, _recipe_id: int) -> Recipe | None:
         """Lookup par id."""
         return None
 
     def search_by_ingredients(self, query: IngredientSearchQuery) -> list[Recipe]:
+        """Recherche via l'API puis persistance locale.
+
+        Avec `importer`, les nouvelles recettes sont persistées par la file de
+        fond ; la réponse attend leur id local (au-delà de
+        `IMPORT_WAIT_SECONDS`, ou si la file est pleine, elles sont persistées
+        ici même). Les recettes rendues ont donc toujours leur id local.
+
+        Les requêtes concurrentes identiques (même forme canonique) partagent
+        un seul appel amont et une seule passe de persistance.
+        """
         ingredients = [s.strip() for s in query.ingredients if s and s.strip()]
         if not ingredients:
             return []
 
+        results = _search_flights.do(
+            (canonical_query_key(query), self._store is not None),
+            lambda: self._search(query, ingredients),
+        )
+        return list(results)
+
+    def _search(
+        self, query: IngredientSearchQuery, ingredients: list[str]
+    ) -> list[Recipe]:
         try:
             detailed = fetch_detailed_recipes_by_ingredients(
                 api_key=self._api_key,
@@ -75,20 +295,57 @@ class ApiFindRecipe(FindRecipe):
                 else "max-used-ingredients",
                 ignore_pantry=query.ignore_pantry,
                 instructions_required=True,
+                session=self._client.session,
+                cache=self._cache,
+                limiter=self._limiter,
             )
         except SpoonacularRateLimitError as e:
-            logging.getLogger(__name__).warning(
+            logger.warning(
                 "Spoonacular quota exceeded - returning empty results: %s", e
             )
             return []
 
-        if self._dao is None:
+        if self._store is None:
             return [self._detailed_to_bo(r) for r in detailed]
+        if self._importer is not None:
+            return self._import(detailed)
+        return self._store.persist(detailed)
+
+    def _import(self, detailed: list) -> list[Recipe]:
+        """Persiste via la file d'import et renvoie les recettes locales."""
+        saved = self._store.load_imported(detailed)
+        futures = {
+            key: self._importer.submit_future(r)
+            for r in detailed
+            if (key := _external_key(r)) not in saved
+        }
+        pending = [f for f in futures.values() if f is not None]
+        if pending:
+            wait_futures(pending, timeout=IMPORT_WAIT_SECONDS)
 
-        saved: list[Recipe] = []
+        leftover = []
         for r in detailed:
-            saved.append(self._get_or_create_local_recipe(r))
-        return saved
+            key = _external_key(r)
+            if key in saved:
+                continue
+            future = futures.get(key)
+            recipe = None
+            if future is not None and future.done() and future.exception() is None:
+                recipe = future.result()
+            if recipe is None:
+                leftover.append(r)
+            else:
+                saved[key] = recipe
+        if leftover:
+            # File pleine, lente ou en échec : persistance synchrone
+            logger.warning(
+                "Recipe import queue did not persist %s recipes in time - "
+                "persisting them inline",
+                len(leftover),
+            )
+            for r, recipe in zip(leftover, self._store.persist(leftover), strict=True):
+                saved[_external_key(r)] = recipe
+        return [saved[_external_key(r)] for r in detailed]
 
     @staticmethod
     def _detailed_to_bo(r) -> Recipe:
@@ -113,91 +370,43 @@ class ApiFindRecipe(FindRecipe):
 
         return recipe
 
-    def _get_or_create_local_recipe(self, r) -> Recipe:
-        assert self._dao is not None
-
-        title = (r.title or "").strip()
-
-        if title:
-            candidates = self._dao.list_recipes(name_ilike=title, limit=10, offset=0)
-            for c in candidates:
-                fr_name = (c.translations.get("fr") or {}).get("name", "")
-                if fr_name.strip().lower() == title.lower():
-                    return c
-
-        description_parts: list[str] = []
-        if getattr(r, "source_url", None):
-            description_parts.append(f"Source: {r.source_url}")
-        if getattr(r, "summary", None):
-            description_parts.append(str(r.summary))
-        if getattr(r, "steps", None):
-            steps_txt = "\n".join(
-                f"{st.number}. {st.step}"
-                for st in sorted(r.steps, key=lambda s: s.number)
-            )
-            if steps_txt.strip():
-                description_parts.append("\nPréparation:\n" + steps_txt)
-
-        description = (
-            "\n\n".join(p for p in description_parts if p and str(p).strip()) or None
-        )
 
-        ingredient_items = []
-        if self._ingredient_dao is not None:
-            for ing in getattr(r, "ingredients", None) or []:
-                ing_name = (getattr(ing, "name", None) or "").strip()
-                ing_unit = getattr(ing, "unit", None) or None
-                ing_amount = float(getattr(ing, "amount", 0.0) or 0.0)
-
-                if not ing_name:
-                    continue
-
-                ing_id = self._get_or_create_ingredient_id(ing_name, ing_unit)
-                ingredient_items.append((ing_id, ing_amount))
-
-        # modif: compat avec FakeRecipeDAO (_ingredient_items) et vrai DAO (ingredient_items)
-        create_kwargs = {
-            "fk_user_id": None,
-            "name": title or "(Sans titre)",
-            "status": "public",
-            "prep_time": int(getattr(r, "ready_in_minutes", 0) or 0),
-            "portion": int(getattr(r, "servings", 1) or 1),
-            "description": description,
-        }
-        params = inspect.signature(self._dao.create_recipe).parameters
-        if "ingredient_items" in params:
-            create_kwargs["ingredient_items"] = ingredient_items or None
-        elif "_ingredient_items" in params:
-            create_kwargs["_ingredient_items"] = ingredient_items or None
-
-        created = self._dao.create_recipe(**create_kwargs)
-
-        created.steps = [
-            st.step
-            for st in sorted((getattr(r, "steps", None) or []), key=lambda s: s.number)
-        ]
-        created.add_translation("en", title, description or "")
-        return created
-
-    def _get_or_create_ingredient_id(self, name: str, unit_raw: str | None) -> int:
-        assert self._ingredient_dao is not None
-
-        clean_name = (name or "").strip()
-        if not clean_name:
-            raise ValueError("Ingredient name is empty")
-
-        existing = self._ingredient_dao.get_ingredient_by_name(clean_name)
-        if existing:
-            return int(existing.id_ingredient)
-
-        unit_value = None
-        if unit_raw:
-            try:
-                unit_value = Unit.from_any(unit_raw)
-            except Exception:
-                unit_value = None
-
-        created = self._ingredient_dao.create_ingredient(
-            name=clean_name, unit=unit_value
-        )
-        return int(created.id_ingredient)
+def _import_batch(detailed: list) -> list[Recipe]:
+    """Handler de la file d'import : persiste un lot sur une connexion dédiée
+    et renvoie les recettes locales (dans l'ordre du lot)."""
+    with connection_scope():
+        return ExternalRecipeStore(RecipeDAO(), IngredientDAO()).persist(detailed)
+
+
+_shared_importer: WriteBehindQueue | None = None
+_shared_importer_lock = threading.Lock()
+
+
+def shared_recipe_importer(
+    *, max_size: int = 256, batch_size: int = 20
+) -> WriteBehindQueue:
+    """File d'import des recettes externes partagée par le processus.
+
+    Les paramètres ne sont pris en compte qu'au premier appel.
+    """
+    global _shared_importer
+    if _shared_importer is None:
+        with _shared_importer_lock:
+            if _shared_importer is None:
+                _shared_importer = WriteBehindQueue(
+                    _import_batch,
+                    max_size=max_size,
+                    batch_size=batch_size,
+                    key=_external_key,
+                    name="recipe-import",
+                )
+    return _shared_importer
+
+
+def close_recipe_importer(timeout: float | None = 10.0) -> None:
+    """Vide la file d'import puis l'arrête (à l'arrêt de l'application)."""
+    global _shared_importer
+    with _shared_importer_lock:
+        importer, _shared_importer = _shared_importer, None
+    if importer is not None and not importer.close(timeout):
+        logger.warning("Recipe import queue not drained before shutdown")
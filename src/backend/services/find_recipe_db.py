@@ -1,16 +1,25 @@
 from __future__ import annotations
 
-from typing import Protocol
+from collections.abc import Iterable
+from typing import TYPE_CHECKING, Protocol
 
 from business_objects.recipe import Recipe
 from services.find_recipe import FindRecipe, IngredientSearchQuery
 
 
+if TYPE_CHECKING:
+    from services.recipe_scoring import RecipeScorer
+
+
 class RecipeDao(Protocol):
     def get_recipe_by_id(
         self, recipe_id: int, *, with_relations: bool = True
     ) -> Recipe | None: ...
 
+    def get_recipes_by_ids(
+        self, recipe_ids: Iterable[int], *, with_relations: bool = True
+    ) -> list[Recipe]: ...
+
     def find_recipes_by_ingredients(
         self,
         ingredients: list[str],
@@ -19,12 +28,29 @@ class RecipeDao(Protocol):
         max_missing: int = 0,
         strict_only: bool = False,
         dish_type: str | None = None,
+        match: str = "ilike",
     ) -> list[Recipe]: ...
 
 
 class DbFindRecipe(FindRecipe):
-    def __init__(self, dao: RecipeDao):
+    """Recherche en base.
+
+    Avec `scorer` (matrice d'incidence en mémoire, voir
+    `services.recipe_scoring`), le classement est calculé en NumPy et seules
+    les recettes retenues sont lues en base ; sinon la requête SQL de
+    `find_recipes_by_ingredients` fait tout le travail.
+    """
+
+    def __init__(
+        self,
+        dao: RecipeDao,
+        *,
+        match: str = "ilike",
+        scorer: RecipeScorer | None = None,
+    ):
         self._dao = dao
+        self._match = match
+        self._scorer = scorer
 
     def get_by_id(self, recipe_id: int) -> Recipe | None:
         return self._dao.get_recipe_by_id(recipe_id, with_relations=True)
@@ -34,10 +60,23 @@ class DbFindRecipe(FindRecipe):
         if not ings:
             return []
 
+        if self._scorer is not None:
+            recipe_ids = self._scorer.rank(
+                ings,
+                limit=query.limit,
+                max_missing=query.max_missing,
+                strict_only=query.strict_only,
+                dish_type=query.dish_type,
+            )
+            if not recipe_ids:
+                return []
+            return self._dao.get_recipes_by_ids(recipe_ids, with_relations=True)
+
         return self._dao.find_recipes_by_ingredients(
             ings,
             limit=query.limit,
             max_missing=query.max_missing,
             strict_only=query.strict_only,
             dish_type=query.dish_type,
+            match=self._match,
         )
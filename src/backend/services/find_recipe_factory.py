@@ -2,23 +2,97 @@
 
 from __future__ import annotations
 
+from collections.abc import Callable
+from concurrent.futures import (
+    Future,
+    ThreadPoolExecutor,
+    TimeoutError as FutureTimeoutError,
+)
 from dataclasses import dataclass
 import logging
+import threading
+import time
 
 from business_objects.recipe import Recipe
-from clients.spoonacular_client import SpoonacularRateLimitError
+from clients.spoonacular_client import (
+    SpoonacularRateLimiter,
+    SpoonacularRateLimitError,
+    estimate_search_cost,
+)
+from dao.db_connection import connection_scope
 from services.find_recipe import FindRecipe, IngredientSearchQuery
+from services.recipe_search_cache import SearchResultCache
 
 
 logger = logging.getLogger(__name__)
 
 
+# Threads de l'executor API ; un appel n'est soumis que si un thread est libre
+# (pas de file d'attente derrière des appels abandonnés)
+_API_WORKERS = 8
+_api_slots = threading.BoundedSemaphore(_API_WORKERS)
+
+_api_executor: ThreadPoolExecutor | None = None
+_api_executor_lock = threading.Lock()
+
+
+def _shared_api_executor() -> ThreadPoolExecutor:
+    """Threads dédiés aux appels API externes (mode hedge / attente bornée)."""
+    global _api_executor
+    if _api_executor is None:
+        with _api_executor_lock:
+            if _api_executor is None:
+                _api_executor = ThreadPoolExecutor(
+                    max_workers=_API_WORKERS, thread_name_prefix="recipe-api"
+                )
+    return _api_executor
+
+
+def shutdown_api_executor() -> None:
+    """Arrête l'executor API (à appeler à l'arrêt de l'application)."""
+    global _api_executor
+    with _api_executor_lock:
+        if _api_executor is not None:
+            _api_executor.shutdown(wait=True)
+            _api_executor = None
+
+
+def _run_isolated(fn: Callable[[], list[Recipe]]) -> list[Recipe]:
+    """Exécute `fn` dans un thread de l'executor avec sa propre connexion BDD
+    (la persistance des recettes externes ne doit pas partager la connexion
+    de la requête HTTP, utilisée en parallèle par la recherche DB)."""
+    with connection_scope():
+        return fn()
+
+
 @dataclass(slots=True)
 class FindRecipeFactory(FindRecipe):
-    """Implémentation composite de `FindRecipe` (DB + API)."""
+    """Implémentation composite de `FindRecipe` (DB + API).
+
+    Avec `cache`, les résultats sont mémorisés par requête canonique (voir
+    `services.recipe_search_cache`). Avec `api_quota`, l'API est sautée
+    d'emblée quand le budget journalier ne suffit plus.
+
+    Latence :
+    - `api_wait_seconds` : budget d'attente de l'API, compté depuis le début
+      de la recherche ; au-delà, on rend la DB seule et l'appel API se
+      termine en arrière-plan. La requête DB n'est pas bornée (elle
+      s'exécute dans le thread appelant) : une DB lente consomme le budget
+      et l'API n'est alors pas appelée
+    - `hedge` : l'appel API est lancé en parallèle de la DB, sans attendre de
+      savoir si la DB suffit (pour `limit` recettes). Latence ~ max(DB, API)
+      au lieu de DB + API, au prix d'appels API parfois inutiles
+
+    Les appels en parallèle passent par un executor borné : si tous ses
+    threads sont occupés, l'API est sautée (résultat DB, non mis en cache).
+    """
 
     db: FindRecipe
     api: FindRecipe
+    cache: SearchResultCache | None = None
+    api_quota: SpoonacularRateLimiter | None = None
+    hedge: bool = False
+    api_wait_seconds: float | None = None
 
     def get_by_id(self, recipe_id: int) -> Recipe | None:
         """Retourne une recette par identifiant interne BDD.
@@ -30,11 +104,42 @@ class FindRecipeFactory(FindRecipe):
     def search_by_ingredients(self, query: IngredientSearchQuery) -> list[Recipe]:
         """Recherche des recettes par ingrédients avec fallback API.
 
-        - DB d'abord
+        - DB d'abord (l'API en parallèle en mode `hedge`)
         - si pas assez, complète via API
         - merge + déduplication
-        - si quota Spoonacular dépassé => on garde juste la DB
+        - si quota Spoonacular dépassé ou attente API dépassée => on garde la DB
+        - résultats mis en cache (sauf réponse dégradée)
         """
+        generation = None
+        if self.cache is not None:
+            generation = self.cache.generation()
+            cached = self.cache.get(query)
+            if cached is not None:
+                logger.info("FindRecipeFactory: cache hit (%s results)", len(cached))
+                return cached
+
+        results, complete = self._search_uncached(query)
+        if self.cache is not None and complete:
+            # Ignoré si une recette a été écrite pendant le calcul
+            self.cache.put(query, results, generation=generation)
+        return results
+
+    def _search_uncached(
+        self, query: IngredientSearchQuery
+    ) -> tuple[list[Recipe], bool]:
+        """Recherche DB + API ; le booléen est faux si l'API a été sautée
+        (quota, executor saturé) ou abandonnée (attente dépassée) : résultat à
+        ne pas mettre en cache."""
+        deadline = (
+            None
+            if self.api_wait_seconds is None
+            else time.monotonic() + float(self.api_wait_seconds)
+        )
+
+        hedged: Future[list[Recipe]] | None = None
+        if self.hedge and self._api_allowed(int(query.limit)):
+            hedged = self._submit_api(self._api_query(query, int(query.limit)))
+
         from_db = self.db.search_by_ingredients(query)
         logger.info(
             "FindRecipeFactory: DB returned %s results (limit=%s)",
@@ -43,42 +148,125 @@ class FindRecipeFactory(FindRecipe):
         )
 
         if len(from_db) >= query.limit:
-            return from_db[: query.limit]
+            # Appel spéculatif inutile : annulé s'il n'a pas démarré, sinon il
+            # finit en arrière-plan (ses recettes sont persistées)
+            if hedged is not None:
+                hedged.cancel()
+            return from_db[: query.limit], True
 
         remaining = max(0, int(query.limit) - len(from_db))
         if remaining == 0:
-            return from_db
+            return from_db, True
+
+        if hedged is not None:
+            from_api, complete = self._await_api(hedged, deadline)
+        elif not self._api_allowed(remaining):
+            return from_db, False
+        elif deadline is not None:
+            if deadline - time.monotonic() <= 0:
+                # Budget déjà consommé par la DB : aucun appel (ni quota)
+                # pour un résultat qui serait de toute façon abandonné
+                logger.warning(
+                    "API wait budget spent by the DB query - skipping external API"
+                )
+                return from_db, False
+            future = self._submit_api(self._api_query(query, remaining))
+            if future is None:
+                return from_db, False
+            from_api, complete = self._await_api(future, deadline)
+        else:
+            logger.info("FindRecipeFactory: calling API for remaining=%s", remaining)
+            from_api, complete = self._call_api(self._api_query(query, remaining))
+
+        seen: set[int] = set()
+        merged: list[Recipe] = []
+
+        for r in [*from_db, *from_api]:
+            rid = int(getattr(r, "recipe_id", 0) or 0)
+            if rid and rid in seen:
+                continue
+            if rid:
+                seen.add(rid)
+            merged.append(r)
+            if len(merged) >= query.limit:
+                break
+
+        return merged, complete
+
+    # ------------------------------------------------------------------
+    # Appels API
+    # ------------------------------------------------------------------
 
-        api_query = IngredientSearchQuery(
+    @staticmethod
+    def _api_query(query: IngredientSearchQuery, limit: int) -> IngredientSearchQuery:
+        return IngredientSearchQuery(
             ingredients=query.ingredients,
-            limit=remaining,
+            limit=limit,
             max_missing=query.max_missing,
             strict_only=query.strict_only,
             dish_type=query.dish_type,
             ignore_pantry=query.ignore_pantry,
         )
 
-        logger.info("FindRecipeFactory: calling API for remaining=%s", remaining)
+    def _api_allowed(self, n: int) -> bool:
+        """Vérification locale du budget avant tout appel API."""
+        if self.api_quota is not None and self.api_quota.would_exceed(
+            estimate_search_cost(n)
+        ):
+            logger.warning(
+                "External recipe API budget spent (%.2f points left) - "
+                "using DB results only",
+                self.api_quota.remaining(),
+            )
+            return False
+        return True
+
+    def _call_api(self, api_query: IngredientSearchQuery) -> tuple[list[Recipe], bool]:
         try:
-            from_api = self.api.search_by_ingredients(api_query)
+            return self.api.search_by_ingredients(api_query), True
         except SpoonacularRateLimitError as e:
             logger.warning(
                 "External recipe API quota exceeded - using DB results only: %s",
                 e,
             )
-            from_api = []
+            return [], False
 
-        seen: set[int] = set()
-        merged: list[Recipe] = []
-
-        for r in [*from_db, *from_api]:
-            rid = int(getattr(r, "recipe_id", 0) or 0)
-            if rid and rid in seen:
-                continue
-            if rid:
-                seen.add(rid)
-            merged.append(r)
-            if len(merged) >= query.limit:
-                break
+    def _submit_api(
+        self, api_query: IngredientSearchQuery
+    ) -> Future[list[Recipe]] | None:
+        """Lance l'appel API dans l'executor, ou None si tous ses threads sont
+        occupés (l'appel n'est jamais mis en file)."""
+        if not _api_slots.acquire(blocking=False):
+            logger.warning("External recipe API executor busy - skipping API call")
+            return None
+        logger.info("FindRecipeFactory: starting API call (limit=%s)", api_query.limit)
+        try:
+            future = _shared_api_executor().submit(
+                _run_isolated, lambda: self.api.search_by_ingredients(api_query)
+            )
+        except BaseException:
+            _api_slots.release()
+            raise
+        # Place rendue à la fin de l'appel, ou à son annulation
+        future.add_done_callback(lambda _f: _api_slots.release())
+        return future
 
-        return merged
+    def _await_api(
+        self, future: Future[list[Recipe]], deadline: float | None
+    ) -> tuple[list[Recipe], bool]:
+        timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+        try:
+            return future.result(timeout=timeout), True
+        except FutureTimeoutError:
+            # Abandonné : annulé s'il attend encore un thread
+            future.cancel()
+            logger.warning(
+                "External recipe API missed the wait budget - using DB results only"
+            )
+            return [], False
+        except SpoonacularRateLimitError as e:
+            logger.warning(
+                "External recipe API quota exceeded - using DB results only: %s",
+                e,
+            )
+            return [], False
@@ -0,0 +1,377 @@
+from __future__ import annotations
+
+from collections import Counter
+from collections.abc import Callable, Iterable
+from datetime import datetime
+import heapq
+import logging
+import threading
+import time
+from typing import Any, Protocol
+
+from business_objects.recipe import Recipe
+from dao.db_connection import connection_scope
+from dao.ingredient_dao import IngredientDAO
+from dao.recipe_dao import RecipeDAO, RecipeIndexRow
+from services.find_recipe import FindRecipe, IngredientSearchQuery
+
+
+logger = logging.getLogger(__name__)
+
+
+class RecipeIndexDao(Protocol):
+    def get_recipe_by_id(
+        self, recipe_id: int, *, with_relations: bool = True
+    ) -> Recipe | None: ...
+
+    def get_recipes_by_ids(
+        self, recipe_ids: Iterable[int], *, with_relations: bool = True
+    ) -> list[Recipe]: ...
+
+    def iter_search_index_rows(
+        self, recipe_ids: Iterable[int] | None = None, *, batch_size: int = 5000
+    ) -> Iterable[RecipeIndexRow]: ...
+
+
+class IngredientNameDao(Protocol):
+    def list_ingredients(self, with_tags: bool = True) -> list[Any]: ...
+
+    def get_ingredient_by_id(self, ingredient_id: int) -> Any | None: ...
+
+
+def created_at_sort_key(created_at: Any) -> float:
+    """Clé de tri de created_at (DESC NULLS FIRST, comme PostgreSQL)."""
+    if created_at is None:
+        return float("inf")
+    if isinstance(created_at, datetime):
+        return created_at.timestamp()
+    try:
+        return datetime.fromisoformat(str(created_at)).timestamp()
+    except ValueError:
+        return float("-inf")
+
+
+class RecipeSearchIndex:
+    """Index inversé en mémoire : ingrédient -> recettes.
+
+    Contient, pour chaque recette, son nombre d'ingrédients distincts, ses
+    tags (pour `dish_type`) et sa clé de tri (created_at, recipe_id). La
+    recherche reproduit exactement les deux modes de
+    `RecipeDAO.find_recipes_by_ingredients` (strict / inclusif) sans accès
+    à la base : seuls les ids des recettes retenues sont renvoyés.
+
+    Thread-safe : les lectures et les mises à jour incrémentales sont
+    sérialisées par un verrou (une recherche coûte O(taille des postings)).
+    """
+
+    # Nombre maximal de termes résolus gardés en cache
+    TERM_CACHE_SIZE = 4096
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        # ingredient_id -> recipe_ids
+        self._postings: dict[int, set[int]] = {}
+        # recipe_id -> ingredient_ids (pour les mises à jour / suppressions)
+        self._recipe_ingredients: dict[int, frozenset[int]] = {}
+        # nb d'ingrédients -> recipe_ids (recettes sans aucun ingrédient exclues)
+        self._by_size: dict[int, set[int]] = {}
+        self._recipe_tags: dict[int, tuple[str, ...]] = {}
+        self._sort_keys: dict[int, tuple[float, int]] = {}
+        # ingredient_id -> nom en minuscules (résolution des termes)
+        self._ingredient_names: dict[int, str] = {}
+        self._term_cache: dict[str, frozenset[int]] = {}
+
+    # ------------------------------------------------------------------
+    # Construction / mises à jour
+    # ------------------------------------------------------------------
+
+    def replace_all(
+        self, rows: Iterable[RecipeIndexRow], ingredient_names: dict[int, str]
+    ) -> None:
+        """Reconstruit l'index complet (chargement au démarrage)."""
+        fresh = RecipeSearchIndex()
+        fresh._ingredient_names = {
+            int(i): str(n).lower() for i, n in ingredient_names.items()
+        }
+        for row in rows:
+            fresh._add(row)
+
+        with self._lock:
+            self._postings = fresh._postings
+            self._recipe_ingredients = fresh._recipe_ingredients
+            self._by_size = fresh._by_size
+            self._recipe_tags = fresh._recipe_tags
+            self._sort_keys = fresh._sort_keys
+            self._ingredient_names = fresh._ingredient_names
+            self._term_cache = {}
+
+    def upsert(self, row: RecipeIndexRow) -> None:
+        """Ajoute ou remplace une recette."""
+        with self._lock:
+            self._remove(row.recipe_id)
+            self._add(row)
+
+    def remove(self, recipe_id: int) -> None:
+        with self._lock:
+            self._remove(int(recipe_id))
+
+    def set_ingredient_name(self, ingredient_id: int, name: str) -> None:
+        with self._lock:
+            self._ingredient_names[int(ingredient_id)] = str(name).lower()
+            self._term_cache = {}
+
+    def missing_ingredient_names(self, ingredient_ids: Iterable[int]) -> list[int]:
+        """Ids d'ingrédients dont le nom n'est pas encore connu de l'index."""
+        with self._lock:
+            return [i for i in ingredient_ids if i not in self._ingredient_names]
+
+    def __len__(self) -> int:
+        return len(self._recipe_ingredients)
+
+    def _add(self, row: RecipeIndexRow) -> None:
+        recipe_id = int(row.recipe_id)
+        ingredient_ids = frozenset(int(i) for i in row.ingredient_ids)
+
+        self._recipe_ingredients[recipe_id] = ingredient_ids
+        for ingredient_id in ingredient_ids:
+            self._postings.setdefault(ingredient_id, set()).add(recipe_id)
+        if ingredient_ids:
+            self._by_size.setdefault(len(ingredient_ids), set()).add(recipe_id)
+
+        self._recipe_tags[recipe_id] = tuple(str(t).lower() for t in row.tag_names)
+        self._sort_keys[recipe_id] = (created_at_sort_key(row.created_at), recipe_id)
+
+    def _remove(self, recipe_id: int) -> None:
+        ingredient_ids = self._recipe_ingredients.pop(recipe_id, None)
+        if ingredient_ids is None:
+            return
+
+        for ingredient_id in ingredient_ids:
+            posting = self._postings.get(ingredient_id)
+            if posting is not None:
+                posting.discard(recipe_id)
+                if not posting:
+                    del self._postings[ingredient_id]
+        if ingredient_ids:
+            bucket = self._by_size.get(len(ingredient_ids))
+            if bucket is not None:
+                bucket.discard(recipe_id)
+                if not bucket:
+                    del self._by_size[len(ingredient_ids)]
+
+        self._recipe_tags.pop(recipe_id, None)
+        self._sort_keys.pop(recipe_id, None)
+
+    # ------------------------------------------------------------------
+    # Recherche
+    # ------------------------------------------------------------------
+
+    def _resolve_term(self, term: str) -> frozenset[int]:
+        """Ingrédients dont le nom contient le terme (équivalent ILIKE %terme%)."""
+        cached = self._term_cache.get(term)
+        if cached is None:
+            cached = frozenset(
+                i for i, name in self._ingredient_names.items() if term in name
+            )
+            if len(self._term_cache) >= self.TERM_CACHE_SIZE:
+                self._term_cache.clear()
+            self._term_cache[term] = cached
+        return cached
+
+    def _has_dish_type(self, recipe_id: int, dish_type: str) -> bool:
+        return any(dish_type in tag for tag in self._recipe_tags.get(recipe_id, ()))
+
+    def search(
+        self,
+        ingredients: list[str],
+        *,
+        limit: int = 10,
+        max_missing: int = 0,
+        strict_only: bool = False,
+        dish_type: str | None = None,
+    ) -> list[int]:
+        """Ids des recettes correspondant à la requête, dans l'ordre SQL.
+
+        Mêmes paramètres et même sémantique que
+        `RecipeDAO.find_recipes_by_ingredients` (mode `ilike`).
+        """
+        # Comme en SQL, les termes distincts sont comparés avant mise en
+        # minuscules (COUNT(DISTINCT q.term)) ; la correspondance, elle,
+        # ignore la casse (ILIKE).
+        terms = [s.strip() for s in ingredients if s and s.strip()]
+        if not terms:
+            return []
+
+        limit = max(1, min(int(limit), 200))
+        max_missing = max(0, int(max_missing))
+        dish = dish_type.strip().lower() if dish_type else None
+
+        with self._lock:
+            counts: Counter[int] = Counter()
+
+            if strict_only:
+                # matched_count = nb de termes distincts présents dans la recette
+                for term in dict.fromkeys(terms):
+                    matched: set[int] = set()
+                    for ingredient_id in self._resolve_term(term.lower()):
+                        matched |= self._postings.get(ingredient_id, set())
+                    counts.update(matched)
+
+                n_terms = len(terms)
+                candidates = [
+                    r for r, c in counts.items() if n_terms - c <= max_missing
+                ]
+            else:
+                # in_query_count = nb d'ingrédients de la recette couverts par la requête
+                wanted: set[int] = set()
+                for term in dict.fromkeys(t.lower() for t in terms):
+                    wanted |= self._resolve_term(term)
+                for ingredient_id in wanted:
+                    counts.update(self._postings.get(ingredient_id, ()))
+
+                # Les recettes sans aucun ingrédient couvert restent éligibles si
+                # leur taille totale tient dans la tolérance.
+                pool = set(counts)
+                for size in range(1, max_missing + 1):
+                    pool |= self._by_size.get(size, set())
+
+                candidates = [
+                    r
+                    for r in pool
+                    if len(self._recipe_ingredients[r]) - counts[r] <= max_missing
+                ]
+
+            if dish:
+                candidates = [r for r in candidates if self._has_dish_type(r, dish)]
+
+            best = heapq.nlargest(
+                limit,
+                candidates,
+                key=lambda r: (counts[r], *self._sort_keys[r]),
+            )
+        return best
+
+
+class IndexFindRecipe(FindRecipe):
+    """Moteur de recherche `FindRecipe` adossé à l'index inversé en mémoire.
+
+    - `load()` construit l'index depuis `recipe_ingredient` (au démarrage)
+    - `on_recipe_write` (abonné aux écritures de `RecipeDAO`) le tient à jour
+    - la recherche est faite en mémoire ; seules les recettes retenues (au
+      plus `limit`) sont ensuite chargées en lot depuis la base
+
+    L'index est propre au processus : `on_recipe_write` ne voit que les
+    écritures faites dans ce processus. Avec plusieurs workers, les écritures
+    des autres ne sont prises en compte qu'au rechargement complet, fait par
+    la première recherche après `refresh_seconds` (0 = jamais : un seul
+    worker). Les autres recherches continuent sur l'index courant pendant ce
+    rechargement.
+    """
+
+    def __init__(
+        self,
+        dao: RecipeIndexDao,
+        ingredient_dao: IngredientNameDao,
+        index: RecipeSearchIndex | None = None,
+        *,
+        refresh_seconds: float = 0.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._dao = dao
+        self._ingredient_dao = ingredient_dao
+        self._index = index or RecipeSearchIndex()
+        self._refresh_seconds = float(refresh_seconds)
+        self._clock = clock
+        self._refresh_lock = threading.Lock()
+        self._refreshing = False
+        self._loaded_at = clock()
+
+    @property
+    def index(self) -> RecipeSearchIndex:
+        return self._index
+
+    def load(self) -> None:
+        names = {
+            int(i.id_ingredient): str(i.name)
+            for i in self._ingredient_dao.list_ingredients(with_tags=False)
+        }
+        self._index.replace_all(self._dao.iter_search_index_rows(), names)
+        self._loaded_at = self._clock()
+        logger.info("Index de recherche chargé : %s recettes", len(self._index))
+
+    def _refresh_if_stale(self) -> None:
+        """Recharge l'index s'il a plus de `refresh_seconds` (un seul thread)."""
+        if self._refresh_seconds <= 0:
+            return
+        with self._refresh_lock:
+            if self._refreshing or (
+                self._clock() < self._loaded_at + self._refresh_seconds
+            ):
+                return
+            self._refreshing = True
+        try:
+            self.load()
+        except Exception:
+            # On garde l'index courant ; nouvel essai au prochain délai
+            logger.exception("Rechargement de l'index de recherche impossible")
+            self._loaded_at = self._clock()
+        finally:
+            with self._refresh_lock:
+                self._refreshing = False
+
+    def on_recipe_write(self, recipe_id: int, deleted: bool) -> None:
+        """Observateur `RecipeDAO` : met à jour la recette modifiée."""
+        if deleted:
+            self._index.remove(recipe_id)
+            return
+
+        rows = list(self._dao.iter_search_index_rows([recipe_id]))
+        if not rows:
+            self._index.remove(recipe_id)
+            return
+
+        row = rows[0]
+        for ingredient_id in self._index.missing_ingredient_names(row.ingredient_ids):
+            ingredient = self._ingredient_dao.get_ingredient_by_id(ingredient_id)
+            if ingredient is not None:
+                self._index.set_ingredient_name(ingredient_id, ingredient.name)
+        self._index.upsert(row)
+
+    def get_by_id(self, recipe_id: int) -> Recipe | None:
+        return self._dao.get_recipe_by_id(recipe_id, with_relations=True)
+
+    def search_by_ingredients(self, query: IngredientSearchQuery) -> list[Recipe]:
+        self._refresh_if_stale()
+        recipe_ids = self._index.search(
+            query.ingredients,
+            limit=query.limit,
+            max_missing=query.max_missing,
+            strict_only=query.strict_only,
+            dish_type=query.dish_type,
+        )
+        if not recipe_ids:
+            return []
+        return self._dao.get_recipes_by_ids(recipe_ids, with_relations=True)
+
+
+_shared_finder: IndexFindRecipe | None = None
+_shared_lock = threading.Lock()
+
+
+def shared_index_finder(*, refresh_seconds: float = 0.0) -> IndexFindRecipe:
+    """Moteur partagé par le processus : chargé au premier appel, puis tenu à
+    jour par les écritures de `RecipeDAO` (et rechargé toutes les
+    `refresh_seconds`). Les paramètres ne sont pris en compte qu'au premier
+    appel."""
+    global _shared_finder
+    if _shared_finder is None:
+        with _shared_lock:
+            if _shared_finder is None:
+                finder = IndexFindRecipe(
+                    RecipeDAO(), IngredientDAO(), refresh_seconds=refresh_seconds
+                )
+                with connection_scope():
+                    finder.load()
+                RecipeDAO.add_write_listener(finder.on_recipe_write)
+                _shared_finder = finder
+    return _shared_finder
@@ -0,0 +1,315 @@
+"""Score vectorisé garde-manger / catalogue (NumPy).
+
+La relation recette × ingrédient est gardée sous forme de matrice d'incidence
+creuse (CSR : `indptr` / `indices`). Pour une requête, chaque terme est
+résolu en un vecteur booléen sur les ingrédients ; les compteurs de
+`RecipeDAO.find_recipes_by_ingredients` (termes trouvés, ingrédients
+couverts, manquants, en trop) sont alors obtenus pour toutes les recettes en
+une seule passe (produit matrice-vecteur via `reduceat`), suivie d'une
+sélection top-k.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+from dataclasses import dataclass
+import logging
+import threading
+
+import numpy as np
+
+from dao.db_connection import connection_scope
+from dao.ingredient_dao import IngredientDAO
+from dao.recipe_dao import RecipeDAO, RecipeIndexRow
+from services.find_recipe_index import (
+    IngredientNameDao,
+    RecipeIndexDao,
+    created_at_sort_key,
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class PantryScores:
+    """Compteurs par recette (un élément par ligne de la matrice).
+
+    - matched : nb de termes distincts de la requête présents dans la recette
+    - covered : nb d'ingrédients de la recette couverts par la requête
+    - missing : termes de la requête absents de la recette (mode strict)
+    - extra   : ingrédients de la recette hors requête (mode inclusif)
+    """
+
+    matched: np.ndarray
+    covered: np.ndarray
+    missing: np.ndarray
+    extra: np.ndarray
+
+
+class RecipeIncidenceMatrix:
+    """Matrice d'incidence recette × ingrédient, immuable.
+
+    Les recettes sans ingrédient sont exclues : elles ne sont renvoyées par
+    aucun des deux modes de recherche.
+    """
+
+    def __init__(
+        self, rows: Iterable[RecipeIndexRow], ingredient_names: dict[int, str]
+    ) -> None:
+        recipes = [
+            (int(r.recipe_id), r, sorted({int(i) for i in r.ingredient_ids}))
+            for r in rows
+        ]
+        recipes = [(rid, r, ings) for rid, r, ings in recipes if ings]
+
+        col_ids = sorted(
+            set(ingredient_names) | {i for _rid, _r, ings in recipes for i in ings}
+        )
+        col_of = {ingredient_id: col for col, ingredient_id in enumerate(col_ids)}
+
+        self.recipe_ids = np.fromiter(
+            (rid for rid, _r, _ings in recipes), dtype=np.int64, count=len(recipes)
+        )
+        self.created_keys = np.fromiter(
+            (created_at_sort_key(r.created_at) for _rid, r, _ings in recipes),
+            dtype=np.float64,
+            count=len(recipes),
+        )
+        self.sizes = np.fromiter(
+            (len(ings) for _rid, _r, ings in recipes),
+            dtype=np.int64,
+            count=len(recipes),
+        )
+        self.indptr = np.zeros(len(recipes) + 1, dtype=np.int64)
+        np.cumsum(self.sizes, out=self.indptr[1:])
+        self.indices = np.fromiter(
+            (col_of[i] for _rid, _r, ings in recipes for i in ings),
+            dtype=np.int32,
+            count=int(self.indptr[-1]),
+        )
+
+        self.names = np.array(
+            [str(ingredient_names.get(i, "")).lower() for i in col_ids], dtype=str
+        )
+
+        # tag (minuscules) -> lignes des recettes portant ce tag
+        by_tag: dict[str, list[int]] = {}
+        for pos, (_rid, r, _ings) in enumerate(recipes):
+            for tag in {str(t).lower() for t in r.tag_names}:
+                by_tag.setdefault(tag, []).append(pos)
+        self._tag_rows = {t: np.array(p, dtype=np.int64) for t, p in by_tag.items()}
+
+    def __len__(self) -> int:
+        return int(self.recipe_ids.size)
+
+    def term_mask(self, term: str) -> np.ndarray:
+        """Vecteur booléen des ingrédients dont le nom contient `term` (ILIKE)."""
+        if self.names.size == 0:
+            return np.zeros(0, dtype=bool)
+        return np.strings.find(self.names, term.lower()) >= 0
+
+    def dish_mask(self, dish_type: str) -> np.ndarray:
+        """Vecteur booléen des recettes dont un tag contient `dish_type`."""
+        dish = dish_type.lower()
+        mask = np.zeros(len(self), dtype=bool)
+        for tag, rows in self._tag_rows.items():
+            if dish in tag:
+                mask[rows] = True
+        return mask
+
+    def score(self, term_masks: np.ndarray, n_terms: int) -> PantryScores:
+        """Compteurs de toutes les recettes pour une requête.
+
+        `term_masks` : matrice booléenne (nb ingrédients × nb termes distincts) ;
+        `n_terms` : nombre de termes de la requête (doublons compris, comme en SQL).
+        """
+        if len(self) == 0:
+            empty = np.zeros(0, dtype=np.int64)
+            return PantryScores(empty, empty, empty, empty)
+
+        starts = self.indptr[:-1]
+        hits = term_masks[self.indices]  # (nnz, nb termes)
+        matched = np.logical_or.reduceat(hits, starts, axis=0).sum(
+            axis=1, dtype=np.int64
+        )
+        covered = np.add.reduceat(hits.any(axis=1).astype(np.int64), starts)
+        return PantryScores(
+            matched=matched,
+            covered=covered,
+            missing=int(n_terms) - matched,
+            extra=self.sizes - covered,
+        )
+
+    def top_k(self, key: np.ndarray, keep: np.ndarray, k: int) -> list[int]:
+        """Ids des `k` meilleures recettes retenues par `keep`.
+
+        Ordre SQL : `key` DESC, created_at DESC (NULL en tête), recipe_id DESC.
+        """
+        rows = np.flatnonzero(keep)
+        if rows.size > k:
+            # Seuil du k-ième score : on ne trie que les ex aequo au-dessus
+            kth = np.partition(key[rows], rows.size - k)[rows.size - k]
+            rows = rows[key[rows] >= kth]
+
+        order = np.lexsort(
+            (-self.recipe_ids[rows], -self.created_keys[rows], -key[rows])
+        )
+        return self.recipe_ids[rows[order[:k]]].tolist()
+
+    def rank(
+        self,
+        ingredients: list[str],
+        *,
+        limit: int = 10,
+        max_missing: int = 0,
+        strict_only: bool = False,
+        dish_type: str | None = None,
+    ) -> list[int]:
+        """Ids des recettes correspondant à la requête, dans l'ordre SQL.
+
+        Même sémantique que `RecipeDAO.find_recipes_by_ingredients` (mode
+        `ilike`).
+        """
+        terms = [s.strip() for s in ingredients if s and s.strip()]
+        if not terms or len(self) == 0:
+            return []
+
+        limit = max(1, min(int(limit), 200))
+        max_missing = max(0, int(max_missing))
+
+        distinct = list(dict.fromkeys(terms))
+        term_masks = np.column_stack([self.term_mask(t) for t in distinct])
+        scores = self.score(term_masks, len(terms))
+
+        if strict_only:
+            key = scores.matched
+            keep = (scores.matched > 0) & (scores.missing <= max_missing)
+        else:
+            key = scores.covered
+            keep = scores.extra <= max_missing
+
+        if dish_type:
+            keep &= self.dish_mask(dish_type)
+
+        return self.top_k(key, keep, limit)
+
+
+class RecipeScorer:
+    """Matrice d'incidence du catalogue, tenue à jour par les écritures.
+
+    - `load()` lit `recipe_ingredient` (au démarrage)
+    - `on_recipe_write` (abonné aux écritures de `RecipeDAO`) met à jour la
+      recette modifiée ; la matrice est reconstruite en mémoire à la
+      recherche suivante, sans relire la base
+
+    La reconstruction se fait hors du verrou, sur une copie des lignes, puis
+    la nouvelle matrice remplace l'ancienne d'un bloc : pendant ce temps, les
+    autres recherches utilisent la matrice précédente au lieu d'attendre.
+    """
+
+    def __init__(self, dao: RecipeIndexDao, ingredient_dao: IngredientNameDao):
+        self._dao = dao
+        self._ingredient_dao = ingredient_dao
+        self._lock = threading.Lock()
+        self._rows: dict[int, RecipeIndexRow] = {}
+        self._ingredient_names: dict[int, str] = {}
+        # Version des lignes (incrémentée à chaque écriture) et version dont
+        # la matrice courante est issue
+        self._version = 0
+        self._matrix: RecipeIncidenceMatrix | None = None
+        self._matrix_version = -1
+        self._building = False
+
+    @property
+    def matrix(self) -> RecipeIncidenceMatrix:
+        with self._lock:
+            matrix = self._matrix
+            if matrix is not None and (
+                self._matrix_version == self._version or self._building
+            ):
+                # À jour, ou reconstruction déjà en cours : l'ancienne suffit
+                return matrix
+            self._building = True
+            version = self._version
+            rows = list(self._rows.values())
+            names = dict(self._ingredient_names)
+
+        built: RecipeIncidenceMatrix | None = None
+        try:
+            built = RecipeIncidenceMatrix(rows, names)
+        finally:
+            with self._lock:
+                self._building = False
+                if built is not None and version > self._matrix_version:
+                    self._matrix = built
+                    self._matrix_version = version
+        return built
+
+    def load(self) -> None:
+        names = {
+            int(i.id_ingredient): str(i.name)
+            for i in self._ingredient_dao.list_ingredients(with_tags=False)
+        }
+        rows = {int(r.recipe_id): r for r in self._dao.iter_search_index_rows()}
+        with self._lock:
+            self._rows = rows
+            self._ingredient_names = names
+            self._version += 1
+        logger.info("Matrice de score chargée : %s recettes", len(self.matrix))
+
+    def on_recipe_write(self, recipe_id: int, deleted: bool) -> None:
+        """Observateur `RecipeDAO` : met à jour la recette modifiée."""
+        rows = [] if deleted else list(self._dao.iter_search_index_rows([recipe_id]))
+
+        names: dict[int, str] = {}
+        for row in rows:
+            for ingredient_id in row.ingredient_ids:
+                if ingredient_id in self._ingredient_names:
+                    continue
+                ingredient = self._ingredient_dao.get_ingredient_by_id(ingredient_id)
+                if ingredient is not None:
+                    names[int(ingredient_id)] = str(ingredient.name)
+
+        with self._lock:
+            self._rows.pop(int(recipe_id), None)
+            for row in rows:
+                self._rows[int(row.recipe_id)] = row
+            self._ingredient_names.update(names)
+            self._version += 1
+
+    def rank(
+        self,
+        ingredients: list[str],
+        *,
+        limit: int = 10,
+        max_missing: int = 0,
+        strict_only: bool = False,
+        dish_type: str | None = None,
+    ) -> list[int]:
+        return self.matrix.rank(
+            ingredients,
+            limit=limit,
+            max_missing=max_missing,
+            strict_only=strict_only,
+            dish_type=dish_type,
+        )
+
+
+_shared_scorer: RecipeScorer | None = None
+_shared_lock = threading.Lock()
+
+
+def shared_recipe_scorer() -> RecipeScorer:
+    """Matrice partagée par le processus : chargée au premier appel, puis tenue
+    à jour par les écritures de `RecipeDAO`."""
+    global _shared_scorer
+    if _shared_scorer is None:
+        with _shared_lock:
+            if _shared_scorer is None:
+                scorer = RecipeScorer(RecipeDAO(), IngredientDAO())
+                with connection_scope():
+                    scorer.load()
+                RecipeDAO.add_write_listener(scorer.on_recipe_write)
+                _shared_scorer = scorer
+    return _shared_scorer
@@ -0,0 +1,136 @@
+"""Cache des résultats de recherche de recettes par ingrédients."""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+import copy
+import threading
+import time
+
+from business_objects.recipe import Recipe
+from dao.recipe_dao import RecipeDAO
+from services.find_recipe import IngredientSearchQuery
+
+
+def canonical_query_key(query: IngredientSearchQuery) -> Hashable:
+    """Forme canonique d'une requête : ingrédients nettoyés triés + options.
+
+    Seule la clé est canonique, la requête exécutée reste celle de l'appelant :
+    la casse est donc conservée (selon le moteur, "Oeuf" et "oeuf" ne comptent
+    pas forcément pour le même terme). Les doublons sont conservés : en mode
+    strict, ils comptent dans le nombre de termes demandés.
+    """
+    ingredients = tuple(sorted(s.strip() for s in query.ingredients if s and s.strip()))
+    return (
+        ingredients,
+        int(query.limit),
+        int(query.max_missing),
+        bool(query.strict_only),
+        query.dish_type or None,
+        bool(query.ignore_pantry),
+    )
+
+
+class SearchResultCache:
+    """Cache LRU borné, avec durée de vie, des résultats de recherche.
+
+    Thread-safe. Vidé entièrement à chaque écriture de recette (`clear`, abonné
+    aux écritures de `RecipeDAO`, hors imports de recettes externes) : un
+    ajout peut changer n'importe quel résultat. Chaque `clear` incrémente la génération : un résultat calculé
+    avant l'invalidation (`put(..., generation=...)`) n'est pas mémorisé.
+    Les recettes sont copiées à l'entrée et à la sortie : un appelant qui
+    modifie ses résultats (traductions, `scale_portions`...) n'altère pas le
+    cache.
+    """
+
+    def __init__(
+        self,
+        *,
+        ttl_seconds: float = 60.0,
+        max_entries: int = 1024,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if ttl_seconds <= 0:
+            raise ValueError("ttl_seconds must be > 0")
+        if max_entries < 1:
+            raise ValueError("max_entries must be >= 1")
+
+        self._ttl = float(ttl_seconds)
+        self._max_entries = int(max_entries)
+        self._clock = clock
+        self._lock = threading.Lock()
+        # clé -> (expiration, résultats), du moins au plus récemment utilisé
+        self._entries: OrderedDict[Hashable, tuple[float, list[Recipe]]] = OrderedDict()
+        self._generation = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, query: IngredientSearchQuery) -> list[Recipe] | None:
+        key = canonical_query_key(query)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, recipes = entry
+            if expires_at <= self._clock():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+        return copy.deepcopy(recipes)
+
+    def generation(self) -> int:
+        """Génération courante, à relever avant de calculer un résultat."""
+        with self._lock:
+            return self._generation
+
+    def put(
+        self,
+        query: IngredientSearchQuery,
+        recipes: list[Recipe],
+        *,
+        generation: int | None = None,
+    ) -> None:
+        """Mémorise un résultat, sauf si le cache a été vidé depuis
+        `generation` (résultat potentiellement périmé)."""
+        key = canonical_query_key(query)
+        recipes = copy.deepcopy(recipes)
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            self._entries[key] = (self._clock() + self._ttl, recipes)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+
+    def on_recipe_write(self, _recipe_id: int, _deleted: bool) -> None:
+        """Observateur `RecipeDAO` : invalide tout le cache (les imports de
+        recettes externes ne sont pas observés, le TTL borne leur retard)."""
+        self.clear()
+
+
+_shared_cache: SearchResultCache | None = None
+_shared_lock = threading.Lock()
+
+
+def shared_search_cache(
+    *, ttl_seconds: float = 60.0, max_entries: int = 1024
+) -> SearchResultCache:
+    """Cache partagé par le processus, invalidé par les écritures de
+    `RecipeDAO`. Les paramètres ne sont pris en compte qu'au premier appel."""
+    global _shared_cache
+    if _shared_cache is None:
+        with _shared_lock:
+            if _shared_cache is None:
+                cache = SearchResultCache(
+                    ttl_seconds=ttl_seconds, max_entries=max_entries
+                )
+                RecipeDAO.add_write_listener(cache.on_recipe_write, imports=False)
+                _shared_cache = cache
+    return _shared_cache
@@ -1,12 +1,13 @@
 from __future__ import annotations
 
+from collections.abc import Sequence
 from dataclasses import dataclass
 from datetime import date
 
 from dao.db_connection import DBConnection
 from dao.ingredient_dao import IngredientDAO
 from dao.stock_dao import StockDAO
-from dao.stock_item_dao import StockItemDAO, StockItemRow
+from dao.stock_item_dao import IngredientConsumption, StockItemDAO, StockItemRow
 from utils.log_decorator import log
 
 
@@ -26,6 +27,18 @@ class ValidationError(StockServiceError):
     """Données invalides."""
 
 
+class InsufficientStockError(StockServiceError):
+    """Stock insuffisant pour un ou plusieurs ingrédients.
+
+    Attributes:
+        shortages: Ingrédients manquants (quantités demandée et disponible).
+    """
+
+    def __init__(self, message: str, shortages: list[IngredientConsumption]):
+        super().__init__(message)
+        self.shortages = shortages
+
+
 @dataclass(frozen=True, slots=True)
 class ConsumeResult:
     """Résultat d'une consommation de stock.
@@ -48,6 +61,62 @@ class ConsumeAllStocksResult:
     by_stock: dict[int, float]  # stock_id -> qty consommée
 
 
+@dataclass(frozen=True, slots=True)
+class CookRecipeResult:
+    """Résultat de la consommation des ingrédients d'une recette.
+
+    Attributes:
+        recipe_id: Identifiant de la recette.
+        portions: Portions cuisinées (None si la recette n'en précise pas).
+        ingredients: Consommation par ingrédient.
+    """
+
+    recipe_id: int
+    portions: int | None
+    ingredients: list[ConsumeAllStocksResult]
+
+
+@dataclass(frozen=True, slots=True)
+class NewLot:
+    """Lot à ajouter lors d'un import groupé."""
+
+    ingredient_id: int
+    quantity: float
+    expiration_date: date | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class LotImportError:
+    """Lot refusé lors d'un import groupé.
+
+    Attributes:
+        index: Position du lot dans la requête.
+        ingredient_id: Ingrédient du lot.
+        message: Raison du refus.
+    """
+
+    index: int
+    ingredient_id: int
+    message: str
+
+
+@dataclass(frozen=True, slots=True)
+class BulkAddLotsResult:
+    """Résultat d'un import groupé de lots.
+
+    Attributes:
+        created: {position dans la requête: stock_item_id créé}.
+        errors: Lots refusés (les autres sont créés).
+    """
+
+    created: dict[int, int]
+    errors: list[LotImportError]
+
+
+# Plus grande quantité représentable par stock_item.quantity (NUMERIC(10,2))
+_MAX_LOT_QUANTITY = 99_999_999.99
+
+
 class StockService:
     """Service métier pour relier stock, lots (stock_item) et ingrédients.
 
@@ -59,6 +128,8 @@ class StockService:
     Notes:
         - Les DAO font les commits/rollbacks sur leurs opérations.
         - Les règles de droits sont centralisées ici (pas dans les DAO).
+        - Une instance est créée par requête (`get_stock_service`) : les
+          droits déjà vérifiés y sont mémorisés le temps de la requête.
     """
 
     def __init__(
@@ -72,6 +143,8 @@ class StockService:
         self._stock_dao = stock_dao or StockDAO()
         self._stock_item_dao = stock_item_dao or StockItemDAO()
         self._ingredient_dao = ingredient_dao or IngredientDAO()
+        # (user_id, stock_id) dont l'existence et la propriété sont vérifiées
+        self._owned_stocks: set[tuple[int, int]] = set()
 
     # ------------------------------------------------------------------
     # Helpers droits / existence
@@ -98,6 +171,9 @@ class StockService:
         Returns:
             bool: True si l'utilisateur possède le stock.
         """
+        if (user_id, stock_id) in self._owned_stocks:
+            return True
+
         conn = DBConnection().connection
         with conn.cursor() as cur:
             cur.execute(
@@ -109,17 +185,63 @@ class StockService:
                 """,
                 (user_id, stock_id),
             )
-            return cur.fetchone() is not None
+            owned = cur.fetchone() is not None
+
+        if owned:
+            self._owned_stocks.add((user_id, stock_id))
+        return owned
 
     def _require_stock_ownership(self, *, user_id: int, stock_id: int) -> None:
         """Lève une exception si l'utilisateur ne possède pas le stock."""
         if not self._user_owns_stock(user_id=user_id, stock_id=stock_id):
             raise ForbiddenError("Vous n'avez pas accès à ce stock.")
 
-    def _require_stock_exists(self, stock_id: int) -> None:
-        """Lève une exception si le stock n'existe pas."""
-        if self._stock_dao.get_stock_by_id(stock_id, with_items=False) is None:
+    def _require_stock_access(
+        self,
+        *,
+        user_id: int,
+        stock_id: int,
+        ingredient_id: int | None = None,
+    ) -> None:
+        """Vérifie en une requête : stock existant, possédé par l'utilisateur
+        et (optionnellement) ingrédient existant.
+
+        Raises:
+            NotFoundError: Si le stock ou l'ingrédient n'existe pas.
+            ForbiddenError: Si le stock n'appartient pas à l'utilisateur.
+        """
+        if ingredient_id is None and (user_id, stock_id) in self._owned_stocks:
+            return
+
+        conn = DBConnection().connection
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                SELECT
+                    EXISTS (
+                        SELECT 1 FROM stock WHERE stock_id = %s
+                    ) AS stock_exists,
+                    EXISTS (
+                        SELECT 1
+                        FROM user_stock
+                        WHERE fk_user_id = %s AND fk_stock_id = %s
+                    ) AS owned,
+                    EXISTS (
+                        SELECT 1 FROM ingredient WHERE ingredient_id = %s
+                    ) AS ingredient_exists
+                """,
+                (stock_id, user_id, stock_id, ingredient_id),
+            )
+            row = cur.fetchone()
+
+        if not row["stock_exists"]:
             raise NotFoundError("Stock introuvable.")
+        if not row["owned"]:
+            raise ForbiddenError("Vous n'avez pas accès à ce stock.")
+        self._owned_stocks.add((user_id, stock_id))
+
+        if ingredient_id is not None and not row["ingredient_exists"]:
+            raise NotFoundError("Ingrédient introuvable.")
 
     def _require_ingredient_exists(self, ingredient_id: int) -> None:
         """Lève une exception si l'ingrédient n'existe pas."""
@@ -194,9 +316,9 @@ class StockService:
         """
         self._assert_positive(quantity, "quantity")
 
-        self._require_stock_exists(stock_id)
-        self._require_stock_ownership(user_id=user_id, stock_id=stock_id)
-        self._require_ingredient_exists(ingredient_id)
+        self._require_stock_access(
+            user_id=user_id, stock_id=stock_id, ingredient_id=ingredient_id
+        )
 
         return self._stock_item_dao.create_stock_item(
             stock_id=stock_id,
@@ -205,6 +327,68 @@ class StockService:
             expiration_date=expiration_date,
         )
 
+    @log
+    def add_lots_bulk(
+        self,
+        *,
+        user_id: int,
+        stock_id: int,
+        lots: Sequence[NewLot],
+    ) -> BulkAddLotsResult:
+        """Ajoute plusieurs lots à un stock de l'utilisateur en une requête.
+
+        Les droits sont vérifiés une fois ; chaque lot invalide (quantité,
+        ingrédient inconnu) est signalé sans empêcher la création des autres.
+
+        Args:
+            user_id: Identifiant utilisateur.
+            stock_id: Identifiant du stock.
+            lots: Lots à ajouter.
+
+        Returns:
+            BulkAddLotsResult: Lots créés et lots refusés (par position).
+
+        Raises:
+            NotFoundError: Si le stock n'existe pas
+            ForbiddenError: Si le stock n'appartient pas au user
+        """
+        self._require_stock_access(user_id=user_id, stock_id=stock_id)
+
+        errors: list[LotImportError] = []
+        valid: list[tuple[int, NewLot]] = []
+        for index, lot in enumerate(lots):
+            try:
+                self._assert_positive(lot.quantity, "quantity")
+            except ValidationError as exc:
+                errors.append(LotImportError(index, lot.ingredient_id, str(exc)))
+                continue
+            if float(lot.quantity) > _MAX_LOT_QUANTITY:
+                errors.append(
+                    LotImportError(index, lot.ingredient_id, "quantity trop grande.")
+                )
+                continue
+            valid.append((index, lot))
+
+        inserted = self._stock_item_dao.create_stock_items(
+            stock_id=stock_id,
+            items=[
+                (lot.ingredient_id, float(lot.quantity), lot.expiration_date)
+                for _, lot in valid
+            ],
+        )
+
+        created: dict[int, int] = {}
+        for position, (index, lot) in enumerate(valid):
+            if position in inserted:
+                created[index] = inserted[position]
+            else:
+                errors.append(
+                    LotImportError(index, lot.ingredient_id, "Ingrédient introuvable.")
+                )
+
+        errors.sort(key=lambda e: e.index)
+        return BulkAddLotsResult(created=created, errors=errors)
+
     @log
     def list_lots(
         self,
@@ -223,8 +407,7 @@ class StockService:
         Returns:
             list[StockItemRow]: Lots triés FEFO.
         """
-        self._require_stock_exists(stock_id)
-        self._require_stock_ownership(user_id=user_id, stock_id=stock_id)
+        self._require_stock_access(user_id=user_id, stock_id=stock_id)
 
         return self._stock_item_dao.list_stock_items(
             stock_id=stock_id,
@@ -282,9 +465,9 @@ class StockService:
         """
         self._assert_positive(quantity, "quantity")
 
-        self._require_stock_exists(stock_id)
-        self._require_stock_ownership(user_id=user_id, stock_id=stock_id)
-        self._require_ingredient_exists(ingredient_id)
+        self._require_stock_access(
+            user_id=user_id, stock_id=stock_id, ingredient_id=ingredient_id
+        )
 
         # Transaction FEFO gérée dans le DAO (FOR UPDATE)
         self._stock_item_dao.consume_quantity_fefo(
@@ -301,14 +484,13 @@ class StockService:
 
     @log
     def delete_stock(self, *, user_id: int, stock_id: int) -> bool:
-        self._require_stock_exists(stock_id)
-        self._require_stock_ownership(user_id=user_id, stock_id=stock_id)
+        self._require_stock_access(user_id=user_id, stock_id=stock_id)
+        self._owned_stocks.discard((user_id, stock_id))
         return self._stock_dao.delete_stock(stock_id)
 
     @log
     def empty_stock(self, *, user_id: int, stock_id: int) -> int:
-        self._require_stock_exists(stock_id)
-        self._require_stock_ownership(user_id=user_id, stock_id=stock_id)
+        self._require_stock_access(user_id=user_id, stock_id=stock_id)
         return self._stock_item_dao.delete_stock_items_by_stock(stock_id=stock_id)
 
     @log
@@ -358,6 +540,69 @@ class StockService:
             by_stock=by_stock,
         )
 
+    @log
+    def cook_recipe(
+        self,
+        *,
+        user_id: int,
+        recipe_id: int,
+        portions: int | None = None,
+    ) -> CookRecipeResult:
+        """Consomme (FEFO, tous stocks du user) tous les ingrédients d'une recette.
+
+        Tout est fait en une transaction : si un ingrédient manque, rien
+        n'est consommé.
+
+        Args:
+            user_id: Identifiant utilisateur.
+            recipe_id: Identifiant de la recette.
+            portions: Portions à cuisiner (None = portions de la recette) ;
+                les quantités sont mises à l'échelle comme
+                `Recipe.scale_portions`, arrondies au centième.
+
+        Returns:
+            CookRecipeResult: Quantités consommées par ingrédient et par stock.
+
+        Raises:
+            ValidationError: Si portions <= 0, ou si la recette n'a pas de
+                nombre de portions alors que `portions` est donné
+            NotFoundError: Si la recette n'existe pas
+            InsufficientStockError: Si au moins un ingrédient manque
+        """
+        if portions is not None:
+            self._assert_positive(portions, "portions")
+
+        try:
+            consumption = self._stock_item_dao.consume_recipe_fefo_for_user(
+                user_id=user_id,
+                recipe_id=recipe_id,
+                portions=portions,
+            )
+        except ValueError as exc:
+            raise ValidationError(str(exc)) from exc
+        if consumption is None:
+            raise NotFoundError("Recette introuvable.")
+
+        shortages = consumption.shortages
+        if shortages:
+            raise InsufficientStockError(
+                f"Stock insuffisant pour {len(shortages)} ingrédient(s).",
+                shortages,
+            )
+
+        return CookRecipeResult(
+            recipe_id=consumption.recipe_id,
+            portions=consumption.portions,
+            ingredients=[
+                ConsumeAllStocksResult(
+                    ingredient_id=i.ingredient_id,
+                    consumed_quantity=i.required,
+                    by_stock=i.by_stock,
+                )
+                for i in consumption.ingredients
+            ],
+        )
+
     @log
     def admin_list_stocks_by_name(self, *, name: str, with_items: bool = False):
         """Admin: récupère tous les stocks ayant ce nom, même s'ils ne sont pas au user.
@@ -0,0 +1,126 @@
+"""Cache court des utilisateurs existants (contrôle d'accès des routes)."""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from collections.abc import Callable
+import threading
+import time
+
+
+class UserExistenceCache:
+    """Cache LRU borné, avec durée de vie, des utilisateurs trouvés en base.
+
+    Seuls les utilisateurs trouvés en base sont mémorisés. Les écritures de
+    `UserService` (suppression, mise à jour par un admin...) invalident
+    l'entrée concernée ; la durée de vie borne le retard des autres cas
+    (autre processus, modification directe en base).
+
+    Chaque invalidation est datée par un compteur : un utilisateur lu avant
+    l'invalidation de son entrée (`put(..., generation=...)`) n'est pas
+    mémorisé, sans quoi un compte supprimé pendant la lecture serait réadmis.
+    """
+
+    def __init__(
+        self,
+        *,
+        ttl_seconds: float = 30.0,
+        max_entries: int = 10_000,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if ttl_seconds <= 0:
+            raise ValueError("ttl_seconds must be > 0")
+        if max_entries < 1:
+            raise ValueError("max_entries must be >= 1")
+
+        self._ttl = float(ttl_seconds)
+        self._max_entries = int(max_entries)
+        self._clock = clock
+        self._lock = threading.Lock()
+        # user_id -> expiration, du moins au plus récemment utilisé
+        self._entries: OrderedDict[int, float] = OrderedDict()
+        # Compteur d'invalidations ; user_id -> valeur à sa dernière
+        # invalidation (bornée : au-delà, `_floor` garde la plus récente des
+        # valeurs oubliées)
+        self._generation = 0
+        self._invalidated: OrderedDict[int, int] = OrderedDict()
+        self._floor = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def contains(self, user_id: int) -> bool:
+        """Vrai si l'utilisateur est connu et son entrée encore fraîche."""
+        key = int(user_id)
+        with self._lock:
+            expires_at = self._entries.get(key)
+            if expires_at is None:
+                return False
+            if expires_at <= self._clock():
+                del self._entries[key]
+                return False
+            self._entries.move_to_end(key)
+            return True
+
+    def generation(self) -> int:
+        """Génération courante, à relever avant de lire l'utilisateur en base."""
+        with self._lock:
+            return self._generation
+
+    def put(self, user_id: int, *, generation: int | None = None) -> None:
+        """Mémorise l'utilisateur, sauf si son entrée a été invalidée depuis
+        `generation` (lecture potentiellement périmée)."""
+        key = int(user_id)
+        with self._lock:
+            if (
+                generation is not None
+                and self._invalidated.get(key, self._floor) > generation
+            ):
+                return
+            self._entries[key] = self._clock() + self._ttl
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: int) -> None:
+        key = int(user_id)
+        with self._lock:
+            self._entries.pop(key, None)
+            self._generation += 1
+            self._invalidated[key] = self._generation
+            self._invalidated.move_to_end(key)
+            while len(self._invalidated) > self._max_entries:
+                _key, forgotten = self._invalidated.popitem(last=False)
+                self._floor = max(self._floor, forgotten)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+            self._invalidated.clear()
+            self._floor = self._generation
+
+
+_shared_cache: UserExistenceCache | None = None
+_shared_lock = threading.Lock()
+
+
+def shared_user_cache(
+    *, ttl_seconds: float = 30.0, max_entries: int = 10_000
+) -> UserExistenceCache:
+    """Cache partagé par le processus. Les paramètres ne sont pris en compte
+    qu'au premier appel."""
+    global _shared_cache
+    if _shared_cache is None:
+        with _shared_lock:
+            if _shared_cache is None:
+                _shared_cache = UserExistenceCache(
+                    ttl_seconds=ttl_seconds, max_entries=max_entries
+                )
+    return _shared_cache
+
+
+def invalidate_cached_user(user_id: int) -> None:
+    """Retire `user_id` du cache partagé (s'il a été créé)."""
+    if _shared_cache is not None:
+        _shared_cache.invalidate(user_id)
@@ -5,6 +5,7 @@ import secrets
 import string
 
 from business_objects.user import User
+from dao.pagination import Page
 from dao.user_dao import UserDAO, UserRow
 
 # ---------------------------------------------------------------------
@@ -16,8 +17,9 @@ from exceptions import (
     UserEmailAlreadyExistsError,
     UserNotFoundError,
 )
+from services.user_cache import invalidate_cached_user
 from utils.log_decorator import log
-from utils.securite import check_password, hash_password
+from utils.password_pool import check_password, hash_password
 
 
 class UserServiceError(Exception):
@@ -92,6 +94,19 @@ class UserService:
         """
         return self._user_dao.get_all_users(limit=limit)
 
+    @log
+    def get_users_page(
+        self, *, limit: int = 50, after: str | None = None
+    ) -> Page[User]:
+        """
+        Récupère une page d'utilisateurs (pagination par curseur, tri par id).
+
+        :param limit: Taille de la page
+        :param after: Curseur `next_cursor` de la page précédente (None = début)
+        :raises InvalidCursorError: si le curseur est illisible
+        """
+        return self._user_dao.get_users_page(limit=limit, after=after)
+
     # --------------------------------------------------------------
     # Inscription / Auth
     # --------------------------------------------------------------
@@ -177,6 +192,7 @@ class UserService:
             email=email,
             status=status,
         )
+        invalidate_cached_user(user_id)
         if updated is None:
             raise UserNotFoundError(f"Utilisateur {user_id} introuvable.")
         return updated
@@ -209,6 +225,8 @@ class UserService:
     @log
     def delete_user(self, user_id: int) -> None:
         ok = self._user_dao.delete_user(user_id)
+        # Contrôle d'accès des routes : l'utilisateur ne doit plus être admis
+        invalidate_cached_user(user_id)
         if not ok:
             raise UserNotFoundError(f"Utilisateur {user_id} introuvable.")
 
@@ -276,6 +294,7 @@ class UserService:
             status=None,
         )
 
+        invalidate_cached_user(user_id)
         if updated is None:
             raise UserNotFoundError(f"Utilisateur {user_id} introuvable.")
         return updated
@@ -322,6 +341,7 @@ class UserService:
             status=status,
             password_hash=password_hash,
         )
+        invalidate_cached_user(user_id)
         if updated is None:
             raise UserNotFoundError(f"Utilisateur {user_id} introuvable.")
 
@@ -99,3 +99,34 @@ def test_admin_update_conflict_email_returns_409(client):
         json={"email": "conflict2@example.com"},
     )
     assert r.status_code == 409, r.text
+
+
+def test_users_cursor_pagination_walks_all_users(client):
+    admin_access = _login_and_get_access(client, "admin@example.com", "mdpAdmin123")
+    headers = {"Authorization": f"Bearer {admin_access}"}
+
+    everyone = client.get("/api/users/", headers=headers).json()
+
+    seen = []
+    params = {"limit": 2}
+    while True:
+        r = client.get("/api/users/", headers=headers, params=params)
+        assert r.status_code == 200, r.text
+        seen.extend(u["user_id"] for u in r.json())
+        cursor = r.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+        params = {"limit": 2, "cursor": cursor}
+
+    assert seen == [u["user_id"] for u in everyone]
+
+
+def test_users_invalid_cursor_400(client):
+    admin_access = _login_and_get_access(client, "admin@example.com", "mdpAdmin123")
+
+    r = client.get(
+        "/api/users/",
+        headers={"Authorization": f"Bearer {admin_access}"},
+        params={"cursor": "@@@"},
+    )
+    assert r.status_code == 400
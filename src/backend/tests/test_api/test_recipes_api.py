@@ -6,6 +6,7 @@ import pytest
 
 from business_objects.recipe import Recipe
 from business_objects.user import GenericUser
+from dao.pagination import Page
 from services.find_recipe import IngredientSearchQuery
 from services.find_recipe_factory import FindRecipeFactory
 
@@ -100,3 +101,27 @@ def test_search_by_ingredients_deduplicates_ids(finder, db, api):
 
     res = finder.search_by_ingredients(q)
     assert [r.recipe_id for r in res] == [1, 2, 3]
+
+
+def test_list_recipes_include_relations_uses_batch_dao(client, mocker):
+    r = Recipe(recipe_id=1, creator=_user(1), status="draft", prep_time=5, portions=2)
+    r.add_translation("fr", "Crêpes", "")
+    r.add_ingredient(ingredient_id=101, quantity=2.0)
+    r.tags = [(7, "dessert")]
+
+    # Route utilise RecipeDAO directement (import local), donc on patch le vrai module
+    recipe_dao_instance = mocker.Mock()
+    recipe_dao_instance.list_recipes_page.return_value = Page(items=[r])
+    mocker.patch("dao.recipe_dao.RecipeDAO", return_value=recipe_dao_instance)
+
+    resp = client.get("api/recipes", params={"include_relations": True})
+    assert resp.status_code == 200
+
+    body = resp.json()
+    assert body[0]["ingredients"] == [{"ingredient_id": 101, "quantity": 2.0}]
+    assert body[0]["tags"] == [{"tag_id": 7, "name": "dessert"}]
+
+    recipe_dao_instance.list_recipes_page.assert_called_once_with(
+        name_ilike=None, limit=50, after=None, with_relations=True
+    )
+    recipe_dao_instance.get_recipe_by_id.assert_not_called()
@@ -6,10 +6,22 @@ from datetime import date
 from fastapi.testclient import TestClient
 import pytest
 
-from api.deps import get_current_user_checked_exists, get_stock_service
+from api.deps import (
+    NEXT_CURSOR_HEADER,
+    get_current_user_checked_exists,
+    get_stock_service,
+)
 from api.main import app
+from dao.pagination import InvalidCursorError, Page
+from dao.stock_item_dao import IngredientConsumption
 from services.stock_service import (
+    BulkAddLotsResult,
+    ConsumeAllStocksResult,
+    CookRecipeResult,
     ForbiddenError,
+    InsufficientStockError,
+    LotImportError,
+    NewLot,
     NotFoundError,
     ValidationError,
 )
@@ -102,10 +114,13 @@ def test_list_my_stocks_ok(client, auth_user_override, mocker):
 
     # Route utilise StockDAO directement (import local), donc on patch le vrai module
     stock_dao_instance = mocker.Mock()
-    stock_dao_instance.list_user_stocks.return_value = [
-        FakeStock(id_stock=1, nom="Cuisine"),
-        FakeStock(id_stock=2, nom="Garage"),
-    ]
+    stock_dao_instance.list_user_stocks_page.return_value = Page(
+        items=[
+            FakeStock(id_stock=1, nom="Cuisine"),
+            FakeStock(id_stock=2, nom="Garage"),
+        ],
+        next_cursor=None,
+    )
     mocker.patch("dao.stock_dao.StockDAO", return_value=stock_dao_instance)
 
     resp = client.get("api/stocks")
@@ -114,13 +129,62 @@ def test_list_my_stocks_ok(client, auth_user_override, mocker):
         {"stock_id": 1, "name": "Cuisine"},
         {"stock_id": 2, "name": "Garage"},
     ]
+    assert NEXT_CURSOR_HEADER not in resp.headers
 
-    stock_dao_instance.list_user_stocks.assert_called_once_with(
+    stock_dao_instance.list_user_stocks_page.assert_called_once_with(
         user_id=42,
         name_ilike=None,
         limit=200,
-        offset=0,
+        after=None,
+    )
+
+
+def test_list_my_stocks_cursor_sets_next_cursor_header(
+    client, auth_user_override, mocker
+):
+    app.dependency_overrides[get_current_user_checked_exists] = auth_user_override
+
+    stock_dao_instance = mocker.Mock()
+    stock_dao_instance.list_user_stocks_page.return_value = Page(
+        items=[FakeStock(id_stock=3, nom="Cave")], next_cursor="next"
+    )
+    mocker.patch("dao.stock_dao.StockDAO", return_value=stock_dao_instance)
+
+    resp = client.get("api/stocks", params={"cursor": "abc", "limit": 1})
+    assert resp.status_code == 200
+    assert resp.json() == [{"stock_id": 3, "name": "Cave"}]
+    assert resp.headers[NEXT_CURSOR_HEADER] == "next"
+
+    stock_dao_instance.list_user_stocks_page.assert_called_once_with(
+        user_id=42, name_ilike=None, limit=1, after="abc"
+    )
+
+
+def test_list_my_stocks_invalid_cursor_400(client, auth_user_override, mocker):
+    app.dependency_overrides[get_current_user_checked_exists] = auth_user_override
+
+    stock_dao_instance = mocker.Mock()
+    stock_dao_instance.list_user_stocks_page.side_effect = InvalidCursorError("bad")
+    mocker.patch("dao.stock_dao.StockDAO", return_value=stock_dao_instance)
+
+    resp = client.get("api/stocks", params={"cursor": "zzz"})
+    assert resp.status_code == 400
+
+
+def test_list_my_stocks_offset_keeps_legacy_path(client, auth_user_override, mocker):
+    app.dependency_overrides[get_current_user_checked_exists] = auth_user_override
+
+    stock_dao_instance = mocker.Mock()
+    stock_dao_instance.list_user_stocks.return_value = []
+    mocker.patch("dao.stock_dao.StockDAO", return_value=stock_dao_instance)
+
+    resp = client.get("api/stocks", params={"offset": 10})
+    assert resp.status_code == 200
+
+    stock_dao_instance.list_user_stocks.assert_called_once_with(
+        user_id=42, name_ilike=None, limit=200, offset=10
     )
+    stock_dao_instance.list_user_stocks_page.assert_not_called()
 
 
 def test_get_my_stock_by_name_none(client, auth_user_override, stock_service_mock):
@@ -394,6 +458,136 @@ def mocker_consume_all_result(
     return _Res()
 
 
+# ---------------------------------------------------------------------
+# add_lots_bulk (/{stock_id}/lots/bulk)
+# ---------------------------------------------------------------------
+
+
+def test_add_lots_bulk_ok(client, auth_user_override, stock_service_mock):
+    app.dependency_overrides[get_current_user_checked_exists] = auth_user_override
+    app.dependency_overrides[get_stock_service] = lambda: stock_service_mock
+
+    stock_service_mock.add_lots_bulk.return_value = BulkAddLotsResult(
+        created={0: 101},
+        errors=[LotImportError(1, 999, "Ingrédient introuvable.")],
+    )
+
+    resp = client.post(
+        "api/stocks/1/lots/bulk",
+        json={
+            "items": [
+                {"ingredient_id": 7, "quantity": 1.5, "expiration_date": "2026-03-01"},
+                {"ingredient_id": 999, "quantity": 1.0},
+            ]
+        },
+    )
+    assert resp.status_code == 200
+    assert resp.json() == {
+        "created": [{"index": 0, "stock_item_id": 101}],
+        "errors": [
+            {"index": 1, "ingredient_id": 999, "detail": "Ingrédient introuvable."}
+        ],
+    }
+
+    stock_service_mock.add_lots_bulk.assert_called_once_with(
+        user_id=42,
+        stock_id=1,
+        lots=[NewLot(7, 1.5, date(2026, 3, 1)), NewLot(999, 1.0, None)],
+    )
+
+
+def test_add_lots_bulk_rejects_empty_list(
+    client, auth_user_override, stock_service_mock
+):
+    app.dependency_overrides[get_current_user_checked_exists] = auth_user_override
+    app.dependency_overrides[get_stock_service] = lambda: stock_service_mock
+
+    resp = client.post("api/stocks/1/lots/bulk", json={"items": []})
+    assert resp.status_code == 422
+    stock_service_mock.add_lots_bulk.assert_not_called()
+
+
+def test_add_lots_bulk_forbidden(client, auth_user_override, stock_service_mock):
+    app.dependency_overrides[get_current_user_checked_exists] = auth_user_override
+    app.dependency_overrides[get_stock_service] = lambda: stock_service_mock
+
+    stock_service_mock.add_lots_bulk.side_effect = ForbiddenError("nope")
+
+    resp = client.post(
+        "api/stocks/1/lots/bulk", json={"items": [{"ingredient_id": 7, "quantity": 1}]}
+    )
+    assert resp.status_code == 403
+
+
+# ---------------------------------------------------------------------
+# cook_recipe (/cook)
+# ---------------------------------------------------------------------
+
+
+def test_cook_recipe_ok(client, auth_user_override, stock_service_mock):
+    app.dependency_overrides[get_current_user_checked_exists] = auth_user_override
+    app.dependency_overrides[get_stock_service] = lambda: stock_service_mock
+
+    stock_service_mock.cook_recipe.return_value = CookRecipeResult(
+        recipe_id=3,
+        portions=2,
+        ingredients=[
+            ConsumeAllStocksResult(
+                ingredient_id=7, consumed_quantity=2.0, by_stock={1: 1.5, 2: 0.5}
+            )
+        ],
+    )
+
+    resp = client.post("api/stocks/cook", json={"recipe_id": 3, "portions": 2})
+    assert resp.status_code == 200
+    assert resp.json() == {
+        "recipe_id": 3,
+        "portions": 2,
+        "ingredients": [
+            {
+                "ingredient_id": 7,
+                "consumed_quantity": 2.0,
+                "by_stock": {"1": 1.5, "2": 0.5},
+            }
+        ],
+    }
+
+    stock_service_mock.cook_recipe.assert_called_once_with(
+        user_id=42, recipe_id=3, portions=2
+    )
+
+
+def test_cook_recipe_insufficient_stock(client, auth_user_override, stock_service_mock):
+    app.dependency_overrides[get_current_user_checked_exists] = auth_user_override
+    app.dependency_overrides[get_stock_service] = lambda: stock_service_mock
+
+    stock_service_mock.cook_recipe.side_effect = InsufficientStockError(
+        "Stock insuffisant pour 1 ingrédient(s).",
+        [
+            IngredientConsumption(
+                ingredient_id=8, required=3.0, available=1.0, by_stock={}
+            )
+        ],
+    )
+
+    resp = client.post("api/stocks/cook", json={"recipe_id": 3})
+    assert resp.status_code == 409
+    assert resp.json()["detail"] == {
+        "message": "Stock insuffisant pour 1 ingrédient(s).",
+        "shortages": [{"ingredient_id": 8, "required": 3.0, "available": 1.0}],
+    }
+
+
+def test_cook_recipe_not_found(client, auth_user_override, stock_service_mock):
+    app.dependency_overrides[get_current_user_checked_exists] = auth_user_override
+    app.dependency_overrides[get_stock_service] = lambda: stock_service_mock
+
+    stock_service_mock.cook_recipe.side_effect = NotFoundError("Recette introuvable.")
+
+    resp = client.post("api/stocks/cook", json={"recipe_id": 999})
+    assert resp.status_code == 404
+
+
 # ---------------------------------------------------------------------
 # admin_get_stocks_by_name (/by-name-admin/{name})
 # ---------------------------------------------------------------------
@@ -3,6 +3,7 @@ from datetime import date, timedelta
 import pytest
 
 from business_objects.stock import Stock
+from business_objects.stock_item import StockItem
 
 
 # ---------------------------
@@ -102,3 +103,59 @@ def test_add_invalid_id_type(stock):
 def test_get_total_quantity_missing(stock):
     """Vérifie qu'un ID inconnu retourne 0."""
     assert stock.get_total_quantity(999) == 0
+
+
+def test_add_item_does_not_print(stock, capsys):
+    """Vérifie que l'ajout n'écrit rien sur la sortie standard."""
+    stock.add_item(10, 101, 5.0, date.today())
+
+    assert capsys.readouterr().out == ""
+
+
+# ---------------------------
+# Tests de l'ordre FEFO
+# ---------------------------
+
+
+def test_lots_iterate_in_fefo_order_keeping_insertion_order_on_ties(stock):
+    """Vérifie l'ordre FEFO, l'ordre d'ajout départageant les dates égales."""
+    today = date.today()
+    stock.add_item(60, 603, 1, today + timedelta(days=5))
+    stock.add_item(60, 601, 1, today)
+    stock.add_item(60, 602, 1, today)
+
+    assert [lot.id_lot for lot in stock.items_by_ingredient[60]] == [601, 602, 603]
+    assert stock.items_by_ingredient[60][1].id_lot == 602
+
+
+def test_add_items_sorted_bulk_load(stock):
+    """Vérifie le chargement en bloc de lots déjà triés (cas du DAO)."""
+    today = date.today()
+    stock.add_items_sorted(
+        [
+            StockItem(70, 701, 2, today),
+            StockItem(71, 711, 4, today),
+            StockItem(70, 702, 3, today + timedelta(days=3)),
+        ]
+    )
+
+    assert [lot.id_lot for lot in stock.items_by_ingredient[70]] == [701, 702]
+    assert stock.get_total_quantity(71) == 4
+
+    stock.remove_quantity(70, 4)
+    assert [lot.id_lot for lot in stock.items_by_ingredient[70]] == [702]
+    assert stock.get_total_quantity(70) == 1
+
+
+def test_add_items_sorted_recovers_from_unsorted_input(stock):
+    """Vérifie que des lots non triés (ou un stock non vide) restent FEFO."""
+    today = date.today()
+    stock.add_item(80, 800, 1, today + timedelta(days=1))
+    stock.add_items_sorted(
+        [
+            StockItem(80, 802, 1, today + timedelta(days=9)),
+            StockItem(80, 801, 1, today),
+        ]
+    )
+
+    assert [lot.id_lot for lot in stock.items_by_ingredient[80]] == [801, 800, 802]
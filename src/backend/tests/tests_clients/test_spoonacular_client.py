@@ -0,0 +1,462 @@
+from __future__ import annotations
+
+import threading
+
+import pytest
+import requests
+from urllib3.exceptions import MaxRetryError, NewConnectionError
+
+from clients import spoonacular_client as sc
+from clients.spoonacular_client import (
+    SpoonacularClient,
+    SpoonacularError,
+    SpoonacularRateLimiter,
+    SpoonacularResponseCache,
+)
+
+
+@pytest.fixture
+def client():
+    c = SpoonacularClient(retries=3, backoff_factor=0.1, pool_maxsize=4)
+    yield c
+    c.close()
+
+
+def fake_response(mocker, status_code=200, payload=None):
+    resp = mocker.Mock(status_code=status_code)
+    resp.json.return_value = payload if payload is not None else []
+    return resp
+
+
+# ---------------------------------------------------------------------
+# Tests : SpoonacularClient
+# ---------------------------------------------------------------------
+
+
+def test_session_is_reused_within_a_thread(client):
+    assert client.session is client.session
+
+
+def test_sessions_per_thread_share_one_pooled_adapter(client):
+    sessions: list[requests.Session] = []
+    t = threading.Thread(target=lambda: sessions.append(client.session))
+    t.start()
+    t.join()
+
+    other = sessions[0]
+    assert other is not client.session
+    assert other.get_adapter("https://api.spoonacular.com") is (
+        client.session.get_adapter("https://api.spoonacular.com")
+    )
+
+
+def test_adapter_retries_server_errors_only(client):
+    adapter = client.session.get_adapter("https://api.spoonacular.com")
+    retry = adapter.max_retries
+
+    assert adapter._pool_maxsize == 4
+    assert retry.total == 3
+    assert retry.backoff_factor == 0.1
+    assert set(retry.status_forcelist) == {500, 502, 503, 504}
+    assert 429 not in retry.status_forcelist
+    assert 402 not in retry.status_forcelist
+    assert retry.raise_on_status is False
+
+
+def test_get_builds_url_and_uses_default_timeout(client, mocker):
+    get = mocker.patch.object(client.session, "get", return_value=fake_response(mocker))
+
+    client.get("/recipes/complexSearch", {"number": 1})
+
+    get.assert_called_once_with(
+        "https://api.spoonacular.com/recipes/complexSearch",
+        params={"number": 1},
+        timeout=(5.0, 30.0),
+    )
+
+
+def test_get_converts_network_errors(client, mocker):
+    mocker.patch.object(
+        client.session, "get", side_effect=requests.ConnectionError("down")
+    )
+
+    with pytest.raises(SpoonacularError, match="Erreur réseau"):
+        client.get("recipes/complexSearch", {})
+
+
+def test_get_converts_timeouts(client, mocker):
+    mocker.patch.object(client.session, "get", side_effect=requests.Timeout("slow"))
+
+    with pytest.raises(SpoonacularError, match="Timeout"):
+        client.get("recipes/complexSearch", {}, timeout=1.0)
+
+
+# ---------------------------------------------------------------------
+# Tests : client partagé
+# ---------------------------------------------------------------------
+
+
+def test_default_client_is_shared_and_closable():
+    sc.close_default_client()
+    first = sc.default_client()
+    assert sc.default_client() is first
+
+    sc.close_default_client()
+    assert sc.default_client() is not first
+    sc.close_default_client()
+
+
+def test_functions_use_default_client_session_without_session(mocker):
+    session = mocker.Mock()
+    session.get.return_value = fake_response(mocker, payload=[{"id": 7}])
+    fake_client = mocker.Mock(session=session)
+    mocker.patch.object(sc, "default_client", return_value=fake_client)
+
+    ids = sc.find_recipe_ids_by_ingredients("key", ["egg"], n=1)
+
+    assert ids == [7]
+    session.get.assert_called_once()
+
+
+# ---------------------------------------------------------------------
+# Tests : SpoonacularResponseCache
+# ---------------------------------------------------------------------
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    return FakeClock()
+
+
+@pytest.fixture
+def cache(tmp_path, clock):
+    c = SpoonacularResponseCache(
+        tmp_path / "cache" / "spoonacular.sqlite3",
+        ttls={"recipes/complexSearch": 60, "recipes/informationBulk": 600},
+        max_bytes=200,
+        clock=clock,
+    )
+    yield c
+    c.close()
+
+
+def test_cache_key_ignores_api_key_and_param_order():
+    k1 = SpoonacularResponseCache.cache_key(
+        "recipes/complexSearch", {"apiKey": "a", "number": 2, "query": "egg"}
+    )
+    k2 = SpoonacularResponseCache.cache_key(
+        "/recipes/complexSearch", {"query": "egg", "number": "2", "apiKey": "b"}
+    )
+    k3 = SpoonacularResponseCache.cache_key(
+        "recipes/complexSearch", {"query": "egg", "number": 3}
+    )
+
+    assert k1 == k2
+    assert k1 != k3
+
+
+def test_cache_roundtrip_and_persistence(tmp_path, cache, clock):
+    cache.put("recipes/complexSearch", {"apiKey": "a", "q": 1}, {"results": [1]})
+
+    assert cache.get("recipes/complexSearch", {"apiKey": "b", "q": 1}) == {
+        "results": [1]
+    }
+
+    reopened = SpoonacularResponseCache(
+        tmp_path / "cache" / "spoonacular.sqlite3", clock=clock
+    )
+    try:
+        assert reopened.get("recipes/complexSearch", {"q": 1}) == {"results": [1]}
+    finally:
+        reopened.close()
+
+
+def test_cache_ttl_per_endpoint(cache, clock):
+    cache.put("recipes/complexSearch", {"q": 1}, [1])
+    cache.put("recipes/informationBulk", {"ids": "1"}, [2])
+    cache.put("recipes/findByIngredients", {"q": 1}, [3])  # non caché
+
+    clock.now += 61
+    assert cache.get("recipes/complexSearch", {"q": 1}) is None
+    assert cache.get("recipes/informationBulk", {"ids": "1"}) == [2]
+    assert cache.get("recipes/findByIngredients", {"q": 1}) is None
+
+
+def test_cache_evicts_least_recently_read_over_max_bytes(cache, clock):
+    payload = ["x" * 60]  # ~66 octets en JSON
+    cache.put("recipes/complexSearch", {"q": 1}, payload)
+    clock.now += 1
+    cache.put("recipes/complexSearch", {"q": 2}, payload)
+    clock.now += 1
+    cache.get("recipes/complexSearch", {"q": 1})  # q=1 relu : plus récent
+    clock.now += 1
+    cache.put("recipes/complexSearch", {"q": 3}, payload)
+    clock.now += 1
+    cache.put("recipes/complexSearch", {"q": 4}, payload)
+
+    assert cache.total_bytes() <= 200
+    assert cache.get("recipes/complexSearch", {"q": 2}) is None
+    assert cache.get("recipes/complexSearch", {"q": 4}) == payload
+
+
+def test_cache_hits_batch_access_time_writes(cache, clock, monkeypatch):
+    monkeypatch.setattr(SpoonacularResponseCache, "TOUCH_BATCH_SIZE", 2)
+    cache.put("recipes/complexSearch", {"q": 1}, [1])
+    cache.put("recipes/complexSearch", {"q": 2}, [2])
+    writes = cache._conn.total_changes
+
+    clock.now += 1
+    assert cache.get("recipes/complexSearch", {"q": 1}) == [1]
+    assert cache._conn.total_changes == writes  # lecture sans écriture
+
+    assert cache.get("recipes/complexSearch", {"q": 2}) == [2]
+    assert cache._conn.total_changes == writes + 2  # un lot de 2 accès
+    rows = cache._conn.execute("SELECT last_access FROM response").fetchall()
+    assert {r[0] for r in rows} == {clock.now}
+
+
+def test_fetch_detailed_serves_repeats_from_cache(tmp_path, mocker):
+    session = mocker.Mock()
+    session.get.side_effect = [
+        fake_response(mocker, payload={"results": [{"id": 5, "title": "Omelette"}]}),
+        fake_response(mocker, payload=[{"id": 5, "title": "Omelette"}]),
+    ]
+    cache = SpoonacularResponseCache(tmp_path / "c.sqlite3")
+
+    try:
+        for api_key in ("key1", "key2"):
+            res = sc.fetch_detailed_recipes_by_ingredients(
+                api_key, ["egg"], n=1, session=session, cache=cache
+            )
+            assert [r.title for r in res] == ["Omelette"]
+    finally:
+        cache.close()
+
+    assert session.get.call_count == 2  # 1 complexSearch + 1 informationBulk
+
+
+def test_errors_are_not_cached(tmp_path, mocker):
+    session = mocker.Mock()
+    session.get.side_effect = [
+        fake_response(mocker, status_code=503, payload={"message": "down"}),
+        fake_response(mocker, payload=[{"id": 9}]),
+    ]
+    cache = SpoonacularResponseCache(tmp_path / "c.sqlite3")
+
+    try:
+        with pytest.raises(SpoonacularError):
+            sc.find_recipe_ids_by_ingredients(
+                "key", ["egg"], n=1, session=session, cache=cache
+            )
+        ids = sc.find_recipe_ids_by_ingredients(
+            "key", ["egg"], n=1, session=session, cache=cache
+        )
+    finally:
+        cache.close()
+
+    assert ids == [9]
+
+
+# ---------------------------------------------------------------------
+# Tests : SpoonacularRateLimiter
+# ---------------------------------------------------------------------
+
+
+class FakeTime:
+    """Horloges monotone / murale et sleep simulés."""
+
+    def __init__(self) -> None:
+        self.mono = 0.0
+        self.wall = 1_767_268_800.0  # 2026-01-01 12:00 UTC
+        self.slept: list[float] = []
+
+    def sleep(self, seconds: float) -> None:
+        self.slept.append(seconds)
+        self.mono += seconds
+
+
+@pytest.fixture
+def fake_time() -> FakeTime:
+    return FakeTime()
+
+
+def make_limiter(fake_time, **kwargs) -> SpoonacularRateLimiter:
+    params = {
+        "daily_budget": 10.0,
+        "rate_per_second": 2.0,
+        "burst": 2,
+        "max_wait": 1.0,
+        "clock": lambda: fake_time.mono,
+        "wall_clock": lambda: fake_time.wall,
+        "sleep": fake_time.sleep,
+    }
+    params.update(kwargs)
+    return SpoonacularRateLimiter(**params)
+
+
+def test_estimate_cost_follows_points_schedule():
+    assert sc.estimate_cost("recipes/complexSearch", {"number": 10}) == 1.1
+    assert sc.estimate_cost("recipes/informationBulk", {"ids": "1,2,3"}) == 2.0
+    assert sc.estimate_cost("food/jokes/random", {}) == 1.0
+    assert sc.estimate_search_cost(3) == pytest.approx(1.03 + 2.0)
+
+
+def test_token_bucket_allows_burst_then_waits(fake_time):
+    limiter = make_limiter(fake_time)
+
+    limiter.acquire()
+    limiter.acquire()
+    assert fake_time.slept == []
+
+    limiter.acquire()  # seau vide : attend un jeton (1 / 2 par seconde)
+    assert fake_time.slept == [0.5]
+
+
+def test_token_bucket_rejects_when_wait_too_long(fake_time):
+    limiter = make_limiter(fake_time, rate_per_second=0.5, burst=1)
+
+    limiter.acquire()
+    with pytest.raises(sc.SpoonacularRateLimitError, match="retry in 2.00s"):
+        limiter.acquire()
+
+
+def test_daily_budget_checked_locally(fake_time):
+    limiter = make_limiter(fake_time, daily_budget=3.0, rate_per_second=100.0)
+
+    assert limiter.would_exceed(2.5) is False
+    limiter.acquire(2.5)
+
+    assert limiter.remaining() == 0.5
+    assert limiter.would_exceed(1.0) is True
+    with pytest.raises(sc.SpoonacularRateLimitError, match="daily budget"):
+        limiter.acquire(1.0)
+
+
+def test_budget_is_persisted_and_resets_next_day(tmp_path, fake_time):
+    path = tmp_path / "quota.sqlite3"
+    first = make_limiter(fake_time, state_path=path)
+    first.acquire(4.0)
+    first.close()
+
+    second = make_limiter(fake_time, state_path=path)
+    assert second.remaining() == 6.0
+
+    fake_time.wall += 24 * 3600
+    assert second.remaining() == 10.0
+    second.close()
+
+
+def test_quota_headers_and_errors_update_budget(fake_time, mocker):
+    limiter = make_limiter(fake_time)
+
+    resp = mocker.Mock(headers={"X-API-Quota-Used": "7.5"})
+    limiter.observe(resp)
+    assert limiter.remaining() == 2.5
+
+    limiter.mark_exhausted()
+    assert limiter.would_exceed(0.01) is True
+
+
+def test_limiter_skips_upstream_when_budget_spent(fake_time, mocker):
+    limiter = make_limiter(fake_time, daily_budget=1.0)
+    session = mocker.Mock()
+
+    with pytest.raises(sc.SpoonacularRateLimitError):
+        sc.find_recipe_ids_by_ingredients(
+            "key", ["egg"], n=10, session=session, limiter=limiter
+        )
+    session.get.assert_not_called()
+
+
+def test_upstream_quota_error_exhausts_local_budget(fake_time, mocker):
+    limiter = make_limiter(fake_time)
+    session = mocker.Mock()
+    session.get.return_value = fake_response(
+        mocker, status_code=402, payload={"message": "quota"}
+    )
+
+    with pytest.raises(sc.SpoonacularRateLimitError):
+        sc.find_recipe_ids_by_ingredients(
+            "key", ["egg"], n=1, session=session, limiter=limiter
+        )
+    assert limiter.remaining() == 0.0
+
+
+def test_quota_left_header_at_zero_exhausts_budget(fake_time, mocker):
+    limiter = make_limiter(fake_time)
+
+    limiter.observe(mocker.Mock(headers={"X-API-Quota-Left": "0"}))
+
+    assert limiter.remaining() == 0.0
+
+
+def test_upstream_throttling_does_not_exhaust_daily_budget(fake_time, mocker):
+    limiter = make_limiter(fake_time, rate_per_second=1.0, max_wait=1.0)
+    session = mocker.Mock()
+    throttled = fake_response(mocker, status_code=429, payload={"message": "slow"})
+    throttled.headers = {"Retry-After": "3"}
+    session.get.return_value = throttled
+
+    with pytest.raises(sc.SpoonacularRateLimitError, match="429"):
+        sc.find_recipe_ids_by_ingredients(
+            "key", ["egg"], n=1, session=session, limiter=limiter
+        )
+
+    assert limiter.remaining() == pytest.approx(10.0 - 1.01)
+    # Retry-After respecté : pas de nouvel appel avant 3 s
+    with pytest.raises(sc.SpoonacularRateLimitError, match="retry in"):
+        limiter.acquire()
+    fake_time.mono += 3.0
+    limiter.acquire()
+    assert fake_time.slept == []
+
+
+@pytest.mark.parametrize(
+    "error",
+    [
+        requests.ConnectTimeout("connect timeout"),
+        requests.ConnectionError(
+            MaxRetryError(None, "/", NewConnectionError(None, "refused"))
+        ),
+    ],
+    ids=["connect-timeout", "refused"],
+)
+def test_connection_failure_gives_back_reserved_points(fake_time, mocker, error):
+    limiter = make_limiter(fake_time)
+    session = mocker.Mock()
+    session.get.side_effect = error
+
+    with pytest.raises(sc.SpoonacularConnectionError):
+        sc.find_recipe_ids_by_ingredients(
+            "key", ["egg"], n=1, session=session, limiter=limiter
+        )
+
+    assert limiter.remaining() == 10.0
+
+
+@pytest.mark.parametrize(
+    "error",
+    [requests.ReadTimeout("slow"), requests.ConnectionError("connection reset")],
+    ids=["read-timeout", "reset"],
+)
+def test_failure_after_sending_keeps_reserved_points(fake_time, mocker, error):
+    limiter = make_limiter(fake_time)
+    session = mocker.Mock()
+    session.get.side_effect = error
+
+    with pytest.raises(sc.SpoonacularError) as exc_info:
+        sc.find_recipe_ids_by_ingredients(
+            "key", ["egg"], n=1, session=session, limiter=limiter
+        )
+
+    # L'appel a pu être facturé par Spoonacular
+    assert not isinstance(exc_info.value, sc.SpoonacularConnectionError)
+    assert limiter.remaining() < 10.0
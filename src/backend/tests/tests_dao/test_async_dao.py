@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import threading
+
+import pytest
+
+from dao.async_dao import AsyncDAO, AsyncRecipeDAO, run_in_db_executor
+
+
+# ---------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------
+
+
+_marker: contextvars.ContextVar[str | None] = contextvars.ContextVar(
+    "marker", default=None
+)
+
+
+class FakeDAO:
+    table = "recipe"
+
+    def __init__(self):
+        self.calls = []
+
+    def list_recipes(self, *, limit: int = 50, offset: int = 0):
+        self.calls.append((limit, offset, threading.current_thread().name))
+        return ["r1", "r2"][:limit]
+
+    def delete_recipe(self, recipe_id: int) -> bool:
+        raise ValueError(f"boom {recipe_id}")
+
+    def read_marker(self):
+        return _marker.get()
+
+    def _private(self):
+        return "private"
+
+
+# ---------------------------------------------------------------------
+# Tests
+# ---------------------------------------------------------------------
+
+
+def test_async_dao_exposes_same_method_names():
+    fake = FakeDAO()
+    dao = AsyncDAO(fake)
+
+    res = asyncio.run(dao.list_recipes(limit=1))
+
+    assert res == ["r1"]
+    limit, offset, thread_name = fake.calls[0]
+    assert (limit, offset) == (1, 0)
+    assert thread_name.startswith("db")
+
+
+def test_async_dao_propagates_exceptions():
+    dao = AsyncDAO(FakeDAO())
+
+    with pytest.raises(ValueError, match="boom 3"):
+        asyncio.run(dao.delete_recipe(3))
+
+
+def test_async_dao_propagates_context_to_executor():
+    dao = AsyncDAO(FakeDAO())
+
+    async def _run():
+        _marker.set("request-1")
+        return await dao.read_marker()
+
+    assert asyncio.run(_run()) == "request-1"
+
+
+def test_async_dao_returns_private_and_plain_attributes_as_is():
+    fake = FakeDAO()
+    dao = AsyncDAO(fake)
+
+    assert dao.table == "recipe"
+    assert dao._private() == "private"
+    assert dao.sync is fake
+
+
+def test_async_recipe_dao_wraps_given_dao():
+    fake = FakeDAO()
+    dao = AsyncRecipeDAO(fake)
+
+    assert asyncio.run(dao.list_recipes(limit=2)) == ["r1", "r2"]
+
+
+def test_run_in_db_executor_passes_args_and_kwargs():
+    def _add(a, b, *, c=0):
+        return a + b + c
+
+    assert asyncio.run(run_in_db_executor(_add, 1, 2, c=3)) == 6
@@ -0,0 +1,201 @@
+from __future__ import annotations
+
+import threading
+
+import psycopg2
+from psycopg2 import extensions
+import pytest
+
+from dao.connection_pool import (
+    ConnectionPool,
+    PoolClosedError,
+    PoolError,
+    PoolTimeoutError,
+)
+from dao.db_connection import _request_lease, connection_scope
+
+
+# ---------------------------------------------------------------------
+# Fixtures
+# ---------------------------------------------------------------------
+
+
+@pytest.fixture
+def connect(mocker):
+    """Fabrique de fausses connexions psycopg2 (une nouvelle à chaque appel)."""
+
+    def _make():
+        cur = mocker.Mock(name="cursor")
+        cur.__enter__ = mocker.Mock(return_value=cur)
+        cur.__exit__ = mocker.Mock(return_value=None)
+
+        conn = mocker.Mock(name="connection")
+        conn.closed = 0
+        conn.cursor = mocker.Mock(return_value=cur)
+        conn.get_transaction_status.return_value = extensions.TRANSACTION_STATUS_IDLE
+        return conn
+
+    return mocker.Mock(side_effect=_make)
+
+
+# ---------------------------------------------------------------------
+# Tests
+# ---------------------------------------------------------------------
+
+
+def test_pool_opens_min_size_connections(connect):
+    pool = ConnectionPool(connect, min_size=2, max_size=5)
+
+    stats = pool.stats()
+    assert connect.call_count == 2
+    assert stats.size == 2
+    assert stats.idle == 2
+    assert stats.in_use == 0
+
+
+def test_pool_invalid_sizes_raise(connect):
+    with pytest.raises(ValueError):
+        ConnectionPool(connect, min_size=3, max_size=2)
+    with pytest.raises(ValueError):
+        ConnectionPool(connect, min_size=0, max_size=0)
+
+
+def test_getconn_putconn_reuses_connection(connect):
+    pool = ConnectionPool(connect, min_size=1, max_size=2)
+
+    c1 = pool.getconn()
+    assert pool.stats().in_use == 1
+    pool.putconn(c1)
+
+    c2 = pool.getconn()
+    assert c2 is c1
+    assert connect.call_count == 1
+    assert pool.stats().checkouts == 2
+
+
+def test_getconn_grows_up_to_max_size(connect):
+    pool = ConnectionPool(connect, min_size=0, max_size=2)
+
+    c1 = pool.getconn()
+    c2 = pool.getconn()
+
+    assert c1 is not c2
+    assert pool.stats().size == 2
+
+    with pytest.raises(PoolTimeoutError):
+        pool.getconn(timeout=0.01)
+    assert pool.stats().timeouts == 1
+
+
+def test_getconn_waits_for_released_connection(connect):
+    pool = ConnectionPool(connect, min_size=1, max_size=1)
+    c1 = pool.getconn()
+
+    got = []
+
+    def _borrow():
+        got.append(pool.getconn(timeout=2))
+
+    t = threading.Thread(target=_borrow)
+    t.start()
+    pool.putconn(c1)
+    t.join(timeout=2)
+
+    assert got == [c1]
+
+
+def test_putconn_rolls_back_open_transaction(connect):
+    pool = ConnectionPool(connect, min_size=1, max_size=1)
+    conn = pool.getconn()
+    conn.get_transaction_status.return_value = extensions.TRANSACTION_STATUS_INTRANS
+
+    pool.putconn(conn)
+
+    conn.rollback.assert_called_once()
+    assert pool.stats().idle == 1
+
+
+def test_putconn_discards_closed_connection(connect):
+    pool = ConnectionPool(connect, min_size=1, max_size=1)
+    conn = pool.getconn()
+    conn.closed = 1
+
+    pool.putconn(conn)
+
+    stats = pool.stats()
+    assert stats.size == 0
+    assert stats.discarded == 1
+
+    # Une nouvelle connexion est ouverte à l'emprunt suivant
+    assert pool.getconn() is not conn
+
+
+def test_putconn_unknown_connection_raises(connect):
+    pool = ConnectionPool(connect, min_size=0, max_size=1)
+    with pytest.raises(PoolError):
+        pool.putconn(object())
+
+
+def test_health_check_reconnects_dead_connection(connect):
+    pool = ConnectionPool(connect, min_size=1, max_size=1, health_check_interval=0)
+    conn = pool.getconn()
+    pool.putconn(conn)
+
+    conn.cursor.return_value.execute.side_effect = psycopg2.OperationalError("down")
+
+    fresh = pool.getconn()
+
+    assert fresh is not conn
+    conn.close.assert_called_once()
+    assert pool.stats().reconnects == 1
+
+
+def test_health_check_keeps_live_connection(connect):
+    pool = ConnectionPool(connect, min_size=1, max_size=1, health_check_interval=0)
+    conn = pool.getconn()
+    pool.putconn(conn)
+
+    assert pool.getconn() is conn
+    conn.cursor.return_value.execute.assert_called_with("SELECT 1")
+    assert pool.stats().reconnects == 0
+
+
+def test_close_rejects_new_checkouts(connect):
+    pool = ConnectionPool(connect, min_size=2, max_size=2)
+    pool.close()
+
+    assert pool.closed
+    assert pool.stats().size == 0
+    with pytest.raises(PoolClosedError):
+        pool.getconn()
+
+
+# ---------------------------------------------------------------------
+# Tests : connection_scope
+# ---------------------------------------------------------------------
+
+
+def test_connection_scope_returns_connection_on_exit(connect):
+    pool = ConnectionPool(connect, min_size=0, max_size=1)
+
+    with connection_scope():
+        conn = _request_lease.get().get(pool)
+        assert pool.stats().in_use == 1
+
+    assert _request_lease.get() is None
+    assert pool.stats().in_use == 0
+    assert pool.getconn() is conn
+
+
+def test_nested_connection_scope_reuses_outer_connection(connect):
+    pool = ConnectionPool(connect, min_size=0, max_size=1)
+
+    with connection_scope():
+        outer = _request_lease.get()
+        with connection_scope():
+            assert _request_lease.get() is outer
+            outer.get(pool)
+        # Le scope imbriqué ne rend pas la connexion du scope englobant
+        assert pool.stats().in_use == 1
+
+    assert pool.stats().in_use == 0
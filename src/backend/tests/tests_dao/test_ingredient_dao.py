@@ -139,6 +139,51 @@ def test_create_ingredient_rollback_on_error(dao, mock_db):
     conn.commit.assert_not_called()
 
 
+# ---------------------------------------------------------------------
+# Tests : get_or_create_ingredient_ids (bulk)
+# ---------------------------------------------------------------------
+
+
+def test_get_or_create_ingredient_ids_single_statement(dao, mock_db):
+    conn, cur = mock_db
+    cur.fetchall.return_value = [
+        {"key": "farine", "ingredient_id": 10},  # créé
+        {"key": "lait", "ingredient_id": 3},  # existant
+    ]
+
+    ids = dao.get_or_create_ingredient_ids(
+        [("Farine", Unit.GRAM), ("  lait ", "ml"), ("FARINE", None), ("", "g")]
+    )
+
+    assert ids == {"farine": 10, "lait": 3}
+    cur.execute.assert_called_once()
+    sql, params = cur.execute.call_args.args
+    assert "ON CONFLICT ((LOWER(name))) DO NOTHING" in sql
+    assert sql.count("%s::unit_type") == 2  # doublons et noms vides écartés
+    assert params == ("Farine", "g", "lait", "ml", ["farine", "lait"])
+    conn.commit.assert_called_once()
+
+
+def test_get_or_create_ingredient_ids_rereads_concurrent_inserts(dao, mock_db):
+    _conn, cur = mock_db
+    cur.fetchall.side_effect = [
+        [{"key": "farine", "ingredient_id": 10}],
+        [{"key": "sucre", "ingredient_id": 11}],
+    ]
+
+    ids = dao.get_or_create_ingredient_ids([("Farine", None), ("Sucre", None)])
+
+    assert ids == {"farine": 10, "sucre": 11}
+    assert cur.execute.call_args.args[1] == (["sucre"],)
+
+
+def test_get_or_create_ingredient_ids_empty_input(dao, mock_db):
+    _conn, cur = mock_db
+
+    assert dao.get_or_create_ingredient_ids([(" ", None)]) == {}
+    cur.execute.assert_not_called()
+
+
 # ---------------------------------------------------------------------
 # Tests : get_ingredient_by_id
 # ---------------------------------------------------------------------
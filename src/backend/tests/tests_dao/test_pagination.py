@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+import pytest
+
+from dao.pagination import InvalidCursorError, Page, decode_cursor, encode_cursor
+
+
+def test_cursor_roundtrip_serializes_datetime():
+    cursor = encode_cursor(datetime(2026, 1, 2, 3, 4, 5), 42)
+
+    assert "=" not in cursor  # URL-safe, sans padding
+    assert decode_cursor(cursor, size=2) == ["2026-01-02T03:04:05", 42]
+
+
+def test_cursor_roundtrip_text_key():
+    cursor = encode_cursor("Cuisine é", 7)
+    assert decode_cursor(cursor, size=2) == ["Cuisine é", 7]
+
+
+@pytest.mark.parametrize("cursor", ["", "%%%", "bm90LWpzb24", encode_cursor(1)])
+def test_decode_cursor_rejects_invalid(cursor):
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(cursor, size=2)
+
+
+def test_invalid_cursor_error_is_value_error():
+    assert issubclass(InvalidCursorError, ValueError)
+
+
+def test_page_defaults():
+    page = Page()
+    assert page.items == []
+    assert page.next_cursor is None
@@ -1,7 +1,10 @@
 from __future__ import annotations
 
+from datetime import datetime
+
 import pytest
 
+from dao.pagination import InvalidCursorError, decode_cursor, encode_cursor
 from dao.recipe_dao import RecipeDAO
 
 
@@ -187,6 +190,72 @@ def test_create_recipe_rollback_on_exception(dao, mock_db):
     conn.commit.assert_not_called()
 
 
+# ---------------------------------------------------------------------
+# Tests : recettes importées (source externe)
+# ---------------------------------------------------------------------
+
+
+def test_upsert_external_recipe_inserts_new_recipe_with_relations(dao, mock_db):
+    conn, cur = mock_db
+    cur.fetchone.side_effect = [
+        {"recipe_id": 7, "inserted": True},  # upsert
+        recipe_row(recipe_id=7, fk_user_id=None, name="Pancakes"),
+    ]
+    cur.fetchall.side_effect = [[{"fk_ingredient_id": 101, "quantity": 2.0}], []]
+
+    recipe = dao.upsert_external_recipe(
+        source="spoonacular",
+        external_id="123",
+        name="Pancakes",
+        ingredient_items=[(101, 2.0)],
+    )
+
+    assert recipe.recipe_id == 7
+    assert (101, 2.0) in recipe.ingredients
+    sqls = [str(c.args[0]) for c in cur.execute.call_args_list]
+    assert "ON CONFLICT (external_source, external_id) DO NOTHING" in sqls[0]
+    assert cur.execute.call_args_list[0].args[1][-2:] == ("spoonacular", "123")
+    assert any("INSERT INTO recipe_ingredient" in s for s in sqls)
+    conn.commit.assert_called_once()
+
+
+def test_upsert_external_recipe_known_recipe_writes_nothing_else(
+    dao, mock_db, write_events
+):
+    conn, cur = mock_db
+    cur.fetchone.side_effect = [
+        {"recipe_id": 7, "inserted": False},
+        recipe_row(recipe_id=7, name="Pancakes"),
+    ]
+
+    dao.upsert_external_recipe(
+        source="spoonacular",
+        external_id="123",
+        name="Pancakes",
+        ingredient_items=[(101, 2.0)],
+        tag_ids=[1],
+    )
+
+    sqls = [str(c.args[0]) for c in cur.execute.call_args_list]
+    assert not any("INSERT INTO recipe_ingredient" in s for s in sqls)
+    assert not any("INSERT INTO recipe_tag" in s for s in sqls)
+    assert write_events == []
+    conn.commit.assert_called_once()
+
+
+def test_get_recipe_ids_by_external_ids_single_query(dao, mock_db):
+    _conn, cur = mock_db
+    cur.fetchall.return_value = [{"external_id": "123", "recipe_id": 7}]
+
+    assert dao.get_recipe_ids_by_external_ids("spoonacular", [123, "123", 456]) == {
+        "123": 7
+    }
+    cur.execute.assert_called_once()
+    assert cur.execute.call_args.args[1] == ("spoonacular", ["123", "456"])
+    assert dao.get_recipe_ids_by_external_ids("spoonacular", []) == {}
+    cur.execute.assert_called_once()
+
+
 # ---------------------------------------------------------------------
 # Tests CRUD : read
 # ---------------------------------------------------------------------
@@ -287,6 +356,105 @@ def test_list_recipes_limit_clamped(dao, mock_db):
     assert params[-1] == 0
 
 
+def test_list_recipes_with_relations_batch_loads_page(dao, mock_db):
+    _conn, cur = mock_db
+
+    cur.fetchall.side_effect = [
+        [recipe_row(recipe_id=1, name="A"), recipe_row(recipe_id=2, name="B")],
+        [
+            {"fk_recipe_id": 1, "fk_ingredient_id": 101, "quantity": 1.0},
+            {"fk_recipe_id": 2, "fk_ingredient_id": 102, "quantity": 3.0},
+        ],
+        [{"fk_recipe_id": 2, "tag_id": 7, "name": "dessert"}],
+    ]
+
+    recipes = dao.list_recipes(with_relations=True)
+
+    # 3 requêtes pour toute la page : recettes + ingrédients + tags
+    assert cur.execute.call_count == 3
+    assert cur.execute.call_args_list[1][0][1] == ([1, 2],)
+    assert cur.execute.call_args_list[2][0][1] == ([1, 2],)
+
+    assert [r.recipe_id for r in recipes] == [1, 2]
+    assert recipes[0].ingredients == [(101, 1.0)]
+    assert recipes[1].ingredients == [(102, 3.0)]
+    assert recipes[0].tags == []
+    assert recipes[1].tags == [(7, "dessert")]
+
+
+def test_list_recipes_with_relations_empty_page_single_query(dao, mock_db):
+    _conn, cur = mock_db
+    cur.fetchall.return_value = []
+
+    assert dao.list_recipes(with_relations=True) == []
+    assert cur.execute.call_count == 1
+
+
+def test_list_recipes_page_first_page_has_next_cursor(dao, mock_db):
+    _conn, cur = mock_db
+
+    # limit=2 => la DAO demande 3 lignes pour savoir s'il y a une suite
+    cur.fetchall.return_value = [
+        recipe_row(recipe_id=3, created_at=datetime(2026, 1, 3)),
+        recipe_row(recipe_id=2, created_at=datetime(2026, 1, 2)),
+        recipe_row(recipe_id=1, created_at=datetime(2026, 1, 1)),
+    ]
+
+    page = dao.list_recipes_page(limit=2)
+
+    assert [r.recipe_id for r in page.items] == [3, 2]
+    assert decode_cursor(page.next_cursor, size=2) == ["2026-01-02T00:00:00", 2]
+
+    sql = last_executed_sql(cur)
+    assert "OFFSET" not in sql
+    assert "recipe_id) <" not in sql
+    assert last_executed_params(cur) == (3,)
+
+
+def test_list_recipes_page_after_cursor_uses_keyset(dao, mock_db):
+    _conn, cur = mock_db
+    cur.fetchall.return_value = [recipe_row(recipe_id=1)]
+
+    after = encode_cursor(datetime(2026, 1, 2), 2)
+    page = dao.list_recipes_page(name_ilike="cr", limit=2, after=after)
+
+    assert [r.recipe_id for r in page.items] == [1]
+    assert page.next_cursor is None
+
+    sql = last_executed_sql(cur)
+    key = "COALESCE(created_at, 'infinity'::timestamp)"
+    assert f"({key}, recipe_id) < (%s::timestamp, %s)" in sql
+    assert f"ORDER BY {key} DESC, recipe_id DESC" in sql
+    assert last_executed_params(cur) == ("%cr%", datetime(2026, 1, 2), 2, 3)
+
+
+def test_list_recipes_page_handles_null_created_at(dao, mock_db):
+    _conn, cur = mock_db
+    # created_at NULL : en tête en DESC, comme dans list_recipes
+    cur.fetchall.return_value = [
+        recipe_row(recipe_id=9, created_at=None),
+        recipe_row(recipe_id=8, created_at=None),
+    ]
+
+    page = dao.list_recipes_page(limit=1)
+
+    assert decode_cursor(page.next_cursor, size=2) == [None, 9]
+
+    cur.fetchall.return_value = [recipe_row(recipe_id=8, created_at=None)]
+    page = dao.list_recipes_page(limit=1, after=page.next_cursor)
+
+    assert [r.recipe_id for r in page.items] == [8]
+    assert last_executed_params(cur) == ("infinity", 9, 2)
+
+
+def test_list_recipes_page_invalid_cursor(dao, mock_db):
+    _conn, cur = mock_db
+
+    with pytest.raises(InvalidCursorError):
+        dao.list_recipes_page(after=encode_cursor("pas-une-date", 1))
+    cur.execute.assert_not_called()
+
+
 # ---------------------------------------------------------------------
 # Tests CRUD : update
 # ---------------------------------------------------------------------
@@ -711,10 +879,10 @@ def test_find_recipes_by_ingredients_clamps_limit_and_max_missing(dao, mock_db):
                 "matched_count": 1,
             }
         ],
-        # get_recipe_ingredients
-        [{"fk_ingredient_id": 101, "quantity": 1.0}],
-        # get_recipe_tags
-        [{"tag_id": 1, "name": "dessert"}],
+        # get_ingredients_for_recipes
+        [{"fk_recipe_id": 1, "fk_ingredient_id": 101, "quantity": 1.0}],
+        # get_tags_for_recipes
+        [{"fk_recipe_id": 1, "tag_id": 1, "name": "dessert"}],
     ]
 
     res = dao.find_recipes_by_ingredients(
@@ -795,7 +963,7 @@ def test_find_recipes_by_ingredients_with_dish_type_adds_tag_filter(dao, mock_db
             }
         ],
         [],  # ingredients
-        [{"tag_id": 7, "name": "dessert"}],  # tags
+        [{"fk_recipe_id": 2, "tag_id": 7, "name": "dessert"}],  # tags
     ]
 
     res = dao.find_recipes_by_ingredients(
@@ -820,10 +988,11 @@ def test_find_recipes_by_ingredients_with_dish_type_adds_tag_filter(dao, mock_db
     assert params[1] == "%dessert%"
 
 
-def test_find_recipes_by_ingredients_loads_relations_per_recipe(dao, mock_db):
+def test_find_recipes_by_ingredients_batch_loads_relations(dao, mock_db):
     """
-    Vérifie que, pour chaque recette retournée par la requête principale,
-    la DAO recharge ingrédients + tags via get_recipe_ingredients/get_recipe_tags.
+    Vérifie que les relations (ingrédients + tags) de toutes les recettes
+    retournées sont chargées en lot : 1 requête principale + 2 requêtes,
+    quel que soit le nombre de recettes, puis réassemblées par recipe_id.
 
     NB: depuis la nouvelle logique, strict_only=False utilise le mode inclusif
     (WITH recipe_counts AS ...).
@@ -856,27 +1025,46 @@ def test_find_recipes_by_ingredients_loads_relations_per_recipe(dao, mock_db):
                 "matched_count": 1,
             },
         ],
-        # Pour recipe_id=1 : ingredients
-        [{"fk_ingredient_id": 101, "quantity": 1.0}],
-        # Pour recipe_id=1 : tags
-        [{"tag_id": 1, "name": "rapide"}],
-        # Pour recipe_id=2 : ingredients
-        [{"fk_ingredient_id": 102, "quantity": 2.0}],
-        # Pour recipe_id=2 : tags
-        [],
+        # ingrédients des 2 recettes
+        [
+            {"fk_recipe_id": 1, "fk_ingredient_id": 101, "quantity": 1.0},
+            {"fk_recipe_id": 2, "fk_ingredient_id": 102, "quantity": 2.0},
+        ],
+        # tags des 2 recettes
+        [{"fk_recipe_id": 1, "tag_id": 1, "name": "rapide"}],
     ]
 
     res = dao.find_recipes_by_ingredients(["oeuf"], limit=10, max_missing=0)
     assert len(res) == 2
 
-    executed_sql = [str(c[0][0]) for c in cur.execute.call_args_list]
+    executed = cur.execute.call_args_list
+    executed_sql = [str(c[0][0]) for c in executed]
 
     # requête principale = recipe_counts (mode inclusif)
     assert any("WITH recipe_counts AS" in s for s in executed_sql)
 
-    # Ensuite, par recette : 1 execute pour ingredients + 1 execute pour tags
-    assert sum("FROM recipe_ingredient" in s for s in executed_sql) == 2
-    assert sum("FROM recipe_tag rt" in s for s in executed_sql) == 2
+    # 3 requêtes au total : principale + ingrédients + tags
+    assert len(executed_sql) == 3
+    assert "FROM recipe_ingredient" in executed_sql[1]
+    assert "ANY(%s)" in executed_sql[1]
+    assert executed[1][0][1] == ([1, 2],)
+    assert "FROM recipe_tag rt" in executed_sql[2]
+    assert executed[2][0][1] == ([1, 2],)
+
+    # Relations réassemblées sur la bonne recette (ordre conservé)
+    assert [r.recipe_id for r in res] == [1, 2]
+    assert res[0].ingredients == [(101, 1.0)]
+    assert res[1].ingredients == [(102, 2.0)]
+    assert res[0].tags == [(1, "rapide")]
+    assert res[1].tags == []
+
+
+def test_find_recipes_by_ingredients_no_result_skips_relations(dao, mock_db):
+    _conn, cur = mock_db
+    cur.fetchall.side_effect = [[]]
+
+    assert dao.find_recipes_by_ingredients(["oeuf"]) == []
+    assert cur.execute.call_count == 1
 
 
 def test_find_recipes_by_ingredients_rollback_not_needed_no_commit(dao, mock_db):
@@ -892,3 +1080,259 @@ def test_find_recipes_by_ingredients_rollback_not_needed_no_commit(dao, mock_db)
 
     conn.commit.assert_not_called()
     conn.rollback.assert_not_called()
+
+
+# ---------------------------------------------------------------------
+# Tests : correspondance par trigrammes
+# ---------------------------------------------------------------------
+
+
+@pytest.fixture
+def trigram(monkeypatch):
+    """Force la disponibilité de pg_trgm (détection mise en cache par classe)."""
+    monkeypatch.setattr(RecipeDAO, "_trigram_available", True)
+
+
+@pytest.mark.usefixtures("trigram")
+def test_resolve_ingredient_terms_single_query_ranked(dao, mock_db):
+    _conn, cur = mock_db
+    cur.fetchall.return_value = [
+        {"term": "oeuf", "ingredient_id": 1, "score": 0.8},
+        {"term": "oeuf", "ingredient_id": 44, "score": 0.3},
+        {"term": "lait", "ingredient_id": 2, "score": 1.0},
+    ]
+
+    res = dao.resolve_ingredient_terms([" oeuf ", "lait", "oeuf", "zzz"], per_term=3)
+
+    assert res == {"oeuf": [(1, 0.8), (44, 0.3)], "lait": [(2, 1.0)], "zzz": []}
+
+    assert cur.execute.call_count == 1
+    sql, params = cur.execute.call_args[0]
+    assert "public.similarity" in sql
+    assert "OPERATOR(public.%%)" in sql
+    assert params == (["oeuf", "lait", "zzz"], 3)
+
+
+def test_resolve_ingredient_terms_without_pg_trgm_uses_ilike(dao, mock_db, monkeypatch):
+    monkeypatch.setattr(RecipeDAO, "_trigram_available", None)
+    _conn, cur = mock_db
+    cur.fetchone.return_value = {"available": False}
+    cur.fetchall.return_value = []
+
+    assert dao.resolve_ingredient_terms(["oeuf"]) == {"oeuf": []}
+
+    detect_sql = str(cur.execute.call_args_list[0][0][0])
+    sql = str(cur.execute.call_args_list[1][0][0])
+    assert "to_regprocedure" in detect_sql
+    assert "similarity" not in sql
+    assert "ILIKE" in sql
+    assert RecipeDAO._trigram_available is False
+
+
+@pytest.mark.usefixtures("trigram")
+def test_find_recipes_trigram_strict_matches_resolved_ids(dao, mock_db):
+    _conn, cur = mock_db
+    cur.fetchall.side_effect = [
+        # resolve_ingredient_terms
+        [
+            {"term": "oeuf", "ingredient_id": 1, "score": 0.8},
+            {"term": "oeuf", "ingredient_id": 44, "score": 0.3},
+            {"term": "lait", "ingredient_id": 2, "score": 1.0},
+        ],
+        [],  # requête principale
+    ]
+
+    res = dao.find_recipes_by_ingredients(
+        ["oeuf", "lait"], strict_only=True, match="trigram"
+    )
+    assert res == []
+
+    sql, params = cur.execute.call_args_list[1][0]
+    assert "WITH matched AS" in sql
+    assert "UNNEST(%s::int[], %s::int[])" in sql
+    assert "ILIKE q.term" not in sql
+    # (positions des termes, ids résolus, n_terms, max_missing, limit)
+    assert params == ([0, 0, 1], [1, 44, 2], 2, 0, 10)
+
+
+@pytest.mark.usefixtures("trigram")
+def test_find_recipes_trigram_inclusive_filters_on_ids(dao, mock_db):
+    _conn, cur = mock_db
+    cur.fetchall.side_effect = [
+        [{"term": "oeuf", "ingredient_id": 1, "score": 0.8}],
+        [],
+    ]
+
+    dao.find_recipes_by_ingredients(["oeuf"], match="trigram", dish_type="dessert")
+
+    sql, params = cur.execute.call_args_list[1][0]
+    assert "WITH recipe_counts AS" in sql
+    assert "i.ingredient_id = ANY(%s::int[])" in sql
+    assert params == ([1], "%dessert%", 0, 10)
+
+
+def test_find_recipes_unknown_match_mode_raises(dao):
+    with pytest.raises(ValueError):
+        dao.find_recipes_by_ingredients(["oeuf"], match="soundex")
+
+
+# ---------------------------------------------------------------------
+# Tests : observateurs d'écriture
+# ---------------------------------------------------------------------
+
+
+@pytest.fixture
+def write_events():
+    """Abonne un observateur le temps du test (liste partagée au niveau classe)."""
+    events: list[tuple[int, bool]] = []
+
+    def _listener(recipe_id: int, deleted: bool) -> None:
+        events.append((recipe_id, deleted))
+
+    RecipeDAO.add_write_listener(_listener)
+    yield events
+    RecipeDAO.remove_write_listener(_listener)
+
+
+def test_write_listener_notified_after_commit(dao, mock_db, write_events):
+    conn, cur = mock_db
+    cur.rowcount = 1
+    conn.commit.side_effect = lambda: write_events.append(("commit", False))
+
+    dao.delete_recipe(12)
+    dao.add_tag(3, 7)
+
+    assert write_events == [
+        ("commit", False),
+        (12, True),
+        ("commit", False),
+        (3, False),
+    ]
+
+
+def test_write_listener_not_notified_when_nothing_changed(dao, mock_db, write_events):
+    _conn, cur = mock_db
+    cur.rowcount = 0
+
+    assert dao.delete_recipe(12) is False
+    assert dao.remove_tag(3, 7) is False
+    assert write_events == []
+
+
+def test_write_listener_not_notified_on_rollback(dao, mock_db, write_events):
+    _conn, cur = mock_db
+    cur.execute.side_effect = Exception("DB error")
+
+    with pytest.raises(Exception, match="DB error"):
+        dao.delete_recipe(12)
+    assert write_events == []
+
+
+def test_write_listener_error_does_not_break_write(dao, mock_db, write_events):
+    conn, cur = mock_db
+    cur.rowcount = 1
+
+    def _boom(_recipe_id, _deleted):
+        raise RuntimeError("listener down")
+
+    RecipeDAO.add_write_listener(_boom)
+    try:
+        assert dao.delete_recipe(5) is True
+    finally:
+        RecipeDAO.remove_write_listener(_boom)
+
+    conn.commit.assert_called_once()
+    assert write_events == [(5, True)]
+
+
+def test_write_listener_can_ignore_imports(dao, mock_db, write_events):
+    _conn, cur = mock_db
+    cur.rowcount = 1
+    cur.fetchone.side_effect = [
+        {"recipe_id": 7, "inserted": True},
+        recipe_row(recipe_id=7, fk_user_id=None, name="Pancakes"),
+    ]
+    cur.fetchall.side_effect = [[], []]
+    skipped: list[int] = []
+
+    def _no_imports(recipe_id: int, _deleted: bool) -> None:
+        skipped.append(recipe_id)
+
+    RecipeDAO.add_write_listener(_no_imports, imports=False)
+    try:
+        dao.upsert_external_recipe(
+            source="spoonacular", external_id="123", name="Pancakes"
+        )
+        dao.delete_recipe(5)
+    finally:
+        RecipeDAO.remove_write_listener(_no_imports)
+
+    assert write_events == [(7, False), (5, True)]
+    assert skipped == [5]
+
+
+# ---------------------------------------------------------------------
+# Tests : lecture en lot / index de recherche
+# ---------------------------------------------------------------------
+
+
+def test_get_recipes_by_ids_keeps_requested_order(dao, mock_db):
+    _conn, cur = mock_db
+    cur.fetchall.side_effect = [
+        [recipe_row(recipe_id=1), recipe_row(recipe_id=3)],
+        [{"fk_recipe_id": 3, "fk_ingredient_id": 101, "quantity": 1.0}],
+        [],
+    ]
+
+    res = dao.get_recipes_by_ids([3, 2, 1, 3])
+
+    assert [r.recipe_id for r in res] == [3, 1]
+    assert res[0].ingredients == [(101, 1.0)]
+    assert cur.execute.call_count == 3
+    assert cur.execute.call_args_list[0][0][1] == ([3, 2, 1],)
+
+
+def test_get_recipes_by_ids_empty_skips_db(dao, mock_db):
+    conn, _cur = mock_db
+
+    assert dao.get_recipes_by_ids([]) == []
+    conn.cursor.assert_not_called()
+
+
+def test_iter_search_index_rows_streams_with_server_cursor(dao, mock_db):
+    conn, cur = mock_db
+    cur.__iter__ = lambda _self: iter(
+        [
+            {
+                "recipe_id": 1,
+                "created_at": "2026-01-01 12:00:00",
+                "ingredient_ids": [101, 102],
+                "tag_names": ["dessert"],
+            },
+            {
+                "recipe_id": 2,
+                "created_at": None,
+                "ingredient_ids": [],
+                "tag_names": [],
+            },
+        ]
+    )
+
+    rows = list(dao.iter_search_index_rows(batch_size=100))
+
+    conn.cursor.assert_called_once_with(name="recipe_search_index")
+    assert cur.itersize == 100
+    assert [r.recipe_id for r in rows] == [1, 2]
+    assert rows[0].ingredient_ids == [101, 102]
+    assert rows[0].tag_names == ["dessert"]
+    assert rows[1].ingredient_ids == []
+    assert "ANY(%s)" not in last_executed_sql(cur)
+
+
+def test_iter_search_index_rows_filters_on_ids(dao, mock_db):
+    _conn, cur = mock_db
+    cur.__iter__ = lambda _self: iter([])
+
+    assert list(dao.iter_search_index_rows([4, 5])) == []
+    assert "r.recipe_id = ANY(%s)" in last_executed_sql(cur)
+    assert last_executed_params(cur) == ([4, 5],)
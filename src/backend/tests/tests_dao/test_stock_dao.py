@@ -4,6 +4,7 @@ from datetime import date
 
 import pytest
 
+from dao.pagination import InvalidCursorError, decode_cursor, encode_cursor
 from dao.stock_dao import StockDAO
 
 
@@ -147,6 +148,48 @@ def test_list_user_stocks_with_filter(dao, mock_db):
     assert any("s.name ILIKE %s" in s for s in sqls)
 
 
+def test_list_user_stocks_page_keyset(dao, mock_db):
+    conn, cur = mock_db
+    cur.fetchall.return_value = [
+        stock_row(stock_id=4, name="Garage"),
+        stock_row(stock_id=9, name="Placard"),
+    ]
+
+    page = dao.list_user_stocks_page(
+        user_id=42, limit=1, after=encode_cursor("Cuisine", 1)
+    )
+
+    assert [s.nom for s in page.items] == ["Garage"]
+    assert decode_cursor(page.next_cursor, size=2) == ["Garage", 4]
+
+    sql, params = cur.execute.call_args[0]
+    assert "(s.name, s.stock_id) > (%s, %s)" in sql
+    assert "OFFSET" not in sql
+    assert params == (42, "Cuisine", 1, 2)
+
+
+def test_list_stocks_page_last_page(dao, mock_db):
+    conn, cur = mock_db
+    cur.fetchall.return_value = [stock_row(stock_id=1, name="Cuisine")]
+
+    page = dao.list_stocks_page(name_ilike="cu", limit=5)
+
+    assert [s.id_stock for s in page.items] == [1]
+    assert page.next_cursor is None
+
+    sql, params = cur.execute.call_args[0]
+    assert "(name, stock_id) >" not in sql
+    assert params == ("%cu%", 6)
+
+
+def test_list_stocks_page_invalid_cursor(dao, mock_db):
+    conn, cur = mock_db
+
+    with pytest.raises(InvalidCursorError):
+        dao.list_stocks_page(after=encode_cursor("Cuisine", "x"))
+    cur.execute.assert_not_called()
+
+
 # ---------------------------------------------------------------------
 # get_user_stock_by_name
 # ---------------------------------------------------------------------
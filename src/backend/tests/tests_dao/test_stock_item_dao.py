@@ -152,6 +152,60 @@ def test_create_stock_item_rollback_on_error(dao, mock_db):
     conn.commit.assert_not_called()
 
 
+# ---------------------------------------------------------------------
+# create_stock_items
+# ---------------------------------------------------------------------
+
+
+def test_create_stock_items_empty_does_nothing(dao, mock_db):
+    conn, cur = mock_db
+
+    assert dao.create_stock_items(stock_id=10, items=[]) == {}
+
+    cur.execute.assert_not_called()
+    conn.commit.assert_not_called()
+
+
+def test_create_stock_items_single_statement_maps_positions(dao, mock_db):
+    conn, cur = mock_db
+    # position 1 absente : ingrédient inexistant
+    cur.fetchall.return_value = [
+        {"item_index": 0, "stock_item_id": 101},
+        {"item_index": 2, "stock_item_id": 102},
+    ]
+
+    created = dao.create_stock_items(
+        stock_id=10,
+        items=[(7, 1.5, date(2026, 3, 1)), (999, 1.0, None), (8, 2.0, None)],
+    )
+
+    assert created == {0: 101, 2: 102}
+
+    cur.execute.assert_called_once()
+    sql, params = cur.execute.call_args[0]
+    assert "unnest" in sql
+    assert "INSERT INTO stock_item" in sql
+    assert params == (
+        [0, 1, 2],
+        [7, 999, 8],
+        [1.5, 1.0, 2.0],
+        [date(2026, 3, 1), None, None],
+        10,
+    )
+    conn.commit.assert_called_once()
+
+
+def test_create_stock_items_rollback_on_error(dao, mock_db):
+    conn, cur = mock_db
+    cur.execute.side_effect = RuntimeError("DB error")
+
+    with pytest.raises(RuntimeError):
+        dao.create_stock_items(stock_id=10, items=[(7, 1.0, None)])
+
+    conn.rollback.assert_called_once()
+    conn.commit.assert_not_called()
+
+
 # ---------------------------------------------------------------------
 # update_stock_item
 # ---------------------------------------------------------------------
@@ -241,65 +295,70 @@ def test_delete_stock_item_not_deleted(dao, mock_db):
     conn.commit.assert_called_once()
 
 
+def consume_rows(available, taken_by_stock):
+    """Lignes renvoyées par la requête FEFO (LEFT JOIN vide si insuffisant)."""
+    if not taken_by_stock:
+        return [{"available": available, "fk_stock_id": None, "taken": None}]
+    return [
+        {"available": available, "fk_stock_id": stock_id, "taken": taken}
+        for stock_id, taken in taken_by_stock.items()
+    ]
+
+
 # ---------------------------------------------------------------------
 # consume_quantity_fefo
 # ---------------------------------------------------------------------
 
 
-def test_consume_quantity_fefo_invalid_quantity_raises(dao):
+def test_consume_quantity_fefo_invalid_quantity_raises(dao, mock_db):
+    _conn, cur = mock_db
+
     with pytest.raises(ValueError):
         dao.consume_quantity_fefo(stock_id=10, ingredient_id=7, quantity_to_consume=0)
 
+    cur.execute.assert_not_called()
+
 
 def test_consume_quantity_fefo_insufficient_stock_raises_and_rollbacks(dao, mock_db):
     conn, cur = mock_db
-    cur.fetchall.return_value = [
-        {"stock_item_id": 1, "quantity": 1.0},
-        {"stock_item_id": 2, "quantity": 1.0},
-    ]
+    cur.fetchall.return_value = consume_rows(2.0, {})
 
-    with pytest.raises(ValueError):
+    with pytest.raises(ValueError, match="disponible=2.0"):
         dao.consume_quantity_fefo(stock_id=10, ingredient_id=7, quantity_to_consume=3.0)
 
     conn.rollback.assert_called_once()
     conn.commit.assert_not_called()
 
 
-def test_consume_quantity_fefo_partial_on_first_lot(dao, mock_db):
+def test_consume_quantity_fefo_runs_single_statement(dao, mock_db):
     conn, cur = mock_db
-    cur.fetchall.return_value = [
-        {"stock_item_id": 1, "quantity": 5.0},
-        {"stock_item_id": 2, "quantity": 2.0},
-    ]
+    cur.fetchall.return_value = consume_rows(7.0, {10: 3.0})
 
     dao.consume_quantity_fefo(stock_id=10, ingredient_id=7, quantity_to_consume=3.0)
 
-    # doit faire un UPDATE (lot 1 -> 2.0) et aucun DELETE
-    sqls = executed_sql_list(cur)
-    assert any("FOR UPDATE" in s for s in sqls)
-    assert any("UPDATE stock_item" in s for s in sqls)
-    assert not any("DELETE FROM stock_item" in s for s in sqls)
+    cur.execute.assert_called_once()
+    sql, params = cur.execute.call_args[0]
+    assert "ORDER BY si.stock_item_id\n    FOR UPDATE OF si" in sql
+    assert "SUM(quantity) OVER" in sql
+    assert "expiration_date ASC NULLS LAST" in sql
+    assert "DELETE FROM stock_item" in sql
+    assert "UPDATE stock_item" in sql
+    assert "JOIN user_stock" not in sql
+    assert params == (10, 7, 3.0)
 
     conn.commit.assert_called_once()
     conn.rollback.assert_not_called()
 
 
-def test_consume_quantity_fefo_delete_first_lot_then_update_second(dao, mock_db):
+def test_consume_quantity_fefo_rollback_on_error(dao, mock_db):
     conn, cur = mock_db
-    cur.fetchall.return_value = [
-        {"stock_item_id": 1, "quantity": 2.0},
-        {"stock_item_id": 2, "quantity": 5.0},
-    ]
-
-    dao.consume_quantity_fefo(stock_id=10, ingredient_id=7, quantity_to_consume=3.0)
+    cur.execute.side_effect = RuntimeError("DB error")
 
-    # doit DELETE lot 1 et UPDATE lot 2
-    sqls = executed_sql_list(cur)
-    assert any("DELETE FROM stock_item" in s for s in sqls)
-    assert any("UPDATE stock_item" in s for s in sqls)
+    with pytest.raises(RuntimeError):
+        dao.consume_quantity_fefo(stock_id=10, ingredient_id=7, quantity_to_consume=1.0)
 
-    conn.commit.assert_called_once()
-    conn.rollback.assert_not_called()
+    conn.rollback.assert_called_once()
+    conn.commit.assert_not_called()
 
 
 # ---------------------------------------------------------------------
@@ -349,10 +408,7 @@ def test_consume_quantity_fefo_for_user_insufficient_stock_raises_and_rollbacks(
     dao, mock_db
 ):
     conn, cur = mock_db
-    cur.fetchall.return_value = [
-        {"stock_item_id": 1, "fk_stock_id": 10, "quantity": 1.0},
-        {"stock_item_id": 2, "fk_stock_id": 11, "quantity": 1.0},
-    ]
+    cur.fetchall.return_value = consume_rows(2.0, {})
 
     with pytest.raises(ValueError):
         dao.consume_quantity_fefo_for_user(
@@ -363,50 +419,118 @@ def test_consume_quantity_fefo_for_user_insufficient_stock_raises_and_rollbacks(
     conn.commit.assert_not_called()
 
 
-def test_consume_quantity_fefo_for_user_partial_on_first_lot(dao, mock_db):
+def test_consume_quantity_fefo_for_user_returns_breakdown_by_stock(dao, mock_db):
     conn, cur = mock_db
-    cur.fetchall.return_value = [
-        {"stock_item_id": 1, "fk_stock_id": 10, "quantity": 5.0},
-        {"stock_item_id": 2, "fk_stock_id": 11, "quantity": 2.0},
-    ]
+    cur.fetchall.return_value = consume_rows(7.0, {10: 2.0, 11: 1.0})
 
     by_stock = dao.consume_quantity_fefo_for_user(
         user_id=42, ingredient_id=7, quantity_to_consume=3.0
     )
 
-    assert by_stock == {10: 3.0}
+    assert by_stock == {10: 2.0, 11: 1.0}
 
-    sqls = executed_sql_list(cur)
-    assert any("JOIN user_stock" in s for s in sqls)
-    assert any(
-        "ORDER BY" in s and "expiration_date" in s and "NULLS LAST" in s for s in sqls
-    )
-    assert any("FOR UPDATE" in s for s in sqls)
-    assert any("UPDATE stock_item" in s for s in sqls)
-    assert not any("DELETE FROM stock_item" in s for s in sqls)
+    cur.execute.assert_called_once()
+    sql, params = cur.execute.call_args[0]
+    assert "JOIN user_stock" in sql
+    assert "us.fk_user_id = %s" in sql
+    assert "FOR UPDATE OF si" in sql
+    assert params == (42, 7, 3.0)
 
     conn.commit.assert_called_once()
     conn.rollback.assert_not_called()
 
 
-def test_consume_quantity_fefo_for_user_delete_first_lot_then_update_second(
-    dao, mock_db
-):
+# ---------------------------------------------------------------------
+# consume_recipe_fefo_for_user
+# ---------------------------------------------------------------------
+
+
+def recipe_row(ingredient_id, required, available, fk_stock_id=None, taken=None):
+    return {
+        "portion": 4,
+        "ingredient_id": ingredient_id,
+        "required": required,
+        "available": available,
+        "fk_stock_id": fk_stock_id,
+        "taken": taken,
+    }
+
+
+def test_consume_recipe_fefo_for_user_invalid_portions_raises(dao, mock_db):
+    _conn, cur = mock_db
+
+    with pytest.raises(ValueError):
+        dao.consume_recipe_fefo_for_user(user_id=42, recipe_id=3, portions=0)
+
+    cur.execute.assert_not_called()
+
+
+def test_consume_recipe_fefo_for_user_recipe_not_found(dao, mock_db):
+    conn, cur = mock_db
+    cur.fetchall.return_value = []
+
+    assert dao.consume_recipe_fefo_for_user(user_id=42, recipe_id=999) is None
+
+    conn.rollback.assert_called_once()
+    conn.commit.assert_not_called()
+
+
+def test_consume_recipe_fefo_for_user_groups_rows_and_commits(dao, mock_db):
     conn, cur = mock_db
     cur.fetchall.return_value = [
-        {"stock_item_id": 1, "fk_stock_id": 10, "quantity": 2.0},
-        {"stock_item_id": 2, "fk_stock_id": 11, "quantity": 5.0},
+        recipe_row(7, 3.0, 5.0, fk_stock_id=10, taken=2.0),
+        recipe_row(7, 3.0, 5.0, fk_stock_id=11, taken=1.0),
+        recipe_row(8, 0.5, 1.0, fk_stock_id=10, taken=0.5),
     ]
 
-    by_stock = dao.consume_quantity_fefo_for_user(
-        user_id=42, ingredient_id=7, quantity_to_consume=3.0
-    )
+    result = dao.consume_recipe_fefo_for_user(user_id=42, recipe_id=3, portions=2)
 
-    assert by_stock == {10: 2.0, 11: 1.0}
+    assert result.recipe_id == 3
+    assert result.portions == 2
+    assert [(i.ingredient_id, i.by_stock) for i in result.ingredients] == [
+        (7, {10: 2.0, 11: 1.0}),
+        (8, {10: 0.5}),
+    ]
+    assert result.shortages == []
 
-    sqls = executed_sql_list(cur)
-    assert any("DELETE FROM stock_item" in s for s in sqls)
-    assert any("UPDATE stock_item" in s for s in sqls)
+    cur.execute.assert_called_once()
+    sql, params = cur.execute.call_args[0]
+    assert "PARTITION BY fk_ingredient_id" in sql
+    assert "FOR UPDATE OF si" in sql
+    assert params == (3, 2, 42)
 
     conn.commit.assert_called_once()
     conn.rollback.assert_not_called()
+
+
+@pytest.mark.parametrize("portion", [None, 0])
+def test_consume_recipe_fefo_for_user_portions_without_recipe_portion_raises(
+    dao, mock_db, portion
+):
+    conn, cur = mock_db
+    cur.fetchall.return_value = [
+        {**recipe_row(7, 3.0, 5.0, fk_stock_id=10, taken=3.0), "portion": portion}
+    ]
+
+    with pytest.raises(ValueError):
+        dao.consume_recipe_fefo_for_user(user_id=42, recipe_id=3, portions=2)
+
+    conn.rollback.assert_called_once()
+    conn.commit.assert_not_called()
+
+
+def test_consume_recipe_fefo_for_user_shortage_rolls_back(dao, mock_db):
+    conn, cur = mock_db
+    cur.fetchall.return_value = [
+        recipe_row(7, 3.0, 5.0),
+        recipe_row(8, 2.0, 0.5),
+    ]
+
+    result = dao.consume_recipe_fefo_for_user(user_id=42, recipe_id=3)
+
+    assert result.portions == 4
+    assert [(s.ingredient_id, s.missing) for s in result.shortages] == [(8, 1.5)]
+    assert all(i.by_stock == {} for i in result.ingredients)
+
+    conn.rollback.assert_called_once()
+    conn.commit.assert_not_called()
@@ -3,6 +3,7 @@ from __future__ import annotations
 import pytest
 
 from business_objects.user import Admin, GenericUser
+from dao.pagination import InvalidCursorError, decode_cursor, encode_cursor
 from dao.user_dao import UserDAO
 
 
@@ -291,3 +292,36 @@ def test_delete_user_rollback_on_error(dao, mock_db):
 
     conn.rollback.assert_called_once()
     conn.commit.assert_not_called()
+
+
+# ---------------------------------------------------------------------
+# Tests : pagination par curseur
+# ---------------------------------------------------------------------
+
+
+def test_get_users_page_keyset(dao, mock_db):
+    conn, cur = mock_db
+    cur.fetchall.return_value = [
+        user_row(user_id=6, username="bob"),
+        user_row(user_id=8, username="carol", status="admin"),
+        user_row(user_id=9, username="dave"),
+    ]
+
+    page = dao.get_users_page(limit=2, after=encode_cursor(5))
+
+    assert [u.user_id for u in page.items] == [6, 8]
+    assert isinstance(page.items[1], Admin)
+    assert decode_cursor(page.next_cursor, size=1) == [8]
+
+    sql, params = cur.execute.call_args[0]
+    assert "WHERE user_id > %s" in sql
+    assert "ORDER BY user_id" in sql
+    assert params == (5, 3)
+
+
+def test_get_user_rows_page_invalid_cursor(dao, mock_db):
+    conn, cur = mock_db
+
+    with pytest.raises(InvalidCursorError):
+        dao.get_user_rows_page(after="@@@")
+    cur.execute.assert_not_called()
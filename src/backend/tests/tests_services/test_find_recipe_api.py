@@ -74,33 +74,69 @@ class FakeRecipeDAO:
     def __init__(self):
         """Initialise une base en mémoire vide."""
         self._db: list[Recipe] = []
+        # (source, external_id) -> recipe_id
+        self._external: dict[tuple[str, str], int] = {}
         self.created_calls: list[tuple[str, int, int]] = []
 
-    def list_recipes(
-        self, *, name_ilike: str | None = None, limit: int = 50, offset: int = 0
+    def get_recipe_ids_by_external_ids(self, source: str, external_ids):
+        """Retourne {external_id: recipe_id} des recettes déjà importées."""
+        return {
+            str(e): self._external[(source, str(e))]
+            for e in external_ids
+            if (source, str(e)) in self._external
+        }
+
+    def get_recipes_by_ids(
+        self,
+        recipe_ids,
+        *,
+        with_relations: bool = True,  # noqa: ARG002
     ):
-        """Liste les recettes, éventuellement filtrées par nom FR (contient).
+        """Retourne les recettes demandées, dans l'ordre des ids fournis."""
+        by_id = {r.recipe_id: r for r in self._db}
+        return [by_id[i] for i in recipe_ids if i in by_id]
+
+    def upsert_external_recipe(
+        self,
+        *,
+        source: str,
+        external_id: str,
+        name: str,
+        status: str | None = "public",
+        prep_time: int | None = 0,
+        portion: int | None = 1,
+        description: str | None = None,
+        ingredient_items=None,  # noqa: ARG002
+        tag_ids=None,  # noqa: ARG002
+    ) -> Recipe:
+        """Crée la recette si (source, external_id) est inconnu.
 
         Args:
-            name_ilike (str | None): Motif de recherche sur le nom FR.
-            limit (int): Nombre max de résultats.
-            offset (int): Décalage.
+            source (str): Source externe (ex: "spoonacular").
+            external_id (str): Identifiant chez la source.
+            name (str): Nom de la recette.
+            status (str | None): Statut de la recette.
+            prep_time (int | None): Temps de préparation.
+            portion (int | None): Nombre de portions.
+            description (str | None): Description.
 
         Returns:
-            list[Recipe]: Recettes correspondant au filtre.
+            Recipe: Recette existante ou créée (avec un id local).
         """
-        rows = self._db
-
-        if name_ilike:
-            needle = name_ilike.strip().lower()
-            filtered: list[Recipe] = []
-            for r in rows:
-                fr_name = (r.translations.get("fr") or {}).get("name", "")
-                if needle in fr_name.lower():
-                    filtered.append(r)
-            rows = filtered
-
-        return rows[offset : offset + limit]
+        key = (source, str(external_id))
+        if key in self._external:
+            return self.get_recipes_by_ids([self._external[key]])[0]
+
+        recipe = self.create_recipe(
+            fk_user_id=None,
+            name=name,
+            status=status,
+            prep_time=prep_time,
+            portion=portion,
+            description=description,
+        )
+        self._external[key] = recipe.recipe_id
+        return recipe
 
     def create_recipe(
         self,
@@ -111,15 +147,9 @@ class FakeRecipeDAO:
         prep_time: int | None = 0,
         portion: int | None = 1,
         description: str | None = None,
-        _ingredient_items=None,
-        _tag_ids=None,
     ) -> Recipe:
         """Crée une recette et la stocke dans la base en mémoire.
 
-        Note:
-            Les paramètres `_ingredient_items` et `_tag_ids` sont présents pour coller
-            à la signature du DAO réel mais ne sont pas utilisés dans ce fake.
-
         Args:
             fk_user_id (int | None): Id du créateur.
             name (str): Nom de la recette.
@@ -224,7 +254,7 @@ def test_search_by_ingredients_with_dao_creates_in_db(monkeypatch):
 
 
 def test_search_by_ingredients_with_dao_deduplicates(monkeypatch):
-    """Avec DAO, si une recette existe déjà, elle doit être réutilisée (pas recréée)."""
+    """Avec DAO, une recette déjà importée (même id externe) est réutilisée."""
 
     def fake_fetch(**_kwargs):
         return [
@@ -239,11 +269,11 @@ def test_search_by_ingredients_with_dao_deduplicates(monkeypatch):
     )
 
     dao = FakeRecipeDAO()
-    # On pré-remplit la BDD avec Pancakes
-    existing = dao.create_recipe(
-        fk_user_id=None,
+    # On pré-remplit la BDD avec la recette externe 999
+    existing = dao.upsert_external_recipe(
+        source="spoonacular",
+        external_id="999",
         name="Pancakes",
-        status="public",
         prep_time=15,
         portion=4,
         description="already here",
@@ -260,3 +290,221 @@ def test_search_by_ingredients_with_dao_deduplicates(monkeypatch):
     assert res[0].recipe_id == existing.recipe_id
     # Et on ne doit pas recréer
     assert len(dao.created_calls) == 1
+
+
+def test_search_by_ingredients_same_title_other_source_id_is_created(monkeypatch):
+    """Deux recettes externes homonymes restent distinctes (id externe différent)."""
+
+    def fake_fetch(**_kwargs):
+        return [FakeDetailedRecipe(id=2, title="Pancakes")]
+
+    monkeypatch.setattr(
+        "services.find_recipe_api.fetch_detailed_recipes_by_ingredients",
+        fake_fetch,
+    )
+
+    dao = FakeRecipeDAO()
+    dao.create_recipe(fk_user_id=1, name="Pancakes")  # recette locale
+    dao.upsert_external_recipe(source="spoonacular", external_id="1", name="Pancakes")
+
+    finder = ApiFindRecipe("fake_key", dao=dao)
+    res = finder.search_by_ingredients(IngredientSearchQuery(ingredients=["egg"]))
+
+    assert len(dao.created_calls) == 3
+    assert res[0].recipe_id == 1002
+
+
+def test_search_by_ingredients_reuses_client_session(monkeypatch, mocker):
+    """Le service passe la session (keep-alive) de son client à l'API."""
+    calls: list[dict] = []
+
+    def fake_fetch(**kwargs):
+        calls.append(kwargs)
+        return []
+
+    monkeypatch.setattr(
+        "services.find_recipe_api.fetch_detailed_recipes_by_ingredients",
+        fake_fetch,
+    )
+    client = mocker.Mock()
+
+    finder = ApiFindRecipe("fake_key", dao=None, client=client)
+    finder.search_by_ingredients(IngredientSearchQuery(ingredients=["egg"]))
+    finder.search_by_ingredients(IngredientSearchQuery(ingredients=["milk"]))
+
+    assert [c["session"] for c in calls] == [client.session, client.session]
+
+
+def test_concurrent_identical_searches_share_one_upstream_call(monkeypatch):
+    """Deux recherches identiques simultanées : un seul appel amont."""
+    import threading
+
+    started = threading.Event()
+    release = threading.Event()
+    calls: list[dict] = []
+
+    def fake_fetch(**kwargs):
+        calls.append(kwargs)
+        started.set()
+        release.wait(timeout=5)
+        return [FakeDetailedRecipe(id=1, title="Pancakes")]
+
+    monkeypatch.setattr(
+        "services.find_recipe_api.fetch_detailed_recipes_by_ingredients",
+        fake_fetch,
+    )
+    dao = FakeRecipeDAO()
+    results: list[list[Recipe]] = []
+
+    def search(ingredients: list[str]) -> None:
+        finder = ApiFindRecipe("fake_key", dao=dao)
+        results.append(
+            finder.search_by_ingredients(IngredientSearchQuery(ingredients=ingredients))
+        )
+
+    first = threading.Thread(target=search, args=(["egg", "milk"],))
+    first.start()
+    assert started.wait(timeout=5)
+    second = threading.Thread(target=search, args=(["milk", " egg"],))
+    second.start()
+    second.join(timeout=0.2)  # laisse le second rejoindre l'appel en cours
+    release.set()
+    first.join(timeout=5)
+    second.join(timeout=5)
+
+    assert len(calls) == 1
+    assert len(dao.created_calls) == 1
+    assert [len(res) for res in results] == [1, 1]
+    assert results[0][0].recipe_id == results[1][0].recipe_id
+
+
+def test_search_with_importer_waits_for_local_ids(monkeypatch):
+    """Avec une file d'import, la réponse attend l'id local des recettes ;
+    celles déjà importées ne passent pas par la file."""
+    from services.find_recipe_api import ExternalRecipeStore
+    from utils.write_behind import WriteBehindQueue
+
+    def fake_fetch(**_kwargs):
+        return [
+            FakeDetailedRecipe(id=123, title="Pancakes", servings=4),
+            FakeDetailedRecipe(id=456, title="Soup"),
+        ]
+
+    monkeypatch.setattr(
+        "services.find_recipe_api.fetch_detailed_recipes_by_ingredients",
+        fake_fetch,
+    )
+    dao = FakeRecipeDAO()
+    known = dao.upsert_external_recipe(
+        source="spoonacular", external_id="456", name="Soup"
+    )
+    store = ExternalRecipeStore(dao)
+    batches: list[list] = []
+
+    def handler(batch: list) -> list[Recipe]:
+        batches.append(batch)
+        return store.persist(batch)
+
+    importer = WriteBehindQueue(handler)
+    finder = ApiFindRecipe("fake_key", dao=dao, importer=importer)
+    res = finder.search_by_ingredients(IngredientSearchQuery(ingredients=["egg"]))
+    assert importer.close(timeout=5)
+
+    assert [[r.title for r in b] for b in batches] == [["Pancakes"]]
+    assert all(r.recipe_id is not None for r in res)
+    assert res[1].recipe_id == known.recipe_id
+    assert (
+        res[0].recipe_id
+        == dao.get_recipe_ids_by_external_ids("spoonacular", ["123"])["123"]
+    )
+    assert res[0].portions == 4
+
+
+def test_search_with_stalled_importer_persists_inline(monkeypatch):
+    """File bloquée (ou pleine) : la recherche persiste elle-même ses recettes."""
+    import threading
+
+    from utils.write_behind import WriteBehindQueue
+
+    monkeypatch.setattr("services.find_recipe_api.IMPORT_WAIT_SECONDS", 0.05)
+    monkeypatch.setattr(
+        "services.find_recipe_api.fetch_detailed_recipes_by_ingredients",
+        lambda **_kw: [FakeDetailedRecipe(id=123, title="Pancakes")],
+    )
+    release = threading.Event()
+    importer = WriteBehindQueue(lambda _b: release.wait(timeout=5))
+    dao = FakeRecipeDAO()
+
+    finder = ApiFindRecipe("fake_key", dao=dao, importer=importer)
+    res = finder.search_by_ingredients(IngredientSearchQuery(ingredients=["egg"]))
+    release.set()
+    assert importer.close(timeout=5)
+
+    assert len(dao.created_calls) == 1
+    assert [r.recipe_id for r in res] == [dao._db[0].recipe_id]
+
+
+def test_external_recipe_store_persists_batch_once_per_external_id():
+    """Le handler de la file : get-or-create idempotent (rejouable)."""
+    from services.find_recipe_api import ExternalRecipeStore
+
+    dao = FakeRecipeDAO()
+    store = ExternalRecipeStore(dao)
+    batch = [
+        FakeDetailedRecipe(id=1, title="Pancakes"),
+        FakeDetailedRecipe(id=2, title="Soup"),
+    ]
+
+    first = store.persist(batch)
+    again = store.persist(batch)
+
+    assert [r.recipe_id for r in first] == [r.recipe_id for r in again]
+    assert [c[0] for c in dao.created_calls] == ["Pancakes", "Soup"]
+
+
+def test_external_recipe_store_resolves_batch_ingredients_in_one_call(mocker):
+    """Ingrédients de tout le lot résolus en un appel ; quantités cumulées
+    seulement entre lignes de même unité."""
+    from types import SimpleNamespace
+
+    from services.find_recipe_api import ExternalRecipeStore
+
+    def ing(name, amount, unit="g"):
+        return SimpleNamespace(name=name, amount=amount, unit=unit)
+
+    pancakes = FakeDetailedRecipe(id=1, title="Pancakes")
+    pancakes.ingredients = [
+        ing("Flour", 100),
+        ing("flour", 50, "grams"),
+        ing("Flour", 2, "cups"),  # autre unité : ignorée
+        ing("Egg", 2, ""),
+    ]
+    soup = FakeDetailedRecipe(id=2, title="Soup")
+    soup.ingredients = [ing("Leek", 1, "unknown-unit"), ing("", 1)]
+
+    dao = FakeRecipeDAO()
+    upserts = mocker.spy(dao, "upsert_external_recipe")
+    ingredient_dao = mocker.Mock()
+    ingredient_dao.get_or_create_ingredient_ids.return_value = {
+        "flour": 1,
+        "egg": 2,
+        "leek": 3,
+    }
+
+    ExternalRecipeStore(dao, ingredient_dao).persist([pancakes, soup])
+
+    ingredient_dao.get_or_create_ingredient_ids.assert_called_once()
+    items = ingredient_dao.get_or_create_ingredient_ids.call_args.args[0]
+    assert [name for name, _unit in items] == [
+        "Flour",
+        "flour",
+        "Flour",
+        "Egg",
+        "Leek",
+    ]
+    assert items[-1][1] is None  # unité inconnue ignorée
+    ingredient_dao.get_ingredient_by_name.assert_not_called()
+    assert [c.kwargs["ingredient_items"] for c in upserts.call_args_list] == [
+        [(1, 150.0), (2, 2.0)],
+        [(3, 1.0)],
+    ]
@@ -72,6 +72,7 @@ def test_search_by_ingredients_normalizes_and_calls_dao(service, dao):
         max_missing=2,
         strict_only=False,
         dish_type=None,
+        match="ilike",
     )
 
 
@@ -94,9 +95,20 @@ def test_search_by_ingredients_passes_through_flags(service, dao):
         max_missing=1,
         strict_only=True,
         dish_type="dessert",
+        match="ilike",
     )
 
 
+def test_search_by_ingredients_uses_configured_match(dao):
+    dao.find_recipes_by_ingredients.return_value = []
+
+    DbFindRecipe(dao, match="trigram").search_by_ingredients(
+        IngredientSearchQuery(ingredients=["oeuf"])
+    )
+
+    assert dao.find_recipes_by_ingredients.call_args.kwargs["match"] == "trigram"
+
+
 def test_search_by_ingredients_returns_dao_result(service, dao, mocker):
     r1 = mocker.Mock(name="Recipe1")
     r2 = mocker.Mock(name="Recipe2")
@@ -106,3 +118,32 @@ def test_search_by_ingredients_returns_dao_result(service, dao, mocker):
     res = service.search_by_ingredients(query)
 
     assert res == [r1, r2]
+
+
+def test_search_by_ingredients_with_scorer_hydrates_ranked_ids(dao, mocker):
+    scorer = mocker.Mock()
+    scorer.rank.return_value = [12, 10]
+    dao.get_recipes_by_ids.return_value = ["r12", "r10"]
+
+    res = DbFindRecipe(dao, scorer=scorer).search_by_ingredients(
+        IngredientSearchQuery(ingredients=[" Oeuf "], limit=5, strict_only=True)
+    )
+
+    assert res == ["r12", "r10"]
+    scorer.rank.assert_called_once_with(
+        ["oeuf"], limit=5, max_missing=0, strict_only=True, dish_type=None
+    )
+    dao.get_recipes_by_ids.assert_called_once_with([12, 10], with_relations=True)
+    dao.find_recipes_by_ingredients.assert_not_called()
+
+
+def test_search_by_ingredients_with_scorer_no_match_skips_db(dao, mocker):
+    scorer = mocker.Mock()
+    scorer.rank.return_value = []
+
+    res = DbFindRecipe(dao, scorer=scorer).search_by_ingredients(
+        IngredientSearchQuery(ingredients=["oeuf"])
+    )
+
+    assert res == []
+    dao.get_recipes_by_ids.assert_not_called()
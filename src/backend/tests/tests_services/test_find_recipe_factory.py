@@ -1,13 +1,19 @@
 from __future__ import annotations
 
+from concurrent.futures import Future
+import threading
+import time
 from unittest.mock import Mock
 
 import pytest
 
 from business_objects.recipe import Recipe
 from business_objects.user import GenericUser
+from clients.spoonacular_client import SpoonacularRateLimitError
+from services import find_recipe_factory as factory_module
 from services.find_recipe import IngredientSearchQuery
 from services.find_recipe_factory import FindRecipeFactory
+from services.recipe_search_cache import SearchResultCache
 
 
 @pytest.fixture
@@ -111,3 +117,244 @@ def test_search_by_ingredients_deduplicates_ids(finder, db, api, monkeypatch):
     res = finder.search_by_ingredients(q)
     assert [r.recipe_id for r in res] == [1, 2, 3]
     api.search_by_ingredients.assert_called_once()
+
+
+# ---------------------------------------------------------------------
+# Cache des résultats
+# ---------------------------------------------------------------------
+
+
+def test_search_by_ingredients_served_from_cache(db, api):
+    finder = FindRecipeFactory(db=db, api=api, cache=SearchResultCache())
+    db.search_by_ingredients.return_value = [
+        Recipe(recipe_id=1, creator=_user(1), status="draft", prep_time=0, portions=1),
+    ]
+
+    first = finder.search_by_ingredients(
+        IngredientSearchQuery(ingredients=["egg", "Milk"], limit=1)
+    )
+    second = finder.search_by_ingredients(
+        IngredientSearchQuery(ingredients=["Milk", " egg"], limit=1)
+    )
+
+    assert [r.recipe_id for r in second] == [r.recipe_id for r in first] == [1]
+    db.search_by_ingredients.assert_called_once()
+
+
+def test_search_by_ingredients_executes_caller_query_when_cached(db, api):
+    finder = FindRecipeFactory(db=db, api=api, cache=SearchResultCache())
+    db.search_by_ingredients.return_value = []
+    api.search_by_ingredients.return_value = []
+    q = IngredientSearchQuery(ingredients=["Oeuf", "oeuf"], strict_only=True)
+
+    finder.search_by_ingredients(q)
+
+    # Seule la clé du cache est canonique : la requête part telle quelle
+    db.search_by_ingredients.assert_called_once_with(q)
+    assert api.search_by_ingredients.call_args.args[0].ingredients == ["Oeuf", "oeuf"]
+
+
+def test_search_by_ingredients_not_cached_when_recipe_written_meanwhile(db, api):
+    cache = SearchResultCache()
+    finder = FindRecipeFactory(db=db, api=api, cache=cache)
+    q = IngredientSearchQuery(ingredients=["egg"], limit=1)
+
+    def search_then_write(_query):
+        cache.on_recipe_write(7, False)  # écriture concurrente
+        return [
+            Recipe(
+                recipe_id=1, creator=_user(1), status="draft", prep_time=0, portions=1
+            )
+        ]
+
+    db.search_by_ingredients.side_effect = search_then_write
+
+    assert [r.recipe_id for r in finder.search_by_ingredients(q)] == [1]
+    assert cache.get(q) is None
+
+
+def test_search_by_ingredients_not_cached_when_api_quota_exceeded(db, api):
+    finder = FindRecipeFactory(db=db, api=api, cache=SearchResultCache())
+    db.search_by_ingredients.return_value = []
+    api.search_by_ingredients.side_effect = SpoonacularRateLimitError("quota")
+    q = IngredientSearchQuery(ingredients=["egg"], limit=2)
+
+    assert finder.search_by_ingredients(q) == []
+    assert finder.search_by_ingredients(q) == []
+    assert api.search_by_ingredients.call_count == 2
+
+
+def test_search_by_ingredients_skips_api_when_budget_spent(db, api):
+    quota = Mock()
+    quota.would_exceed.return_value = True
+    quota.remaining.return_value = 0.0
+    finder = FindRecipeFactory(
+        db=db, api=api, cache=SearchResultCache(), api_quota=quota
+    )
+    db.search_by_ingredients.return_value = []
+    q = IngredientSearchQuery(ingredients=["egg"], limit=2)
+
+    assert finder.search_by_ingredients(q) == []
+    assert finder.search_by_ingredients(q) == []  # non mis en cache
+
+    api.search_by_ingredients.assert_not_called()
+    quota.would_exceed.assert_called_with(pytest.approx(1.02 + 1.5))
+
+
+# ---------------------------------------------------------------------
+# Latence : deadline / hedge
+# ---------------------------------------------------------------------
+
+
+def _recipe(rid: int) -> Recipe:
+    return Recipe(
+        recipe_id=rid, creator=_user(1), status="draft", prep_time=0, portions=1
+    )
+
+
+def test_hedge_starts_api_before_db_returns(db, api):
+    api_started = threading.Event()
+
+    def api_search(_q):
+        api_started.set()
+        return [_recipe(2)]
+
+    def db_search(_q):
+        # La DB ne répond qu'une fois l'appel API lancé
+        assert api_started.wait(timeout=5)
+        return [_recipe(1)]
+
+    api.search_by_ingredients.side_effect = api_search
+    db.search_by_ingredients.side_effect = db_search
+    finder = FindRecipeFactory(db=db, api=api, hedge=True, api_wait_seconds=5)
+
+    res = finder.search_by_ingredients(
+        IngredientSearchQuery(ingredients=["egg"], limit=3)
+    )
+
+    assert [r.recipe_id for r in res] == [1, 2]
+    assert api.search_by_ingredients.call_args.args[0].limit == 3
+
+
+def test_hedge_ignores_api_when_db_is_enough(db, api):
+    db.search_by_ingredients.return_value = [_recipe(1), _recipe(2)]
+    api.search_by_ingredients.return_value = [_recipe(3)]
+    finder = FindRecipeFactory(db=db, api=api, hedge=True)
+
+    res = finder.search_by_ingredients(
+        IngredientSearchQuery(ingredients=["egg"], limit=2)
+    )
+
+    assert [r.recipe_id for r in res] == [1, 2]
+
+
+def test_api_wait_returns_db_results_when_api_is_slow(db, api):
+    release = threading.Event()
+
+    def slow_api(_q):
+        release.wait(timeout=5)
+        return [_recipe(2)]
+
+    api.search_by_ingredients.side_effect = slow_api
+    db.search_by_ingredients.return_value = [_recipe(1)]
+    cache = SearchResultCache()
+    finder = FindRecipeFactory(db=db, api=api, cache=cache, api_wait_seconds=0.05)
+    q = IngredientSearchQuery(ingredients=["egg"], limit=3)
+
+    started = time.monotonic()
+    res = finder.search_by_ingredients(q)
+    elapsed = time.monotonic() - started
+    release.set()
+
+    assert [r.recipe_id for r in res] == [1]
+    assert elapsed < 1.0
+    assert cache.get(q) is None  # résultat partiel : non mis en cache
+    assert api.search_by_ingredients.call_args.args[0].limit == 2
+
+
+def test_api_wait_spent_by_db_skips_api_call(db, api):
+    def slow_db(_q):
+        time.sleep(0.05)
+        return [_recipe(1)]
+
+    db.search_by_ingredients.side_effect = slow_db
+    cache = SearchResultCache()
+    finder = FindRecipeFactory(db=db, api=api, cache=cache, api_wait_seconds=0.01)
+    q = IngredientSearchQuery(ingredients=["egg"], limit=3)
+
+    res = finder.search_by_ingredients(q)
+
+    assert [r.recipe_id for r in res] == [1]
+    api.search_by_ingredients.assert_not_called()
+    assert cache.get(q) is None
+
+
+def test_api_wait_merges_api_results_in_time(db, api):
+    db.search_by_ingredients.return_value = [_recipe(1), _recipe(2)]
+    api.search_by_ingredients.return_value = [_recipe(2), _recipe(3)]
+    finder = FindRecipeFactory(db=db, api=api, api_wait_seconds=5)
+
+    res = finder.search_by_ingredients(
+        IngredientSearchQuery(ingredients=["egg"], limit=3)
+    )
+
+    assert [r.recipe_id for r in res] == [1, 2, 3]
+
+
+def test_api_skipped_when_executor_is_busy(db, api, monkeypatch):
+    slots = threading.BoundedSemaphore(1)
+    slots.acquire()  # tous les threads occupés
+    monkeypatch.setattr(factory_module, "_api_slots", slots)
+    db.search_by_ingredients.return_value = [_recipe(1)]
+    cache = SearchResultCache()
+    finder = FindRecipeFactory(db=db, api=api, cache=cache, api_wait_seconds=5)
+    q = IngredientSearchQuery(ingredients=["egg"], limit=3)
+
+    assert [r.recipe_id for r in finder.search_by_ingredients(q)] == [1]
+    api.search_by_ingredients.assert_not_called()
+    assert cache.get(q) is None
+
+
+def test_abandoned_api_call_is_cancelled_and_frees_its_slot(db, api, monkeypatch):
+    slots = threading.BoundedSemaphore(1)
+    monkeypatch.setattr(factory_module, "_api_slots", slots)
+    pending: Future = Future()  # jamais démarré : en file derrière d'autres appels
+    executor = Mock()
+    executor.submit.return_value = pending
+    monkeypatch.setattr(factory_module, "_shared_api_executor", lambda: executor)
+    db.search_by_ingredients.return_value = [_recipe(1)]
+    finder = FindRecipeFactory(db=db, api=api, api_wait_seconds=0.01)
+
+    res = finder.search_by_ingredients(
+        IngredientSearchQuery(ingredients=["egg"], limit=3)
+    )
+
+    assert [r.recipe_id for r in res] == [1]
+    assert pending.cancelled()
+    assert slots.acquire(blocking=False)
+
+
+def test_hedged_call_cancelled_when_db_is_enough(db, api, monkeypatch):
+    pending: Future = Future()
+    executor = Mock()
+    executor.submit.return_value = pending
+    monkeypatch.setattr(factory_module, "_shared_api_executor", lambda: executor)
+    db.search_by_ingredients.return_value = [_recipe(1)]
+    finder = FindRecipeFactory(db=db, api=api, hedge=True)
+
+    finder.search_by_ingredients(IngredientSearchQuery(ingredients=["egg"], limit=1))
+
+    assert pending.cancelled()
+
+
+def test_hedge_skipped_when_budget_spent(db, api):
+    quota = Mock()
+    quota.would_exceed.return_value = True
+    quota.remaining.return_value = 0.0
+    db.search_by_ingredients.return_value = []
+    finder = FindRecipeFactory(db=db, api=api, api_quota=quota, hedge=True)
+
+    assert (
+        finder.search_by_ingredients(IngredientSearchQuery(ingredients=["egg"])) == []
+    )
+    api.search_by_ingredients.assert_not_called()
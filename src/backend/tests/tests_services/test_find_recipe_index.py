@@ -0,0 +1,269 @@
+from __future__ import annotations
+
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+from dao.recipe_dao import RecipeIndexRow
+from services.find_recipe import IngredientSearchQuery
+from services.find_recipe_index import IndexFindRecipe, RecipeSearchIndex
+
+
+INGREDIENT_NAMES = {
+    1: "Oeuf",
+    2: "Lait",
+    3: "Sucre",
+    4: "Farine",
+    5: "Lait de coco",
+}
+
+
+def row(recipe_id, ingredient_ids, *, day=1, tags=()):
+    return RecipeIndexRow(
+        recipe_id=recipe_id,
+        created_at=datetime(2026, 1, day),
+        ingredient_ids=list(ingredient_ids),
+        tag_names=list(tags),
+    )
+
+
+@pytest.fixture
+def index() -> RecipeSearchIndex:
+    idx = RecipeSearchIndex()
+    idx.replace_all(
+        [
+            row(10, [1, 2, 3], day=1, tags=["Dessert"]),  # crème
+            row(11, [1], day=2),  # oeuf dur
+            row(12, [1, 2, 3, 4], day=3, tags=["dessert"]),  # crêpes
+            row(13, [4, 5], day=4),
+            row(14, [], day=5),  # recette sans ingrédient
+        ],
+        INGREDIENT_NAMES,
+    )
+    return idx
+
+
+# ---------------------------------------------------------------------
+# Tests : RecipeSearchIndex (mode strict)
+# ---------------------------------------------------------------------
+
+
+def test_strict_requires_all_terms(index):
+    res = index.search(["oeuf", "sucre"], strict_only=True)
+    # matched_count égal (2) -> created_at DESC
+    assert res == [12, 10]
+
+
+def test_strict_tolerates_max_missing(index):
+    res = index.search(["oeuf", "sucre", "farine"], strict_only=True, max_missing=1)
+    # 12 matche 3 termes, 10 en matche 2 ; 13 (farine) et 11 (oeuf) un seul
+    assert res == [12, 10]
+
+
+def test_strict_term_is_substring_case_insensitive(index):
+    # "LAIT" matche "Lait" et "Lait de coco"
+    assert index.search(["  LAIT "], strict_only=True) == [13, 12, 10]
+
+
+def test_strict_duplicate_terms_count_once(index):
+    assert index.search(["oeuf", "oeuf"], strict_only=True) == []
+    assert index.search(["oeuf", "oeuf"], strict_only=True, max_missing=1) == [
+        12,
+        11,
+        10,
+    ]
+
+
+# ---------------------------------------------------------------------
+# Tests : RecipeSearchIndex (mode inclusif)
+# ---------------------------------------------------------------------
+
+
+def test_inclusive_keeps_recipes_covered_by_query(index):
+    res = index.search(["oeuf", "lait", "sucre"])
+    # 10 entièrement couverte (3), 11 entièrement couverte (1)
+    assert res == [10, 11]
+
+
+def test_inclusive_tolerates_extra_ingredients(index):
+    res = index.search(["oeuf", "lait", "sucre"], max_missing=1)
+    # "lait" couvre aussi "Lait de coco" : 13 n'a qu'un ingrédient en trop
+    assert res == [12, 10, 13, 11]
+
+
+def test_inclusive_includes_unmatched_small_recipes(index):
+    # 11 n'a qu'un ingrédient (hors requête) : éligible avec max_missing=1,
+    # la recette sans ingrédient (14) ne l'est jamais
+    res = index.search(["farine"], max_missing=1)
+    assert res == [13, 11]
+
+
+def test_dish_type_filters_on_tags(index):
+    res = index.search(["oeuf"], strict_only=True, dish_type="DESS")
+    assert res == [12, 10]
+
+
+def test_limit_and_empty_terms(index):
+    assert index.search(["", "  "]) == []
+    assert index.search(["lait"], strict_only=True, limit=1) == [13]
+
+
+def test_null_created_at_sorts_first(index):
+    index.upsert(
+        RecipeIndexRow(recipe_id=15, created_at=None, ingredient_ids=[1], tag_names=[])
+    )
+    assert index.search(["oeuf"], strict_only=True) == [15, 12, 11, 10]
+
+
+# ---------------------------------------------------------------------
+# Tests : mises à jour incrémentales
+# ---------------------------------------------------------------------
+
+
+def test_upsert_replaces_recipe_postings(index):
+    index.upsert(row(11, [4], day=2))
+
+    assert 11 not in index.search(["oeuf"], strict_only=True)
+    assert index.search(["farine"], strict_only=True) == [13, 12, 11]
+
+
+def test_remove_drops_recipe(index):
+    index.remove(12)
+    index.remove(999)  # inconnue : sans effet
+
+    assert len(index) == 4
+    assert index.search(["oeuf"], strict_only=True) == [11, 10]
+
+
+def test_new_ingredient_name_invalidates_term_cache(index):
+    assert index.search(["beurre"], strict_only=True) == []
+
+    index.set_ingredient_name(6, "Beurre")
+    index.upsert(row(16, [6], day=6))
+
+    assert index.search(["beurre"], strict_only=True) == [16]
+
+
+# ---------------------------------------------------------------------
+# Tests : IndexFindRecipe
+# ---------------------------------------------------------------------
+
+
+@pytest.fixture
+def dao(mocker):
+    return mocker.Mock()
+
+
+@pytest.fixture
+def ingredient_dao(mocker):
+    m = mocker.Mock()
+    m.list_ingredients.return_value = [
+        SimpleNamespace(id_ingredient=i, name=n) for i, n in INGREDIENT_NAMES.items()
+    ]
+    return m
+
+
+@pytest.fixture
+def finder(dao, ingredient_dao) -> IndexFindRecipe:
+    dao.iter_search_index_rows.return_value = iter(
+        [row(10, [1, 2, 3], day=1), row(11, [1], day=2)]
+    )
+    f = IndexFindRecipe(dao, ingredient_dao)
+    f.load()
+    return f
+
+
+def test_load_builds_index_from_dao(finder, dao, ingredient_dao):
+    assert len(finder.index) == 2
+    dao.iter_search_index_rows.assert_called_once_with()
+    ingredient_dao.list_ingredients.assert_called_once_with(with_tags=False)
+
+
+def test_search_hydrates_only_selected_ids(finder, dao, mocker):
+    recipes = [mocker.Mock(name="R10"), mocker.Mock(name="R11")]
+    dao.get_recipes_by_ids.return_value = recipes
+
+    res = finder.search_by_ingredients(
+        IngredientSearchQuery(ingredients=["oeuf"], strict_only=True, limit=5)
+    )
+
+    assert res == recipes
+    dao.get_recipes_by_ids.assert_called_once_with([11, 10], with_relations=True)
+    dao.find_recipes_by_ingredients.assert_not_called()
+
+
+def test_search_without_match_skips_db(finder, dao):
+    res = finder.search_by_ingredients(
+        IngredientSearchQuery(ingredients=["chocolat"], strict_only=True)
+    )
+
+    assert res == []
+    dao.get_recipes_by_ids.assert_not_called()
+
+
+def test_get_by_id_delegates_to_dao(finder, dao, mocker):
+    fake_recipe = mocker.Mock(name="Recipe")
+    dao.get_recipe_by_id.return_value = fake_recipe
+
+    assert finder.get_by_id(3) is fake_recipe
+    dao.get_recipe_by_id.assert_called_once_with(3, with_relations=True)
+
+
+def test_on_recipe_write_reloads_recipe_and_new_names(finder, dao, ingredient_dao):
+    dao.iter_search_index_rows.return_value = iter([row(20, [1, 7], day=9)])
+    ingredient_dao.get_ingredient_by_id.return_value = SimpleNamespace(
+        id_ingredient=7, name="Beurre"
+    )
+
+    finder.on_recipe_write(20, False)
+
+    dao.iter_search_index_rows.assert_called_with([20])
+    ingredient_dao.get_ingredient_by_id.assert_called_once_with(7)
+    assert finder.index.search(["beurre"], strict_only=True) == [20]
+
+
+def test_on_recipe_write_removes_deleted_or_missing_recipe(finder, dao):
+    finder.on_recipe_write(10, True)
+    assert len(finder.index) == 1
+
+    dao.iter_search_index_rows.return_value = iter([])
+    finder.on_recipe_write(11, False)
+    assert len(finder.index) == 0
+
+
+def test_search_reloads_index_after_refresh_delay(dao, ingredient_dao):
+    now = [0.0]
+    dao.iter_search_index_rows.return_value = iter([row(10, [1], day=1)])
+    f = IndexFindRecipe(dao, ingredient_dao, refresh_seconds=60, clock=lambda: now[0])
+    f.load()
+    dao.get_recipes_by_ids.return_value = []
+    # Écriture faite par un autre worker : invisible pour l'index local
+    dao.iter_search_index_rows.return_value = iter(
+        [row(10, [1], day=1), row(11, [1], day=2)]
+    )
+
+    now[0] = 59.0
+    f.search_by_ingredients(IngredientSearchQuery(ingredients=["oeuf"]))
+    assert len(f.index) == 1
+
+    now[0] = 60.0
+    f.search_by_ingredients(IngredientSearchQuery(ingredients=["oeuf"]))
+    assert len(f.index) == 2
+    assert dao.iter_search_index_rows.call_count == 2
+
+
+def test_failed_reload_keeps_current_index(dao, ingredient_dao):
+    now = [0.0]
+    dao.iter_search_index_rows.return_value = iter([row(10, [1], day=1)])
+    f = IndexFindRecipe(dao, ingredient_dao, refresh_seconds=60, clock=lambda: now[0])
+    f.load()
+    dao.get_recipes_by_ids.return_value = []
+    dao.iter_search_index_rows.side_effect = RuntimeError("db down")
+
+    now[0] = 61.0
+    f.search_by_ingredients(IngredientSearchQuery(ingredients=["oeuf"]))
+    f.search_by_ingredients(IngredientSearchQuery(ingredients=["oeuf"]))
+
+    assert len(f.index) == 1
+    assert dao.iter_search_index_rows.call_count == 2  # un seul nouvel essai
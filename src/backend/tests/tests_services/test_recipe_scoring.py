@@ -0,0 +1,220 @@
+from __future__ import annotations
+
+from datetime import datetime
+import random
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from dao.recipe_dao import RecipeIndexRow
+from services.find_recipe_index import RecipeSearchIndex
+from services.recipe_scoring import RecipeIncidenceMatrix, RecipeScorer
+
+
+INGREDIENT_NAMES = {
+    1: "Oeuf",
+    2: "Lait",
+    3: "Sucre",
+    4: "Farine",
+    5: "Lait de coco",
+}
+
+
+def row(recipe_id, ingredient_ids, *, day=1, tags=()):
+    return RecipeIndexRow(
+        recipe_id=recipe_id,
+        created_at=datetime(2026, 1, day),
+        ingredient_ids=list(ingredient_ids),
+        tag_names=list(tags),
+    )
+
+
+ROWS = [
+    row(10, [1, 2, 3], day=1, tags=["Dessert"]),
+    row(11, [1], day=2),
+    row(12, [1, 2, 3, 4], day=3, tags=["dessert"]),
+    row(13, [4, 5], day=4),
+    row(14, [], day=5),
+]
+
+
+@pytest.fixture
+def matrix() -> RecipeIncidenceMatrix:
+    return RecipeIncidenceMatrix(ROWS, INGREDIENT_NAMES)
+
+
+# ---------------------------------------------------------------------
+# Tests : construction / compteurs
+# ---------------------------------------------------------------------
+
+
+def test_matrix_is_csr_without_empty_recipes(matrix):
+    assert len(matrix) == 4
+    assert matrix.recipe_ids.tolist() == [10, 11, 12, 13]
+    assert matrix.indptr.tolist() == [0, 3, 4, 8, 10]
+    assert matrix.sizes.tolist() == [3, 1, 4, 2]
+
+
+def test_score_counts_matched_missing_and_extra(matrix):
+    masks = np.column_stack([matrix.term_mask("oeuf"), matrix.term_mask("LAIT")])
+
+    scores = matrix.score(masks, n_terms=2)
+
+    assert scores.matched.tolist() == [2, 1, 2, 1]
+    assert scores.missing.tolist() == [0, 1, 0, 1]
+    # "lait" couvre "Lait" et "Lait de coco"
+    assert scores.covered.tolist() == [2, 1, 2, 1]
+    assert scores.extra.tolist() == [1, 0, 2, 1]
+
+
+def test_empty_matrix_ranks_nothing():
+    assert RecipeIncidenceMatrix([], {}).rank(["oeuf"]) == []
+
+
+# ---------------------------------------------------------------------
+# Tests : rank (mêmes résultats que le SQL / l'index inversé)
+# ---------------------------------------------------------------------
+
+
+def test_rank_strict(matrix):
+    assert matrix.rank(["oeuf", "sucre"], strict_only=True) == [12, 10]
+    assert matrix.rank(["oeuf", "oeuf"], strict_only=True) == []
+
+
+def test_rank_inclusive(matrix):
+    assert matrix.rank(["oeuf", "lait", "sucre"]) == [10, 11]
+    assert matrix.rank(["farine"], max_missing=1) == [13, 11]
+
+
+def test_rank_dish_type_and_limit(matrix):
+    assert matrix.rank(["oeuf"], strict_only=True, dish_type="DESS") == [12, 10]
+    assert matrix.rank(["lait"], strict_only=True, limit=1) == [13]
+
+
+def test_top_k_keeps_ties_in_sql_order(matrix):
+    key = np.array([1, 1, 1, 1])
+    keep = np.array([True, True, True, True])
+
+    assert matrix.top_k(key, keep, 2) == [13, 12]
+
+
+@pytest.mark.parametrize("strict_only", [True, False])
+@pytest.mark.parametrize("max_missing", [0, 1, 3])
+def test_rank_matches_inverted_index(strict_only, max_missing):
+    rng = random.Random(42)
+    names = {i: f"ingredient{i:03d}" for i in range(1, 60)}
+    rows = [
+        RecipeIndexRow(
+            recipe_id=rid,
+            created_at=None if rid % 17 == 0 else datetime(2026, 1, 1 + rid % 28),
+            ingredient_ids=rng.sample(range(1, 60), rng.randint(0, 8)),
+            tag_names=["dessert"] if rid % 3 == 0 else [],
+        )
+        for rid in range(1, 400)
+    ]
+    index = RecipeSearchIndex()
+    index.replace_all(rows, names)
+    matrix = RecipeIncidenceMatrix(rows, names)
+
+    for _ in range(20):
+        terms = [f"ingredient{i:03d}" for i in rng.sample(range(1, 60), 5)]
+        terms.append("ingredient00")  # terme ambigu (9 ingrédients)
+        for dish_type in (None, "dess"):
+            kwargs = {
+                "limit": 25,
+                "max_missing": max_missing,
+                "strict_only": strict_only,
+                "dish_type": dish_type,
+            }
+            assert matrix.rank(terms, **kwargs) == index.search(terms, **kwargs)
+
+
+# ---------------------------------------------------------------------
+# Tests : RecipeScorer
+# ---------------------------------------------------------------------
+
+
+@pytest.fixture
+def dao(mocker):
+    m = mocker.Mock()
+    m.iter_search_index_rows.return_value = iter(ROWS)
+    return m
+
+
+@pytest.fixture
+def ingredient_dao(mocker):
+    m = mocker.Mock()
+    m.list_ingredients.return_value = [
+        SimpleNamespace(id_ingredient=i, name=n) for i, n in INGREDIENT_NAMES.items()
+    ]
+    return m
+
+
+@pytest.fixture
+def scorer(dao, ingredient_dao) -> RecipeScorer:
+    s = RecipeScorer(dao, ingredient_dao)
+    s.load()
+    return s
+
+
+def test_scorer_load_and_rank(scorer, dao):
+    dao.iter_search_index_rows.assert_called_once_with()
+    assert len(scorer.matrix) == 4
+    assert scorer.rank(["oeuf"], strict_only=True) == [12, 11, 10]
+
+
+def test_scorer_write_rebuilds_matrix_lazily(scorer, dao, ingredient_dao):
+    before = scorer.matrix
+    dao.iter_search_index_rows.return_value = iter([row(20, [1, 6], day=9)])
+    ingredient_dao.get_ingredient_by_id.return_value = SimpleNamespace(
+        id_ingredient=6, name="Beurre"
+    )
+
+    scorer.on_recipe_write(20, False)
+    scorer.on_recipe_write(11, True)
+
+    dao.iter_search_index_rows.assert_called_with([20])
+    ingredient_dao.get_ingredient_by_id.assert_called_once_with(6)
+    assert scorer.matrix is not before
+    assert scorer.rank(["beurre"], strict_only=True) == [20]
+    assert scorer.rank(["oeuf"], strict_only=True) == [20, 12, 10]
+
+
+def test_scorer_serves_previous_matrix_while_rebuilding(scorer, dao, mocker):
+    before = scorer.matrix
+    dao.iter_search_index_rows.return_value = iter([row(20, [1], day=9)])
+    scorer.on_recipe_write(20, False)
+
+    served_during_build = []
+    real_matrix = RecipeIncidenceMatrix
+
+    def build(rows, names):
+        # Un autre lecteur arrive pendant la reconstruction (hors verrou)
+        served_during_build.append(scorer.matrix)
+        return real_matrix(rows, names)
+
+    mocker.patch("services.recipe_scoring.RecipeIncidenceMatrix", side_effect=build)
+
+    after = scorer.matrix
+
+    assert served_during_build == [before]
+    assert after is not before
+    assert scorer.matrix is after
+    assert 20 in after.recipe_ids.tolist()
+
+
+def test_scorer_keeps_previous_matrix_when_rebuild_fails(scorer, dao, mocker):
+    before = scorer.matrix
+    dao.iter_search_index_rows.return_value = iter([row(20, [1], day=9)])
+    scorer.on_recipe_write(20, False)
+    mocker.patch(
+        "services.recipe_scoring.RecipeIncidenceMatrix",
+        side_effect=[MemoryError(), before],
+    )
+
+    with pytest.raises(MemoryError):
+        _ = scorer.matrix
+
+    # La reconstruction est retentée à l'appel suivant
+    assert scorer.matrix is before
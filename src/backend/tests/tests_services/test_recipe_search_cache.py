@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import pytest
+
+from business_objects.recipe import Recipe
+from business_objects.user import GenericUser
+from services.find_recipe import IngredientSearchQuery
+from services.recipe_search_cache import SearchResultCache, canonical_query_key
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    return FakeClock()
+
+
+@pytest.fixture
+def cache(clock) -> SearchResultCache:
+    return SearchResultCache(ttl_seconds=10, max_entries=2, clock=clock)
+
+
+def q(*ingredients: str, **kwargs) -> IngredientSearchQuery:
+    return IngredientSearchQuery(ingredients=list(ingredients), **kwargs)
+
+
+# ---------------------------------------------------------------------
+# Tests : canonical_query_key
+# ---------------------------------------------------------------------
+
+
+def test_key_ignores_order_and_blanks():
+    assert canonical_query_key(q("Lait", " oeuf ", "")) == canonical_query_key(
+        q("oeuf", "Lait")
+    )
+
+
+def test_key_keeps_case_of_executed_terms():
+    # La requête exécutée n'est pas normalisée : "Oeuf" / "oeuf" peuvent compter
+    # pour deux termes distincts selon le moteur
+    assert canonical_query_key(q("Oeuf", "oeuf", strict_only=True)) != (
+        canonical_query_key(q("oeuf", "oeuf", strict_only=True))
+    )
+
+
+def test_key_keeps_duplicates_and_flags():
+    base = canonical_query_key(q("oeuf"))
+
+    assert canonical_query_key(q("oeuf", "oeuf")) != base
+    assert canonical_query_key(q("oeuf", strict_only=True)) != base
+    assert canonical_query_key(q("oeuf", max_missing=1)) != base
+    assert canonical_query_key(q("oeuf", limit=20)) != base
+    assert canonical_query_key(q("oeuf", dish_type="Dessert")) != base
+
+
+# ---------------------------------------------------------------------
+# Tests : SearchResultCache
+# ---------------------------------------------------------------------
+
+
+def test_get_returns_copy_of_stored_results(cache):
+    cache.put(q("oeuf", "lait"), ["r1", "r2"])
+
+    res = cache.get(q("lait", "oeuf"))
+    assert res == ["r1", "r2"]
+
+    res.append("r3")
+    assert cache.get(q("oeuf", "lait")) == ["r1", "r2"]
+
+
+def test_cached_recipes_are_isolated_from_callers(cache):
+    creator = GenericUser(id_user=1, pseudo="user1", password="____")
+    recipe = Recipe(
+        recipe_id=1, creator=creator, status="public", prep_time=0, portions=2
+    )
+    recipe.add_ingredient(3, 100.0)
+    cache.put(q("oeuf"), [recipe])
+
+    recipe.scale_portions(4)  # l'appelant modifie ce qu'il a mis en cache
+    first = cache.get(q("oeuf"))
+    first[0].scale_portions(8)  # ... ou ce qu'il a reçu
+    first[0].add_translation("fr", "Modifiée", "")
+
+    again = cache.get(q("oeuf"))
+    assert again[0].portions == 2
+    assert again[0].ingredients == [(3, 100.0)]
+    assert again[0].translations == {}
+
+
+def test_entries_expire_after_ttl(cache, clock):
+    cache.put(q("oeuf"), ["r1"])
+
+    clock.now = 9.9
+    assert cache.get(q("oeuf")) == ["r1"]
+    clock.now = 10.0
+    assert cache.get(q("oeuf")) is None
+    assert len(cache) == 0
+
+
+def test_lru_eviction(cache):
+    cache.put(q("a"), ["ra"])
+    cache.put(q("b"), ["rb"])
+    cache.get(q("a"))  # "a" devient le plus récent
+    cache.put(q("c"), ["rc"])
+
+    assert cache.get(q("b")) is None
+    assert cache.get(q("a")) == ["ra"]
+    assert cache.get(q("c")) == ["rc"]
+
+
+def test_recipe_write_invalidates_everything(cache):
+    cache.put(q("a"), ["ra"])
+    cache.put(q("b"), ["rb"])
+
+    cache.on_recipe_write(1, False)
+
+    assert len(cache) == 0
+
+
+def test_put_skipped_when_cleared_during_computation(cache):
+    generation = cache.generation()
+
+    cache.clear()  # écriture de recette pendant le calcul
+    cache.put(q("a"), ["stale"], generation=generation)
+
+    assert cache.get(q("a")) is None
+
+    cache.put(q("a"), ["ra"], generation=cache.generation())
+    assert cache.get(q("a")) == ["ra"]
+
+
+@pytest.mark.parametrize(
+    "kwargs", [{"ttl_seconds": 0}, {"max_entries": 0}], ids=["ttl", "size"]
+)
+def test_invalid_parameters(kwargs):
+    with pytest.raises(ValueError):
+        SearchResultCache(**kwargs)
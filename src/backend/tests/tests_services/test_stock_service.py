@@ -5,9 +5,12 @@ from datetime import date
 
 import pytest
 
+from dao.stock_item_dao import IngredientConsumption, RecipeConsumption
 from services.stock_service import (
     ConsumeResult,
     ForbiddenError,
+    InsufficientStockError,
+    NewLot,
     NotFoundError,
     StockService,
     ValidationError,
@@ -28,10 +31,12 @@ class FakeStock:
 @pytest.fixture
 def mock_db_ownership(mocker):
     """
-    Mock DBConnection utilisé uniquement par StockService._user_owns_stock().
+    Mock DBConnection utilisé par StockService._user_owns_stock() et
+    StockService._require_stock_access().
 
     - conn.cursor() utilisé en context manager
-    - cur.fetchone() => None (pas owner) ou {"?": 1} (owner)
+    - _user_owns_stock : cur.fetchone() => None (pas owner) ou {"?": 1} (owner)
+    - _require_stock_access : cur.fetchone() => access_row(...)
     """
     cur = mocker.Mock(name="cursor")
     cur.__enter__ = mocker.Mock(return_value=cur)
@@ -48,6 +53,14 @@ def mock_db_ownership(mocker):
     return conn, cur
 
 
+def access_row(stock_exists=True, owned=True, ingredient_exists=True):
+    return {
+        "stock_exists": stock_exists,
+        "owned": owned,
+        "ingredient_exists": ingredient_exists,
+    }
+
+
 @pytest.fixture
 def mocked_daos(mocker):
     stock_dao = mocker.Mock(name="StockDAO")
@@ -123,6 +136,48 @@ def test_get_user_stock_by_name_delegates(service, mocked_daos):
     )
 
 
+# ---------------------------------------------------------------------
+# Tests: _require_stock_access
+# ---------------------------------------------------------------------
+
+
+def test_require_stock_access_checks_everything_in_one_query(
+    service, mocked_daos, mock_db_ownership
+):
+    stock_dao, _, ingredient_dao = mocked_daos
+    _, cur = mock_db_ownership
+    cur.fetchone.return_value = access_row()
+
+    service._require_stock_access(user_id=42, stock_id=1, ingredient_id=7)
+
+    cur.execute.assert_called_once()
+    assert cur.execute.call_args[0][1] == (1, 42, 1, 7)
+    stock_dao.get_stock_by_id.assert_not_called()
+    ingredient_dao.get_ingredient_by_id.assert_not_called()
+
+
+def test_require_stock_access_memoizes_ownership(service, mock_db_ownership):
+    _, cur = mock_db_ownership
+    cur.fetchone.return_value = access_row()
+
+    service._require_stock_access(user_id=42, stock_id=1)
+    service._require_stock_access(user_id=42, stock_id=1)
+    service._require_stock_ownership(user_id=42, stock_id=1)
+
+    cur.execute.assert_called_once()
+
+
+def test_require_stock_access_does_not_memoize_refusal(service, mock_db_ownership):
+    _, cur = mock_db_ownership
+    cur.fetchone.return_value = access_row(owned=False)
+
+    for _ in range(2):
+        with pytest.raises(ForbiddenError):
+            service._require_stock_access(user_id=42, stock_id=1)
+
+    assert cur.execute.call_count == 2
+
+
 # ---------------------------------------------------------------------
 # Tests: add_lot
 # ---------------------------------------------------------------------
@@ -139,22 +194,22 @@ def test_add_lot_invalid_quantity_raises(service, mocked_daos):
     ingredient_dao.get_ingredient_by_id.assert_not_called()
 
 
-def test_add_lot_stock_not_found_raises(service, mocked_daos):
+def test_add_lot_stock_not_found_raises(service, mocked_daos, mock_db_ownership):
     stock_dao, _, _ = mocked_daos
-    stock_dao.get_stock_by_id.return_value = None
+    _, cur = mock_db_ownership
+    cur.fetchone.return_value = access_row(stock_exists=False)
 
     with pytest.raises(NotFoundError):
         service.add_lot(user_id=42, stock_id=99, ingredient_id=2, quantity=1)
 
-    stock_dao.get_stock_by_id.assert_called_once_with(99, with_items=False)
+    cur.execute.assert_called_once()
 
 
 def test_add_lot_forbidden_if_not_owner(service, mocked_daos, mock_db_ownership):
     stock_dao, stock_item_dao, ingredient_dao = mocked_daos
     conn, cur = mock_db_ownership
 
-    stock_dao.get_stock_by_id.return_value = FakeStock(id_stock=1, nom="Cuisine")
-    cur.fetchone.return_value = None  # pas owner
+    cur.fetchone.return_value = access_row(owned=False)
 
     with pytest.raises(ForbiddenError):
         service.add_lot(user_id=42, stock_id=1, ingredient_id=2, quantity=1)
@@ -169,14 +224,11 @@ def test_add_lot_ingredient_not_found_raises(service, mocked_daos, mock_db_owner
     stock_dao, stock_item_dao, ingredient_dao = mocked_daos
     _, cur = mock_db_ownership
 
-    stock_dao.get_stock_by_id.return_value = FakeStock(id_stock=1, nom="Cuisine")
-    cur.fetchone.return_value = {"ok": 1}  # owner
-    ingredient_dao.get_ingredient_by_id.return_value = None
+    cur.fetchone.return_value = access_row(ingredient_exists=False)
 
     with pytest.raises(NotFoundError):
         service.add_lot(user_id=42, stock_id=1, ingredient_id=999, quantity=1)
 
-    ingredient_dao.get_ingredient_by_id.assert_called_once_with(999, with_tags=False)
     stock_item_dao.create_stock_item.assert_not_called()
 
 
@@ -184,9 +236,7 @@ def test_add_lot_success(service, mocked_daos, mock_db_ownership):
     stock_dao, stock_item_dao, ingredient_dao = mocked_daos
     _, cur = mock_db_ownership
 
-    stock_dao.get_stock_by_id.return_value = FakeStock(id_stock=1, nom="Cuisine")
-    cur.fetchone.return_value = {"ok": 1}  # owner
-    ingredient_dao.get_ingredient_by_id.return_value = object()  # exists
+    cur.fetchone.return_value = access_row()
     stock_item_dao.create_stock_item.return_value = 123
 
     lot_id = service.add_lot(
@@ -206,27 +256,72 @@ def test_add_lot_success(service, mocked_daos, mock_db_ownership):
     )
 
 
+# ---------------------------------------------------------------------
+# Tests: add_lots_bulk
+# ---------------------------------------------------------------------
+
+
+def test_add_lots_bulk_forbidden_if_not_owner(service, mocked_daos, mock_db_ownership):
+    _, stock_item_dao, _ = mocked_daos
+    _, cur = mock_db_ownership
+    cur.fetchone.return_value = access_row(owned=False)
+
+    with pytest.raises(ForbiddenError):
+        service.add_lots_bulk(user_id=42, stock_id=1, lots=[NewLot(7, 1.0)])
+
+    stock_item_dao.create_stock_items.assert_not_called()
+
+
+def test_add_lots_bulk_reports_errors_per_row(service, mocked_daos, mock_db_ownership):
+    _, stock_item_dao, _ = mocked_daos
+    _, cur = mock_db_ownership
+    cur.fetchone.return_value = access_row()
+    # 2e lot valide (position 1 envoyée au DAO) : ingrédient inconnu
+    stock_item_dao.create_stock_items.return_value = {0: 101, 2: 103}
+
+    result = service.add_lots_bulk(
+        user_id=42,
+        stock_id=1,
+        lots=[
+            NewLot(7, 1.5, date(2026, 3, 1)),
+            NewLot(8, 0),
+            NewLot(999, 1.0),
+            NewLot(9, 2.0),
+        ],
+    )
+
+    assert result.created == {0: 101, 3: 103}
+    assert [(e.index, e.ingredient_id) for e in result.errors] == [(1, 8), (2, 999)]
+    assert result.errors[1].message == "Ingrédient introuvable."
+
+    cur.execute.assert_called_once()
+    stock_item_dao.create_stock_items.assert_called_once_with(
+        stock_id=1,
+        items=[(7, 1.5, date(2026, 3, 1)), (999, 1.0, None), (9, 2.0, None)],
+    )
+
+
 # ---------------------------------------------------------------------
 # Tests: list_lots
 # ---------------------------------------------------------------------
 
 
-def test_list_lots_stock_not_found(service, mocked_daos):
+def test_list_lots_stock_not_found(service, mocked_daos, mock_db_ownership):
     stock_dao, _, _ = mocked_daos
-    stock_dao.get_stock_by_id.return_value = None
+    _, cur = mock_db_ownership
+    cur.fetchone.return_value = access_row(stock_exists=False)
 
     with pytest.raises(NotFoundError):
         service.list_lots(user_id=42, stock_id=1)
 
-    stock_dao.get_stock_by_id.assert_called_once_with(1, with_items=False)
+    cur.execute.assert_called_once()
 
 
 def test_list_lots_forbidden_if_not_owner(service, mocked_daos, mock_db_ownership):
     stock_dao, stock_item_dao, _ = mocked_daos
     _, cur = mock_db_ownership
 
-    stock_dao.get_stock_by_id.return_value = FakeStock(id_stock=1, nom="Cuisine")
-    cur.fetchone.return_value = None  # pas owner
+    cur.fetchone.return_value = access_row(owned=False)
 
     with pytest.raises(ForbiddenError):
         service.list_lots(user_id=42, stock_id=1)
@@ -238,8 +333,7 @@ def test_list_lots_success_with_filter(service, mocked_daos, mock_db_ownership):
     stock_dao, stock_item_dao, _ = mocked_daos
     _, cur = mock_db_ownership
 
-    stock_dao.get_stock_by_id.return_value = FakeStock(id_stock=1, nom="Cuisine")
-    cur.fetchone.return_value = {"ok": 1}  # owner
+    cur.fetchone.return_value = access_row()
 
     stock_item_dao.list_stock_items.return_value = ["lot1", "lot2"]
 
@@ -316,22 +410,22 @@ def test_consume_fefo_invalid_quantity(service, mocked_daos):
     ingredient_dao.get_ingredient_by_id.assert_not_called()
 
 
-def test_consume_fefo_stock_not_found(service, mocked_daos):
+def test_consume_fefo_stock_not_found(service, mocked_daos, mock_db_ownership):
     stock_dao, _, _ = mocked_daos
-    stock_dao.get_stock_by_id.return_value = None
+    _, cur = mock_db_ownership
+    cur.fetchone.return_value = access_row(stock_exists=False)
 
     with pytest.raises(NotFoundError):
         service.consume_fefo(user_id=1, stock_id=999, ingredient_id=1, quantity=1)
 
-    stock_dao.get_stock_by_id.assert_called_once_with(999, with_items=False)
+    cur.execute.assert_called_once()
 
 
 def test_consume_fefo_forbidden_if_not_owner(service, mocked_daos, mock_db_ownership):
     stock_dao, stock_item_dao, _ = mocked_daos
     _, cur = mock_db_ownership
 
-    stock_dao.get_stock_by_id.return_value = FakeStock(id_stock=1, nom="Cuisine")
-    cur.fetchone.return_value = None  # pas owner
+    cur.fetchone.return_value = access_row(owned=False)
 
     with pytest.raises(ForbiddenError):
         service.consume_fefo(user_id=42, stock_id=1, ingredient_id=7, quantity=1)
@@ -343,9 +437,7 @@ def test_consume_fefo_ingredient_not_found(service, mocked_daos, mock_db_ownersh
     stock_dao, stock_item_dao, ingredient_dao = mocked_daos
     _, cur = mock_db_ownership
 
-    stock_dao.get_stock_by_id.return_value = FakeStock(id_stock=1, nom="Cuisine")
-    cur.fetchone.return_value = {"ok": 1}  # owner
-    ingredient_dao.get_ingredient_by_id.return_value = None
+    cur.fetchone.return_value = access_row(ingredient_exists=False)
 
     with pytest.raises(NotFoundError):
         service.consume_fefo(user_id=42, stock_id=1, ingredient_id=999, quantity=1)
@@ -357,9 +449,7 @@ def test_consume_fefo_success(service, mocked_daos, mock_db_ownership):
     stock_dao, stock_item_dao, ingredient_dao = mocked_daos
     _, cur = mock_db_ownership
 
-    stock_dao.get_stock_by_id.return_value = FakeStock(id_stock=1, nom="Cuisine")
-    cur.fetchone.return_value = {"ok": 1}  # owner
-    ingredient_dao.get_ingredient_by_id.return_value = object()  # exists
+    cur.fetchone.return_value = access_row()
 
     result = service.consume_fefo(user_id=42, stock_id=1, ingredient_id=7, quantity=2.0)
 
@@ -399,14 +489,15 @@ def mocker_lot(stock_item_id: int, fk_stock_id: int):
 # ---------------------------------------------------------------------
 
 
-def test_delete_stock_stock_not_found_raises(service, mocked_daos):
+def test_delete_stock_stock_not_found_raises(service, mocked_daos, mock_db_ownership):
     stock_dao, stock_item_dao, _ = mocked_daos
-    stock_dao.get_stock_by_id.return_value = None
+    _, cur = mock_db_ownership
+    cur.fetchone.return_value = access_row(stock_exists=False)
 
     with pytest.raises(NotFoundError):
         service.delete_stock(user_id=42, stock_id=99)
 
-    stock_dao.get_stock_by_id.assert_called_once_with(99, with_items=False)
+    cur.execute.assert_called_once()
     stock_dao.delete_stock.assert_not_called()
     stock_item_dao.delete_stock_items_by_stock.assert_not_called()
 
@@ -415,8 +506,7 @@ def test_delete_stock_forbidden_if_not_owner(service, mocked_daos, mock_db_owner
     stock_dao, _, _ = mocked_daos
     _, cur = mock_db_ownership
 
-    stock_dao.get_stock_by_id.return_value = FakeStock(id_stock=1, nom="Cuisine")
-    cur.fetchone.return_value = None  # pas owner
+    cur.fetchone.return_value = access_row(owned=False)
 
     with pytest.raises(ForbiddenError):
         service.delete_stock(user_id=42, stock_id=1)
@@ -428,8 +518,7 @@ def test_delete_stock_success(service, mocked_daos, mock_db_ownership):
     stock_dao, _, _ = mocked_daos
     _, cur = mock_db_ownership
 
-    stock_dao.get_stock_by_id.return_value = FakeStock(id_stock=1, nom="Cuisine")
-    cur.fetchone.return_value = {"ok": 1}  # owner
+    cur.fetchone.return_value = access_row()
     stock_dao.delete_stock.return_value = True
 
     ok = service.delete_stock(user_id=42, stock_id=1)
@@ -438,9 +527,10 @@ def test_delete_stock_success(service, mocked_daos, mock_db_ownership):
     stock_dao.delete_stock.assert_called_once_with(1)
 
 
-def test_empty_stock_stock_not_found_raises(service, mocked_daos):
+def test_empty_stock_stock_not_found_raises(service, mocked_daos, mock_db_ownership):
     stock_dao, stock_item_dao, _ = mocked_daos
-    stock_dao.get_stock_by_id.return_value = None
+    _, cur = mock_db_ownership
+    cur.fetchone.return_value = access_row(stock_exists=False)
 
     with pytest.raises(NotFoundError):
         service.empty_stock(user_id=42, stock_id=99)
@@ -452,8 +542,7 @@ def test_empty_stock_forbidden_if_not_owner(service, mocked_daos, mock_db_owners
     stock_dao, stock_item_dao, _ = mocked_daos
     _, cur = mock_db_ownership
 
-    stock_dao.get_stock_by_id.return_value = FakeStock(id_stock=1, nom="Cuisine")
-    cur.fetchone.return_value = None  # pas owner
+    cur.fetchone.return_value = access_row(owned=False)
 
     with pytest.raises(ForbiddenError):
         service.empty_stock(user_id=42, stock_id=1)
@@ -465,8 +554,7 @@ def test_empty_stock_success(service, mocked_daos, mock_db_ownership):
     stock_dao, stock_item_dao, _ = mocked_daos
     _, cur = mock_db_ownership
 
-    stock_dao.get_stock_by_id.return_value = FakeStock(id_stock=1, nom="Cuisine")
-    cur.fetchone.return_value = {"ok": 1}  # owner
+    cur.fetchone.return_value = access_row()
     stock_item_dao.delete_stock_items_by_stock.return_value = 3
 
     deleted_count = service.empty_stock(user_id=42, stock_id=1)
@@ -521,6 +609,88 @@ def test_consume_fefo_all_stocks_success(service, mocked_daos):
     )
 
 
+# ---------------------------------------------------------------------
+# Tests: cook_recipe
+# ---------------------------------------------------------------------
+
+
+def test_cook_recipe_invalid_portions(service, mocked_daos):
+    _stock_dao, stock_item_dao, _ingredient_dao = mocked_daos
+
+    with pytest.raises(ValidationError):
+        service.cook_recipe(user_id=42, recipe_id=3, portions=0)
+
+    stock_item_dao.consume_recipe_fefo_for_user.assert_not_called()
+
+
+def test_cook_recipe_without_recipe_portions_is_a_validation_error(
+    service, mocked_daos
+):
+    _stock_dao, stock_item_dao, _ingredient_dao = mocked_daos
+    stock_item_dao.consume_recipe_fefo_for_user.side_effect = ValueError(
+        "La recette n'a pas de nombre de portions"
+    )
+
+    with pytest.raises(ValidationError):
+        service.cook_recipe(user_id=42, recipe_id=3, portions=2)
+
+
+def test_cook_recipe_not_found(service, mocked_daos):
+    _stock_dao, stock_item_dao, _ingredient_dao = mocked_daos
+    stock_item_dao.consume_recipe_fefo_for_user.return_value = None
+
+    with pytest.raises(NotFoundError):
+        service.cook_recipe(user_id=42, recipe_id=999)
+
+
+def test_cook_recipe_reports_shortages(service, mocked_daos):
+    _stock_dao, stock_item_dao, _ingredient_dao = mocked_daos
+    stock_item_dao.consume_recipe_fefo_for_user.return_value = RecipeConsumption(
+        recipe_id=3,
+        portions=4,
+        ingredients=[
+            IngredientConsumption(
+                ingredient_id=7, required=2.0, available=5.0, by_stock={}
+            ),
+            IngredientConsumption(
+                ingredient_id=8, required=3.0, available=1.0, by_stock={}
+            ),
+        ],
+    )
+
+    with pytest.raises(InsufficientStockError) as exc_info:
+        service.cook_recipe(user_id=42, recipe_id=3, portions=4)
+
+    assert [s.ingredient_id for s in exc_info.value.shortages] == [8]
+    assert exc_info.value.shortages[0].missing == 2.0
+
+
+def test_cook_recipe_success(service, mocked_daos):
+    _stock_dao, stock_item_dao, _ingredient_dao = mocked_daos
+    stock_item_dao.consume_recipe_fefo_for_user.return_value = RecipeConsumption(
+        recipe_id=3,
+        portions=2,
+        ingredients=[
+            IngredientConsumption(
+                ingredient_id=7, required=2.0, available=5.0, by_stock={1: 1.5, 2: 0.5}
+            ),
+        ],
+    )
+
+    result = service.cook_recipe(user_id=42, recipe_id=3, portions=2)
+
+    assert result.recipe_id == 3
+    assert result.portions == 2
+    assert len(result.ingredients) == 1
+    assert result.ingredients[0].ingredient_id == 7
+    assert result.ingredients[0].consumed_quantity == 2.0
+    assert result.ingredients[0].by_stock == {1: 1.5, 2: 0.5}
+
+    stock_item_dao.consume_recipe_fefo_for_user.assert_called_once_with(
+        user_id=42, recipe_id=3, portions=2
+    )
+
+
 # ---------------------------------------------------------------------
 # Tests: admin_list_stocks_by_name
 # ---------------------------------------------------------------------
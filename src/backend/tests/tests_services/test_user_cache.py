@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import pytest
+
+from services import user_cache
+from services.user_cache import UserExistenceCache, invalidate_cached_user
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    return FakeClock()
+
+
+@pytest.fixture
+def cache(clock) -> UserExistenceCache:
+    return UserExistenceCache(ttl_seconds=10, max_entries=2, clock=clock)
+
+
+# ---------------------------------------------------------------------
+# Tests : UserExistenceCache
+# ---------------------------------------------------------------------
+
+
+def test_unknown_user_is_not_contained(cache):
+    assert not cache.contains(1)
+
+
+def test_put_then_contains(cache):
+    cache.put(1)
+
+    assert cache.contains(1)
+
+
+def test_entry_expires_after_ttl(cache, clock):
+    cache.put(1)
+
+    clock.now = 10.0
+
+    assert not cache.contains(1)
+    assert len(cache) == 0
+
+
+def test_least_recently_used_entry_is_evicted(cache):
+    cache.put(1)
+    cache.put(2)
+    cache.contains(1)
+
+    cache.put(3)
+
+    assert cache.contains(1)
+    assert not cache.contains(2)
+    assert cache.contains(3)
+
+
+def test_invalidate_removes_entry(cache):
+    cache.put(1)
+
+    cache.invalidate(1)
+    cache.invalidate(42)
+
+    assert not cache.contains(1)
+
+
+def test_put_read_before_invalidation_is_ignored(cache):
+    generation = cache.generation()
+    cache.invalidate(1)  # compte supprimé pendant la lecture
+
+    cache.put(1, generation=generation)
+    cache.put(2, generation=generation)  # autre utilisateur : non concerné
+
+    assert not cache.contains(1)
+    assert cache.contains(2)
+
+
+def test_put_after_invalidation_is_kept(cache):
+    cache.invalidate(1)
+    generation = cache.generation()
+
+    cache.put(1, generation=generation)
+
+    assert cache.contains(1)
+
+
+def test_forgotten_invalidations_still_reject_older_reads(cache):
+    generation = cache.generation()
+    cache.invalidate(1)
+    cache.invalidate(2)
+    cache.invalidate(3)  # max_entries=2 : l'invalidation de 1 est oubliée
+
+    cache.put(1, generation=generation)
+    cache.clear()
+    cache.put(2, generation=generation)
+
+    assert not cache.contains(1)
+    assert not cache.contains(2)
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [{"ttl_seconds": 0}, {"max_entries": 0}],
+)
+def test_invalid_parameters_raise(kwargs):
+    with pytest.raises(ValueError):
+        UserExistenceCache(**kwargs)
+
+
+# ---------------------------------------------------------------------
+# Tests : invalidate_cached_user
+# ---------------------------------------------------------------------
+
+
+def test_invalidate_cached_user_without_shared_cache_is_noop(mocker):
+    mocker.patch.object(user_cache, "_shared_cache", None)
+
+    invalidate_cached_user(1)
+
+
+def test_invalidate_cached_user_targets_shared_cache(mocker, cache):
+    mocker.patch.object(user_cache, "_shared_cache", cache)
+    cache.put(1)
+
+    invalidate_cached_user(1)
+
+    assert not cache.contains(1)
@@ -368,3 +368,12 @@ def test_delete_user_not_found(service, mock_dao):
 
     with pytest.raises(UserNotFoundError):
         service.delete_user(999)
+
+
+def test_delete_user_invalidates_cached_user(service, mock_dao, mocker):
+    mock_dao.delete_user.return_value = True
+    invalidate = mocker.patch("services.user_service.invalidate_cached_user")
+
+    service.delete_user(1)
+
+    invalidate.assert_called_once_with(1)
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import time
+
+import pytest
+
+from utils import jwt_utils
+from utils.jwt_utils import (
+    JWTExpiredError,
+    JWTInvalidTokenError,
+    JWTIssuerError,
+    VerifiedTokenCache,
+    decode_jwt,
+    encode_jwt,
+)
+
+
+SECRET = "s3cret"
+
+
+def token(**claims) -> str:
+    payload = {"iss": "projet2a", "uid": 1, "exp": int(time.time()) + 60}
+    payload.update(claims)
+    return encode_jwt(payload, secret=SECRET)
+
+
+def test_roundtrip_and_signature_check():
+    t = token()
+    assert decode_jwt(t, secret=SECRET, issuer="projet2a")["uid"] == 1
+
+    with pytest.raises(JWTInvalidTokenError):
+        decode_jwt(t, secret="other")
+    with pytest.raises(JWTIssuerError):
+        decode_jwt(t, secret=SECRET, issuer="other")
+    with pytest.raises(JWTExpiredError):
+        decode_jwt(token(exp=int(time.time()) - 1), secret=SECRET)
+
+
+def test_cache_skips_verification_on_hit(mocker):
+    cache = VerifiedTokenCache()
+    t = token()
+    verify = mocker.spy(jwt_utils, "_decode_and_verify")
+
+    first = decode_jwt(t, secret=SECRET, issuer="projet2a", cache=cache)
+    first["uid"] = 999  # ne doit pas altérer l'entrée en cache
+    second = decode_jwt(t, secret=SECRET, issuer="projet2a", cache=cache)
+
+    assert verify.call_count == 1
+    assert second["uid"] == 1
+
+
+def test_cache_is_keyed_on_secret_and_issuer():
+    cache = VerifiedTokenCache()
+    t = token()
+    decode_jwt(t, secret=SECRET, issuer="projet2a", cache=cache)
+
+    with pytest.raises(JWTInvalidTokenError):
+        decode_jwt(t, secret="other", issuer="projet2a", cache=cache)
+    with pytest.raises(JWTIssuerError):
+        decode_jwt(t, secret=SECRET, issuer="other", cache=cache)
+
+
+def test_cached_token_expires():
+    now = [1_000.0]
+    cache = VerifiedTokenCache(clock=lambda: now[0])
+    t = encode_jwt({"exp": 1_010}, secret=SECRET)
+    cache.put((SECRET, None, t), {"exp": 1_010}, 1_010)
+
+    assert decode_jwt(t, secret=SECRET, cache=cache) == {"exp": 1_010}
+    now[0] = 1_010.0
+    with pytest.raises(JWTExpiredError):
+        decode_jwt(t, secret=SECRET, cache=cache)
+    assert len(cache) == 0
+
+
+def test_cache_is_bounded_lru():
+    cache = VerifiedTokenCache(max_entries=2)
+    a, b, c = token(uid=1), token(uid=2), token(uid=3)
+    for t in (a, b):
+        decode_jwt(t, secret=SECRET, cache=cache)
+    decode_jwt(a, secret=SECRET, cache=cache)  # a devient le plus récent
+    decode_jwt(c, secret=SECRET, cache=cache)
+
+    assert len(cache) == 2
+    assert cache.get((SECRET, None, b)) is None
+    assert cache.get((SECRET, None, a)) is not None
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+import threading
+
+import pytest
+
+from exceptions import PasswordHashingBusyError
+from utils import securite
+from utils.password_pool import PasswordHashPool
+
+
+def test_hash_and_check_run_in_worker_processes():
+    pool = PasswordHashPool(max_workers=1)
+    try:
+        hashed = securite.hash_password("mdpAlice123", rounds=4)
+        assert pool.check("mdpAlice123", hashed) is True
+        assert pool.check("wrong", hashed) is False
+    finally:
+        pool.shutdown()
+
+
+def test_saturated_pool_rejects_immediately():
+    release = threading.Event()
+    started = threading.Semaphore(0)
+
+    def slow() -> str:
+        started.release()
+        release.wait(timeout=5)
+        return "done"
+
+    pool = PasswordHashPool(
+        max_workers=1, max_pending=2, executor_factory=ThreadPoolExecutor
+    )
+    callers = [threading.Thread(target=pool.run, args=(slow,)) for _ in range(2)]
+    callers[0].start()
+    assert started.acquire(timeout=5)  # 1 en cours
+    callers[1].start()
+    callers[1].join(timeout=0.2)  # 1 en attente
+
+    with pytest.raises(PasswordHashingBusyError):
+        pool.run(slow)
+
+    release.set()
+    for t in callers:
+        t.join(timeout=5)
+    # Les places sont rendues une fois les appels terminés
+    assert pool.run(lambda: "ok") == "ok"
+    pool.shutdown()
+
+
+def test_slot_is_released_when_call_fails():
+    pool = PasswordHashPool(
+        max_workers=1, max_pending=1, executor_factory=ThreadPoolExecutor
+    )
+
+    def boom() -> None:
+        raise RuntimeError("bcrypt error")
+
+    with pytest.raises(RuntimeError):
+        pool.run(boom)
+    assert pool.run(lambda: 42) == 42
+    pool.shutdown()
+
+
+def test_max_pending_must_cover_workers():
+    with pytest.raises(ValueError):
+        PasswordHashPool(max_workers=4, max_pending=2)
+
+
+def test_default_admission_is_two_calls_per_worker():
+    release = threading.Event()
+    started = threading.Semaphore(0)
+
+    def slow() -> None:
+        started.release()
+        release.wait(timeout=5)
+
+    pool = PasswordHashPool(max_workers=1, executor_factory=ThreadPoolExecutor)
+    callers = [threading.Thread(target=pool.run, args=(slow,)) for _ in range(2)]
+    for t in callers:
+        t.start()
+    assert started.acquire(timeout=5)
+    callers[1].join(timeout=0.2)
+
+    with pytest.raises(PasswordHashingBusyError):
+        pool.run(slow)
+
+    release.set()
+    for t in callers:
+        t.join(timeout=5)
+    pool.shutdown()
+
+
+def test_shared_pool_is_sized_on_first_call(mocker):
+    from utils import password_pool
+
+    mocker.patch.object(password_pool, "_shared_pool", None)
+
+    pool = password_pool.shared_password_pool(max_workers=3, max_pending=5)
+
+    assert password_pool.shared_password_pool(max_workers=8) is pool
+    assert pool._workers == 3
+    password_pool.shutdown_password_pool()
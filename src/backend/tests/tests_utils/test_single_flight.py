@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import threading
+
+import pytest
+
+from utils.single_flight import SingleFlight
+
+
+class CountingEvent(threading.Event):
+    """Event qui compte les threads entrés dans `wait`."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._count_lock = threading.Lock()
+        self.waiting = 0
+
+    def wait(self, timeout: float | None = None) -> bool:
+        with self._count_lock:
+            self.waiting += 1
+        return super().wait(timeout)
+
+
+def test_concurrent_identical_calls_share_one_execution():
+    flights: SingleFlight[str] = SingleFlight()
+    release = threading.Event()
+    calls: list[int] = []
+    results: list[str] = []
+
+    def fn() -> str:
+        calls.append(1)
+        release.wait(timeout=5)
+        return "result"
+
+    def call() -> None:
+        results.append(flights.do("key", fn))
+
+    # Le premier thread (leader) bloque dans fn ; les suivants le rejoignent
+    threads = [threading.Thread(target=call) for _ in range(5)]
+    threads[0].start()
+    while flights.in_flight() == 0:
+        pass
+    done = flights._calls["key"].done = CountingEvent()
+    for t in threads[1:]:
+        t.start()
+    while done.waiting < 4:
+        pass
+    release.set()
+    for t in threads:
+        t.join(timeout=5)
+
+    assert calls == [1]
+    assert results == ["result"] * 5
+    assert flights.in_flight() == 0
+
+
+def test_different_keys_run_independently():
+    flights: SingleFlight[int] = SingleFlight()
+
+    assert flights.do("a", lambda: 1) == 1
+    assert flights.do("b", lambda: 2) == 2
+
+
+def test_sequential_calls_are_not_memoized():
+    flights: SingleFlight[int] = SingleFlight()
+    counter = iter(range(10))
+
+    assert flights.do("k", lambda: next(counter)) == 0
+    assert flights.do("k", lambda: next(counter)) == 1
+
+
+def test_error_is_shared_and_key_released():
+    flights: SingleFlight[int] = SingleFlight()
+
+    def boom() -> int:
+        raise RuntimeError("upstream down")
+
+    with pytest.raises(RuntimeError, match="upstream down"):
+        flights.do("k", boom)
+
+    assert flights.in_flight() == 0
+    assert flights.do("k", lambda: 3) == 3
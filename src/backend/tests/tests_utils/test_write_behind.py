@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import threading
+
+import pytest
+
+from utils.write_behind import WriteBehindQueue
+
+
+def test_items_are_processed_in_batches_and_drained_on_close():
+    release = threading.Event()
+    batches: list[list[int]] = []
+
+    def handler(batch: list[int]) -> None:
+        release.wait(timeout=5)
+        batches.append(batch)
+
+    q: WriteBehindQueue[int] = WriteBehindQueue(handler, batch_size=3)
+    for i in range(7):
+        assert q.submit(i)
+    release.set()
+
+    assert q.close(timeout=5)
+    assert [i for b in batches for i in b] == list(range(7))
+    assert all(len(b) <= 3 for b in batches)
+    assert len(batches) < 7  # les éléments en attente sont regroupés
+
+
+def test_submit_is_refused_when_full_or_closed():
+    release = threading.Event()
+    q: WriteBehindQueue[int] = WriteBehindQueue(
+        lambda _b: release.wait(timeout=5), max_size=1, batch_size=1
+    )
+
+    assert q.submit(1)
+    while len(q):  # le worker a pris le premier élément
+        pass
+    assert q.submit(2)
+    assert not q.submit(3)  # file pleine
+
+    release.set()
+    assert q.close(timeout=5)
+    assert not q.submit(4)
+
+
+def test_failed_batch_is_retried_then_dropped():
+    attempts: list[list[str]] = []
+
+    def handler(batch: list[str]) -> None:
+        attempts.append(batch)
+        if batch == ["bad"] or len(attempts) == 1:
+            raise RuntimeError("db down")
+
+    q: WriteBehindQueue[str] = WriteBehindQueue(
+        handler, batch_size=1, max_retries=2, retry_backoff=0
+    )
+    q.submit("ok")
+    q.submit("bad")
+    q.submit("after")
+
+    assert q.close(timeout=5)
+    # "ok" réussit au 2e essai, "bad" est abandonné après 3 essais
+    assert attempts == [["ok"], ["ok"], ["bad"], ["bad"], ["bad"], ["after"]]
+
+
+def test_pending_duplicate_keys_are_submitted_once():
+    release = threading.Event()
+    seen: list[str] = []
+
+    def handler(batch: list[str]) -> None:
+        release.wait(timeout=5)
+        seen.extend(batch)
+
+    q: WriteBehindQueue[str] = WriteBehindQueue(handler, batch_size=10, key=str.lower)
+    q.submit("warmup")
+    while len(q):
+        pass
+    q.submit("Pancakes")
+    q.submit("pancakes")
+    release.set()
+    assert q.close(timeout=5)
+
+    q2: WriteBehindQueue[str] = WriteBehindQueue(seen.extend, key=str.lower)
+    q2.submit("Pancakes")  # plus en attente : accepté à nouveau
+    assert q2.close(timeout=5)
+
+    assert seen == ["warmup", "Pancakes", "Pancakes"]
+
+
+def test_invalid_sizes_are_rejected():
+    with pytest.raises(ValueError):
+        WriteBehindQueue(lambda _b: None, max_size=0)
+    with pytest.raises(ValueError):
+        WriteBehindQueue(lambda _b: None, batch_size=0)
+
+
+def test_submit_future_resolves_with_aligned_handler_result():
+    release = threading.Event()
+
+    def handler(batch: list[str]) -> list[str]:
+        release.wait(timeout=5)
+        return [s.upper() for s in batch]
+
+    q: WriteBehindQueue[str] = WriteBehindQueue(handler, batch_size=10, key=str.lower)
+    q.submit_future("warmup")
+    while len(q):
+        pass
+    first = q.submit_future("egg")
+    again = q.submit_future("EGG")  # même clé en attente : même future
+    other = q.submit_future("milk")
+    release.set()
+
+    assert again is first
+    assert first.result(timeout=5) == "EGG"
+    assert other.result(timeout=5) == "MILK"
+    assert q.close(timeout=5)
+
+
+def test_submit_future_gets_none_when_handler_result_is_not_aligned():
+    q: WriteBehindQueue[str] = WriteBehindQueue(lambda _b: None)
+
+    assert q.submit_future("egg").result(timeout=5) is None
+    assert q.close(timeout=5)
+
+
+def test_submit_future_carries_error_of_dropped_batch():
+    def handler(_batch: list[str]) -> None:
+        raise RuntimeError("db down")
+
+    q: WriteBehindQueue[str] = WriteBehindQueue(handler, max_retries=0, retry_backoff=0)
+
+    future = q.submit_future("egg")
+
+    with pytest.raises(RuntimeError, match="db down"):
+        future.result(timeout=5)
+    assert q.close(timeout=5)
+    assert q.submit_future("late") is None  # file fermée
@@ -1,9 +1,14 @@
 from __future__ import annotations
 
 import base64
+from collections import OrderedDict
+from collections.abc import Callable
+import contextlib
+import functools
 import hashlib
 import hmac
 import json
+import threading
 import time
 from typing import Any
 
@@ -34,6 +39,68 @@ def _b64url_decode(data: str) -> bytes:
     return base64.urlsafe_b64decode((data + padding).encode("utf-8"))
 
 
+@functools.lru_cache(maxsize=8)
+def _hmac_key(secret: str) -> hmac.HMAC:
+    """HMAC-SHA256 préparé pour `secret` (clé encodée et paddée une seule
+    fois) ; à dupliquer avec `.copy()` avant usage."""
+    return hmac.new(secret.encode("utf-8"), digestmod=hashlib.sha256)
+
+
+def _sign(secret: str, signing_input: bytes) -> str:
+    mac = _hmac_key(secret).copy()
+    mac.update(signing_input)
+    return _b64url_encode(mac.digest())
+
+
+class VerifiedTokenCache:
+    """Cache LRU borné des tokens déjà vérifiés (signature + issuer).
+
+    Un client renvoie le même access token à chaque requête pendant sa durée
+    de vie : on évite de re-décoder et re-signer. `exp` est revérifié à chaque
+    lecture ; une entrée expirée est retirée.
+    """
+
+    def __init__(
+        self, *, max_entries: int = 4096, clock: Callable[[], float] = time.time
+    ) -> None:
+        if max_entries < 1:
+            raise ValueError("max_entries must be >= 1")
+        self._max_entries = int(max_entries)
+        self._clock = clock
+        self._lock = threading.Lock()
+        # (secret, issuer, token) -> (payload, exp)
+        self._entries: OrderedDict[tuple, tuple[dict[str, Any], int | None]] = (
+            OrderedDict()
+        )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: tuple, *, verify_exp: bool = True) -> dict[str, Any] | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            payload, exp = entry
+            if verify_exp and exp is not None and exp <= int(self._clock()):
+                del self._entries[key]
+                raise JWTExpiredError("JWT expiré.")
+            self._entries.move_to_end(key)
+        # Copie : l'appelant ne doit pas pouvoir altérer l'entrée
+        return dict(payload)
+
+    def put(self, key: tuple, payload: dict[str, Any], exp: int | None) -> None:
+        with self._lock:
+            self._entries[key] = (dict(payload), exp)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
 def encode_jwt(
     payload: dict[str, Any],
     *,
@@ -59,8 +126,7 @@ def encode_jwt(
     payload_b64 = _b64url_encode(payload_json)
 
     signing_input = f"{header_b64}.{payload_b64}".encode()
-    signature = hmac.new(secret.encode("utf-8"), signing_input, hashlib.sha256).digest()
-    signature_b64 = _b64url_encode(signature)
+    signature_b64 = _sign(secret, signing_input)
 
     return f"{header_b64}.{payload_b64}.{signature_b64}"
 
@@ -71,13 +137,40 @@ def decode_jwt(
     secret: str,
     verify_exp: bool = True,
     issuer: str | None = None,
+    cache: VerifiedTokenCache | None = None,
 ) -> dict[str, Any]:
     """
     Décode et vérifie un JWT HS256.
     - verify_exp: si True, vérifie exp
     - issuer: si non None, vérifie payload["iss"] == issuer
+    - cache: tokens déjà vérifiés (seul exp est alors revérifié)
     Retourne le payload dict.
     """
+    if cache is not None:
+        cache_key = (secret, issuer, token)
+        cached = cache.get(cache_key, verify_exp=verify_exp)
+        if cached is not None:
+            return cached
+
+    payload = _decode_and_verify(
+        token, secret=secret, verify_exp=verify_exp, issuer=issuer
+    )
+
+    if cache is not None:
+        exp = payload.get("exp")
+        # exp illisible (verify_exp=False) : non mis en cache
+        with contextlib.suppress(TypeError, ValueError):
+            cache.put(cache_key, payload, None if exp is None else int(exp))
+    return payload
+
+
+def _decode_and_verify(
+    token: str,
+    *,
+    secret: str,
+    verify_exp: bool,
+    issuer: str | None,
+) -> dict[str, Any]:
     try:
         header_b64, payload_b64, signature_b64 = token.split(".")
     except ValueError as exc:
@@ -96,10 +189,7 @@ def decode_jwt(
 
     # 3) Vérifier signature
     signing_input = f"{header_b64}.{payload_b64}".encode()
-    expected_sig = hmac.new(
-        secret.encode("utf-8"), signing_input, hashlib.sha256
-    ).digest()
-    expected_sig_b64 = _b64url_encode(expected_sig)
+    expected_sig_b64 = _sign(secret, signing_input)
 
     if not hmac.compare_digest(expected_sig_b64, signature_b64):
         raise JWTInvalidTokenError("Signature JWT invalide.")
@@ -0,0 +1,139 @@
+"""Hachage / vérification bcrypt hors des threads du serveur.
+
+bcrypt (coût 12) occupe un cœur plusieurs centaines de millisecondes par
+appel. Les appels sont exécutés dans un pool de processus dédié, dimensionné
+sur le nombre de cœurs, avec un nombre borné d'appels admis (en cours + en
+attente) : au-delà, `PasswordHashingBusyError` est levée immédiatement
+(réponse 503) plutôt que de laisser une rafale de connexions occuper les
+threads qui servent les stocks et les recettes.
+
+Chaque appel admis bloque son thread jusqu'au résultat : la borne par défaut
+(2 x processus, soit au plus un appel en attente par processus) limite
+aussi le nombre de threads du serveur immobilisés.
+
+Taille du pool et borne : `PASSWORD_HASH_*` (voir `api.config.Settings`),
+appliquées au démarrage de l'application (`shared_password_pool`).
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from concurrent.futures import Executor, ProcessPoolExecutor
+import multiprocessing
+import os
+import threading
+from typing import Any, TypeVar
+
+from exceptions import PasswordHashingBusyError
+from utils import securite
+
+
+T = TypeVar("T")
+
+
+def _process_pool(max_workers: int) -> Executor:
+    # "spawn" : pas de fork d'un processus serveur multi-threadé
+    return ProcessPoolExecutor(
+        max_workers=max_workers, mp_context=multiprocessing.get_context("spawn")
+    )
+
+
+class PasswordHashPool:
+    """Pool de hachage avec contrôle d'admission.
+
+    `admission_timeout` : attente maximale d'une place (0 = rejet immédiat).
+    """
+
+    def __init__(
+        self,
+        *,
+        max_workers: int | None = None,
+        max_pending: int | None = None,
+        admission_timeout: float = 0.0,
+        executor_factory: Callable[[int], Executor] = _process_pool,
+    ) -> None:
+        workers = int(max_workers or os.cpu_count() or 1)
+        pending = int(max_pending or 2 * workers)
+        if pending < workers:
+            raise ValueError("max_pending must be >= max_workers")
+
+        self._workers = workers
+        self._admission_timeout = max(0.0, float(admission_timeout))
+        self._slots = threading.BoundedSemaphore(pending)
+        self._executor_factory = executor_factory
+        self._executor: Executor | None = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = self._executor_factory(self._workers)
+        return self._executor
+
+    def run(self, fn: Callable[..., T], *args: Any) -> T:
+        """Exécute `fn(*args)` dans le pool ; lève `PasswordHashingBusyError`
+        si aucune place ne se libère dans le délai d'admission."""
+        if self._admission_timeout > 0:
+            admitted = self._slots.acquire(timeout=self._admission_timeout)
+        else:
+            admitted = self._slots.acquire(blocking=False)
+        if not admitted:
+            raise PasswordHashingBusyError(
+                "Service d'authentification saturé, réessayez plus tard."
+            )
+
+        try:
+            return self._get_executor().submit(fn, *args).result()
+        finally:
+            self._slots.release()
+
+    def hash(self, password: str) -> str:
+        return self.run(securite.hash_password, password)
+
+    def check(self, plain_password: str, hashed_password: str) -> bool:
+        return self.run(securite.check_password, plain_password, hashed_password)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+
+
+_shared_pool: PasswordHashPool | None = None
+_shared_lock = threading.Lock()
+
+
+def shared_password_pool(
+    *, max_workers: int | None = None, max_pending: int | None = None
+) -> PasswordHashPool:
+    """Pool partagé par le processus (processus de travail lancés au premier
+    hachage). Les paramètres ne sont pris en compte qu'au premier appel."""
+    global _shared_pool
+    if _shared_pool is None:
+        with _shared_lock:
+            if _shared_pool is None:
+                _shared_pool = PasswordHashPool(
+                    max_workers=max_workers, max_pending=max_pending
+                )
+    return _shared_pool
+
+
+def shutdown_password_pool() -> None:
+    """Arrête les processus de hachage (à l'arrêt de l'application)."""
+    global _shared_pool
+    with _shared_lock:
+        pool, _shared_pool = _shared_pool, None
+    if pool is not None:
+        pool.shutdown()
+
+
+def hash_password(password: str) -> str:
+    """`securite.hash_password` exécuté dans le pool partagé."""
+    return shared_password_pool().hash(password)
+
+
+def check_password(plain_password: str, hashed_password: str) -> bool:
+    """`securite.check_password` exécuté dans le pool partagé."""
+    return shared_password_pool().check(plain_password, hashed_password)
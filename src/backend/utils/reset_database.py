@@ -1,6 +1,7 @@
 import logging
 import os
 from pathlib import Path
+import re
 import sys
 from unittest import mock
 
@@ -64,6 +65,15 @@ def _has_executable_sql(sql: str | None) -> bool:
     return bool(_strip_sql_comments(sql))
 
 
+def _target_schema(sql: str, schema: str) -> str:
+    """
+    Les fichiers SQL ciblent `projet_dao` en dur (nécessaire pour
+    docker-entrypoint-initdb.d). On les redirige vers le schéma demandé,
+    sinon le reset du schéma de test écrirait dans `projet_dao`.
+    """
+    return re.sub(r"\bprojet_dao\b", schema, sql)
+
+
 class ResetDatabase(metaclass=Singleton):
     @log
     def lancer(self, test_dao=True, populate=True):
@@ -96,7 +106,7 @@ class ResetDatabase(metaclass=Singleton):
             raise FileNotFoundError(f"Fichier manquant : {INIT_SQL_PATH}")
 
         with INIT_SQL_PATH.open(encoding="utf-8") as f:
-            init_db_sql = f.read()
+            init_db_sql = _target_schema(f.read(), schema)
 
         if not _has_executable_sql(init_db_sql):
             raise ValueError(
@@ -106,7 +116,7 @@ class ResetDatabase(metaclass=Singleton):
         pop_db_sql = None
         if pop_data_path and pop_data_path.exists():
             with pop_data_path.open(encoding="utf-8") as f:
-                pop_db_sql = f.read()
+                pop_db_sql = _target_schema(f.read(), schema)
 
         run_pop = _has_executable_sql(pop_db_sql)
 
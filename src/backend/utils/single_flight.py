@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+from collections.abc import Callable, Hashable
+import threading
+from typing import Any, Generic, TypeVar
+
+
+T = TypeVar("T")
+
+
+class _Call:
+    """Appel en cours pour une clé : résultat ou erreur partagés."""
+
+    __slots__ = ("done", "error", "result")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException | None = None
+
+
+class SingleFlight(Generic[T]):
+    """Déduplication des appels concurrents identiques ("single-flight").
+
+    Tant qu'un appel `do(key, fn)` est en cours, les autres threads appelant
+    `do` avec la même clé n'exécutent pas `fn` : ils attendent et reçoivent le
+    même résultat (ou la même exception). Rien n'est mémorisé après la fin de
+    l'appel : un appel ultérieur relance `fn`.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: dict[Hashable, _Call] = {}
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> T:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    def in_flight(self) -> int:
+        """Nombre de clés en cours d'exécution."""
+        with self._lock:
+            return len(self._calls)
@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+from collections.abc import Callable, Hashable
+from concurrent.futures import Future
+import logging
+import queue
+import threading
+import time
+from typing import Any, Generic, TypeVar
+
+
+T = TypeVar("T")
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class WriteBehindQueue(Generic[T]):
+    """File d'écriture différée ("write-behind"), bornée, traitée par lots.
+
+    `submit` rend la main immédiatement ; un thread de fond regroupe les
+    éléments en attente (jusqu'à `batch_size`) et appelle `handler(lot)`.
+    En cas d'erreur, le lot est rejoué `max_retries` fois (attente
+    exponentielle) puis abandonné : `handler` doit être idempotent.
+
+    - file pleine : l'élément est refusé (`submit` renvoie False)
+    - `key` (optionnel) : un élément dont la clé est déjà en attente est ignoré
+    - `close` traite les éléments déjà soumis puis arrête le thread
+    - `submit_future` : pour attendre l'écriture d'un élément. Si `handler`
+      renvoie une liste alignée sur le lot, chaque future reçoit l'élément
+      correspondant (sinon None) ; elle reçoit l'exception si le lot est
+      abandonné
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[list[T]], object],
+        *,
+        max_size: int = 256,
+        batch_size: int = 20,
+        max_retries: int = 3,
+        retry_backoff: float = 0.5,
+        key: Callable[[T], Hashable] | None = None,
+        name: str = "write-behind",
+    ) -> None:
+        if max_size < 1:
+            raise ValueError("max_size must be >= 1")
+        if batch_size < 1:
+            raise ValueError("batch_size must be >= 1")
+
+        self._handler = handler
+        self._batch_size = int(batch_size)
+        self._max_retries = max(0, int(max_retries))
+        self._retry_backoff = max(0.0, float(retry_backoff))
+        self._key = key
+        self._name = name
+
+        self._queue: queue.Queue = queue.Queue(maxsize=int(max_size))
+        self._lock = threading.Lock()
+        # clé en attente -> future de l'élément déjà soumis
+        self._pending_keys: dict[Hashable, Future[Any]] = {}
+        self._thread: threading.Thread | None = None
+        self._closed = False
+
+    def __len__(self) -> int:
+        return self._queue.qsize()
+
+    def submit(self, item: T) -> bool:
+        """Ajoute `item` à la file ; False s'il est refusé (file pleine ou fermée)."""
+        return self.submit_future(item) is not None
+
+    def submit_future(self, item: T) -> Future[Any] | None:
+        """Ajoute `item` à la file et renvoie la future de son écriture (celle
+        de l'élément déjà en attente pour la même clé), ou None s'il est
+        refusé (file pleine ou fermée)."""
+        k = self._key(item) if self._key is not None else None
+        with self._lock:
+            if self._closed:
+                return None
+            if k is not None and k in self._pending_keys:
+                return self._pending_keys[k]
+            future: Future[Any] = Future()
+            try:
+                self._queue.put_nowait((item, future))
+            except queue.Full:
+                logger.warning("%s: queue full, item dropped", self._name)
+                return None
+            if k is not None:
+                self._pending_keys[k] = future
+            self._ensure_worker()
+        return future
+
+    def close(self, timeout: float | None = 10.0) -> bool:
+        """Traite les éléments en attente puis arrête le thread.
+
+        Renvoie False si la file n'a pas été vidée avant `timeout`.
+        """
+        with self._lock:
+            self._closed = True
+            thread = self._thread
+        if thread is None:
+            return True
+
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            return False
+        thread.join(timeout)
+        return not thread.is_alive()
+
+    def _ensure_worker(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run, name=self._name, daemon=True
+            )
+            self._thread.start()
+
+    def _run(self) -> None:
+        stop = False
+        while not stop:
+            batch = [self._queue.get()]
+            while len(batch) < self._batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            entries = [entry for entry in batch if entry is not _STOP]
+            stop = len(entries) < len(batch)
+            if entries:
+                self._process(entries)
+
+    def _process(self, entries: list[tuple[T, Future[Any]]]) -> None:
+        items = [item for item, _future in entries]
+        futures = [future for _item, future in entries]
+        try:
+            for attempt in range(self._max_retries + 1):
+                try:
+                    result = self._handler(items)
+                except Exception as exc:
+                    if attempt == self._max_retries:
+                        logger.exception(
+                            "%s: batch of %s items dropped after %s attempts",
+                            self._name,
+                            len(items),
+                            attempt + 1,
+                        )
+                        for future in futures:
+                            _resolve(future, error=exc)
+                        return
+                    delay = self._retry_backoff * (2**attempt)
+                    logger.warning(
+                        "%s: batch failed, retrying in %.2fs", self._name, delay
+                    )
+                    time.sleep(delay)
+                else:
+                    aligned = isinstance(result, list) and len(result) == len(items)
+                    for i, future in enumerate(futures):
+                        _resolve(future, result=result[i] if aligned else None)
+                    return
+        finally:
+            if self._key is not None:
+                with self._lock:
+                    for item in items:
+                        self._pending_keys.pop(self._key(item), None)
+
+
+def _resolve(
+    future: Future[Any], *, result: Any = None, error: BaseException | None = None
+) -> None:
+    """Termine `future` (sauf si l'appelant l'a annulée entre-temps)."""
+    if future.done():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)